@@ -19,6 +19,8 @@ from migration.individual.import_size_aliases import import_size_aliases
 from migration.individual.import_bom import import_bom_data
 from migration.individual.import_color_aliases import import_color_aliases
 from migration.individual.import_stock import import_stock_data
+from migration.partitions import maintain_partitions
+from migration.refresh_views import DEFAULT_WORKERS, STATUS_FAILED, refresh_views
 from initial_populate import populate_archival_sales
 from utils.import_utils import log_info, log_error, log_header
 
@@ -27,32 +29,29 @@ def _fetch_single_row(conn, query: str) -> tuple:
     return conn.execute(text(query)).fetchone()
 
 
+def create_sales_partitions(connection_string: str) -> None:
+    engine = create_engine(connection_string)
+
+    try:
+        created = maintain_partitions(engine)
+        log_info(f"Sales partitions ready ({len(created)} created)")
+    except Exception as e:
+        log_error(f"Error creating sales partitions: {str(e)[:100]}")
+
+    engine.dispose()
+
+
 def refresh_materialized_views(connection_string: str) -> None:
     log_header("Refreshing materialized views...")
 
-    engine = create_engine(connection_string)
+    engine = create_engine(connection_string, pool_size=DEFAULT_WORKERS)
 
     try:
-        with engine.connect() as conn:
-            result = conn.execute(text("""
-                SELECT matviewname FROM pg_matviews
-                WHERE schemaname = 'public' ORDER BY matviewname
-            """))
-            views = [row[0] for row in result]
-
-            if not views:
-                log_info("  No materialized views found (this is normal if not created yet)")
-                engine.dispose()
-                return
-
-            for view in views:
-                log_info(f"Refreshing {view}...")
-                try:
-                    conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
-                    conn.commit()
-                    log_info("  OK")
-                except Exception as e:
-                    log_info(f"  Skipped ({str(e)[:50]}...)")
+        for result in refresh_views(engine):
+            if result.status == STATUS_FAILED:
+                log_info(f"  {result.view_name}: skipped ({result.detail[:50]}...)")
+            else:
+                log_info(f"  {result.view_name}: {result.status} in {result.duration:.1f}s")
 
         log_info("Materialized views refresh complete")
     except Exception as e:
@@ -136,6 +135,7 @@ def main() -> None:
     start_time = datetime.now()
 
     import_steps = [
+        ("Creating sales partitions", create_sales_partitions),
         ("Importing archival sales data", populate_archival_sales),
         ("Importing current year sales data", import_current_sales),
         ("Importing stock data", import_stock_data),
@@ -9,25 +9,25 @@ from pathlib import Path
 import pandas as pd
 from dotenv import find_dotenv, load_dotenv
 from sqlalchemy import create_engine
-from tqdm import tqdm
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sales_data.loader import SalesDataLoader
+from utils.import_pipeline import PipelineStage, run_pipeline
 from utils.import_utils import (
-    compute_file_hash,
-    is_file_imported,
+    filter_new_files,
+    hash_sales_file,
+    import_sales_frame,
     log_file_import,
-    process_sales_file_in_batches,
 )
-from utils.parallel_loader import parallel_load
 
 load_dotenv(find_dotenv(filename=".env"))
 
-BATCH_SIZE = 1000
+STAGE_WORKERS = {"hash": 4, "check": 1, "parse": 4, "load": 1}
+CHECK_BATCH_SIZE = 50
 
 
-def _collect_current_files_to_import(engine, loader) -> list[tuple]:
+def _collect_current_files(loader) -> list[tuple]:
     if not loader.sales_dir.exists():
         print(f"Sales directory not found: {loader.sales_dir}")
         return []
@@ -38,12 +38,7 @@ def _collect_current_files_to_import(engine, loader) -> list[tuple]:
         return []
 
     current_files.sort(key=lambda x: x[2], reverse=True)
-
-    return [
-        (file_path, start_date, end_date, compute_file_hash(file_path))
-        for file_path, start_date, end_date in current_files
-        if not is_file_imported(engine, compute_file_hash(file_path), "sales_current")
-    ]
+    return current_files
 
 
 def _load_sales_file(
@@ -69,8 +64,8 @@ def _insert_sales_file(
     batch_id = str(uuid.uuid4())
     file_start_time = datetime.now()
 
-    records_imported = process_sales_file_in_batches(
-        df, engine, file_path, start_date, end_date, batch_id, data_source, BATCH_SIZE
+    records_imported = import_sales_frame(
+        df, engine, file_path, start_date, end_date, batch_id, data_source
     )
 
     processing_time_ms = int((datetime.now() - file_start_time).total_seconds() * 1000)
@@ -84,12 +79,23 @@ def _insert_sales_file(
     return records_imported
 
 
-def _print_import_summary(files_to_import: list[tuple]) -> None:
-    print(f"Found {len(files_to_import)} file(s) to import:")
-    for file_path, start_date, end_date, _ in files_to_import:
+def _print_import_summary(current_files: list[tuple]) -> None:
+    print(f"Found {len(current_files)} sales file(s):")
+    for file_path, start_date, end_date in current_files:
         print(f"  - {file_path.name}: {start_date.date()} to {end_date.date()}")
 
 
+def _insert_loaded_file(engine, loaded: tuple[tuple, pd.DataFrame]) -> int | None:
+    file_info, df = loaded
+    try:
+        return _insert_sales_file(
+            engine, file_info, df, "current", "sales_current", "import_current_sales"
+        )
+    except (ValueError, OSError, IOError) as exc:
+        print(f"ERROR inserting {file_info[0].name}: {exc}")
+        return None
+
+
 def import_current_sales(connection_string: str) -> None:
     print("Starting current year sales data import...")
     print("=" * 60)
@@ -97,39 +103,34 @@ def import_current_sales(connection_string: str) -> None:
     engine = create_engine(connection_string)
     loader = SalesDataLoader()
 
-    files_to_import = _collect_current_files_to_import(engine, loader)
+    current_files = _collect_current_files(loader)
 
-    if not files_to_import:
+    if not current_files:
         print("No new current sales files to import")
         return
 
-    _print_import_summary(files_to_import)
-
-    print(f"\nLoading {len(files_to_import)} file(s) in parallel...")
-    loaded_data = parallel_load(
-        files_to_import,
-        lambda info: _load_sales_file(loader, info),
-        desc="Loading sales files",
-    )
-
-    if not loaded_data:
-        print("No files loaded successfully")
-        engine.dispose()
-        return
-
-    print(f"\nInserting {len(loaded_data)} file(s) to database...")
-    total_records = 0
-    for file_info, df in tqdm(loaded_data, desc="Inserting files"):
-        try:
-            total_records += _insert_sales_file(
-                engine, file_info, df, "current", "sales_current", "import_current_sales"
-            )
-        except (ValueError, OSError, IOError) as exc:
-            file_path = file_info[0]
-            print(f"ERROR inserting {file_path.name}: {exc}")
+    _print_import_summary(current_files)
+
+    print("\nImporting new files (hash -> check -> parse -> load)...")
+    stages = [
+        PipelineStage("hash", hash_sales_file, STAGE_WORKERS["hash"]),
+        PipelineStage(
+            "check",
+            lambda batch: filter_new_files(engine, batch, "sales_current"),
+            STAGE_WORKERS["check"],
+            batch_size=CHECK_BATCH_SIZE,
+        ),
+        PipelineStage("parse", lambda info: _load_sales_file(loader, info), STAGE_WORKERS["parse"]),
+        PipelineStage(
+            "load", lambda loaded: _insert_loaded_file(engine, loaded), STAGE_WORKERS["load"]
+        ),
+    ]
+    imported, stage_stats = run_pipeline(current_files, stages)
 
     print("=" * 60)
-    print(f"Import complete: {total_records} total records imported")
+    for stats in stage_stats:
+        print(f"  {stats.summary()}")
+    print(f"Import complete: {sum(imported)} total records imported from {len(imported)} file(s)")
     engine.dispose()
 
 
@@ -14,12 +14,12 @@ from sqlalchemy.engine import Engine
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sales_data.loader import SalesDataLoader
-from utils.import_utils import build_forecast_record
-from utils.parallel_loader import parallel_load
+from utils.import_pipeline import PipelineStage, run_pipeline
+from utils.import_utils import FORECAST_CONFLICT, build_forecast_frame, copy_merge
 
 load_dotenv(find_dotenv(filename=".env"))
 
-BATCH_SIZE = 1000
+STAGE_WORKERS = {"parse": 4, "load": 2}
 
 
 def _check_existing_dates(engine: Engine, forecast_files: list[tuple[Path, datetime]]) -> set[datetime]:
@@ -36,23 +36,6 @@ def _check_existing_dates(engine: Engine, forecast_files: list[tuple[Path, datet
         return {row[0] for row in result.fetchall()}
 
 
-def _insert_forecast_batch(engine: Engine, batch_data: list[dict]) -> None:
-    with engine.connect() as conn:
-        conn.execute(
-            text("""
-                INSERT INTO forecast_data (forecast_date, sku, forecast_quantity,
-                                           model, generated_date,
-                                           source_file, import_batch_id)
-                VALUES (:forecast_date, :sku, :forecast_quantity,
-                        :model, :generated_date,
-                        :source_file, :import_batch_id)
-                ON CONFLICT (sku, forecast_date, generated_date) DO NOTHING
-            """),
-            batch_data,
-        )
-        conn.commit()
-
-
 def _load_forecast_file(
     loader: SalesDataLoader, file_info: tuple[Path, datetime]
 ) -> tuple[Path, datetime, pd.DataFrame] | None:
@@ -70,18 +53,19 @@ def _load_forecast_file(
 
 
 def _insert_forecast_file(
-    engine: Engine, file_path: Path, generation_date: datetime, df: pd.DataFrame
-) -> None:
+    engine: Engine, loaded: tuple[Path, datetime, pd.DataFrame]
+) -> int | None:
+    file_path, generation_date, df = loaded
     batch_id = str(uuid.uuid4())
-    batch_data = [
-        build_forecast_record(row, generation_date, file_path, batch_id)
-        for _, row in df.iterrows()
-    ]
-
-    for i in range(0, len(batch_data), BATCH_SIZE):
-        _insert_forecast_batch(engine, batch_data[i:i + BATCH_SIZE])
+    try:
+        frame = build_forecast_frame(df, generation_date, file_path, batch_id)
+        records_imported = copy_merge(engine, "forecast_data", frame, FORECAST_CONFLICT)
+    except (ValueError, OSError, IOError) as e:
+        print(f"  ERROR inserting {file_path.name}: {e}")
+        return None
 
     print(f"  OK Imported forecast records for {df['sku'].nunique()} SKUs from {file_path.name}")
+    return records_imported
 
 
 def _print_forecast_files_summary(forecast_files: list[tuple[Path, datetime]]) -> None:
@@ -119,25 +103,19 @@ def import_forecast_data(connection_string: str) -> None:
     if skipped > 0:
         print(f"\nSkipping {skipped} already imported file(s)")
 
-    print(f"\nLoading {len(files_to_import)} file(s) in parallel...")
-    loaded_data = parallel_load(
-        files_to_import,
-        lambda info: _load_forecast_file(loader, info),
-        desc="Loading forecast files",
-    )
-
-    if not loaded_data:
-        print("No files loaded successfully")
-        engine.dispose()
-        return
-
-    print(f"\nInserting {len(loaded_data)} file(s) to database...")
-    for file_path, generation_date, df in loaded_data:
-        try:
-            _insert_forecast_file(engine, file_path, generation_date, df)
-        except (ValueError, OSError, IOError) as e:
-            print(f"  ERROR inserting {file_path.name}: {e}")
+    print(f"\nImporting {len(files_to_import)} file(s) (parse -> load)...")
+    stages = [
+        PipelineStage(
+            "parse", lambda info: _load_forecast_file(loader, info), STAGE_WORKERS["parse"]
+        ),
+        PipelineStage(
+            "load", lambda loaded: _insert_forecast_file(engine, loaded), STAGE_WORKERS["load"]
+        ),
+    ]
+    _, stage_stats = run_pipeline(files_to_import, stages)
 
+    for stats in stage_stats:
+        print(f"  {stats.summary()}")
     print("=" * 60)
     print("Forecast import complete")
     engine.dispose()
@@ -6,6 +6,7 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 
+import pandas as pd
 from dotenv import find_dotenv, load_dotenv
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
@@ -13,17 +14,17 @@ from sqlalchemy.engine import Engine
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sales_data.loader import SalesDataLoader
-from utils.import_utils import build_stock_record
-from utils.parallel_loader import parallel_load
+from utils.import_pipeline import PipelineStage, run_pipeline
+from utils.import_utils import STOCK_CONFLICT, build_stock_frame, copy_merge
 
 load_dotenv(find_dotenv(filename=".env"))
 
-BATCH_SIZE = 1000
+STAGE_WORKERS = {"parse": 4, "load": 2}
 
 
 def _load_stock_file(
         loader: SalesDataLoader, file_info: tuple[Path, datetime]
-) -> tuple[Path, datetime, list[dict]] | None:
+) -> tuple[Path, datetime, pd.DataFrame] | None:
     file_path, snapshot_date = file_info
     try:
         df = loader.load_stock_file(file_path)
@@ -31,13 +32,20 @@ def _load_stock_file(
             return None
         print(f"  Loaded: {file_path.name} ({len(df):,} rows)")
         batch_id = str(uuid.uuid4())
-        records = [build_stock_record(row, snapshot_date, file_path, batch_id) for _, row in df.iterrows()]
-        return file_path, snapshot_date, records
+        frame = build_stock_frame(df, snapshot_date, file_path, batch_id)
+        return file_path, snapshot_date, frame
     except (ValueError, OSError, IOError) as e:
         print(f"  ERROR loading {file_path.name}: {e}")
         return None
 
 
+def _insert_stock_file(engine: Engine, loaded: tuple[Path, datetime, pd.DataFrame]) -> int:
+    file_path, _, frame = loaded
+    records_imported = copy_merge(engine, "stock_snapshots", frame, STOCK_CONFLICT)
+    print(f"  OK Imported {records_imported} stock records from {file_path.name}")
+    return records_imported
+
+
 def _check_existing_dates(engine: Engine, stock_files: list) -> set[datetime]:
     dates = [d for _, d in stock_files]
     with engine.connect() as conn:
@@ -85,30 +93,17 @@ def import_stock_data(connection_string: str):
     if skipped > 0:
         print(f"\nSkipping {skipped} already imported file(s)")
 
-    print(f"\nLoading {len(files_to_import)} file(s) in parallel...")
-    loaded_data = parallel_load(
-        files_to_import,
-        lambda info: _load_stock_file(loader, info),
-        desc="Loading stock files",
-    )
-
-    print(f"\nInserting {len(loaded_data)} file(s) to database...")
-    for file_path, snapshot_date, records in loaded_data:
-        with engine.connect() as conn:
-            conn.execute(
-                text(
-                    """
-                    INSERT INTO stock_snapshots (snapshot_date, sku, product_name, net_price,
-                                                 available_stock, model, source_file, import_batch_id)
-                    VALUES (:snapshot_date, :sku, :product_name, :net_price,
-                            :available_stock, :model, :source_file, :import_batch_id)
-                    """
-                ),
-                records,
-            )
-            conn.commit()
-
-        print(f"  OK Imported {len(records)} stock records from {file_path.name}")
+    print(f"\nImporting {len(files_to_import)} file(s) (parse -> load)...")
+    stages = [
+        PipelineStage("parse", lambda info: _load_stock_file(loader, info), STAGE_WORKERS["parse"]),
+        PipelineStage(
+            "load", lambda loaded: _insert_stock_file(engine, loaded), STAGE_WORKERS["load"]
+        ),
+    ]
+    _, stage_stats = run_pipeline(files_to_import, stages)
+
+    for stats in stage_stats:
+        print(f"  {stats.summary()}")
 
     print("=" * 60)
     print("Stock import complete")
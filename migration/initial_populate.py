@@ -9,22 +9,22 @@ from pathlib import Path
 import pandas as pd
 from dotenv import find_dotenv, load_dotenv
 from sqlalchemy import create_engine, text
-from tqdm import tqdm
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sales_data.loader import SalesDataLoader
+from utils.import_pipeline import PipelineStage, run_pipeline
 from utils.import_utils import (
-    compute_file_hash,
-    is_file_imported,
+    filter_new_files,
+    hash_sales_file,
+    import_sales_frame,
     log_file_import,
-    process_sales_file_in_batches,
 )
-from utils.parallel_loader import parallel_load
 
 load_dotenv(find_dotenv(filename=".env"))
 
-BATCH_SIZE = 1000
+STAGE_WORKERS = {"hash": 4, "check": 1, "parse": 4, "load": 2}
+CHECK_BATCH_SIZE = 50
 
 
 def _log_failed_import(engine, file_path: Path, file_hash: str, batch_id: str, error_message: str) -> None:
@@ -77,8 +77,8 @@ def _insert_sales_file(
     batch_id = str(uuid.uuid4())
     file_start_time = datetime.now()
 
-    records_imported = process_sales_file_in_batches(
-        df, engine, file_path, start_date, end_date, batch_id, data_source, BATCH_SIZE
+    records_imported = import_sales_frame(
+        df, engine, file_path, start_date, end_date, batch_id, data_source
     )
 
     processing_time = int((datetime.now() - file_start_time).total_seconds() * 1000)
@@ -92,18 +92,18 @@ def _insert_sales_file(
     return records_imported
 
 
-def _collect_files_to_import(engine, loader, directory: Path, file_type: str) -> list[tuple]:
-    if not directory.exists():
-        print(f"Directory not found: {directory}")
-        return []
-
-    files_to_import = []
-    for file_path, start_date, end_date in loader.collect_files_from_directory(directory):
-        file_hash = compute_file_hash(file_path)
-        if not is_file_imported(engine, file_hash, file_type):
-            files_to_import.append((file_path, start_date, end_date, file_hash))
-
-    return files_to_import
+def _insert_loaded_file(engine, loaded: tuple[tuple, pd.DataFrame]) -> int | None:
+    file_info, df = loaded
+    try:
+        return _insert_sales_file(
+            engine, file_info, df, "archival", "sales_archival", "initial_populate"
+        )
+    except (ValueError, OSError, IOError) as e:
+        file_path, _, _, file_hash = file_info
+        batch_id = str(uuid.uuid4())
+        print(f"ERROR inserting {file_path.name}: {str(e)}")
+        _log_failed_import(engine, file_path, file_hash, batch_id, str(e))
+        return None
 
 
 def _toggle_cache_triggers(engine, enable: bool) -> None:
@@ -122,49 +122,43 @@ def populate_archival_sales(connection_string: str) -> None:
     engine = create_engine(connection_string)
     loader = SalesDataLoader()
 
-    files_to_import = _collect_files_to_import(
-        engine, loader, loader.sales_dir, "sales_archival"
-    )
+    if not loader.sales_dir.exists():
+        print(f"Directory not found: {loader.sales_dir}")
+        return
 
-    if not files_to_import:
+    archival_files = loader.collect_files_from_directory(loader.sales_dir)
+
+    if not archival_files:
         print("No new archival files to import")
         return
 
-    print(f"Found {len(files_to_import)} files to import")
+    print(f"Found {len(archival_files)} archival file(s)")
 
     _toggle_cache_triggers(engine, enable=False)
 
-    print(f"\nLoading {len(files_to_import)} file(s) in parallel...")
-    loaded_data = parallel_load(
-        files_to_import,
-        lambda info: _load_sales_file(loader, info),
-        desc="Loading archival files",
-    )
-
-    if not loaded_data:
-        print("No files loaded successfully")
+    print("\nImporting new files (hash -> check -> parse -> load)...")
+    stages = [
+        PipelineStage("hash", hash_sales_file, STAGE_WORKERS["hash"]),
+        PipelineStage(
+            "check",
+            lambda batch: filter_new_files(engine, batch, "sales_archival"),
+            STAGE_WORKERS["check"],
+            batch_size=CHECK_BATCH_SIZE,
+        ),
+        PipelineStage("parse", lambda info: _load_sales_file(loader, info), STAGE_WORKERS["parse"]),
+        PipelineStage(
+            "load", lambda loaded: _insert_loaded_file(engine, loaded), STAGE_WORKERS["load"]
+        ),
+    ]
+    try:
+        imported, stage_stats = run_pipeline(archival_files, stages)
+    finally:
         _toggle_cache_triggers(engine, enable=True)
-        engine.dispose()
-        return
-
-    print(f"\nInserting {len(loaded_data)} file(s) to database...")
-    total_records = 0
-
-    for file_info, df in tqdm(loaded_data, desc="Inserting files"):
-        try:
-            total_records += _insert_sales_file(
-                engine, file_info, df, "archival", "sales_archival", "initial_populate"
-            )
-        except (ValueError, OSError, IOError) as e:
-            file_path, _, _, file_hash = file_info
-            batch_id = str(uuid.uuid4())
-            print(f"ERROR inserting {file_path.name}: {str(e)}")
-            _log_failed_import(engine, file_path, file_hash, batch_id, str(e))
-
-    _toggle_cache_triggers(engine, enable=True)
 
     print("=" * 60)
-    print(f"Import complete: {total_records} total records imported")
+    for stats in stage_stats:
+        print(f"  {stats.summary()}")
+    print(f"Import complete: {sum(imported)} total records imported from {len(imported)} file(s)")
 
     engine.dispose()
 
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+load_dotenv()
+
+from sales_data.db_source import build_sales_query
+
+PARENT_TABLE = "raw_sales_transactions"
+
+GRANULARITY_YEAR = "year"
+GRANULARITY_MONTH = "month"
+GRANULARITIES = (GRANULARITY_YEAR, GRANULARITY_MONTH)
+
+DEFAULT_MONTHS_AHEAD = 12
+
+_BOUND_PATTERN = re.compile(r"FROM \((MINVALUE|'[^']+')\) TO \((MAXVALUE|'[^']+')\)")
+
+
+@dataclass
+class Partition:
+    name: str
+    start: date | None
+    end: date | None
+
+    def overlaps(self, start: date, end: date) -> bool:
+        return (self.start is None or self.start < end) and (self.end is None or start < self.end)
+
+
+@dataclass
+class PruningCheck:
+    start: datetime
+    end: datetime
+    expected: set[str]
+    scanned: set[str]
+
+    @property
+    def passed(self) -> bool:
+        return self.scanned <= self.expected
+
+
+def _parse_bound(bound: str) -> date | None:
+    if bound in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(bound.strip("'")).date()
+
+
+def _existing_partitions(conn: Connection) -> list[Partition]:
+    query = text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+                 JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:parent AS regclass)
+        ORDER BY c.relname
+    """)
+    partitions = []
+    for name, bound in conn.execute(query, {"parent": PARENT_TABLE}):
+        match = _BOUND_PATTERN.search(bound)
+        if match is not None:
+            partitions.append(Partition(name, _parse_bound(match[1]), _parse_bound(match[2])))
+    return partitions
+
+
+def _default_partition(conn: Connection) -> str | None:
+    query = text("""
+        SELECT c.relname
+        FROM pg_inherits i
+                 JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:parent AS regclass)
+          AND c.relpartbound IS NOT NULL
+          AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'
+    """)
+    row = conn.execute(query, {"parent": PARENT_TABLE}).fetchone()
+    return None if row is None else row[0]
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _period_start(day: date, granularity: str) -> date:
+    return date(day.year, 1, 1) if granularity == GRANULARITY_YEAR else date(day.year, day.month, 1)
+
+
+def _period_end(start: date, granularity: str) -> date:
+    return _add_months(start, 12 if granularity == GRANULARITY_YEAR else 1)
+
+
+def _partition_name(start: date, granularity: str) -> str:
+    suffix = f"{start:%Y}" if granularity == GRANULARITY_YEAR else f"{start:%Y_%m}"
+    return f"{PARENT_TABLE}_{suffix}"
+
+
+def plan_partitions(
+        existing: list[Partition], start: date, until: date, granularity: str
+) -> list[Partition]:
+    planned: list[Partition] = []
+    period = _period_start(start, granularity)
+    while period < until:
+        period_end = _period_end(period, granularity)
+        if not any(partition.overlaps(period, period_end) for partition in existing):
+            planned.append(Partition(_partition_name(period, granularity), period, period_end))
+        elif granularity == GRANULARITY_YEAR:
+            covered = existing + planned
+            planned.extend(
+                month for month in plan_partitions(covered, period, period_end, GRANULARITY_MONTH)
+                if month.start < until
+            )
+        period = period_end
+    return planned
+
+
+def _create_partition(engine: Engine, partition: Partition) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {partition.name} PARTITION OF {PARENT_TABLE}
+                FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')
+        """))
+
+
+def _create_brin_index(engine: Engine, partition_name: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE INDEX IF NOT EXISTS {partition_name}_sale_date_brin
+                ON {partition_name} USING BRIN (sale_date)
+        """))
+
+
+def maintain_partitions(
+        engine: Engine,
+        granularity: str = GRANULARITY_YEAR,
+        months_ahead: int = DEFAULT_MONTHS_AHEAD,
+        start: date | None = None,
+        brin: bool = False,
+) -> list[str]:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown partition granularity: {granularity}")
+
+    today = date.today()
+    until = _add_months(today, months_ahead + 1)
+
+    with engine.connect() as conn:
+        existing = _existing_partitions(conn)
+
+    created = []
+    for partition in plan_partitions(existing, start or today, until, granularity):
+        try:
+            _create_partition(engine, partition)
+            created.append(partition.name)
+            print(f"  [OK]   {partition.name}: {partition.start} to {partition.end}")
+        except Exception as e:
+            print(f"  [FAIL] {partition.name}: {str(e).splitlines()[0]}")
+
+    if brin:
+        with engine.connect() as conn:
+            names = [partition.name for partition in _existing_partitions(conn)]
+            default_name = _default_partition(conn)
+        if default_name:
+            names.append(default_name)
+        for name in names:
+            _create_brin_index(engine, name)
+        print(f"  [OK]   BRIN index on sale_date present on {len(names)} partition(s)")
+
+    return created
+
+
+def _scanned_relations(plan: dict) -> set[str]:
+    scanned = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for child in plan.get("Plans", []):
+        scanned |= _scanned_relations(child)
+    return scanned
+
+
+def explain_scanned_partitions(conn: Connection, query: str, params: dict) -> set[str]:
+    result = conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params).scalar()
+    plan = json.loads(result) if isinstance(result, str) else result
+    return _scanned_relations(plan[0]["Plan"])
+
+
+def check_pruning(engine: Engine) -> list[PruningCheck]:
+    checks = []
+    with engine.connect() as conn:
+        partitions = _existing_partitions(conn)
+        default_name = _default_partition(conn)
+        for partition in partitions:
+            if partition.start is None or partition.end is None:
+                continue
+            range_end = min(_add_months(partition.start, 1), partition.end)
+            start = datetime.combine(partition.start, time.min)
+            end = datetime.combine(range_end, time.min) - timedelta(seconds=1)
+            expected = {p.name for p in partitions if p.overlaps(partition.start, range_end)}
+            if default_name:
+                expected.add(default_name)
+            query, params = build_sales_query(start, end)
+            checks.append(PruningCheck(
+                start, end, expected, explain_scanned_partitions(conn, query, params)
+            ))
+    return checks
+
+
+def _print_check(check: PruningCheck) -> None:
+    scanned = ", ".join(sorted(check.scanned)) or "no partitions"
+    marker = "[OK]  " if check.passed else "[FAIL]"
+    print(f"  {marker} {check.start:%Y-%m-%d} to {check.end:%Y-%m-%d}: scans {scanned}")
+
+
+def manage_partitions(
+        granularity: str = GRANULARITY_YEAR,
+        months_ahead: int = DEFAULT_MONTHS_AHEAD,
+        start: date | None = None,
+        brin: bool = False,
+        check: bool = False,
+) -> int:
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        print("ERROR: DATABASE_URL not set")
+        return 1
+
+    print("=" * 60)
+    print("Maintaining Sales Partitions")
+    print("=" * 60)
+
+    engine = create_engine(db_url)
+
+    try:
+        created = maintain_partitions(engine, granularity, months_ahead, start, brin)
+        if not created:
+            print(f"  [SKIP] Partitions already cover the next {months_ahead} month(s)")
+
+        failed = []
+        if check:
+            print("\nChecking partition pruning...")
+            checks = check_pruning(engine)
+            for result in checks:
+                _print_check(result)
+            failed = [result for result in checks if not result.passed]
+
+        print("\n" + "=" * 60)
+        if failed:
+            print(f"{len(failed)} range query(ies) scan partitions outside their range")
+        else:
+            print("Partition maintenance complete!")
+        print("=" * 60)
+
+        return 1 if failed else 0
+
+    except Exception as e:
+        print(f"\n  [ERROR] Partition maintenance failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        engine.dispose()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create sales partitions ahead of time")
+    parser.add_argument(
+        "--granularity", choices=GRANULARITIES, default=GRANULARITY_YEAR, help="Partition size"
+    )
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=DEFAULT_MONTHS_AHEAD,
+        help="Months past today that partitions must cover",
+    )
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=None,
+        help="Also create partitions back to this date (YYYY-MM-DD), e.g. for archival imports",
+    )
+    parser.add_argument(
+        "--brin", action="store_true", help="Create a BRIN index on sale_date in every partition"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Verify with EXPLAIN that range queries prune"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    exit_code = manage_partitions(
+        args.granularity, args.months_ahead, args.start, args.brin, args.check
+    )
+    sys.exit(exit_code)
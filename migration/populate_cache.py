@@ -1,11 +1,10 @@
 from __future__ import annotations
 
+import argparse
 import os
 import sys
 from pathlib import Path
-from typing import Any, cast
 
-import pandas as pd
 from dotenv import find_dotenv, load_dotenv
 from sqlalchemy import create_engine, text
 
@@ -13,67 +12,155 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 load_dotenv(find_dotenv(filename=".env"))
 
+from migration.refresh_views import refresh_views
 
-def _build_aggregation_query(entity_type: str, group_col: str) -> str:
+ENTITY_COLUMNS = {"sku": "sku", "model": "model"}
+
+_AGGREGATE_COLUMNS = """
+            SUM(r.quantity) as total_quantity,
+            SUM(r.total_amount) as total_revenue,
+            COUNT(*) as transaction_count,
+            COUNT(DISTINCT r.order_id) as unique_orders,
+            AVG(r.unit_price) as avg_unit_price"""
+
+_UPSERT_AGGREGATES = """
+    INSERT INTO cache_monthly_aggregations (entity_type, entity_id, year_month,
+                                            total_quantity, total_revenue, transaction_count,
+                                            unique_orders, avg_unit_price,
+                                            cache_version, computed_at, is_valid)
+    SELECT :entity_type, entity_id, year_month,
+           total_quantity, total_revenue, transaction_count,
+           unique_orders, avg_unit_price,
+           1, CURRENT_TIMESTAMP, TRUE
+    FROM recomputed
+    ON CONFLICT (entity_type, entity_id, year_month, cache_version) DO UPDATE
+        SET total_quantity    = EXCLUDED.total_quantity,
+            total_revenue     = EXCLUDED.total_revenue,
+            transaction_count = EXCLUDED.transaction_count,
+            unique_orders     = EXCLUDED.unique_orders,
+            avg_unit_price    = EXCLUDED.avg_unit_price,
+            computed_at       = EXCLUDED.computed_at,
+            is_valid          = TRUE
+"""
+
+
+def _build_full_refresh(group_col: str) -> str:
     return f"""
+    WITH recomputed AS (
         SELECT
-            '{entity_type}' as entity_type,
-            {group_col} as entity_id,
-            TO_CHAR(sale_date, 'YYYY-MM') as year_month,
-            SUM(quantity) as total_quantity,
-            SUM(total_amount) as total_revenue,
-            COUNT(*) as transaction_count,
-            COUNT(DISTINCT order_id) as unique_orders,
-            AVG(unit_price) as avg_unit_price
-        FROM raw_sales_transactions
-        WHERE is_valid = TRUE
-          AND {group_col} IS NOT NULL
-        GROUP BY {group_col}, TO_CHAR(sale_date, 'YYYY-MM')
-        ORDER BY {group_col}, year_month
+            r.{group_col} as entity_id,
+            TO_CHAR(r.sale_date, 'YYYY-MM') as year_month,{_AGGREGATE_COLUMNS}
+        FROM raw_sales_transactions r
+        WHERE r.is_valid = TRUE
+          AND r.{group_col} IS NOT NULL
+        GROUP BY r.{group_col}, TO_CHAR(r.sale_date, 'YYYY-MM')
+    ),
+    removed AS (
+        DELETE FROM cache_monthly_aggregations c
+        WHERE c.entity_type = :entity_type
+          AND NOT EXISTS (SELECT 1
+                          FROM recomputed n
+                          WHERE n.entity_id = c.entity_id
+                            AND n.year_month = c.year_month)
+    )
+    {_UPSERT_AGGREGATES}
     """
 
 
-def _populate_entity_type(conn, entity_type: str) -> bool:
-    group_col = "model" if entity_type == "model" else "sku"
-    query = _build_aggregation_query(entity_type, group_col)
+def _build_incremental_refresh(group_col: str) -> str:
+    return f"""
+    WITH touched AS (
+        SELECT DISTINCT r.{group_col} as entity_id, TO_CHAR(r.sale_date, 'YYYY-MM') as year_month
+        FROM raw_sales_transactions r
+        WHERE r.import_batch_id = ANY (CAST(:batch_ids AS uuid[]))
+          AND r.{group_col} IS NOT NULL
+        UNION
+        SELECT c.entity_id, c.year_month
+        FROM cache_monthly_aggregations c
+        WHERE c.entity_type = :entity_type
+          AND c.is_valid = FALSE
+    ),
+    recomputed AS (
+        SELECT
+            t.entity_id,
+            t.year_month,{_AGGREGATE_COLUMNS}
+        FROM touched t
+                 JOIN raw_sales_transactions r
+                      ON r.{group_col} = t.entity_id
+                          AND r.sale_date >= TO_DATE(t.year_month, 'YYYY-MM')
+                          AND r.sale_date < TO_DATE(t.year_month, 'YYYY-MM') + INTERVAL '1 month'
+        WHERE r.is_valid = TRUE
+        GROUP BY t.entity_id, t.year_month
+    ),
+    removed AS (
+        DELETE FROM cache_monthly_aggregations c
+        USING touched t
+        WHERE c.entity_type = :entity_type
+          AND c.entity_id = t.entity_id
+          AND c.year_month = t.year_month
+          AND NOT EXISTS (SELECT 1
+                          FROM recomputed n
+                          WHERE n.entity_id = t.entity_id
+                            AND n.year_month = t.year_month)
+    )
+    {_UPSERT_AGGREGATES}
+    """
 
-    print("  Computing aggregations from raw_sales_transactions...")
-    df = pd.read_sql_query(text(query), conn)
 
-    if df.empty:
-        print(f"  [WARN] No data found for {entity_type}")
-        return False
+def _pending_batches(conn) -> list[str]:
+    result = conn.execute(text("""
+        SELECT import_batch_id::text
+        FROM file_imports
+        WHERE aggregated_at IS NULL
+          AND import_status = 'completed'
+          AND file_type LIKE 'sales%'
+        ORDER BY id
+    """))
+    return [row[0] for row in result]
 
-    print(f"  Computed {len(df):,} aggregation records")
-    print("  Clearing existing cache...")
-    conn.execute(
-        text("DELETE FROM cache_monthly_aggregations WHERE entity_type = :entity_type"),
-        {"entity_type": entity_type}
-    )
-    conn.commit()
 
-    print("  Inserting into cache_monthly_aggregations...")
-    records = cast(list[dict[str, Any]], df.to_dict('records'))
+def _mark_batches_aggregated(conn, batch_ids: list[str]) -> None:
     conn.execute(
         text("""
-             INSERT INTO cache_monthly_aggregations (entity_type, entity_id, year_month,
-                                                     total_quantity, total_revenue, transaction_count,
-                                                     unique_orders, avg_unit_price,
-                                                     cache_version, computed_at, is_valid)
-             VALUES (:entity_type, :entity_id, :year_month,
-                     :total_quantity, :total_revenue, :transaction_count,
-                     :unique_orders, :avg_unit_price,
-                     1, CURRENT_TIMESTAMP, TRUE)
-             """),
-        records
+            UPDATE file_imports
+            SET aggregated_at = CURRENT_TIMESTAMP
+            WHERE import_batch_id = ANY (CAST(:batch_ids AS uuid[]))
+        """),
+        {"batch_ids": batch_ids},
     )
-    conn.commit()
 
-    print(f"  [OK] Inserted {len(records):,} records")
-    return True
 
+def _refresh_entity_type(conn, entity_type: str, batch_ids: list[str], full: bool) -> int:
+    group_col = ENTITY_COLUMNS[entity_type]
+    if full:
+        statement = _build_full_refresh(group_col)
+        params = {"entity_type": entity_type}
+    else:
+        statement = _build_incremental_refresh(group_col)
+        params = {"entity_type": entity_type, "batch_ids": batch_ids}
 
-def populate_monthly_aggregations_cache():
+    result = conn.execute(text(statement), params)
+    return max(result.rowcount, 0)
+
+
+def refresh_monthly_aggregations(engine, full: bool = False) -> dict[str, int]:
+    with engine.begin() as conn:
+        batch_ids = _pending_batches(conn)
+        if full:
+            print("  Full rebuild requested")
+        else:
+            print(f"  {len(batch_ids)} new sales batch(es) since the last refresh")
+
+        refreshed = {
+            entity_type: _refresh_entity_type(conn, entity_type, batch_ids, full)
+            for entity_type in ENTITY_COLUMNS
+        }
+        if batch_ids:
+            _mark_batches_aggregated(conn, batch_ids)
+    return refreshed
+
+
+def populate_monthly_aggregations_cache(full: bool = False):
     db_url = os.getenv("DATABASE_URL")
     if not db_url:
         print("ERROR: DATABASE_URL not set")
@@ -86,20 +173,13 @@ def populate_monthly_aggregations_cache():
     engine = create_engine(db_url)
 
     try:
-        for entity_type in ["sku", "model"]:
-            print(f"\nProcessing {entity_type.upper()} aggregations...")
-            with engine.connect() as conn:
-                _populate_entity_type(conn, entity_type)
+        refreshed = refresh_monthly_aggregations(engine, full)
+        for entity_type, count in refreshed.items():
+            print(f"  [OK] {entity_type.upper()}: {count:,} aggregation cell(s) written")
 
         print("\nRefreshing materialized view...")
-        with engine.connect() as conn:
-            conn.execute(text("REFRESH MATERIALIZED VIEW mv_valid_monthly_aggs"))
-            conn.commit()
-
-            result = conn.execute(text("SELECT COUNT(*) FROM mv_valid_monthly_aggs"))
-            row = result.fetchone()
-            count = row[0] if row else 0
-            print(f"  [OK] mv_valid_monthly_aggs: {count:,} rows")
+        for result in refresh_views(engine, ["mv_valid_monthly_aggs"], force=True):
+            print(f"  [{result.status.upper()}] {result.view_name} {result.detail}".rstrip())
 
         print("\n" + "=" * 60)
         print("Cache population complete!")
@@ -116,6 +196,14 @@ def populate_monthly_aggregations_cache():
         engine.dispose()
 
 
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Refresh cache_monthly_aggregations")
+    parser.add_argument(
+        "--full", action="store_true", help="Recompute every month instead of new batches only"
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    exit_code = populate_monthly_aggregations_cache()
+    exit_code = populate_monthly_aggregations_cache(_parse_args().full)
     sys.exit(exit_code)
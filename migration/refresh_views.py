@@ -1,50 +1,232 @@
 from __future__ import annotations
 
+import argparse
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 load_dotenv()
 
-VIEWS_TO_REFRESH = [
-    "mv_valid_monthly_aggs",
-    "mv_valid_sku_stats",
-    "mv_valid_order_priorities",
-]
+VIEW_SOURCES = {
+    "mv_latest_stock": ["stock_snapshots"],
+    "mv_latest_forecast": ["forecast_data"],
+    "mv_valid_monthly_aggs": ["cache_monthly_aggregations"],
+    "mv_valid_sku_stats": ["cache_sku_statistics"],
+    "mv_valid_order_priorities": ["cache_order_priorities"],
+}
 
+DEFAULT_WORKERS = 4
 
-def _view_exists(conn, view_name: str) -> bool:
+STATUS_REFRESHED = "refreshed"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class RefreshResult:
+    view_name: str
+    status: str
+    duration: float = 0.0
+    concurrently: bool = False
+    detail: str = ""
+
+
+def _view_exists(conn: Connection, view_name: str) -> bool:
     query = text("SELECT COUNT(*) FROM pg_matviews WHERE matviewname = :view_name")
     result = conn.execute(query, {"view_name": view_name})
     return result.fetchone()[0] > 0
 
 
-def _get_row_count(conn, view_name: str) -> int:
-    result = conn.execute(text(f"SELECT COUNT(*) FROM {view_name}"))
-    return result.fetchone()[0]
+def _can_refresh_concurrently(conn: Connection, view_name: str) -> bool:
+    query = text("""
+        SELECT m.ispopulated
+           AND EXISTS (SELECT 1
+                       FROM pg_index i
+                       WHERE i.indrelid = CAST(:view_name AS regclass)
+                         AND i.indisunique
+                         AND i.indpred IS NULL
+                         AND i.indexprs IS NULL)
+        FROM pg_matviews m
+        WHERE m.matviewname = :view_name
+    """)
+    row = conn.execute(query, {"view_name": view_name}).fetchone()
+    return bool(row and row[0])
+
+
+def _log_table_exists(conn: Connection) -> bool:
+    row = conn.execute(text("SELECT to_regclass('mv_refresh_log') IS NOT NULL")).fetchone()
+    return bool(row[0])
+
 
+def _source_change_marker(conn: Connection, sources: list[str]) -> int:
+    query = text("""
+        SELECT COALESCE(hashtextextended(
+                   string_agg(concat_ws(':', part.relid, pg_relation_filenode(part.relid),
+                                        s.n_tup_ins, s.n_tup_upd, s.n_tup_del),
+                              ',' ORDER BY part.relid),
+                   0), 0)
+        FROM unnest(CAST(:sources AS text[])) AS src(name)
+                 CROSS JOIN LATERAL pg_partition_tree(CAST(src.name AS regclass)) AS part
+                 JOIN pg_stat_user_tables s ON s.relid = part.relid
+    """)
+    return int(conn.execute(query, {"sources": sources}).fetchone()[0])
 
-def _refresh_single_view(conn, view_name: str) -> None:
-    print(f"\n  Refreshing {view_name}...")
 
-    if not _view_exists(conn, view_name):
-        print("    [SKIP] View does not exist")
-        return
+def _last_refreshed_marker(conn: Connection, view_name: str) -> int | None:
+    query = text("""
+        SELECT source_change_marker
+        FROM mv_refresh_log
+        WHERE view_name = :view_name
+          AND status = :status
+        ORDER BY started_at DESC
+        LIMIT 1
+    """)
+    row = conn.execute(query, {"view_name": view_name, "status": STATUS_REFRESHED}).fetchone()
+    return None if row is None else row[0]
 
-    before_count = _get_row_count(conn, view_name)
-    conn.execute(text(f"REFRESH MATERIALIZED VIEW {view_name}"))
-    conn.commit()
-    after_count = _get_row_count(conn, view_name)
 
-    print(f"    [OK] Refreshed: {before_count} -> {after_count} rows")
+def _record_refresh(
+        engine: Engine, result: RefreshResult, started_at: float, marker: int | None
+) -> None:
+    query = text("""
+        INSERT INTO mv_refresh_log (view_name, started_at, finished_at, duration_ms, status,
+                                    concurrently, source_change_marker, error_message)
+        VALUES (:view_name,
+                TO_TIMESTAMP(:started_at),
+                TO_TIMESTAMP(:started_at) + make_interval(secs => :duration),
+                ROUND(:duration * 1000),
+                :status,
+                :concurrently,
+                :marker,
+                :error_message)
+    """)
+    with engine.begin() as conn:
+        conn.execute(query, {
+            "view_name": result.view_name,
+            "started_at": started_at,
+            "duration": result.duration,
+            "status": result.status,
+            "concurrently": result.concurrently,
+            "marker": marker,
+            "error_message": result.detail if result.status == STATUS_FAILED else None,
+        })
+
+
+def _refresh_single_view(
+        engine: Engine, view_name: str, force: bool, track_changes: bool
+) -> RefreshResult:
+    started_at = time.time()
+    marker = None
+    try:
+        with engine.begin() as conn:
+            if not _view_exists(conn, view_name):
+                return RefreshResult(view_name, STATUS_SKIPPED, detail="view does not exist")
+
+            if track_changes:
+                marker = _source_change_marker(conn, VIEW_SOURCES[view_name])
+                if not force and marker == _last_refreshed_marker(conn, view_name):
+                    return RefreshResult(view_name, STATUS_SKIPPED, detail="sources unchanged")
+
+            concurrently = _can_refresh_concurrently(conn, view_name)
+            mode = "CONCURRENTLY " if concurrently else ""
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW {mode}{view_name}"))
+
+        result = RefreshResult(
+            view_name, STATUS_REFRESHED, time.time() - started_at, concurrently
+        )
+    except Exception as e:
+        result = RefreshResult(view_name, STATUS_FAILED, time.time() - started_at, detail=str(e))
 
+    if track_changes:
+        try:
+            _record_refresh(engine, result, started_at, marker)
+        except Exception as e:
+            print(f"    [WARN] Could not record refresh of {view_name}: {e}")
+    return result
 
-def refresh_materialized_views() -> int:
+
+def _refresh_waves(views: list[str]) -> list[list[str]]:
+    levels: dict[str, int] = {}
+
+    def level(view_name: str, path: tuple[str, ...] = ()) -> int:
+        if view_name in path:
+            raise ValueError(f"Circular view dependency: {' -> '.join(path + (view_name,))}")
+        if view_name not in levels:
+            upstream = [src for src in VIEW_SOURCES[view_name] if src in VIEW_SOURCES]
+            levels[view_name] = 1 + max(
+                (level(src, path + (view_name,)) for src in upstream), default=-1
+            )
+        return levels[view_name]
+
+    waves: list[list[str]] = []
+    for view_name in views:
+        depth = level(view_name)
+        while len(waves) <= depth:
+            waves.append([])
+        waves[depth].append(view_name)
+    return [wave for wave in waves if wave]
+
+
+def refresh_views(
+        engine: Engine,
+        views: list[str] | None = None,
+        force: bool = False,
+        workers: int = DEFAULT_WORKERS,
+) -> list[RefreshResult]:
+    selected = list(VIEW_SOURCES) if views is None else views
+    unknown = [view for view in selected if view not in VIEW_SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown materialized views: {unknown}")
+
+    with engine.connect() as conn:
+        track_changes = _log_table_exists(conn)
+    if not track_changes:
+        print("  [WARN] mv_refresh_log not found, refreshing all views without change tracking")
+
+    results: list[RefreshResult] = []
+    refreshed: set[str] = set()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for wave in _refresh_waves(selected):
+            futures = [
+                executor.submit(
+                    _refresh_single_view,
+                    engine,
+                    view_name,
+                    force or any(src in refreshed for src in VIEW_SOURCES[view_name]),
+                    track_changes,
+                )
+                for view_name in wave
+            ]
+            for future in futures:
+                result = future.result()
+                results.append(result)
+                if result.status == STATUS_REFRESHED:
+                    refreshed.add(result.view_name)
+    return results
+
+
+def _print_result(result: RefreshResult) -> None:
+    if result.status == STATUS_REFRESHED:
+        mode = "concurrently" if result.concurrently else "with exclusive lock"
+        print(f"  [OK]   {result.view_name}: {result.duration:.2f}s ({mode})")
+    elif result.status == STATUS_SKIPPED:
+        print(f"  [SKIP] {result.view_name}: {result.detail}")
+    else:
+        print(f"  [FAIL] {result.view_name}: {result.detail}")
+
+
+def refresh_materialized_views(
+        views: list[str] | None = None, force: bool = False, workers: int = DEFAULT_WORKERS
+) -> int:
     db_url = os.getenv("DATABASE_URL")
     if not db_url:
         print("ERROR: DATABASE_URL not set")
@@ -54,18 +236,22 @@ def refresh_materialized_views() -> int:
     print("Refreshing Materialized Views")
     print("=" * 60)
 
-    engine = create_engine(db_url)
+    engine = create_engine(db_url, pool_size=max(workers, 1))
 
     try:
-        with engine.connect() as conn:
-            for view in VIEWS_TO_REFRESH:
-                _refresh_single_view(conn, view)
+        results = refresh_views(engine, views, force, workers)
+        for result in results:
+            _print_result(result)
 
+        failed = [result for result in results if result.status == STATUS_FAILED]
         print("\n" + "=" * 60)
-        print("All views refreshed successfully!")
+        if failed:
+            print(f"{len(failed)} view(s) failed to refresh")
+        else:
+            print("All views refreshed successfully!")
         print("=" * 60)
 
-        return 0
+        return 1 if failed else 0
 
     except Exception as e:
         print(f"\n  [ERROR] Failed to refresh views: {e}")
@@ -76,6 +262,19 @@ def refresh_materialized_views() -> int:
         engine.dispose()
 
 
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Refresh materialized views")
+    parser.add_argument("views", nargs="*", help="Views to refresh (default: all)")
+    parser.add_argument(
+        "--force", action="store_true", help="Refresh even if source tables are unchanged"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS, help="Parallel refresh connections"
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    exit_code = refresh_materialized_views()
+    args = _parse_args()
+    exit_code = refresh_materialized_views(args.views or None, args.force, args.workers)
     sys.exit(exit_code)
@@ -0,0 +1,132 @@
+-- Upgrade: multi-configuration cache slots for SKU statistics and order priorities
+-- Run once on databases created before cache_configuration_slots existed.
+
+CREATE TABLE IF NOT EXISTS cache_configuration_slots
+(
+    cache_name         VARCHAR(40) NOT NULL,
+    configuration_hash VARCHAR(64) NOT NULL,
+
+    created_at         TIMESTAMP   NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_used_at       TIMESTAMP   NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    hit_count          BIGINT      NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (cache_name, configuration_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_cache_slots_lru ON cache_configuration_slots (cache_name, last_used_at DESC);
+
+ALTER TABLE cache_sku_statistics DROP CONSTRAINT IF EXISTS uq_cache_stats;
+ALTER TABLE cache_sku_statistics
+    ADD CONSTRAINT uq_cache_stats UNIQUE (entity_type, entity_id, configuration_hash, cache_version);
+
+CREATE INDEX IF NOT EXISTS idx_cache_stats_slot ON cache_sku_statistics (entity_type, configuration_hash);
+CREATE INDEX IF NOT EXISTS idx_cache_priorities_slot ON cache_order_priorities (configuration_hash);
+
+DROP VIEW IF EXISTS v_current_sku_stats;
+DROP VIEW IF EXISTS v_current_order_priorities;
+DROP MATERIALIZED VIEW IF EXISTS mv_valid_sku_stats;
+DROP MATERIALIZED VIEW IF EXISTS mv_valid_order_priorities;
+
+-- View: Valid SKU statistics cache
+CREATE MATERIALIZED VIEW mv_valid_sku_stats AS
+SELECT
+    entity_type,
+    entity_id,
+    months_with_sales,
+    total_quantity,
+    average_monthly_sales,
+    standard_deviation,
+    coefficient_of_variation,
+    first_sale_date,
+    product_type,
+    safety_stock,
+    reorder_point,
+    z_score_used,
+    lead_time_months,
+    is_seasonal,
+    seasonal_ss_in,
+    seasonal_ss_out,
+    seasonal_rop_in,
+    seasonal_rop_out,
+    last_2y_avg_monthly,
+    computed_at,
+    based_on_data_until,
+    configuration_hash
+FROM cache_sku_statistics
+WHERE is_valid = TRUE
+  AND cache_version = (
+      SELECT MAX(cache_version)
+      FROM cache_sku_statistics css2
+      WHERE css2.entity_type = cache_sku_statistics.entity_type
+        AND css2.entity_id = cache_sku_statistics.entity_id
+        AND css2.configuration_hash IS NOT DISTINCT FROM cache_sku_statistics.configuration_hash
+        AND css2.is_valid = TRUE
+  );
+
+CREATE UNIQUE INDEX idx_mv_sku_stats_unique ON mv_valid_sku_stats(entity_type, configuration_hash, entity_id);
+CREATE INDEX idx_mv_sku_stats_type ON mv_valid_sku_stats(product_type);
+
+
+-- View: Valid order priorities cache
+CREATE MATERIALIZED VIEW mv_valid_order_priorities AS
+SELECT
+    sku,
+    model,
+    color,
+    size,
+    priority_score,
+    stockout_risk,
+    revenue_impact,
+    revenue_at_risk,
+    current_stock,
+    reorder_point,
+    deficit,
+    forecast_leadtime,
+    coverage_gap,
+    product_type,
+    type_multiplier,
+    is_urgent,
+    computed_at,
+    forecast_generated_date,
+    stock_snapshot_date,
+    configuration_hash
+FROM cache_order_priorities
+WHERE is_valid = TRUE
+  AND cache_version = (
+      SELECT MAX(cache_version)
+      FROM cache_order_priorities cop2
+      WHERE cop2.sku = cache_order_priorities.sku
+        AND cop2.configuration_hash = cache_order_priorities.configuration_hash
+        AND cop2.is_valid = TRUE
+  );
+
+CREATE UNIQUE INDEX idx_mv_priorities_unique ON mv_valid_order_priorities(configuration_hash, sku);
+CREATE INDEX idx_mv_priorities_model_color ON mv_valid_order_priorities(model, color);
+CREATE INDEX idx_mv_priorities_score ON mv_valid_order_priorities(priority_score DESC);
+CREATE INDEX idx_mv_priorities_urgent ON mv_valid_order_priorities(is_urgent) WHERE is_urgent = TRUE;
+
+
+-- View: SKU statistics of the most recently used configuration slot
+CREATE VIEW v_current_sku_stats AS
+SELECT s.*
+FROM mv_valid_sku_stats s
+WHERE s.configuration_hash = (
+    SELECT slots.configuration_hash
+    FROM cache_configuration_slots slots
+    WHERE slots.cache_name = 'sku_statistics:' || s.entity_type
+    ORDER BY slots.last_used_at DESC
+    LIMIT 1
+);
+
+
+-- View: Order priorities of the most recently used configuration slot
+CREATE VIEW v_current_order_priorities AS
+SELECT p.*
+FROM mv_valid_order_priorities p
+WHERE p.configuration_hash = (
+    SELECT slots.configuration_hash
+    FROM cache_configuration_slots slots
+    WHERE slots.cache_name = 'order_priorities'
+    ORDER BY slots.last_used_at DESC
+    LIMIT 1
+);
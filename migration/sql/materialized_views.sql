@@ -102,10 +102,11 @@ WHERE is_valid = TRUE
       FROM cache_sku_statistics css2
       WHERE css2.entity_type = cache_sku_statistics.entity_type
         AND css2.entity_id = cache_sku_statistics.entity_id
+        AND css2.configuration_hash IS NOT DISTINCT FROM cache_sku_statistics.configuration_hash
         AND css2.is_valid = TRUE
   );
 
-CREATE UNIQUE INDEX idx_mv_sku_stats_unique ON mv_valid_sku_stats(entity_type, entity_id);
+CREATE UNIQUE INDEX idx_mv_sku_stats_unique ON mv_valid_sku_stats(entity_type, configuration_hash, entity_id);
 CREATE INDEX idx_mv_sku_stats_type ON mv_valid_sku_stats(product_type);
 
 
@@ -138,15 +139,67 @@ WHERE is_valid = TRUE
       SELECT MAX(cache_version)
       FROM cache_order_priorities cop2
       WHERE cop2.sku = cache_order_priorities.sku
+        AND cop2.configuration_hash = cache_order_priorities.configuration_hash
         AND cop2.is_valid = TRUE
   );
 
-CREATE UNIQUE INDEX idx_mv_priorities_unique ON mv_valid_order_priorities(sku);
+CREATE UNIQUE INDEX idx_mv_priorities_unique ON mv_valid_order_priorities(configuration_hash, sku);
 CREATE INDEX idx_mv_priorities_model_color ON mv_valid_order_priorities(model, color);
 CREATE INDEX idx_mv_priorities_score ON mv_valid_order_priorities(priority_score DESC);
 CREATE INDEX idx_mv_priorities_urgent ON mv_valid_order_priorities(is_urgent) WHERE is_urgent = TRUE;
 
 
+-- =============================================================================
+-- CURRENT CONFIGURATION VIEWS
+-- =============================================================================
+
+-- View: SKU statistics of the most recently used configuration slot
+CREATE VIEW v_current_sku_stats AS
+SELECT s.*
+FROM mv_valid_sku_stats s
+WHERE s.configuration_hash = (
+    SELECT slots.configuration_hash
+    FROM cache_configuration_slots slots
+    WHERE slots.cache_name = 'sku_statistics:' || s.entity_type
+    ORDER BY slots.last_used_at DESC
+    LIMIT 1
+);
+
+
+-- View: Order priorities of the most recently used configuration slot
+CREATE VIEW v_current_order_priorities AS
+SELECT p.*
+FROM mv_valid_order_priorities p
+WHERE p.configuration_hash = (
+    SELECT slots.configuration_hash
+    FROM cache_configuration_slots slots
+    WHERE slots.cache_name = 'order_priorities'
+    ORDER BY slots.last_used_at DESC
+    LIMIT 1
+);
+
+
+-- =============================================================================
+-- REFRESH LOG
+-- =============================================================================
+
+-- Table: Per-view refresh timings written by migration/refresh_views.py
+CREATE TABLE IF NOT EXISTS mv_refresh_log (
+    id                   BIGSERIAL PRIMARY KEY,
+    view_name            VARCHAR(63) NOT NULL,
+    started_at           TIMESTAMP   NOT NULL,
+    finished_at          TIMESTAMP   NOT NULL,
+    duration_ms          INTEGER     NOT NULL,
+    status               VARCHAR(10) NOT NULL,
+    concurrently         BOOLEAN     NOT NULL DEFAULT FALSE,
+    source_change_marker BIGINT,
+    error_message        TEXT,
+    CONSTRAINT chk_mv_refresh_status CHECK (status IN ('refreshed', 'skipped', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_mv_refresh_log_view ON mv_refresh_log (view_name, started_at DESC);
+
+
 -- =============================================================================
 -- REFRESH FUNCTIONS
 -- =============================================================================
@@ -0,0 +1,48 @@
+-- Upgrade: statement-level sales cache invalidation
+-- Run once on databases created with the per-row trg_invalidate_sales_caches trigger.
+
+CREATE OR REPLACE FUNCTION invalidate_sales_caches()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE cache_monthly_aggregations c
+    SET is_valid = FALSE
+    FROM (SELECT 'sku' AS entity_type, sku AS entity_id, TO_CHAR(sale_date, 'YYYY-MM') AS year_month
+          FROM changed_sales
+          UNION
+          SELECT 'model', model, TO_CHAR(sale_date, 'YYYY-MM')
+          FROM changed_sales
+          WHERE model IS NOT NULL) t
+    WHERE c.is_valid
+      AND c.entity_type = t.entity_type
+      AND c.entity_id = t.entity_id
+      AND c.year_month = t.year_month;
+
+    UPDATE cache_sku_statistics
+    SET is_valid = FALSE
+    WHERE is_valid
+      AND ((entity_type = 'sku' AND entity_id IN (SELECT sku FROM changed_sales))
+        OR (entity_type = 'model' AND entity_id IN (SELECT model FROM changed_sales)));
+
+    UPDATE cache_seasonal_indices
+    SET is_valid = FALSE
+    WHERE is_valid
+      AND ((entity_type = 'sku' AND entity_id IN (SELECT sku FROM changed_sales))
+        OR (entity_type = 'model' AND entity_id IN (SELECT model FROM changed_sales)));
+
+    UPDATE cache_order_priorities
+    SET is_valid = FALSE
+    WHERE is_valid
+      AND (sku IN (SELECT sku FROM changed_sales)
+        OR model IN (SELECT model FROM changed_sales));
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_invalidate_sales_caches ON raw_sales_transactions;
+
+CREATE TRIGGER trg_invalidate_sales_caches
+AFTER INSERT ON raw_sales_transactions
+REFERENCING NEW TABLE AS changed_sales
+FOR EACH STATEMENT
+EXECUTE FUNCTION invalidate_sales_caches();
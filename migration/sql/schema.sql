@@ -50,6 +50,8 @@ CREATE INDEX idx_sales_date ON raw_sales_transactions (sale_date);
 CREATE INDEX idx_sales_year_month ON raw_sales_transactions (year_month);
 CREATE INDEX idx_sales_model_date ON raw_sales_transactions (model, sale_date);
 CREATE INDEX idx_sales_sku_date ON raw_sales_transactions (sku, sale_date);
+CREATE INDEX idx_sales_updated_at ON raw_sales_transactions (updated_at);
+CREATE INDEX idx_sales_import_batch ON raw_sales_transactions (import_batch_id);
 CREATE INDEX idx_sales_extra_fields ON raw_sales_transactions USING GIN (extra_fields);
 CREATE UNIQUE INDEX idx_sales_unique_transaction
     ON raw_sales_transactions (order_id, sku, sale_date, source_file);
@@ -191,6 +193,7 @@ CREATE TABLE file_imports
 
     processing_time_ms  INTEGER,
     import_triggered_by VARCHAR(100),
+    aggregated_at       TIMESTAMP,
 
     CONSTRAINT uq_file_hash UNIQUE (file_hash, file_type)
 );
@@ -198,6 +201,7 @@ CREATE TABLE file_imports
 CREATE INDEX idx_file_imports_type ON file_imports (file_type);
 CREATE INDEX idx_file_imports_status ON file_imports (import_status);
 CREATE INDEX idx_file_imports_timestamp ON file_imports (import_timestamp DESC);
+CREATE INDEX idx_file_imports_pending_aggregation ON file_imports (id) WHERE aggregated_at IS NULL;
 
 
 -- =============================================================================
@@ -268,10 +272,11 @@ CREATE TABLE cache_sku_statistics
     configuration_hash       VARCHAR(64),
     is_valid                 BOOLEAN        NOT NULL DEFAULT TRUE,
 
-    CONSTRAINT uq_cache_stats UNIQUE (entity_type, entity_id, cache_version)
+    CONSTRAINT uq_cache_stats UNIQUE (entity_type, entity_id, configuration_hash, cache_version)
 );
 
 CREATE INDEX idx_cache_stats_entity ON cache_sku_statistics (entity_type, entity_id);
+CREATE INDEX idx_cache_stats_slot ON cache_sku_statistics (entity_type, configuration_hash);
 CREATE INDEX idx_cache_stats_type ON cache_sku_statistics (product_type);
 CREATE INDEX idx_cache_stats_valid ON cache_sku_statistics (is_valid) WHERE is_valid = TRUE;
 
@@ -338,6 +343,23 @@ CREATE INDEX idx_cache_priorities_model_color ON cache_order_priorities (model,
 CREATE INDEX idx_cache_priorities_score ON cache_order_priorities (priority_score DESC);
 CREATE INDEX idx_cache_priorities_urgent ON cache_order_priorities (is_urgent) WHERE is_urgent = TRUE;
 CREATE INDEX idx_cache_priorities_valid ON cache_order_priorities (is_valid) WHERE is_valid = TRUE;
+CREATE INDEX idx_cache_priorities_slot ON cache_order_priorities (configuration_hash);
+
+
+-- Table: cache_configuration_slots
+CREATE TABLE cache_configuration_slots
+(
+    cache_name         VARCHAR(40) NOT NULL,
+    configuration_hash VARCHAR(64) NOT NULL,
+
+    created_at         TIMESTAMP   NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_used_at       TIMESTAMP   NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    hit_count          BIGINT      NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (cache_name, configuration_hash)
+);
+
+CREATE INDEX idx_cache_slots_lru ON cache_configuration_slots (cache_name, last_used_at DESC);
 
 
 -- =============================================================================
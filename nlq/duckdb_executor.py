@@ -6,6 +6,7 @@ import pandas as pd
 
 from nlq.intent import QueryIntent
 from nlq.sql_generator import SQLGenerator, TABLE_SALES, TABLE_STOCK, TABLE_FORECAST
+from sales_data.sku_dimension import sku_labels
 
 MSG_NO_DATA_MATCH = "No data matches the query criteria."
 MSG_QUERY_NOT_UNDERSTOOD = "Could not understand the query. Please try rephrasing."
@@ -88,7 +89,7 @@ class DuckDBExecutor:
         df = df.copy()
         df = DuckDBExecutor._sanitize_dataframe(df)
         if "model" not in df.columns and "sku" in df.columns:
-            df["model"] = df["sku"].astype(str).str[:5]
+            df["model"] = sku_labels(df["sku"], "model")
         if not pd.api.types.is_datetime64_any_dtype(df.get("data")):
             df["data"] = pd.to_datetime(df["data"], errors="coerce")
         return df
@@ -98,7 +99,7 @@ class DuckDBExecutor:
         df = df.copy()
         df = DuckDBExecutor._sanitize_dataframe(df)
         if "model" not in df.columns and "sku" in df.columns:
-            df["model"] = df["sku"].astype(str).str[:5]
+            df["model"] = sku_labels(df["sku"], "model")
         return df
 
     @staticmethod
@@ -106,7 +107,7 @@ class DuckDBExecutor:
         df = df.copy()
         df = DuckDBExecutor._sanitize_dataframe(df)
         if "model" not in df.columns and "sku" in df.columns:
-            df["model"] = df["sku"].astype(str).str[:5]
+            df["model"] = sku_labels(df["sku"], "model")
         date_col = "data" if "data" in df.columns else "forecast_date"
         if date_col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[date_col]):
             df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
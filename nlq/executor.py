@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 import pandas as pd
 
 from nlq.intent import QueryIntent
+from sales_data.sku_dimension import sku_attribute, sku_labels
 
 MSG_NO_DATA_MATCH = "No data matches the query criteria."
 MSG_QUERY_NOT_UNDERSTOOD = "Could not understand the query. Please try rephrasing."
@@ -197,7 +198,7 @@ class QueryExecutor:
 def _ensure_model_column(df: pd.DataFrame) -> pd.DataFrame:
     if COL_MODEL not in df.columns and COL_SKU in df.columns:
         df = df.copy()
-        df[COL_MODEL] = df[COL_SKU].astype(str).str[:5]
+        df[COL_MODEL] = sku_labels(df[COL_SKU], "model")
     return df
 
 
@@ -217,7 +218,7 @@ def _filter_by_color(df: pd.DataFrame, color: str) -> pd.DataFrame:
     if COL_COLOR in df.columns:
         return pd.DataFrame(df[df[COL_COLOR].str.upper() == color.upper()])
     if COL_SKU in df.columns:
-        return pd.DataFrame(df[df[COL_SKU].str[5:7].str.upper() == color.upper()])
+        return pd.DataFrame(df[sku_attribute(df[COL_SKU], "color").str.upper() == color.upper()])
     return df
 
 
@@ -327,7 +328,7 @@ def _aggregate_by_column(
 
 def _aggregate_sales_by_color(df: pd.DataFrame, value_col: str) -> pd.DataFrame:
     if COL_COLOR not in df.columns and COL_SKU in df.columns:
-        df[COL_COLOR] = df[COL_SKU].str[5:7]
+        df[COL_COLOR] = sku_labels(df[COL_SKU], "color")
     if COL_COLOR in df.columns:
         return _aggregate_by_column(df, COL_COLOR, value_col, "total")
     return df
@@ -335,7 +336,7 @@ def _aggregate_sales_by_color(df: pd.DataFrame, value_col: str) -> pd.DataFrame:
 
 def _aggregate_sales_by_size(df: pd.DataFrame, value_col: str) -> pd.DataFrame:
     if COL_SIZE not in df.columns and COL_SKU in df.columns:
-        df[COL_SIZE] = df[COL_SKU].str[7:9]
+        df[COL_SIZE] = sku_labels(df[COL_SKU], "size")
     if COL_SIZE in df.columns:
         return _aggregate_by_column(df, COL_SIZE, value_col, "total")
     return df
@@ -352,7 +353,7 @@ def _aggregate_stock(df: pd.DataFrame, agg: str) -> pd.DataFrame:
     if agg == COL_COLOR:
         if COL_COLOR not in df.columns and COL_SKU in df.columns:
             df = df.copy()
-            df[COL_COLOR] = df[COL_SKU].str[5:7]
+            df[COL_COLOR] = sku_labels(df[COL_SKU], "color")
         if COL_COLOR in df.columns:
             grouped = pd.DataFrame(df.groupby(COL_COLOR)[stock_col].sum().reset_index())
             grouped.columns = pd.Index([COL_COLOR, "total_stock"])
@@ -42,9 +42,13 @@ color_aliases(color_code VARCHAR(2), color_name VARCHAR)
 Materialized views (prefer these for common lookups):
   mv_latest_stock(sku, model, product_name, net_price, gross_price, total_stock, available_stock, snapshot_date)
   mv_latest_forecast(sku, model, forecast_date, forecast_quantity, generated_date)
-  mv_valid_sku_stats — same cols as cache_sku_statistics, only valid+latest
+  mv_valid_sku_stats — same cols as cache_sku_statistics, valid+latest per configuration_hash
   mv_valid_monthly_aggs — same cols as cache_monthly_aggregations, only valid+latest
-  mv_valid_order_priorities — same cols as cache_order_priorities, only valid+latest
+  mv_valid_order_priorities — same cols as cache_order_priorities, valid+latest per configuration_hash
+
+Views:
+  v_current_sku_stats — mv_valid_sku_stats rows for the most recently used settings
+  v_current_order_priorities — mv_valid_order_priorities rows for the most recently used settings
 """
 
 QUERY_GUIDELINES = """\
@@ -52,9 +56,10 @@ Rules:
 - Generate only SELECT or WITH (CTE) statements. Never INSERT/UPDATE/DELETE/DROP.
 - SKU is 9 characters: model=sku[1:5] (first 5 chars), color=sku[6:7], size=sku[8:9].
 - In PostgreSQL use SUBSTRING(sku, 1, 5) for model extraction. In DuckDB use sku[:5].
-- Product types: 'new', 'basic', 'seasonal', 'regular' (in cache_sku_statistics.product_type or mv_valid_sku_stats.product_type).
-- For "below ROP" queries, join stock with cache_sku_statistics on sku and compare available_stock < reorder_point.
+- Product types: 'new', 'basic', 'seasonal', 'regular' (in v_current_sku_stats.product_type).
+- For "below ROP" queries, join stock with v_current_sku_stats on sku = entity_id and compare available_stock < reorder_point.
 - Use materialized views (mv_*) in PostgreSQL mode when possible — they are pre-filtered for latest/valid data.
+- SKU statistics and order priorities are cached per settings; query v_current_sku_stats / v_current_order_priorities, not the cache_* tables.
 - In file mode (DuckDB): date column is 'data', quantity is 'ilosc', revenue is 'razem'.
 - In database mode (PostgreSQL): date column is 'sale_date', quantity is 'quantity', revenue is 'total_amount'.
 - Always include a LIMIT clause unless the user explicitly wants all rows. Default to LIMIT 100.
@@ -90,13 +95,13 @@ Q: "top 10 models by total revenue"
 SQL: SELECT model, SUM(quantity) AS total_qty, SUM(total_amount) AS total_revenue FROM raw_sales_transactions GROUP BY model ORDER BY total_revenue DESC LIMIT 10
 
 Q: "stock below reorder point"
-SQL: SELECT s.sku, s.model, s.available_stock, st.reorder_point, st.product_type FROM mv_latest_stock s JOIN mv_valid_sku_stats st ON s.sku = st.entity_id WHERE s.available_stock < st.reorder_point ORDER BY (st.reorder_point - s.available_stock) DESC LIMIT 100
+SQL: SELECT s.sku, s.model, s.available_stock, st.reorder_point, st.product_type FROM mv_latest_stock s JOIN v_current_sku_stats st ON s.sku = st.entity_id WHERE s.available_stock < st.reorder_point ORDER BY (st.reorder_point - s.available_stock) DESC LIMIT 100
 
 Q: "monthly sales trend for model JU386"
 SQL: SELECT year_month, SUM(quantity) AS qty, SUM(total_amount) AS revenue FROM raw_sales_transactions WHERE model = 'JU386' GROUP BY year_month ORDER BY year_month
 
 Q: "seasonal products with low stock"
-SQL: SELECT s.sku, s.model, s.available_stock, st.product_type, st.reorder_point FROM mv_latest_stock s JOIN mv_valid_sku_stats st ON s.sku = st.entity_id WHERE st.product_type = 'seasonal' AND s.available_stock < st.reorder_point ORDER BY s.available_stock LIMIT 100
+SQL: SELECT s.sku, s.model, s.available_stock, st.product_type, st.reorder_point FROM mv_latest_stock s JOIN v_current_sku_stats st ON s.sku = st.entity_id WHERE st.product_type = 'seasonal' AND s.available_stock < st.reorder_point ORDER BY s.available_stock LIMIT 100
 
 Q: "category breakdown of sales"
 SQL: SELECT c.kategoria, c.podgrupa, SUM(r.quantity) AS total_qty FROM raw_sales_transactions r JOIN category_mappings c ON r.model = c.model GROUP BY c.kategoria, c.podgrupa ORDER BY total_qty DESC LIMIT 50
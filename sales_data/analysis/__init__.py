@@ -35,9 +35,11 @@ from .material_planning import (
     map_ribbing_type_to_material,
 )
 from .order_priority import (
+    PriorityEngine,
     aggregate_order_by_model_color,
     apply_priority_scoring,
     calculate_order_priority,
+    extract_priority_config,
     find_urgent_colors,
     generate_order_recommendations,
     get_size_quantities_for_model_color,
@@ -49,6 +51,7 @@ from .pattern_helpers import (
     optimize_pattern_with_aliases,
 )
 from .projection import (
+    StockProjection,
     calculate_model_stock_projection,
     calculate_stock_projection,
 )
@@ -62,6 +65,7 @@ from .reports import (
     generate_weekly_new_products_analysis,
     get_last_n_months_sales_by_color,
 )
+from .sales_cube import SalesCube
 from .utils import (
     get_completed_last_week_range,
     get_last_week_range,
@@ -71,6 +75,9 @@ from .utils import (
 
 __all__ = [
     "AVERAGE_SALES",
+    "PriorityEngine",
+    "SalesCube",
+    "StockProjection",
     "aggregate_by_model",
     "aggregate_by_sku",
     "aggregate_forecast_yearly",
@@ -96,6 +103,7 @@ __all__ = [
     "classify_sku_type",
     "determine_seasonal_months",
     "apply_priority_scoring",
+    "extract_priority_config",
     "find_urgent_colors",
     "generate_order_recommendations",
     "generate_weekly_new_products_analysis",
@@ -1,73 +1,29 @@
 from __future__ import annotations
 
 import math
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import pandas as pd
 
-from ui.shared.sku_utils import ADULT_PREFIXES, CHILDREN_PREFIXES
+from sales_data.sku_dimension import AGE_GROUP_ADULT, AGE_GROUP_CHILDREN, sku_attribute
 
-AVERAGE_SALES = "AVERAGE SALES"
-
-
-def _aggregate_sales_summary(df: pd.DataFrame, group_col: str, id_col: str) -> pd.DataFrame:
-    df = df.copy()
-    df["year_month"] = df["data"].dt.to_period("M")  # type: ignore[union-attr]
-
-    first_sale = df.groupby(group_col, as_index=False, observed=True).agg(first_sale=("data", "min"))
-    first_sale.columns = pd.Index([id_col, "first_sale"])
-
-    monthly_sales = df.groupby([group_col, "year_month"], as_index=False, observed=True).agg(ilosc=("ilosc", "sum"))
-
-    summary = pd.DataFrame(
-        monthly_sales.groupby(group_col, as_index=False, observed=True).agg(
-            {"year_month": "nunique", "ilosc": ["sum", "mean", "std"]}  # type: ignore[arg-type]
-        )
-    )
-    summary.columns = pd.Index([id_col, "MONTHS", "QUANTITY", AVERAGE_SALES, "SD"])
-
-    summary["CV"] = pd.Series(summary["SD"]) / pd.Series(summary[AVERAGE_SALES])
-    summary["CV"] = pd.Series(summary["CV"]).fillna(0)
-
-    summary = pd.merge(summary, first_sale, on=id_col, how="left", validate="one_to_one")
-
-    return pd.DataFrame(summary.sort_values(id_col, ascending=False))
+from .sales_cube import AVERAGE_SALES, SUMMARY_COLUMNS, SalesCube
 
 
 def aggregate_by_sku(data: pd.DataFrame) -> pd.DataFrame:
     if data is None or data.empty:
-        return pd.DataFrame(columns=pd.Index(["SKU", "MONTHS", "QUANTITY", AVERAGE_SALES, "SD", "CV", "first_sale"]))
-    return _aggregate_sales_summary(data, "sku", "SKU")
+        return pd.DataFrame(columns=pd.Index(["SKU", *SUMMARY_COLUMNS]))
+    return SalesCube(data).summary("sku")
 
 
 def aggregate_by_model(data: pd.DataFrame) -> pd.DataFrame:
     if data is None or data.empty:
-        return pd.DataFrame(columns=pd.Index(["MODEL", "MONTHS", "QUANTITY", AVERAGE_SALES, "SD", "CV", "first_sale"]))
-    if "model" not in data.columns:
-        data = data.copy()
-        data["model"] = data["sku"].astype(str).str[:5]
-    return _aggregate_sales_summary(data, "model", "MODEL")
+        return pd.DataFrame(columns=pd.Index(["MODEL", *SUMMARY_COLUMNS]))
+    return SalesCube(data).summary("model")
 
 
 def aggregate_yearly_sales(data: pd.DataFrame, _by_model: bool = False, include_color: bool = False) -> pd.DataFrame:
-    df = data.copy()
-    df["year"] = df["data"].dt.year  # type: ignore[union-attr]
-    sku_str = df["sku"].astype(str)
-    df["model"] = sku_str.str[:5]
-
-    if include_color:
-        df["color"] = sku_str.str[5:7]
-        df["model_color"] = df["model"] + df["color"]
-        group_cols = ["model_color", "year"]
-        id_col = "MODEL_COLOR"
-    else:
-        group_cols = ["model", "year"]
-        id_col = "MODEL"
-
-    yearly_sales = df.groupby(group_cols, as_index=False, observed=True).agg({"ilosc": "sum"})
-    yearly_sales.columns = pd.Index([id_col, "YEAR", "QUANTITY"])
-
-    return pd.DataFrame(yearly_sales)
+    return SalesCube(data).yearly_sales(include_color)
 
 
 def aggregate_forecast_yearly(forecast_df: pd.DataFrame, include_color: bool = False) -> pd.DataFrame:
@@ -81,43 +37,23 @@ def aggregate_forecast_yearly(forecast_df: pd.DataFrame, include_color: bool = F
         return pd.DataFrame(columns=pd.Index([id_col, "YEAR", "QUANTITY"]))
 
     df["year"] = df["data"].dt.year  # type: ignore[union-attr]
-    df["model"] = pd.Series(df["sku"]).astype(str).str[:5]
 
     if include_color:
-        df["color"] = pd.Series(df["sku"]).astype(str).str[5:7]
-        df["model_color"] = df["model"] + df["color"]
+        df["model_color"] = sku_attribute(pd.Series(df["sku"]), "model_color")
         yearly_forecast = df.groupby(["model_color", "year"], as_index=False, observed=True).agg({"forecast": "sum"})
         yearly_forecast.columns = pd.Index(["MODEL_COLOR", "YEAR", "QUANTITY"])
     else:
+        df["model"] = sku_attribute(pd.Series(df["sku"]), "model")
         yearly_forecast = df.groupby(["model", "year"], as_index=False, observed=True).agg({"forecast": "sum"})
         yearly_forecast.columns = pd.Index(["MODEL", "YEAR", "QUANTITY"])
 
+    id_col = yearly_forecast.columns[0]
+    yearly_forecast[id_col] = yearly_forecast[id_col].astype(object)
     return pd.DataFrame(yearly_forecast)
 
 
 def calculate_last_two_years_avg_sales(data: pd.DataFrame, by_model: bool = False) -> pd.DataFrame:
-    two_years_ago = datetime.today().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=730)
-    df_last_2_years = data[data["data"] >= two_years_ago].copy()
-
-    if df_last_2_years.empty:
-        col_name = "MODEL" if by_model else "SKU"
-        return pd.DataFrame(columns=pd.Index([col_name, "LAST_2_YEARS_AVG"]))
-
-    df_last_2_years["year_month"] = df_last_2_years["data"].dt.to_period("M")  # type: ignore[union-attr]
-
-    if by_model:
-        df_last_2_years["model"] = pd.Series(df_last_2_years["sku"]).astype(str).str[:5]
-        monthly_sales = df_last_2_years.groupby(["model", "year_month"], as_index=False, observed=True).agg(ilosc=("ilosc", "sum"))
-        avg_sales = pd.DataFrame(monthly_sales.groupby("model", as_index=False, observed=True).agg(LAST_2_YEARS_AVG=("ilosc", "mean")))
-        avg_sales.columns = pd.Index(["MODEL", "LAST_2_YEARS_AVG"])
-    else:
-        monthly_sales = df_last_2_years.groupby(["sku", "year_month"], as_index=False, observed=True).agg(ilosc=("ilosc", "sum"))
-        avg_sales = pd.DataFrame(monthly_sales.groupby("sku", as_index=False, observed=True).agg(LAST_2_YEARS_AVG=("ilosc", "mean")))
-        avg_sales.columns = pd.Index(["SKU", "LAST_2_YEARS_AVG"])
-
-    avg_sales["LAST_2_YEARS_AVG"] = pd.Series(avg_sales["LAST_2_YEARS_AVG"]).round(2)
-
-    return avg_sales
+    return SalesCube(data).last_two_years_avg("model" if by_model else "sku")
 
 
 _PERIOD_SALES_COLUMNS = pd.Index(["SKU", "PERIOD_SALES"])
@@ -154,7 +90,7 @@ def calculate_period_sales(monthly_agg: pd.DataFrame, lead_time: float, force_se
         return pd.DataFrame(columns=_PERIOD_SALES_COLUMNS)
 
     n_months = math.ceil(lead_time)
-    df["_prefix"] = df[sku_col].astype(str).str[:2].str.lower()
+    age_group = sku_attribute(pd.Series(df[sku_col]), "age_group")
     df[month_col] = df[month_col].astype(str)
     all_months = sorted(df[month_col].unique(), reverse=True)
 
@@ -171,8 +107,8 @@ def calculate_period_sales(monthly_agg: pd.DataFrame, lead_time: float, force_se
     else:
         results = [
             r for r in (
-                _aggregate_group_sales(df, df["_prefix"].isin(CHILDREN_PREFIXES), month_col, sku_col, qty_col, children_months),
-                _aggregate_group_sales(df, df["_prefix"].isin(ADULT_PREFIXES), month_col, sku_col, qty_col, adult_months),
+                _aggregate_group_sales(df, age_group == AGE_GROUP_CHILDREN, month_col, sku_col, qty_col, children_months),
+                _aggregate_group_sales(df, age_group == AGE_GROUP_ADULT, month_col, sku_col, qty_col, adult_months),
             ) if r is not None
         ]
 
@@ -6,6 +6,8 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
+from sales_data.sku_dimension import sku_attribute
+
 
 def _get_entity_col(entity_type: str) -> str:
     return "model" if entity_type == "model" else "sku"
@@ -13,12 +15,21 @@ def _get_entity_col(entity_type: str) -> str:
 
 def _ensure_entity_col(df: pd.DataFrame, entity_col: str) -> pd.DataFrame:
     if entity_col == "model" and "model" not in df.columns:
-        df["model"] = df["sku"].astype(str).str[:5]
+        df["model"] = sku_attribute(df["sku"], "model")
     elif entity_col == "sku":
         df[entity_col] = df["sku"]
     return df
 
 
+def _daily_totals(
+        df: pd.DataFrame, entity_col: str, **aggregations: tuple[str, str]
+) -> pd.DataFrame:
+    daily = df.groupby([entity_col, "date"], as_index=False, observed=True).agg(**aggregations)
+    if entity_col == "model":
+        daily["model"] = daily["model"].astype(object)
+    return daily
+
+
 def _filter_date_range(df: pd.DataFrame, start: datetime, end: datetime) -> pd.DataFrame:
     return pd.DataFrame(df[(df["date"] >= start.date()) & (df["date"] <= end.date())])
 
@@ -61,7 +72,7 @@ def _aggregate_daily_sales(
     df["date"] = pd.to_datetime(df["data"]).dt.date  # type: ignore
     df = _ensure_entity_col(df, entity_col)
     df = _filter_date_range(df, start, end)
-    return pd.DataFrame(df.groupby([entity_col, "date"], as_index=False, observed=True).agg(actual=("ilosc", "sum")))
+    return _daily_totals(df, entity_col, actual=("ilosc", "sum"))
 
 
 def _prepare_daily_forecast(
@@ -70,7 +81,7 @@ def _prepare_daily_forecast(
     df = forecast_df.copy()
     df["date"] = pd.to_datetime(df["data"]).dt.date  # type: ignore
     df = _ensure_entity_col(df, entity_col)
-    daily = pd.DataFrame(df.groupby([entity_col, "date"], as_index=False, observed=True).agg(forecast=("forecast", "sum")))
+    daily = _daily_totals(df, entity_col, forecast=("forecast", "sum"))
     return _filter_date_range(daily, start, end)
 
 
@@ -83,9 +94,7 @@ def _prepare_daily_stock(
     df = stock_df.copy()
     df["date"] = pd.to_datetime(df["snapshot_date"]).dt.date  # type: ignore
     df = _ensure_entity_col(df, entity_col)
-    daily = pd.DataFrame(df.groupby([entity_col, "date"], as_index=False, observed=True).agg(
-        stock_level=("available_stock", "sum")
-    ))
+    daily = _daily_totals(df, entity_col, stock_level=("available_stock", "sum"))
     return _filter_date_range(daily, start, end)
 
 
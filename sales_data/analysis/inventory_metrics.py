@@ -5,6 +5,8 @@ from datetime import datetime
 import numpy as np
 import pandas as pd
 
+from sales_data.sku_dimension import sku_attribute
+
 AVERAGE_SALES = "AVERAGE SALES"
 
 
@@ -18,7 +20,7 @@ def calculate_safety_stock_and_rop(
         z_new: float,
         lead_time_months: float = 1.36,
 ) -> pd.DataFrame:
-    df = sku_summary.copy()
+    df = sku_summary.reset_index(drop=True)
 
     id_column = "MODEL" if "MODEL" in df.columns else "SKU"
 
@@ -139,10 +141,11 @@ def calculate_out_of_stock_streaks(
     df["snapshot_date"] = pd.to_datetime(df["snapshot_date"])
 
     if entity_type == "model":
-        df["entity"] = pd.Series(df["sku"]).astype(str).str[:5]
+        df["entity"] = sku_attribute(df["sku"], "model")
         stock_by_entity = (
             df.groupby(["entity", "snapshot_date"], as_index=False, observed=True)
             .agg(available_stock=("available_stock", "sum"))
+            .astype({"entity": object})
         )
         id_column = "MODEL"
     else:
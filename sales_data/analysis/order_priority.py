@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import time
+
+import numpy as np
 import pandas as pd
 
+from sales_data.sku_dimension import sku_labels
 from utils.logging_config import get_logger
 
 from .inventory_metrics import calculate_forecast_date_range
 
 logger = get_logger("order_priority")
 
+DEFAULT_TYPE_MULTIPLIERS = {"new": 1.2, "seasonal": 1.3, "regular": 1.0, "basic": 0.9}
+MODEL_COLOR_SUMS = ["DEFICIT", "FORECAST_LEADTIME", "STOCK", "ROP", "SS"]
+MODEL_COLOR_OPTIONAL_SUMS = ["REVENUE_AT_RISK", "PERIOD_SALES", "PERIOD_SALES_SEASONAL"]
+
 
 def calculate_order_priority(
     summary_df: pd.DataFrame,
@@ -16,28 +24,18 @@ def calculate_order_priority(
     settings: dict | None = None,
 ) -> pd.DataFrame:
     logger.info("Calculating order priority for %d items", len(summary_df))
-    if settings is None:
-        from utils.settings_manager import load_settings
-        resolved_settings = load_settings()
-    else:
-        resolved_settings = settings
-
-    config = _extract_priority_config(resolved_settings)
-    df = summary_df.copy()
+    engine = PriorityEngine(summary_df, forecast_df, forecast_time_months)
+    return engine.priority(settings)
 
-    _validate_required_columns(df)
-    df = _add_forecast_leadtime(df, forecast_df, forecast_time_months)
-    df = _add_sku_components(df)
-    df = _calculate_stockout_risk(df, config)
-    df = _calculate_revenue_impact(df)
-    df = _apply_type_multipliers(df, config["type_multipliers"])
-    df = _calculate_priority_score(df, config)
-    df["URGENT"] = (df["STOCK"] == 0) & (df["FORECAST_LEADTIME"] > 0)
 
-    return df.sort_values("PRIORITY_SCORE", ascending=False)
+def _resolve_settings(settings: dict | None) -> dict:
+    if settings is None:
+        from utils.settings_manager import load_settings
+        return load_settings()
+    return settings
 
 
-def _extract_priority_config(settings: dict) -> dict:
+def extract_priority_config(settings: dict) -> dict:
     rec_settings = settings.get("order_recommendations", {})
     stockout_cfg = rec_settings.get("stockout_risk", {})
     weights = rec_settings.get("priority_weights", {})
@@ -48,7 +46,10 @@ def _extract_priority_config(settings: dict) -> dict:
         "weight_stockout": weights.get("stockout_risk", 0.5),
         "weight_revenue": weights.get("revenue_impact", 0.3),
         "weight_demand": weights.get("demand_forecast", 0.2),
-        "type_multipliers": rec_settings.get("type_multipliers", {}),
+        "type_multipliers": {
+            **DEFAULT_TYPE_MULTIPLIERS,
+            **rec_settings.get("type_multipliers", {}),
+        },
         "demand_cap": rec_settings.get("demand_cap", 100),
     }
 
@@ -87,10 +88,9 @@ def _add_forecast_leadtime(
 
 
 def _add_sku_components(df: pd.DataFrame) -> pd.DataFrame:
-    sku_str = df["SKU"].astype(str)
-    df["MODEL"] = sku_str.str[:5]
-    df["COLOR"] = sku_str.str[5:7]
-    df["SIZE"] = sku_str.str[7:9]
+    df["MODEL"] = sku_labels(df["SKU"], "model")
+    df["COLOR"] = sku_labels(df["SKU"], "color")
+    df["SIZE"] = sku_labels(df["SKU"], "size")
     return df
 
 
@@ -119,8 +119,7 @@ def _calculate_revenue_impact(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def _apply_type_multipliers(df: pd.DataFrame, type_multipliers: dict) -> pd.DataFrame:
-    default_type_mult = {"new": 1.2, "seasonal": 1.3, "regular": 1.0, "basic": 0.9}
-    type_mult = {k: type_multipliers.get(k, v) for k, v in default_type_mult.items()}
+    type_mult = {k: type_multipliers.get(k, v) for k, v in DEFAULT_TYPE_MULTIPLIERS.items()}
     df["TYPE_MULTIPLIER"] = df["TYPE"].map(type_mult).fillna(1.0)  # type: ignore[arg-type]
     return df
 
@@ -141,13 +140,7 @@ def apply_priority_scoring(df: pd.DataFrame, settings: dict | None = None) -> pd
         df["PRIORITY_SCORE"] = 0
         return df
 
-    if settings is None:
-        from utils.settings_manager import load_settings
-        resolved_settings = load_settings()
-    else:
-        resolved_settings = settings
-
-    config = _extract_priority_config(resolved_settings)
+    config = extract_priority_config(_resolve_settings(settings))
     result = df.copy()
 
     result = _calculate_stockout_risk(result, config)
@@ -215,51 +208,8 @@ def generate_order_recommendations(
     top_n: int = 10,
     settings: dict | None = None,
 ) -> dict:
-    priority_df = calculate_order_priority(
-        summary_df, forecast_df, forecast_time_months, settings
-    )
-
-    model_color_summary = aggregate_order_by_model_color(priority_df)
-
-    top_model_colors = model_color_summary.head(top_n)
-
-    top_keys = set(zip(top_model_colors["MODEL"].astype(str), top_model_colors["COLOR"].astype(str)))
-    relevant = priority_df[
-        priority_df.apply(lambda r: (str(r["MODEL"]), str(r["COLOR"])) in top_keys, axis=1)
-    ]
-    grouped_sizes = {}
-    for (m, c), group in relevant.groupby(["MODEL", "COLOR"], observed=True):
-        deficit = group["DEFICIT"].fillna(0)
-        forecast = group["FORECAST_LEADTIME"].fillna(0)
-        qty = deficit.combine(forecast, max).astype(int)
-        sizes = group["SIZE"].astype(str)
-        valid = sizes != ""
-        grouped_sizes[(str(m), str(c))] = dict(zip(sizes[valid], qty[valid]))
-
-    top_recommendations = []
-    for row in top_model_colors.to_dict("records"):
-        model = str(row["MODEL"])
-        color = str(row["COLOR"])
-        top_recommendations.append(
-            {
-                "model": model,
-                "color": color,
-                "priority_score": row["PRIORITY_SCORE"],
-                "total_deficit": row["DEFICIT"],
-                "forecast_demand": row["FORECAST_LEADTIME"],
-                "coverage_gap": row["COVERAGE_GAP"],
-                "urgent": row["URGENT"],
-                "size_quantities": grouped_sizes.get((model, color), {}),
-            }
-        )
-
-    logger.info("Generated %d order recommendations", len(top_recommendations))
-
-    return {
-        "priority_skus": priority_df,
-        "model_color_summary": model_color_summary,
-        "top_recommendations": top_recommendations,
-    }
+    engine = PriorityEngine(summary_df, forecast_df, forecast_time_months)
+    return engine.recommendations(settings, top_n)
 
 
 def find_urgent_colors(model_color_summary: pd.DataFrame, model: str) -> list[str]:
@@ -267,3 +217,166 @@ def find_urgent_colors(model_color_summary: pd.DataFrame, model: str) -> list[st
     if "URGENT" not in df.columns:
         return []
     return df.loc[df["URGENT"], "COLOR"].tolist()
+
+
+class PriorityEngine:
+    def __init__(
+        self,
+        summary_df: pd.DataFrame,
+        forecast_df: pd.DataFrame,
+        forecast_time_months: float = 5,
+    ) -> None:
+        df = summary_df.copy()
+        _validate_required_columns(df)
+        df = _add_forecast_leadtime(df, forecast_df, forecast_time_months)
+        self.frame = _add_sku_components(df)
+
+        stock = self.frame["STOCK"]
+        rop = self.frame["ROP"]
+        forecast = self.frame["FORECAST_LEADTIME"]
+        self._forecast = forecast.to_numpy(dtype=np.float64)
+        self._zero_stock = ((stock <= 0) & (forecast > 0)).to_numpy()
+        self._below_rop = ((stock > 0) & (stock < rop)).to_numpy()
+        self._rop_gap = ((rop - stock) / rop).to_numpy(dtype=np.float64)
+        self._type_codes, types = pd.factorize(self.frame["TYPE"])
+        self._types = list(types)
+
+        revenue_columns = [c for c in ("FORECAST_LEADTIME", "PRICE") if c in self.frame.columns]
+        revenue = _calculate_revenue_impact(self.frame[revenue_columns].copy())
+        self._revenue_columns = revenue.drop(columns=revenue_columns)
+        self._impact = revenue["REVENUE_IMPACT"].to_numpy(dtype=np.float64)
+        self._deficit = (rop - stock).clip(lower=0)
+        self._urgent = (stock == 0) & (forecast > 0)
+
+        sizes = self.frame["SIZE"].astype(str).to_numpy()
+        quantities = np.maximum(self._deficit.fillna(0), forecast.fillna(0)).astype(int)
+        self._size_quantities = list(zip(sizes, quantities.to_numpy()))
+        self.restrict(None)
+
+    def restrict(self, keep: np.ndarray | None) -> None:
+        if keep is None:
+            keep = np.ones(len(self.frame), dtype=bool)
+        self._keep = np.asarray(keep, dtype=bool)
+        self._model_color_totals: pd.DataFrame | None = None
+        self._group_codes = np.full(len(self.frame), -1, dtype=np.int64)
+
+    def _model_color_groups(self) -> pd.DataFrame:
+        if self._model_color_totals is None:
+            static = self.frame.assign(
+                **self._revenue_columns.drop(columns="REVENUE_IMPACT"),
+                DEFICIT=self._deficit,
+                URGENT=self._urgent,
+            )[self._keep]
+            agg_dict = {column: "sum" for column in MODEL_COLOR_SUMS}
+            agg_dict["URGENT"] = "any"
+            agg_dict.update({c: "sum" for c in MODEL_COLOR_OPTIONAL_SUMS if c in static.columns})
+
+            grouped = static.groupby(["MODEL", "COLOR"], as_index=False, observed=True)
+            totals = pd.DataFrame(grouped.agg(agg_dict))
+            totals["COVERAGE_GAP"] = (totals["FORECAST_LEADTIME"] - totals["STOCK"]).clip(lower=0)
+            self._group_codes[self._keep] = grouped.ngroup().to_numpy()
+            self._model_color_totals = totals
+        return self._model_color_totals
+
+    def scores(self, config: dict) -> dict[str, np.ndarray]:
+        stockout_risk = np.zeros(len(self.frame))
+        stockout_risk[self._zero_stock] = config["zero_stock_penalty"]
+        stockout_risk[self._below_rop] = self._rop_gap[self._below_rop] * config["below_rop_max"]
+
+        type_mult = {
+            k: config["type_multipliers"].get(k, v) for k, v in DEFAULT_TYPE_MULTIPLIERS.items()
+        }
+        multipliers = np.array(
+            [type_mult.get(sku_type, 1.0) for sku_type in self._types] + [1.0], dtype=np.float64
+        )[self._type_codes]
+
+        priority_score = (
+            (stockout_risk * config["weight_stockout"])
+            + (self._impact * config["weight_revenue"])
+            + (np.minimum(self._forecast, config["demand_cap"]) * config["weight_demand"])
+        ) * multipliers
+        return {
+            "STOCKOUT_RISK": stockout_risk,
+            "TYPE_MULTIPLIER": multipliers,
+            "PRIORITY_SCORE": priority_score,
+        }
+
+    def priority(self, settings: dict | None = None) -> pd.DataFrame:
+        config = extract_priority_config(_resolve_settings(settings))
+        return self._priority_frame(self.scores(config))
+
+    def _priority_frame(self, scores: dict[str, np.ndarray]) -> pd.DataFrame:
+        df = self.frame.assign(
+            STOCKOUT_RISK=scores["STOCKOUT_RISK"],
+            **self._revenue_columns,
+            TYPE_MULTIPLIER=scores["TYPE_MULTIPLIER"],
+            DEFICIT=self._deficit,
+            PRIORITY_SCORE=scores["PRIORITY_SCORE"],
+            URGENT=self._urgent,
+        )
+        index = df.index
+        df.index = pd.RangeIndex(len(df))
+        df = df.sort_values("PRIORITY_SCORE", ascending=False)
+        positions = df.index.to_numpy()
+        df.index = index[positions]
+        return df[self._keep[positions]] if not self._keep.all() else df
+
+    def _model_color_summary(self, priority_score: np.ndarray) -> pd.DataFrame:
+        model_color_totals = self._model_color_groups()
+        valid = (self._group_codes >= 0) & ~np.isnan(priority_score)
+        n_groups = len(model_color_totals)
+        totals = np.bincount(
+            self._group_codes[valid], weights=priority_score[valid], minlength=n_groups
+        )
+        counts = np.bincount(self._group_codes[valid], minlength=n_groups)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_score = totals / counts
+
+        summary = model_color_totals.copy()
+        summary.insert(2, "PRIORITY_SCORE", mean_score)
+        return summary.sort_values(by="PRIORITY_SCORE", ascending=False)
+
+    def _size_quantities_for(self, group_codes: np.ndarray) -> dict[int, dict[str, int]]:
+        grouped_sizes: dict[int, dict[str, int]] = {int(code): {} for code in group_codes}
+        for row in np.flatnonzero(np.isin(self._group_codes, group_codes)):
+            size, quantity = self._size_quantities[row]
+            if size != "":
+                grouped_sizes[int(self._group_codes[row])][size] = int(quantity)
+        return grouped_sizes
+
+    def recommendations(self, settings: dict | None = None, top_n: int = 10) -> dict:
+        started = time.perf_counter()
+        scores = self.scores(extract_priority_config(_resolve_settings(settings)))
+        priority_df = self._priority_frame(scores)
+        model_color_summary = self._model_color_summary(scores["PRIORITY_SCORE"])
+
+        top_model_colors = model_color_summary.head(top_n)
+        grouped_sizes = self._size_quantities_for(top_model_colors.index.to_numpy())
+
+        top_recommendations = []
+        for code, row in zip(top_model_colors.index, top_model_colors.to_dict("records")):
+            top_recommendations.append(
+                {
+                    "model": str(row["MODEL"]),
+                    "color": str(row["COLOR"]),
+                    "priority_score": row["PRIORITY_SCORE"],
+                    "total_deficit": row["DEFICIT"],
+                    "forecast_demand": row["FORECAST_LEADTIME"],
+                    "coverage_gap": row["COVERAGE_GAP"],
+                    "urgent": row["URGENT"],
+                    "size_quantities": grouped_sizes[int(code)],
+                }
+            )
+
+        logger.info(
+            "Generated %d order recommendations from %d items in %.1f ms",
+            len(top_recommendations),
+            len(priority_df),
+            (time.perf_counter() - started) * 1000,
+        )
+
+        return {
+            "priority_skus": priority_df,
+            "model_color_summary": model_color_summary,
+            "top_recommendations": top_recommendations,
+        }
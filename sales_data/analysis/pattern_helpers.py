@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import pandas as pd
 
+from sales_data.sku_dimension import sku_attribute, sku_labels
 from utils.logging_config import get_logger
 from .order_priority import get_size_quantities_for_model_color
 from .utils import find_column
@@ -21,11 +22,10 @@ def calculate_size_priorities(
     if "SKU" not in df.columns:
         return {}
 
-    sku_str_top = df["SKU"].astype(str)
-    df["size"] = sku_str_top.str[7:9]
+    df["size"] = sku_labels(df["SKU"], "size")
 
     if model:
-        df["model"] = sku_str_top.str[:5]
+        df["model"] = sku_labels(df["SKU"], "model")
         df = df[df["model"] == model]
 
     size_col = "FORECAST_QTY" if "FORECAST_QTY" in df.columns else "TOTAL_QUANTITY"
@@ -66,10 +66,9 @@ def calculate_size_sales_history(
     if sku_col is None:
         return {}
 
-    sku_str = df[sku_col].astype(str)
-    df["_model"] = sku_str.str[:5]
-    df["_color"] = sku_str.str[5:7]
-    df["_size"] = sku_str.str[7:9]
+    df["_model"] = sku_attribute(df[sku_col], "model")
+    df["_color"] = sku_attribute(df[sku_col], "color")
+    df["_size"] = sku_attribute(df[sku_col], "size")
 
     filtered = pd.DataFrame(df[(df["_model"] == model) & (df["_color"] == color)])
     if filtered.empty:
@@ -114,9 +113,8 @@ def get_size_sales_by_month_for_model(
     if sku_col is None:
         return {}
 
-    sku_str = df[sku_col].astype(str)
-    df["_model"] = sku_str.str[:5]
-    df["_size"] = sku_str.str[7:9]
+    df["_model"] = sku_attribute(df[sku_col], "model")
+    df["_size"] = sku_attribute(df[sku_col], "size")
 
     filtered = pd.DataFrame(df[df["_model"] == model])
     if filtered.empty:
@@ -2,9 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
+from sales_data.sku_dimension import sku_labels
+
 PROJECTION_COLUMNS = ["date", "projected_stock", "rop_reached", "zero_reached"]
+STOCKOUT_COLUMNS = ["MONTHS_TO_ROP", "MONTHS_TO_ZERO", "ROP_DATE", "ZERO_DATE"]
+ENTITY_ID_COLUMNS = {"sku": "SKU", "model": "MODEL"}
 
 
 def _empty_projection() -> pd.DataFrame:
@@ -96,3 +101,117 @@ def calculate_model_stock_projection(
     return build_projection_from_forecast(
         model_forecast_aggregated, current_stock, rop, safety_stock, start_date
     )
+
+
+class StockProjection:
+    def __init__(self, forecast_df: pd.DataFrame, start_date: datetime | None = None) -> None:
+        dates = pd.Series(pd.to_datetime(forecast_df["data"]), dtype="datetime64[ns]")
+        self.start_date = pd.Timestamp(start_date) if start_date is not None else dates.min()
+
+        valid = dates.notna().to_numpy()
+        sku_codes, skus = pd.factorize(forecast_df["sku"].astype(str)[valid], sort=True)
+        date_codes, dates = pd.factorize(dates[valid], sort=True)
+        self.skus = pd.Index(skus, dtype=object)
+        self.dates = pd.DatetimeIndex(dates)
+
+        forecast = np.zeros((len(self.skus), len(self.dates)))
+        present = np.zeros(forecast.shape, dtype=bool)
+        if len(sku_codes):
+            values = pd.to_numeric(forecast_df["forecast"][valid], errors="coerce").fillna(0)
+            np.add.at(forecast, (sku_codes, date_codes), values.to_numpy(dtype=np.float64))
+            present[sku_codes, date_codes] = True
+        self._matrices = {"sku": (self.skus, forecast, present)}
+
+    def _matrix(self, entity_type: str) -> tuple[pd.Index, np.ndarray, np.ndarray]:
+        if entity_type not in self._matrices:
+            _, forecast, present = self._matrices["sku"]
+            labels = sku_labels(pd.Series(self.skus, dtype=object), entity_type).to_numpy()
+            if len(labels):
+                starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+                forecast = np.add.reduceat(forecast, starts, axis=0)
+                present = np.logical_or.reduceat(present, starts, axis=0)
+                labels = labels[starts]
+            self._matrices[entity_type] = (pd.Index(labels, dtype=object), forecast, present)
+        return self._matrices[entity_type]
+
+    def _window(self, projection_months: int) -> slice:
+        if pd.isna(self.start_date):
+            return slice(0, 0)
+        end_date = self.start_date + pd.DateOffset(months=projection_months)
+        return slice(
+            self.dates.searchsorted(self.start_date, side="left"),
+            self.dates.searchsorted(end_date, side="right"),
+        )
+
+    def projected_stock(
+            self,
+            entity_ids: pd.Series,
+            current_stock: pd.Series,
+            entity_type: str = "sku",
+            projection_months: int = 12,
+    ) -> tuple[pd.DatetimeIndex, np.ndarray]:
+        labels, forecast, _ = self._matrix(entity_type)
+        window = self._window(projection_months)
+        rows = labels.get_indexer(pd.Series(entity_ids).astype(str))
+
+        consumed = np.zeros((len(rows), window.stop - window.start + 1))
+        known = rows >= 0
+        consumed[known, 1:] = np.cumsum(forecast[rows[known], window], axis=1)
+        projected = current_stock.to_numpy(dtype=np.float64)[:, None] - consumed
+        return self.dates[window].insert(0, self.start_date), projected
+
+    def _forecasted(
+            self, entity_ids: pd.Series, entity_type: str, projection_months: int
+    ) -> np.ndarray:
+        labels, _, present = self._matrix(entity_type)
+        rows = labels.get_indexer(pd.Series(entity_ids).astype(str))
+        forecasted = np.zeros(len(rows), dtype=bool)
+        known = rows >= 0
+        forecasted[known] = present[rows[known], self._window(projection_months)].any(axis=1)
+        return forecasted
+
+    def stockout_summary(
+            self, summary: pd.DataFrame, entity_type: str = "sku", projection_months: int = 12
+    ) -> pd.DataFrame:
+        id_col = ENTITY_ID_COLUMNS[entity_type]
+        dates, projected = self.projected_stock(
+            summary[id_col], summary["STOCK"], entity_type, projection_months
+        )
+        rop = summary["ROP"].to_numpy(dtype=np.float64)[:, None]
+        forecasted = self._forecasted(summary[id_col], entity_type, projection_months)
+
+        result = pd.DataFrame({id_col: summary[id_col].to_numpy()}, index=summary.index)
+        for name, reached in (("ROP", projected <= rop), ("ZERO", projected <= 0)):
+            steps = reached.argmax(axis=1)
+            found = reached.any(axis=1) & forecasted
+            result[f"MONTHS_TO_{name}"] = np.where(found, steps, np.nan)
+            result[f"{name}_DATE"] = np.where(
+                found, dates.to_numpy()[steps], np.datetime64("NaT", "ns")
+            )
+        return result[[id_col, *STOCKOUT_COLUMNS]].sort_values(
+            ["ZERO_DATE", "ROP_DATE", id_col], na_position="last", kind="stable"
+        )
+
+    def projection(
+            self,
+            entity_id: str,
+            current_stock: float,
+            rop: float,
+            safety_stock: float,
+            entity_type: str = "sku",
+            projection_months: int = 12,
+    ) -> pd.DataFrame:
+        labels, forecast, present = self._matrix(entity_type)
+        row = labels.get_indexer([str(entity_id)])[0]
+        if row < 0:
+            return _empty_projection()
+
+        window = self._window(projection_months)
+        columns = np.flatnonzero(present[row, window]) + window.start
+        entity_forecast = pd.DataFrame({
+            "data": self.dates[columns],
+            "forecast": forecast[row, columns],
+        })
+        return build_projection_from_forecast(
+            entity_forecast, current_stock, rop, safety_stock, self.start_date
+        )
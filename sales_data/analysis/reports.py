@@ -4,8 +4,11 @@ from datetime import datetime, timedelta
 
 import pandas as pd
 
+from sales_data.sku_dimension import sku_attribute, sku_labels
 from .utils import get_completed_last_week_range
 
+MODEL_COLOR_LABELS = {"model": object, "color": object}
+
 
 def generate_weekly_new_products_analysis(
         sales_df: pd.DataFrame,
@@ -22,10 +25,11 @@ def generate_weekly_new_products_analysis(
     cutoff_date = resolved_date - timedelta(days=lookback_days)
 
     df = sales_df.copy()
-    df["model"] = df["sku"].astype(str).str[:5]
+    df["model"] = sku_attribute(df["sku"], "model")
 
     first_sales = df.groupby("model", observed=True)["data"].min().reset_index()
     first_sales.columns = ["model", "first_sale_date"]
+    first_sales["model"] = first_sales["model"].astype(object)
 
     new_products = first_sales[first_sales["first_sale_date"] >= cutoff_date].copy()
 
@@ -35,6 +39,7 @@ def generate_weekly_new_products_analysis(
     new_products["monitoring_end_date"] = new_products["first_sale_date"] + timedelta(days=lookback_days)
 
     df_new = df[df["model"].isin(pd.Series(new_products["model"]))].copy()
+    df_new["model"] = df_new["model"].astype(object)
 
     df_new = df_new.merge(
         pd.DataFrame(new_products[["model", "first_sale_date", "monitoring_end_date"]]),
@@ -87,9 +92,10 @@ def generate_weekly_new_products_analysis(
 
     if stock_df is not None:
         stock_copy = stock_df.copy()
-        stock_copy["model"] = stock_copy["sku"].astype(str).str[:5]
+        stock_copy["model"] = sku_attribute(stock_copy["sku"], "model")
         descriptions = stock_copy.groupby("model", observed=True)["nazwa"].first().reset_index()
         descriptions.columns = ["MODEL", "DESCRIPTION"]
+        descriptions["MODEL"] = descriptions["MODEL"].astype(object)
         result = result.merge(descriptions, on="MODEL", how="left", validate="many_to_one")
 
     week_cols = [col for col in result.columns if col not in ["SALES_START_DATE", "MODEL", "DESCRIPTION"]]
@@ -117,7 +123,7 @@ def calculate_top_sales_report(
     prev_year_end = last_week_end - timedelta(days=364)
 
     df = sales_df.copy()
-    df["model"] = df["sku"].astype(str).str[:5]
+    df["model"] = sku_attribute(df["sku"], "model")
 
     last_week_sales = (
         df[(df["data"] >= last_week_start) & (df["data"] <= last_week_end)]
@@ -136,6 +142,7 @@ def calculate_top_sales_report(
     comparison = last_week_sales.merge(
         pd.DataFrame(prev_year_sales), on="model", how="outer", validate="one_to_one"
     )
+    comparison["model"] = comparison["model"].astype(object)
     comparison["current_week_sales"] = comparison["current_week_sales"].fillna(0)
     comparison["prev_year_sales"] = comparison["prev_year_sales"].fillna(0)
 
@@ -177,13 +184,13 @@ def calculate_top_products_by_type(
     last_week_start, last_week_end = get_completed_last_week_range(resolved_date)
 
     df = sales_df.copy()
-    sku_str = df["sku"].astype(str)
-    df["model"] = sku_str.str[:5]
-    df["color"] = sku_str.str[5:7]
+    df["model"] = sku_attribute(df["sku"], "model")
+    df["color"] = sku_attribute(df["sku"], "color")
 
     last_week_sales = df[(df["data"] >= last_week_start) & (df["data"] <= last_week_end)].copy()
 
     model_color_sales = last_week_sales.groupby(["model", "color"], as_index=False, observed=True).agg(sales=("ilosc", "sum"))
+    model_color_sales = model_color_sales.astype(MODEL_COLOR_LABELS)
 
     monthly_sales = df.copy()
     monthly_sales["month"] = monthly_sales["data"].dt.to_period("M")  # type: ignore[attr-defined]
@@ -203,6 +210,7 @@ def calculate_top_products_by_type(
     first_sales.columns = ["model", "first_sale"]
 
     stats = stats.merge(first_sales, on="model", how="left", validate="many_to_one")
+    stats["model"] = stats["model"].astype(object)
 
     one_year_ago = resolved_date - timedelta(days=365)
     stats["type"] = "regular"
@@ -258,8 +266,8 @@ def calculate_monthly_yoy_by_category(
     current_sales = sales_df[(sales_df["data"] >= current_start) & (sales_df["data"] <= current_end)].copy()
     prior_sales = sales_df[(sales_df["data"] >= prior_start) & (sales_df["data"] <= prior_end)].copy()
 
-    current_sales["model"] = pd.Series(current_sales["sku"]).str[:5]
-    prior_sales["model"] = pd.Series(prior_sales["sku"]).str[:5]
+    current_sales["model"] = sku_attribute(current_sales["sku"], "model")
+    prior_sales["model"] = sku_attribute(prior_sales["sku"], "model")
 
     category_lookup = pd.DataFrame(category_df[["Model", "Podgrupa", "Kategoria", "Nazwa"]]).copy()
     category_lookup["model"] = pd.Series(category_lookup["Model"]).str.upper()
@@ -356,20 +364,18 @@ def calculate_monthly_yoy_by_color(
     current_sales = df[(df["data"] >= current_start) & (df["data"] <= current_end)].copy()
     prior_sales = df[(df["data"] >= prior_start) & (df["data"] <= prior_end)].copy()
 
-    cur_sku = pd.Series(current_sales["sku"]).astype(str)
-    current_sales["color"] = cur_sku.str[5:7]
-    current_sales["model"] = cur_sku.str[:5]
-    pri_sku = pd.Series(prior_sales["sku"]).astype(str)
-    prior_sales["color"] = pri_sku.str[5:7]
-    prior_sales["model"] = pri_sku.str[:5]
+    current_sales["color"] = sku_attribute(current_sales["sku"], "color")
+    current_sales["model"] = sku_attribute(current_sales["sku"], "model")
+    prior_sales["color"] = sku_attribute(prior_sales["sku"], "color")
+    prior_sales["model"] = sku_attribute(prior_sales["sku"], "model")
 
     current_color_agg = pd.DataFrame(current_sales.groupby(
-        "color", as_index=False
-    )["ilosc"].sum()).rename(columns={"ilosc": "current_qty"})
+        "color", as_index=False, observed=True
+    )["ilosc"].sum()).rename(columns={"ilosc": "current_qty"}).astype({"color": object})
 
     prior_color_agg = pd.DataFrame(prior_sales.groupby(
-        "color", as_index=False
-    )["ilosc"].sum()).rename(columns={"ilosc": "prior_qty"})
+        "color", as_index=False, observed=True
+    )["ilosc"].sum()).rename(columns={"ilosc": "prior_qty"}).astype({"color": object})
 
     color_summary = current_color_agg.merge(
         prior_color_agg, on="color", how="outer", validate="one_to_one"
@@ -383,12 +389,12 @@ def calculate_monthly_yoy_by_color(
     color_summary = pd.DataFrame(color_summary).sort_values(by="current_qty", ascending=False)
 
     current_detail_agg = pd.DataFrame(current_sales.groupby(
-        ["color", "model"], as_index=False
-    )["ilosc"].sum()).rename(columns={"ilosc": "current_qty"})
+        ["color", "model"], as_index=False, observed=True
+    )["ilosc"].sum()).rename(columns={"ilosc": "current_qty"}).astype(MODEL_COLOR_LABELS)
 
     prior_detail_agg = pd.DataFrame(prior_sales.groupby(
-        ["color", "model"], as_index=False
-    )["ilosc"].sum()).rename(columns={"ilosc": "prior_qty"})
+        ["color", "model"], as_index=False, observed=True
+    )["ilosc"].sum()).rename(columns={"ilosc": "prior_qty"}).astype(MODEL_COLOR_LABELS)
 
     color_model_details = current_detail_agg.merge(
         prior_detail_agg, on=["color", "model"], how="outer", validate="one_to_one"
@@ -437,9 +443,8 @@ def filter_and_pivot_sales(
         months: int
 ) -> pd.DataFrame:
     df = df.copy()
-    sku_str = df["SKU"].astype(str)
-    df["model"] = sku_str.str[:5]
-    df["color"] = sku_str.str[5:7]
+    df["model"] = sku_labels(df["SKU"], "model")
+    df["color"] = sku_labels(df["SKU"], "color")
 
     all_months = sorted(df["YEAR_MONTH"].unique())
     last_n_months = all_months[-months:] if len(all_months) >= months else all_months
@@ -499,7 +504,7 @@ def calculate_worst_models_12m(
     if df.empty:
         return pd.DataFrame()
 
-    df["model"] = pd.Series(df["sku"]).astype(str).str[:5]
+    df["model"] = sku_attribute(df["sku"], "model")
 
     if exclude_models:
         filtered = pd.DataFrame(df[~pd.Series(df["model"]).isin(list(exclude_models))])
@@ -507,13 +512,13 @@ def calculate_worst_models_12m(
             return pd.DataFrame()
         df = filtered
 
-    df["color"] = pd.Series(df["sku"]).astype(str).str[5:7]
+    df["color"] = sku_attribute(df["sku"], "color")
     df["year_month"] = df["data"].dt.to_period("M")  # type: ignore
 
     model_color_stats = pd.DataFrame(df.groupby(["model", "color"], observed=True).agg(
         total_sales=("ilosc", "sum"),
         months_active=("year_month", "nunique")
-    ).reset_index())
+    ).reset_index()).astype(MODEL_COLOR_LABELS)
 
     model_color_stats["monthly_velocity"] = (
             model_color_stats["total_sales"] / model_color_stats["months_active"]
@@ -572,7 +577,7 @@ def calculate_worst_rotating_models(
 
     df = sales_df.copy()
     df["data"] = pd.to_datetime(df["data"])
-    df["model"] = df["sku"].astype(str).str[:5]
+    df["model"] = sku_attribute(df["sku"], "model")
 
     if exclude_models:
         filtered = pd.DataFrame(df[~pd.Series(df["model"]).isin(list(exclude_models))])
@@ -583,7 +588,7 @@ def calculate_worst_rotating_models(
     model_stats = pd.DataFrame(df.groupby("model", observed=True).agg(
         total_sales=("ilosc", "sum"),
         first_sale=("data", "min")
-    ).reset_index())
+    ).reset_index()).astype({"model": object})
 
     first_sale_series = pd.to_datetime(pd.Series(model_stats["first_sale"]))
     days_since_first = first_sale_series.rsub(pd.Timestamp(resolved_date)).dt.days  # type: ignore[arg-type]
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from sales_data.sku_dimension import AGE_GROUP_ADULT, AGE_GROUP_CHILDREN, sku_labels
+from utils.logging_config import get_logger
+
+logger = get_logger("sales_cube")
+
+AVERAGE_SALES = "AVERAGE SALES"
+
+SEASONAL_THRESHOLD = 1.2
+WINDOW_DAYS = 730
+
+ENTITY_ATTRIBUTES = {"sku": None, "model": "model", "model_color": "model_color"}
+ENTITY_ID_COLUMNS = {"sku": "SKU", "model": "MODEL", "model_color": "MODEL_COLOR"}
+
+SUMMARY_COLUMNS = ["MONTHS", "QUANTITY", AVERAGE_SALES, "SD", "CV", "first_sale"]
+SEASONAL_COLUMNS = ["SKU", "month", "avg_sales", "seasonal_index", "is_in_season"]
+PERIOD_SALES_COLUMNS = ["SKU", "PERIOD_SALES"]
+
+
+def _midnight_today() -> datetime:
+    return datetime.today().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _sku_codes(sku: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    if isinstance(sku.dtype, pd.CategoricalDtype):
+        row_codes = sku.cat.codes.to_numpy().astype(np.int64)
+        labels = pd.Index(sku.cat.categories.astype(str), dtype=object)
+    else:
+        row_codes, uniques = pd.factorize(sku)
+        labels = pd.Index(pd.Index(uniques).astype(str), dtype=object)
+
+    observed = np.unique(row_codes[row_codes >= 0])
+    ordered = observed[np.argsort(labels[observed].to_numpy(), kind="stable")]
+    remap = np.full(len(labels), -1, dtype=np.int64)
+    remap[ordered] = np.arange(len(ordered))
+    codes = np.where(row_codes >= 0, remap[np.maximum(row_codes, 0)], -1)
+    return codes, labels[ordered]
+
+
+class SalesCube:
+    def __init__(self, data: pd.DataFrame, reference_date: datetime | None = None) -> None:
+        self.reference_date = reference_date or _midnight_today()
+        self.window_start = self.reference_date - timedelta(days=WINDOW_DAYS)
+        self.sku_dtype = data["sku"].dtype if "sku" in data.columns else np.dtype(object)
+        self.quantity_dtype = data["ilosc"].dtype if "ilosc" in data.columns else np.dtype(np.int64)
+
+        if data.empty:
+            codes, self.skus = np.empty(0, dtype=np.int64), pd.Index([], dtype=object)
+            dates = np.empty(0, dtype="datetime64[ns]")
+        else:
+            codes, self.skus = _sku_codes(pd.Series(data["sku"]))
+            dates = pd.to_datetime(data["data"]).to_numpy(dtype="datetime64[ns]")
+
+        month_index = dates.astype("datetime64[M]").astype(np.int64)
+        valid = (codes >= 0) & ~np.isnat(dates)
+        first_month = int(month_index[valid].min()) if valid.any() else 0
+        n_months = int(month_index[valid].max()) - first_month + 1 if valid.any() else 0
+        self.months = pd.period_range(
+            pd.Period(np.datetime64(first_month, "M"), freq="M"), periods=n_months, freq="M"
+        )
+
+        codes, dates, month_index = codes[valid], dates[valid], month_index[valid] - first_month
+        quantity = self._column(data, "ilosc", valid)
+        revenue = self._column(data, "razem", valid)
+
+        shape = (len(self.skus), n_months)
+        cells = codes * n_months + month_index
+        self.transactions = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape)
+        self.quantity = np.bincount(cells, quantity, minlength=shape[0] * shape[1]).reshape(shape)
+        self.revenue = np.bincount(cells, revenue, minlength=shape[0] * shape[1]).reshape(shape)
+
+        first_sale = np.full(shape[0], np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_sale, codes, dates.view(np.int64))
+        self.first_sale = first_sale.view("datetime64[ns]")
+
+        window_start = np.datetime64(self.window_start, "ns")
+        window_month = int(window_start.astype("datetime64[M]").astype(np.int64))
+        self.window_offset = window_month - first_month
+        in_window = (month_index == self.window_offset) & (dates >= window_start)
+        window_codes = codes[in_window]
+        self._window_transactions = np.bincount(window_codes, minlength=shape[0])
+        self._window_quantity = np.bincount(window_codes, quantity[in_window], minlength=shape[0])
+
+        logger.debug(
+            "Sales cube built: %d SKUs x %d months from %d transactions",
+            shape[0],
+            n_months,
+            len(codes),
+        )
+
+    @staticmethod
+    def _column(data: pd.DataFrame, col: str, valid: np.ndarray) -> np.ndarray:
+        if col not in data.columns:
+            return np.zeros(int(valid.sum()))
+        values = pd.to_numeric(data[col]).to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+        return np.nan_to_num(values)
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def _groups(self, entity_type: str) -> tuple[pd.Index, np.ndarray]:
+        attribute = ENTITY_ATTRIBUTES[entity_type]
+        if attribute is None or len(self.skus) == 0:
+            return self.skus, np.arange(len(self.skus))
+        labels = sku_labels(pd.Series(self.skus, dtype=object), attribute)
+        starts = np.flatnonzero(np.r_[True, labels.to_numpy()[1:] != labels.to_numpy()[:-1]])
+        return pd.Index(labels.to_numpy()[starts], dtype=object), starts
+
+    def _rollup(self, values: np.ndarray, starts: np.ndarray, ufunc=np.add) -> np.ndarray:
+        if len(starts) == len(values):
+            return values
+        return ufunc.reduceat(values, starts, axis=0)
+
+    def _entity_ids(self, labels: pd.Index, entity_type: str) -> pd.Series:
+        if entity_type == "sku":
+            return pd.Series(pd.array(labels.to_numpy(), dtype=self.sku_dtype))
+        return pd.Series(labels.to_numpy(), dtype=object)
+
+    def _window(self) -> tuple[np.ndarray, np.ndarray, pd.PeriodIndex]:
+        start = max(self.window_offset + 1, 0)
+        quantity = self.quantity[:, start:]
+        transactions = self.transactions[:, start:]
+        months = self.months[start:]
+        if 0 <= self.window_offset < len(self.months):
+            quantity = np.column_stack([self._window_quantity, quantity])
+            transactions = np.column_stack([self._window_transactions, transactions])
+            months = self.months[self.window_offset:]
+        return quantity, transactions, months
+
+    def cells(self, entity_type: str = "sku") -> pd.DataFrame:
+        labels, starts = self._groups(entity_type)
+        transactions = self._rollup(self.transactions, starts)
+        rows, cols = np.nonzero(transactions)
+        return pd.DataFrame({
+            "entity_id": labels.to_numpy()[rows],
+            "month": self.months.asi8[cols],
+            "quantity": self._rollup(self.quantity, starts)[rows, cols],
+            "transactions": transactions[rows, cols],
+        })
+
+    def first_sales(self, entity_type: str = "sku") -> pd.Series:
+        labels, starts = self._groups(entity_type)
+        first_sale = self._rollup(self.first_sale.view(np.int64), starts, np.minimum)
+        return pd.Series(first_sale.view("datetime64[ns]"), index=labels, name="first_sale")
+
+    def summary(self, entity_type: str = "sku") -> pd.DataFrame:
+        id_col = ENTITY_ID_COLUMNS[entity_type]
+        labels, starts = self._groups(entity_type)
+        active = self._rollup(self.transactions, starts) > 0
+        quantity = self._rollup(self.quantity, starts)
+        first_sale = self._rollup(self.first_sale.view(np.int64), starts, np.minimum)
+
+        months = active.sum(axis=1)
+        total = quantity.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / months
+            squared = np.where(active, (quantity - mean[:, None]) ** 2, 0.0).sum(axis=1)
+            sd = np.where(months > 1, np.sqrt(squared / (months - 1)), np.nan)
+            cv = sd / mean
+
+        summary = pd.DataFrame({
+            id_col: self._entity_ids(labels, entity_type),
+            "MONTHS": months.astype(np.int64),
+            "QUANTITY": total.astype(self.quantity_dtype),
+            AVERAGE_SALES: mean,
+            "SD": sd,
+            "CV": pd.Series(cv).fillna(0),
+            "first_sale": first_sale.view("datetime64[ns]"),
+        })
+        summary = summary[months > 0]
+        return pd.DataFrame(summary.sort_values(id_col, ascending=False))
+
+    def last_two_years_avg(self, entity_type: str = "sku") -> pd.DataFrame:
+        id_col = ENTITY_ID_COLUMNS[entity_type]
+        labels, starts = self._groups(entity_type)
+        quantity, transactions, _ = self._window()
+        active = self._rollup(transactions, starts) > 0
+        months = active.sum(axis=1)
+        if not months.any():
+            return pd.DataFrame(columns=pd.Index([id_col, "LAST_2_YEARS_AVG"]))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average = self._rollup(quantity, starts).sum(axis=1) / months
+        avg_sales = pd.DataFrame({
+            id_col: self._entity_ids(labels, entity_type),
+            "LAST_2_YEARS_AVG": np.round(average, 2),
+        })
+        return pd.DataFrame(avg_sales[months > 0]).reset_index(drop=True)
+
+    def seasonal_months(self) -> pd.DataFrame:
+        quantity, transactions, months = self._window()
+        month_of_year = np.asarray(months.month) - 1
+        calendar = np.zeros((len(months), 12))
+        calendar[np.arange(len(months)), month_of_year] = 1.0
+
+        active = transactions > 0
+        years = active.astype(np.float64) @ calendar
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_sales = np.where(active, quantity, 0.0) @ calendar / years
+            present = years > 0
+            overall = np.where(present, avg_sales, 0.0).sum(axis=1) / present.sum(axis=1)
+            seasonal_index = avg_sales / overall[:, None]
+
+        sku_pos, month_pos = np.nonzero(present)
+        seasonal_data = pd.DataFrame({
+            "SKU": self._entity_ids(self.skus[sku_pos], "sku"),
+            "month": (month_pos + 1).astype(np.int32),
+            "avg_sales": avg_sales[sku_pos, month_pos],
+            "seasonal_index": seasonal_index[sku_pos, month_pos],
+        })
+        seasonal_data["is_in_season"] = seasonal_data["seasonal_index"] > SEASONAL_THRESHOLD
+        return pd.DataFrame(seasonal_data[SEASONAL_COLUMNS])
+
+    def yearly_sales(self, include_color: bool = False) -> pd.DataFrame:
+        entity_type = "model_color" if include_color else "model"
+        id_col = ENTITY_ID_COLUMNS[entity_type]
+        if len(self.months) == 0:
+            return pd.DataFrame(columns=pd.Index([id_col, "YEAR", "QUANTITY"]))
+
+        labels, starts = self._groups(entity_type)
+        year_values, year_starts = np.unique(np.asarray(self.months.year), return_index=True)
+        active = np.add.reduceat(self._rollup(self.transactions, starts), year_starts, axis=1) > 0
+        quantity = np.add.reduceat(self._rollup(self.quantity, starts), year_starts, axis=1)
+
+        entity_pos, year_pos = np.nonzero(active)
+        return pd.DataFrame({
+            id_col: pd.Series(labels.to_numpy()[entity_pos], dtype=object),
+            "YEAR": year_values[year_pos].astype(np.int32),
+            "QUANTITY": quantity[entity_pos, year_pos].astype(self.quantity_dtype),
+        })
+
+    def _group_period_sales(
+            self, mask: np.ndarray, month_positions: list[int]
+    ) -> pd.DataFrame | None:
+        if not month_positions or not mask.any():
+            return None
+        active = self.transactions[:, month_positions].sum(axis=1) > 0
+        rows = np.flatnonzero(mask & active)
+        if len(rows) == 0:
+            return None
+        return pd.DataFrame({
+            "SKU": self._entity_ids(self.skus[rows], "sku"),
+            "PERIOD_SALES": self.quantity[rows][:, month_positions].sum(axis=1).astype(
+                self.quantity_dtype
+            ),
+        })
+
+    def period_sales(self, lead_time: float, force_seasonal: bool = False) -> pd.DataFrame:
+        n_months = math.ceil(lead_time)
+        all_months = np.flatnonzero(self.transactions.sum(axis=0) > 0)[::-1].tolist()
+
+        children_months = all_months[:n_months]
+        adult_start = max(0, 12 - n_months)
+        adult_months = all_months[adult_start:12] if len(all_months) > 12 else []
+
+        if force_seasonal:
+            groups = [(np.ones(len(self.skus), dtype=bool), adult_months)]
+        else:
+            age_group = sku_labels(pd.Series(self.skus, dtype=object), "age_group").to_numpy()
+            groups = [
+                (age_group == AGE_GROUP_CHILDREN, children_months),
+                (age_group == AGE_GROUP_ADULT, adult_months),
+            ]
+
+        results = [
+            result for mask, months in groups
+            if (result := self._group_period_sales(mask, months)) is not None
+        ]
+        if not results:
+            return pd.DataFrame(columns=pd.Index(PERIOD_SALES_COLUMNS))
+        return pd.DataFrame(pd.concat(results, ignore_index=True))
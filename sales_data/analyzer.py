@@ -5,14 +5,10 @@ from datetime import datetime
 import pandas as pd
 
 from sales_data.analysis import (
-    aggregate_by_model,
-    aggregate_by_sku,
     aggregate_forecast_yearly,
     aggregate_order_by_model_color,
-    aggregate_yearly_sales,
     calculate_forecast_date_range,
     calculate_forecast_metrics,
-    calculate_last_two_years_avg_sales,
     calculate_model_stock_projection,
     calculate_monthly_yoy_by_category,
     calculate_monthly_yoy_by_color,
@@ -26,7 +22,6 @@ from sales_data.analysis import (
     calculate_top_products_by_type,
     calculate_top_sales_report,
     classify_sku_type,
-    determine_seasonal_months,
     find_urgent_colors,
     generate_order_recommendations,
     generate_weekly_new_products_analysis,
@@ -36,27 +31,43 @@ from sales_data.analysis import (
     optimize_pattern_with_aliases,
     parse_sku_components,
 )
+from sales_data.analysis.sales_cube import SUMMARY_COLUMNS, SalesCube
+from sales_data.sku_dimension import sku_attribute
 
 LEAD_TIME = 1.36
 
 
 class SalesAnalyzer:
-    def __init__(self, data: pd.DataFrame, copy: bool = True) -> None:
+    def __init__(
+            self, data: pd.DataFrame, copy: bool = True, cube: SalesCube | None = None
+    ) -> None:
         self.data = data.copy() if copy else data
         if not pd.api.types.is_datetime64_any_dtype(self.data["data"]):
             self.data["data"] = pd.to_datetime(self.data["data"])
 
         if "model" not in self.data.columns:
-            self.data["model"] = self.data["sku"].astype(str).str[:5]
+            self.data["model"] = sku_attribute(self.data["sku"], "model")
+
+        self._cube = cube
+
+    @property
+    def cube(self) -> SalesCube:
+        if self._cube is None:
+            self._cube = SalesCube(self.data)
+        return self._cube
 
     def aggregate_by_sku(self) -> pd.DataFrame:
-        return aggregate_by_sku(self.data)
+        if self.data.empty:
+            return pd.DataFrame(columns=pd.Index(["SKU", *SUMMARY_COLUMNS]))
+        return self.cube.summary("sku")
 
     def aggregate_by_model(self) -> pd.DataFrame:
-        return aggregate_by_model(self.data)
+        if self.data.empty:
+            return pd.DataFrame(columns=pd.Index(["MODEL", *SUMMARY_COLUMNS]))
+        return self.cube.summary("model")
 
     def calculate_last_two_years_avg_sales(self, by_model: bool = False) -> pd.DataFrame:
-        return calculate_last_two_years_avg_sales(self.data, by_model)
+        return self.cube.last_two_years_avg("model" if by_model else "sku")
 
     @staticmethod
     def calculate_period_sales(monthly_agg: pd.DataFrame, lead_time: float, force_seasonal: bool = False) -> pd.DataFrame:
@@ -69,7 +80,12 @@ class SalesAnalyzer:
         return classify_sku_type(sku_summary, cv_basic, cv_seasonal)
 
     def determine_seasonal_months(self) -> pd.DataFrame:
-        return determine_seasonal_months(self.data)
+        return self.cube.seasonal_months()
+
+    def calculate_sku_period_sales(
+            self, lead_time: float, force_seasonal: bool = False
+    ) -> pd.DataFrame:
+        return self.cube.period_sales(lead_time, force_seasonal)
 
     @staticmethod
     def calculate_safety_stock_and_rop(
@@ -266,7 +282,7 @@ class SalesAnalyzer:
         return calculate_monthly_yoy_by_color(sales_df, reference_date)
 
     def aggregate_yearly_sales(self, include_color: bool = False) -> pd.DataFrame:
-        return aggregate_yearly_sales(self.data, _by_model=True, include_color=include_color)
+        return self.cube.yearly_sales(include_color)
 
     @staticmethod
     def aggregate_forecast_yearly(forecast_df: pd.DataFrame, include_color: bool = False) -> pd.DataFrame:
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+_directory_locks: dict[Path, threading.RLock] = {}
+_directory_locks_guard = threading.Lock()
+
+
+def temp_path(target: Path) -> Path:
+    fd, name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    os.close(fd)
+    return Path(name)
+
+
+def directory_lock(directory: Path) -> threading.RLock:
+    key = directory.resolve()
+    with _directory_locks_guard:
+        lock = _directory_locks.get(key)
+        if lock is None:
+            lock = threading.RLock()
+            _directory_locks[key] = lock
+        return lock
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+from typing import Any, BinaryIO
+
+import pandas as pd
+import psycopg2
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from sqlalchemy.engine import Engine
+
+from utils.logging_config import get_logger
+
+logger = get_logger("copy_export")
+
+EXPORT_COPY = "copy"
+EXPORT_READ_SQL = "read_sql"
+EXPORT_MODES = (EXPORT_COPY, EXPORT_READ_SQL)
+
+COPY_CHUNK_SIZE = 1 << 20
+COPY_FALLBACK_ERRORS = (NotImplementedError, psycopg2.NotSupportedError, pa.ArrowInvalid)
+
+_NAMED_PARAM = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+
+
+def _to_pyformat(query: str) -> str:
+    return _NAMED_PARAM.sub(r"%(\1)s", query.replace("%", "%%"))
+
+
+def _copy_to_pipe(cursor: Any, copy_sql: str, sink: BinaryIO, errors: list[BaseException]) -> None:
+    try:
+        cursor.copy_expert(copy_sql, sink, size=COPY_CHUNK_SIZE)
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        try:
+            sink.close()
+        except OSError:
+            pass
+
+
+def _read_csv_stream(
+        source: BinaryIO, column_types: dict[str, pa.DataType] | None
+) -> pa.Table:
+    return pacsv.read_csv(
+        source,
+        read_options=pacsv.ReadOptions(block_size=COPY_CHUNK_SIZE),
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types or {},
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+
+
+def copy_query_to_arrow(
+        engine: Engine,
+        query: str,
+        params: dict[str, Any] | None = None,
+        column_types: dict[str, pa.DataType] | None = None,
+) -> pa.Table:
+    with engine.connect() as conn:
+        dbapi_connection = conn.connection.dbapi_connection
+        with dbapi_connection.cursor() as cursor:
+            if not hasattr(cursor, "copy_expert"):
+                raise NotImplementedError(f"{type(cursor).__name__} does not support COPY")
+            select_sql = cursor.mogrify(_to_pyformat(query.strip()), params or {}).decode()
+            copy_sql = f"COPY ({select_sql}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+
+            read_fd, write_fd = os.pipe()
+            errors: list[BaseException] = []
+            writer = threading.Thread(
+                target=_copy_to_pipe,
+                args=(cursor, copy_sql, os.fdopen(write_fd, "wb"), errors),
+                name="copy-export",
+                daemon=True,
+            )
+            writer.start()
+            try:
+                with os.fdopen(read_fd, "rb") as source:
+                    table = _read_csv_stream(source, column_types)
+            except pa.ArrowInvalid:
+                writer.join()
+                if errors and not isinstance(errors[0], BrokenPipeError):
+                    raise errors[0]
+                raise
+            finally:
+                writer.join()
+            if errors:
+                raise errors[0]
+            return table
+
+
+def copy_query_to_frame(
+        engine: Engine,
+        query: str,
+        params: dict[str, Any] | None = None,
+        column_types: dict[str, pa.DataType] | None = None,
+) -> pd.DataFrame:
+    table = copy_query_to_arrow(engine, query, params, column_types)
+    return table.to_pandas(date_as_object=False, coerce_temporal_nanoseconds=True)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import sys
+import threading
+import weakref
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from utils.logging_config import get_logger
+
+from .data_source import DataSource
+from .sku_dimension import reset_sku_dimension
+
+logger = get_logger("data_plane")
+
+DatasetGetter = Callable[[str], "pd.DataFrame | None"]
+DatasetLoader = Callable[[DataSource, DatasetGetter], "pd.DataFrame | None"]
+
+
+_ARRAY_BUFFERS = ("_ndarray", "_codes", "_data", "_mask")
+
+
+def _freeze_array(values: object) -> None:
+    while isinstance(values, np.ndarray):
+        values.flags.writeable = False
+        values = values.base
+
+
+def _is_arrow_backed(dtype: object) -> bool:
+    return isinstance(dtype, pd.ArrowDtype) or getattr(dtype, "storage", None) == "pyarrow"
+
+
+def freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    frozen = df.copy()
+    for position, dtype in enumerate(frozen.dtypes):
+        if _is_arrow_backed(dtype):
+            continue
+        values = frozen.iloc[:, position].array
+        for buffer in _ARRAY_BUFFERS:
+            _freeze_array(getattr(values, buffer, None))
+    return frozen
+
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    total = int(df.index.memory_usage(deep=True))
+    for _, column in df.items():
+        values = getattr(column.array, "_ndarray", None)
+        if values is not None and values.dtype == object:
+            total += values.nbytes + sum(map(sys.getsizeof, values))
+        else:
+            total += int(column.memory_usage(index=False, deep=True))
+    return total
+
+
+def frozen_view(df: pd.DataFrame) -> pd.DataFrame:
+    view = df.copy(deep=False)
+    for position, dtype in enumerate(view.dtypes):
+        if _is_arrow_backed(dtype):
+            view.isetitem(position, view.iloc[:, position].array.copy())
+    return view
+
+
+class _Generation:
+    def __init__(self, version: str) -> None:
+        self.version = version
+        self.frames: dict[str, pd.DataFrame | None] = {}
+        self.refs = 0
+        self.retired = False
+        self.lock = threading.RLock()
+
+
+class DataLease:
+    def __init__(self, plane: SharedDataPlane, generation: _Generation) -> None:
+        self._plane = plane
+        self._generation = generation
+        self._finalizer = weakref.finalize(self, plane._release, generation)
+
+    @property
+    def version(self) -> str:
+        return self._generation.version
+
+    @property
+    def active(self) -> bool:
+        return self._finalizer.alive and not self._generation.retired
+
+    def get(self, name: str) -> pd.DataFrame | None:
+        if not self._finalizer.alive:
+            raise RuntimeError("Data lease has already been released")
+        return self._plane._view(self._generation, name)
+
+    def release(self) -> None:
+        self._finalizer()
+
+
+class SharedDataPlane:
+    def __init__(self, source_factory: Callable[[], DataSource]) -> None:
+        self._source_factory = source_factory
+        self._source: DataSource | None = None
+        self._loaders: dict[str, DatasetLoader] = {}
+        self._current: _Generation | None = None
+        self._generations: list[_Generation] = []
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: DatasetLoader) -> None:
+        with self._lock:
+            self._loaders[name] = loader
+
+    @property
+    def source(self) -> DataSource:
+        with self._lock:
+            if self._source is None:
+                self._source = self._source_factory()
+            return self._source
+
+    @property
+    def current_version(self) -> str | None:
+        current = self._current
+        return current.version if current is not None else None
+
+    def acquire(self, version: str | None = None) -> DataLease:
+        resolved = version or self.source.get_data_version()
+        with self._lock:
+            current = self._current
+            if current is None or current.version != resolved:
+                current = _Generation(resolved)
+                self._generations.append(current)
+                previous, self._current = self._current, current
+                if previous is not None:
+                    previous.retired = True
+                    reset_sku_dimension()
+                    logger.info(
+                        "Data plane switched %s -> %s", previous.version, current.version
+                    )
+                    self._collect(previous)
+            current.refs += 1
+            return DataLease(self, current)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            previous, self._current = self._current, None
+            if previous is not None:
+                previous.retired = True
+                self._collect(previous)
+            reset_sku_dimension()
+
+    def stats(self) -> list[dict[str, str | int | bool]]:
+        with self._lock:
+            return [
+                {
+                    "version": generation.version,
+                    "current": generation is self._current,
+                    "refs": generation.refs,
+                    "datasets": len(generation.frames),
+                    "bytes": sum(
+                        _frame_bytes(frame)
+                        for frame in generation.frames.values()
+                        if frame is not None
+                    ),
+                }
+                for generation in self._generations
+            ]
+
+    def _view(self, generation: _Generation, name: str) -> pd.DataFrame | None:
+        with generation.lock:
+            if name not in generation.frames:
+                loader = self._loaders.get(name)
+                if loader is None:
+                    raise KeyError(f"Unknown dataset: {name}")
+                df = loader(self.source, lambda dependency: self._view(generation, dependency))
+                generation.frames[name] = None if df is None else freeze_frame(df)
+                logger.info(
+                    "Data plane loaded %s for version %s (%d rows)",
+                    name,
+                    generation.version,
+                    0 if df is None else len(df),
+                )
+            frame = generation.frames[name]
+        return None if frame is None else frozen_view(frame)
+
+    def _release(self, generation: _Generation) -> None:
+        with self._lock:
+            generation.refs -= 1
+            self._collect(generation)
+
+    def _collect(self, generation: _Generation) -> None:
+        if generation.retired and generation.refs <= 0:
+            generation.frames.clear()
+            if generation in self._generations:
+                self._generations.remove(generation)
+            logger.info("Data plane released version %s", generation.version)
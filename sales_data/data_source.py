@@ -1,31 +1,67 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import date, datetime
 
+import numpy as np
 import pandas as pd
 
 
+def select_columns(df: pd.DataFrame, columns: list[str] | None) -> pd.DataFrame:
+    if columns is None:
+        return df
+    return pd.DataFrame({col: df[col] for col in columns if col in df.columns}, copy=False)
+
+
+def slice_by_date(
+        df: pd.DataFrame,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        column: str = "data",
+) -> pd.DataFrame:
+    if start_date is None and end_date is None:
+        return df
+    dates = df[column].to_numpy()
+    start = 0
+    if start_date is not None:
+        start = int(np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64(), "left"))
+    if end_date is None:
+        stop = int(np.searchsorted(dates, np.datetime64("NaT"), "left"))
+    else:
+        stop = int(np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), "right"))
+    return df.iloc[start:max(start, stop)]
+
+
 class DataSource(ABC):
 
     @abstractmethod
     def load_sales_data(
-        self, start_date: datetime | None = None, end_date: datetime | None = None
+        self,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        columns: list[str] | None = None,
     ) -> pd.DataFrame:
         pass
 
     @abstractmethod
-    def load_stock_data(self, snapshot_date: datetime | None = None) -> pd.DataFrame:
+    def load_stock_data(
+        self, snapshot_date: datetime | None = None, columns: list[str] | None = None
+    ) -> pd.DataFrame:
         pass
 
     @abstractmethod
     def load_stock_history(
-        self, start_date: datetime | None = None, end_date: datetime | None = None
+        self,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        columns: list[str] | None = None,
     ) -> pd.DataFrame:
         pass
 
     @abstractmethod
-    def load_forecast_data(self, generated_date: datetime | None = None) -> pd.DataFrame:
+    def load_forecast_data(
+        self, generated_date: datetime | None = None, columns: list[str] | None = None
+    ) -> pd.DataFrame:
         pass
 
     @abstractmethod
@@ -85,3 +121,6 @@ class DataSource(ABC):
     @abstractmethod
     def load_material_stock(self) -> pd.DataFrame | None:
         pass
+
+    def get_data_version(self, refresh: bool = False) -> str:
+        return f"{self.get_data_source_type()}_{date.today().isoformat()}"
@@ -51,12 +51,21 @@ class DataSourceFactory:
 
     @staticmethod
     def _create_database_source(connection_string: str, config: dict) -> DataSource:
+        from .copy_export import EXPORT_COPY
         from .db_source import DatabaseSource
+        from .sql_statistics import DEFAULT_CACHE_SLOTS
 
         pool_size = config.get("pool_size", 10)
         pool_recycle = config.get("pool_recycle", 3600)
+        export_mode = config.get("export_mode", EXPORT_COPY)
+        mirror_dir = None
+        if config.get("sales_mirror", True):
+            mirror_dir = Path(__file__).parent.parent / "data" / ".sales_mirror"
+        cache_slots = config.get("cache_slots", DEFAULT_CACHE_SLOTS)
 
-        db_source = DatabaseSource(connection_string, pool_size, pool_recycle)
+        db_source = DatabaseSource(
+            connection_string, pool_size, pool_recycle, export_mode, mirror_dir, cache_slots
+        )
 
         if db_source.is_available():
             logger.info("Using database data source")
@@ -82,6 +91,25 @@ class DataSourceFactory:
                 return FileSource()
             raise
 
+    @staticmethod
+    def _handle_duckdb_mode(config: dict) -> DataSource:
+        from .duckdb_source import DuckDBSource
+
+        database_path = config.get("duckdb_path")
+        if database_path is not None:
+            database_path = Path(__file__).parent.parent / database_path
+
+        try:
+            duckdb_source = DuckDBSource(database_path)
+            if duckdb_source.is_available():
+                logger.info("Using DuckDB data source")
+                return duckdb_source
+        except Exception as e:
+            logger.error("DuckDB data source failed: %s", e)
+
+        logger.warning("DuckDB unavailable, falling back to file mode")
+        return FileSource()
+
     @staticmethod
     def create_data_source() -> DataSource:
         load_dotenv()
@@ -90,6 +118,8 @@ class DataSourceFactory:
 
         if mode == "database":
             return DataSourceFactory._handle_database_mode(config)
+        if mode == "duckdb":
+            return DataSourceFactory._handle_duckdb_mode(config)
 
         logger.info("Using file data source")
         return FileSource()
@@ -102,8 +132,8 @@ class DataSourceFactory:
 
     @staticmethod
     def switch_mode(mode: str) -> None:
-        if mode not in ["file", "database"]:
-            raise ValueError("Mode must be 'file' or 'database'")
+        if mode not in ["file", "database", "duckdb"]:
+            raise ValueError("Mode must be 'file', 'database' or 'duckdb'")
 
         settings = _load_settings_file()
         if "data_source" not in settings:
@@ -2,30 +2,166 @@ from __future__ import annotations
 
 import hashlib
 import json
+import time
 from datetime import datetime
+from pathlib import Path
 from typing import Any
 
 import pandas as pd
+import pyarrow as pa
 from sqlalchemy import create_engine, text
 from sqlalchemy.pool import QueuePool
 
 from utils.logging_config import get_logger
 
+from .copy_export import COPY_FALLBACK_ERRORS, EXPORT_COPY, EXPORT_MODES, copy_query_to_frame
 from .data_source import DataSource
+from .sales_mirror import SalesMirror, get_sales_mirror
+from .sql_statistics import (
+    DEFAULT_CACHE_SLOTS,
+    load_cached_order_priorities,
+    load_cached_sku_statistics,
+    recompute_order_priorities,
+    recompute_sku_statistics,
+)
 
 logger = get_logger("db_source")
 
+DATA_VERSION_INTERVAL = 60.0
+_DATA_VERSION_QUERY = """
+    SELECT (SELECT MAX(id) FROM file_imports)                 AS last_import,
+           (SELECT MAX(updated_at) FROM raw_sales_transactions) AS sales_updated_at
+"""
+
+SALES_COLUMN_MAP = {
+    "order_id": "order_id",
+    "data": "sale_date",
+    "sku": "sku",
+    "ilosc": "quantity",
+    "cena": "unit_price",
+    "razem": "total_amount",
+    "model": "model",
+    "color": "color",
+    "size": "size",
+    "source_file": "source_file",
+}
+STOCK_COLUMN_MAP = {
+    "sku": "sku",
+    "nazwa": "product_name",
+    "cena_netto": "net_price",
+    "cena_brutto": "gross_price",
+    "stock": "total_stock",
+    "available_stock": "available_stock",
+    "aktywny": "1",
+    "snapshot_date": "snapshot_date",
+}
+FORECAST_COLUMN_MAP = {
+    "data": "forecast_date",
+    "sku": "sku",
+    "model": "model",
+    "forecast": "forecast_quantity",
+    "generated_date": "generated_date",
+}
+
+SALES_ARROW_TYPES = {
+    "order_id": pa.string(),
+    "data": pa.timestamp("us"),
+    "sku": pa.string(),
+    "ilosc": pa.float64(),
+    "cena": pa.float64(),
+    "razem": pa.float64(),
+    "model": pa.string(),
+    "color": pa.string(),
+    "size": pa.string(),
+    "source_file": pa.string(),
+}
+SALES_MIRROR_ARROW_TYPES = {
+    "id": pa.int64(),
+    "updated_at": pa.timestamp("us"),
+    "is_valid": pa.int64(),
+    **SALES_ARROW_TYPES,
+}
+STOCK_ARROW_TYPES = {
+    "sku": pa.string(),
+    "nazwa": pa.string(),
+    "cena_netto": pa.float64(),
+    "cena_brutto": pa.float64(),
+    "stock": pa.float64(),
+    "available_stock": pa.float64(),
+    "aktywny": pa.int64(),
+    "snapshot_date": pa.date32(),
+}
+FORECAST_ARROW_TYPES = {
+    "data": pa.date32(),
+    "sku": pa.string(),
+    "model": pa.string(),
+    "forecast": pa.float64(),
+    "generated_date": pa.date32(),
+}
+
 
 def _to_date(value: datetime | Any) -> Any:
     return value.date() if isinstance(value, datetime) else value
 
 
+def _to_timestamp(value: datetime | Any) -> datetime:
+    return pd.Timestamp(value).to_pydatetime()
+
+
+def select_list(column_map: dict[str, str], columns: list[str] | None) -> str:
+    selected = list(column_map) if columns is None else [
+        col for col in columns if col in column_map
+    ]
+    if not selected:
+        raise ValueError(f"None of the requested columns are available: {columns}")
+    return ",\n                   ".join(
+        alias if column_map[alias] == alias else f"{column_map[alias]} as {alias}"
+        for alias in selected
+    )
+
+
+def build_sales_query(
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        columns: list[str] | None = None,
+        column_map: dict[str, str] = SALES_COLUMN_MAP,
+) -> tuple[str, dict[str, Any]]:
+    conditions = ["is_valid = TRUE"]
+    params: dict[str, Any] = {}
+
+    if start_date is not None:
+        conditions.append("sale_date >= CAST(:start_date AS timestamp)")
+        params["start_date"] = _to_timestamp(start_date)
+
+    if end_date is not None:
+        conditions.append("sale_date <= CAST(:end_date AS timestamp)")
+        params["end_date"] = _to_timestamp(end_date)
+
+    query = f"""
+        SELECT {select_list(column_map, columns)}
+        FROM raw_sales_transactions
+        WHERE {' AND '.join(conditions)}
+        ORDER BY sale_date, sku
+    """
+    return query, params
+
+
 class DatabaseSource(DataSource):
 
     def __init__(
-            self, connection_string: str, pool_size: int = 10, pool_recycle: int = 3600
+            self,
+            connection_string: str,
+            pool_size: int = 10,
+            pool_recycle: int = 3600,
+            export_mode: str = EXPORT_COPY,
+            mirror_dir: Path | None = None,
+            cache_slots: int = DEFAULT_CACHE_SLOTS,
     ) -> None:
+        if export_mode not in EXPORT_MODES:
+            raise ValueError(f"Unknown export mode '{export_mode}', expected one of {EXPORT_MODES}")
         self.connection_string = connection_string
+        self.export_mode = export_mode
+        self.cache_slots = cache_slots
         self.engine = create_engine(
             connection_string,
             poolclass=QueuePool,
@@ -36,6 +172,20 @@ class DatabaseSource(DataSource):
         self._is_available = self._test_connection()
         self._cached_settings_hash: str | None = None
         self._cached_settings: dict | None = None
+        self._data_version: str | None = None
+        self._data_version_at = 0.0
+        self._sales_mirror: SalesMirror | None = None
+        if mirror_dir is not None:
+            self._sales_mirror = get_sales_mirror(
+                mirror_dir,
+                self._source_key(),
+                self._fetch_sales_changes,
+                self._count_valid_sales,
+            )
+
+    def _source_key(self) -> str:
+        url = self.engine.url.render_as_string(hide_password=True)
+        return hashlib.sha256(url.encode()).hexdigest()[:16]
 
     def _test_connection(self) -> bool:
         try:
@@ -46,40 +196,63 @@ class DatabaseSource(DataSource):
             logger.error("Database connection failed: %s", e)
             return False
 
-    def load_sales_data(
-            self, start_date: datetime | None = None, end_date: datetime | None = None
+    def _read_frame(
+            self, query: str, params: dict[str, Any], column_types: dict[str, pa.DataType]
     ) -> pd.DataFrame:
-        logger.info("Loading sales data from database")
+        if self.export_mode == EXPORT_COPY:
+            try:
+                return copy_query_to_frame(self.engine, query, params, column_types)
+            except COPY_FALLBACK_ERRORS as e:
+                logger.warning("COPY export failed, falling back to read_sql_query: %s", e)
 
-        query = """
-                SELECT order_id,
-                       sale_date    as data,
-                       sku,
-                       quantity     as ilosc,
-                       unit_price   as cena,
-                       total_amount as razem,
-                       model,
-                       color,
-                       size,
-                       source_file
-                FROM raw_sales_transactions
-                WHERE is_valid = TRUE \
-                """
+        with self.engine.connect() as conn:
+            return pd.read_sql_query(text(query), conn, params=params)
 
-        params = {}
+    def _fetch_sales_changes(self, since: datetime | None) -> pd.DataFrame:
+        query = f"""
+            SELECT id,
+                   updated_at,
+                   COALESCE(is_valid, FALSE)::int as is_valid,
+                   {select_list(SALES_COLUMN_MAP, None)}
+            FROM raw_sales_transactions
+        """
+        params: dict[str, Any] = {}
+        if since is None:
+            query += " WHERE is_valid = TRUE"
+        else:
+            query += " WHERE updated_at > :since"
+            params["since"] = since
+        return self._read_frame(query, params, SALES_MIRROR_ARROW_TYPES)
+
+    def _count_valid_sales(self) -> int:
+        with self.engine.connect() as conn:
+            result = conn.execute(  # type: ignore[call-overload]
+                text("SELECT COUNT(*) FROM raw_sales_transactions WHERE is_valid = TRUE")
+            )
+            return int(result.scalar() or 0)
 
-        if start_date is not None:
-            query += " AND sale_date >= :start_date"
-            params["start_date"] = start_date
+    def resync_sales_mirror(self) -> None:
+        if self._sales_mirror is not None:
+            self._sales_mirror.resync()
 
-        if end_date is not None:
-            query += " AND sale_date <= :end_date"
-            params["end_date"] = end_date
+    def load_sales_data(
+            self,
+            start_date: datetime | None = None,
+            end_date: datetime | None = None,
+            columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        if self._sales_mirror is not None:
+            try:
+                df = self._sales_mirror.load(start_date, end_date, columns)
+                logger.info("Loaded %d sales rows from local mirror", len(df))
+                return df
+            except Exception as e:
+                logger.warning("Sales mirror unavailable, querying database directly: %s", e)
 
-        query += " ORDER BY sale_date, sku"
+        logger.info("Loading sales data from database")
 
-        with self.engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn, params=params)
+        query, params = build_sales_query(start_date, end_date, columns)
+        df = self._read_frame(query, params, SALES_ARROW_TYPES)
 
         if not df.empty and "data" in df.columns:
             df["data"] = pd.to_datetime(df["data"])
@@ -87,7 +260,9 @@ class DatabaseSource(DataSource):
         logger.info("Loaded %d sales rows from database", len(df))
         return df
 
-    def load_stock_data(self, snapshot_date: datetime | None = None) -> pd.DataFrame:
+    def load_stock_data(
+            self, snapshot_date: datetime | None = None, columns: list[str] | None = None
+    ) -> pd.DataFrame:
         logger.info("Loading stock data from database")
 
         date_condition = (
@@ -98,14 +273,7 @@ class DatabaseSource(DataSource):
         params = {"snapshot_date": _to_date(snapshot_date)} if snapshot_date else {}
 
         query = f"""
-            SELECT sku,
-                   product_name as nazwa,
-                   net_price    as cena_netto,
-                   gross_price  as cena_brutto,
-                   total_stock  as stock,
-                   available_stock,
-                   1            as aktywny,
-                   snapshot_date
+            SELECT {select_list(STOCK_COLUMN_MAP, columns)}
             FROM stock_snapshots
             WHERE {date_condition}
               AND is_active = TRUE
@@ -123,7 +291,10 @@ class DatabaseSource(DataSource):
             return pd.DataFrame()
 
     def load_stock_history(
-        self, start_date: datetime | None = None, end_date: datetime | None = None
+        self,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        columns: list[str] | None = None,
     ) -> pd.DataFrame:
         logger.info("Loading stock history from database")
 
@@ -139,22 +310,14 @@ class DatabaseSource(DataSource):
             params["end_date"] = _to_date(end_date)
 
         query = f"""
-            SELECT sku,
-                   product_name    as nazwa,
-                   net_price       as cena_netto,
-                   gross_price     as cena_brutto,
-                   total_stock     as stock,
-                   available_stock,
-                   1               as aktywny,
-                   snapshot_date
+            SELECT {select_list(STOCK_COLUMN_MAP, columns)}
             FROM stock_snapshots
             WHERE {' AND '.join(conditions)}
             ORDER BY snapshot_date, sku
         """
 
         try:
-            with self.engine.connect() as conn:
-                df = pd.read_sql_query(text(query), conn, params=params)
+            df = self._read_frame(query, params, STOCK_ARROW_TYPES)
 
             if not df.empty and "snapshot_date" in df.columns:
                 df["snapshot_date"] = pd.to_datetime(df["snapshot_date"])
@@ -165,7 +328,9 @@ class DatabaseSource(DataSource):
             logger.error("Failed to load stock history: %s", e)
             return pd.DataFrame()
 
-    def load_forecast_data(self, generated_date: datetime | None = None) -> pd.DataFrame:
+    def load_forecast_data(
+            self, generated_date: datetime | None = None, columns: list[str] | None = None
+    ) -> pd.DataFrame:
         logger.info("Loading forecast data from database")
 
         date_condition = (
@@ -176,19 +341,14 @@ class DatabaseSource(DataSource):
         params = {"generated_date": _to_date(generated_date)} if generated_date else {}
 
         query = f"""
-            SELECT forecast_date     as data,
-                   sku,
-                   model,
-                   forecast_quantity as forecast,
-                   generated_date
+            SELECT {select_list(FORECAST_COLUMN_MAP, columns)}
             FROM forecast_data
             WHERE {date_condition}
             ORDER BY forecast_date, sku
         """
 
         try:
-            with self.engine.connect() as conn:
-                df = pd.read_sql_query(text(query), conn, params=params)
+            df = self._read_frame(query, params, FORECAST_ARROW_TYPES)
 
             if not df.empty and "data" in df.columns:
                 df["data"] = pd.to_datetime(df["data"])
@@ -214,35 +374,14 @@ class DatabaseSource(DataSource):
         if force_recompute:
             return self._compute_sku_statistics(entity_type)
 
-        query = """
-            SELECT entity_id                as "SKU",
-                   months_with_sales        as "MONTHS",
-                   total_quantity           as "QUANTITY",
-                   average_monthly_sales    as "AVERAGE SALES",
-                   standard_deviation       as "SD",
-                   coefficient_of_variation as "CV",
-                   product_type             as "TYPE",
-                   safety_stock             as "SS",
-                   reorder_point            as "ROP",
-                   first_sale_date,
-                   last_2y_avg_monthly      as "LAST_2_YEARS_AVG",
-                   is_seasonal,
-                   seasonal_ss_in,
-                   seasonal_ss_out,
-                   seasonal_rop_in,
-                   seasonal_rop_out,
-                   computed_at,
-                   configuration_hash
-            FROM mv_valid_sku_stats
-            WHERE entity_type = :entity_type
-            ORDER BY total_quantity DESC
-        """
-
-        with self.engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn, params={"entity_type": entity_type})
+        configuration_hash = self._get_current_settings_hash()
+        with self.engine.begin() as conn:
+            df = load_cached_sku_statistics(conn, entity_type, configuration_hash)
 
-        if df.empty or not self._is_cache_valid(df):
-            logger.info("Cache invalid or empty, recomputing statistics")
+        if df.empty:
+            logger.info(
+                "No cache slot for configuration %s, recomputing statistics", configuration_hash
+            )
             return self._compute_sku_statistics(entity_type)
 
         logger.info("Loaded %d SKU statistics rows from database", len(df))
@@ -256,36 +395,14 @@ class DatabaseSource(DataSource):
         if force_recompute:
             return self._compute_order_priorities(top_n)
 
-        query = """
-            SELECT sku               as "SKU",
-                   model             as "MODEL",
-                   color             as "COLOR",
-                   size              as "SIZE",
-                   priority_score    as "PRIORITY_SCORE",
-                   stockout_risk     as "STOCKOUT_RISK",
-                   revenue_impact    as "REVENUE_IMPACT",
-                   revenue_at_risk   as "REVENUE_AT_RISK",
-                   current_stock     as "STOCK",
-                   reorder_point     as "ROP",
-                   deficit           as "DEFICIT",
-                   forecast_leadtime as "FORECAST_LEADTIME",
-                   coverage_gap      as "COVERAGE_GAP",
-                   product_type      as "TYPE",
-                   type_multiplier   as "TYPE_MULTIPLIER",
-                   is_urgent         as "URGENT",
-                   computed_at
-            FROM mv_valid_order_priorities
-            ORDER BY priority_score DESC
-        """
-
-        if top_n is not None:
-            query += f" LIMIT {top_n}"
+        configuration_hash = self._get_current_settings_hash()
+        with self.engine.begin() as conn:
+            df = load_cached_order_priorities(conn, configuration_hash, top_n)
 
-        with self.engine.connect() as conn:
-            df = pd.read_sql_query(text(query), conn)
-
-        if df.empty or not self._is_cache_valid(df):
-            logger.info("Cache invalid or empty, recomputing priorities")
+        if df.empty:
+            logger.info(
+                "No cache slot for configuration %s, recomputing priorities", configuration_hash
+            )
             return self._compute_order_priorities(top_n)
 
         logger.info("Loaded %d order priority rows from database", len(df))
@@ -336,6 +453,7 @@ class DatabaseSource(DataSource):
             "z_seasonal_in": zs.get("seasonal_in"),
             "z_seasonal_out": zs.get("seasonal_out"),
             "z_new": zs.get("new"),
+            "order_recommendations": settings.get("order_recommendations"),
         }
         settings_json = json.dumps(settings_subset, sort_keys=True)
         return hashlib.md5(settings_json.encode()).hexdigest()
@@ -354,13 +472,30 @@ class DatabaseSource(DataSource):
         from .file_source import FileSource
         return FileSource()
 
-    @staticmethod
-    def _compute_sku_statistics(entity_type: str) -> pd.DataFrame:
-        return DatabaseSource._get_file_source().get_sku_statistics(entity_type, force_recompute=True)
+    def _compute_sku_statistics(self, entity_type: str) -> pd.DataFrame:
+        configuration_hash = self._get_current_settings_hash()
+        assert self._cached_settings is not None
+        try:
+            with self.engine.begin() as conn:
+                return recompute_sku_statistics(
+                    conn, entity_type, self._cached_settings, configuration_hash, self.cache_slots
+                )
+        except Exception as e:
+            logger.warning("Server-side statistics failed, computing locally: %s", e)
+        return self._get_file_source().get_sku_statistics(entity_type, force_recompute=True)
 
-    @staticmethod
-    def _compute_order_priorities(top_n: int | None = None) -> pd.DataFrame:
-        return DatabaseSource._get_file_source().get_order_priorities(top_n, force_recompute=True)
+    def _compute_order_priorities(self, top_n: int | None = None) -> pd.DataFrame:
+        configuration_hash = self._get_current_settings_hash()
+        assert self._cached_settings is not None
+        try:
+            with self.engine.begin() as conn:
+                df = recompute_order_priorities(
+                    conn, self._cached_settings, configuration_hash, self.cache_slots
+                )
+            return df.head(top_n) if top_n is not None else df
+        except Exception as e:
+            logger.warning("Server-side order priorities failed, computing locally: %s", e)
+        return self._get_file_source().get_order_priorities(top_n, force_recompute=True)
 
     @staticmethod
     def _compute_monthly_aggregations(entity_type: str) -> pd.DataFrame:
@@ -466,6 +601,28 @@ class DatabaseSource(DataSource):
     def get_data_source_type(self) -> str:
         return "database"
 
+    def get_data_version(self, refresh: bool = False) -> str:
+        now = time.monotonic()
+        if refresh or self._data_version is None or (
+            now - self._data_version_at >= DATA_VERSION_INTERVAL
+        ):
+            self._data_version = self._read_data_version(refresh)
+            self._data_version_at = now
+        return self._data_version
+
+    def _read_data_version(self, refresh: bool) -> str:
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(text(_DATA_VERSION_QUERY)).one()  # type: ignore[call-overload]
+            markers = [str(row.last_import), str(row.sales_updated_at)]
+            if self._sales_mirror is not None:
+                markers.append(self._sales_mirror.version(refresh))
+        except Exception as e:
+            logger.warning("Could not read database data version: %s", e)
+            return super().get_data_version(refresh)
+        digest = hashlib.sha256("|".join(markers).encode()).hexdigest()[:16]
+        return f"database_{digest}"
+
     def load_outlet_models(self) -> set[str]:
         return set()
 
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import ExtensionDtype
+
+from utils.logging_config import get_logger
+
+logger = get_logger("dtype_schema")
+
+ARROW_STRING = pd.StringDtype("pyarrow", na_value=np.nan)
+DICTIONARY = pd.CategoricalDtype()
+DATETIME = np.dtype("datetime64[ns]")
+
+_WIDE_INTEGER = np.dtype(np.int64)
+_WIDE_FLOAT = np.dtype(np.float64)
+
+ColumnDtype = np.dtype | ExtensionDtype
+
+
+@dataclass(frozen=True)
+class DatasetSchema:
+    name: str
+    columns: dict[str, ColumnDtype]
+
+    def read_dtypes(self, columns: list[str]) -> dict[str, ColumnDtype]:
+        return {
+            col: dtype
+            for col, dtype in self.columns.items()
+            if col in columns and dtype.kind not in "iuM"
+        }
+
+    def cast(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df.empty:
+            return df
+        return pd.DataFrame(
+            {
+                col: _cast_column(self.name, col, df[col], self.columns[col])
+                if col in self.columns
+                else df[col]
+                for col in df.columns
+            },
+            index=df.index,
+            copy=False,
+        )
+
+
+def _cast_column(dataset: str, col: str, series: pd.Series, target: ColumnDtype) -> pd.Series:
+    if isinstance(target, pd.CategoricalDtype):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series
+        return series.astype(target)
+    if series.dtype == target:
+        return series
+    if target.kind == "M":
+        return pd.to_datetime(series).astype(target)
+    if target.kind in "iu":
+        return _cast_integer(dataset, col, series, np.dtype(target))
+    return series.astype(target)
+
+
+def _cast_integer(dataset: str, col: str, series: pd.Series, target: np.dtype) -> pd.Series:
+    values = pd.to_numeric(series)
+    if values.isna().any() or (values.dtype.kind == "f" and (values % 1 != 0).any()):
+        logger.warning(
+            "%s.%s has missing or fractional values, keeping %s instead of %s",
+            dataset,
+            col,
+            _WIDE_FLOAT,
+            target,
+        )
+        return values.astype(_WIDE_FLOAT)
+
+    info = np.iinfo(target)
+    col_min, col_max = values.min(), values.max()
+    if col_min < info.min or col_max > info.max:
+        logger.warning(
+            "%s.%s range [%s, %s] overflows %s, widening to %s",
+            dataset,
+            col,
+            col_min,
+            col_max,
+            target,
+            _WIDE_INTEGER,
+        )
+        return values.astype(_WIDE_INTEGER)
+    return values.astype(target)
+
+
+SALES_SCHEMA = DatasetSchema(
+    "sales",
+    {
+        "order_id": ARROW_STRING,
+        "data": DATETIME,
+        "sku": DICTIONARY,
+        "ilosc": np.dtype(np.int32),
+        "cena": np.dtype(np.float32),
+        "razem": np.dtype(np.float32),
+        "file_start_date": DATETIME,
+        "file_end_date": DATETIME,
+        "source_file": DICTIONARY,
+    },
+)
+
+STOCK_SCHEMA = DatasetSchema(
+    "stock",
+    {
+        "sku": DICTIONARY,
+        "nazwa": ARROW_STRING,
+        "cena_netto": np.dtype(np.float32),
+        "available_stock": np.dtype(np.int32),
+    },
+)
+
+FORECAST_SCHEMA = DatasetSchema(
+    "forecast",
+    {
+        "data": DATETIME,
+        "sku": DICTIONARY,
+        "forecast": np.dtype(np.float32),
+        "model": DICTIONARY,
+        "generated_date": DATETIME,
+    },
+)
+
+STOCK_HISTORY_SCHEMA = DatasetSchema(
+    "stock_history",
+    {
+        "sku": DICTIONARY,
+        "snapshot_date": DATETIME,
+        "available_stock": np.dtype(np.int32),
+    },
+)
+
+MONTHLY_AGGREGATE_SCHEMA = DatasetSchema(
+    "monthly_aggregates",
+    {
+        "entity_id": DICTIONARY,
+        "year_month": DICTIONARY,
+        "total_quantity": np.dtype(np.int32),
+        "total_revenue": np.dtype(np.float32),
+        "unique_orders": np.dtype(np.int32),
+        "entity_type": DICTIONARY,
+    },
+)
@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from utils.logging_config import get_logger
+
+from .data_source import DataSource
+from .db_source import (
+    FORECAST_COLUMN_MAP,
+    SALES_COLUMN_MAP,
+    STOCK_COLUMN_MAP,
+    DatabaseSource,
+    build_sales_query,
+    select_list,
+)
+from .dtype_schema import MONTHLY_AGGREGATE_SCHEMA, SALES_SCHEMA, STOCK_HISTORY_SCHEMA
+from .file_source import FileSource
+from .sql_statistics import ENTITY_COLUMNS, order_priorities_query, sku_statistics_query
+
+logger = get_logger("duckdb_source")
+
+_NAMED_PARAM = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+_DUCKDB_PARAM = re.compile(r"\$([A-Za-z_]\w*)")
+
+STOCK_HISTORY_COLUMNS = list(STOCK_HISTORY_SCHEMA.columns)
+DUCKDB_SALES_COLUMN_MAP = {
+    **SALES_COLUMN_MAP,
+    "file_start_date": "file_start_date",
+    "file_end_date": "file_end_date",
+}
+
+_SALES_RELATION = """
+    SELECT CAST(order_id AS VARCHAR)             AS order_id,
+           data                                  AS sale_date,
+           CAST(sku AS VARCHAR)                  AS sku,
+           ilosc                                 AS quantity,
+           cena                                  AS unit_price,
+           razem                                 AS total_amount,
+           LEFT(CAST(sku AS VARCHAR), 5)         AS model,
+           SUBSTRING(CAST(sku AS VARCHAR), 6, 2) AS color,
+           SUBSTRING(CAST(sku AS VARCHAR), 8, 2) AS size,
+           CAST(source_file AS VARCHAR)          AS source_file,
+           CAST(file_start_date AS TIMESTAMP)    AS file_start_date,
+           CAST(file_end_date AS TIMESTAMP)      AS file_end_date,
+           data IS NOT NULL                      AS is_valid
+    FROM read_parquet({files}, union_by_name = true)
+"""
+
+_STOCK_HISTORY_RELATION = """
+    SELECT CAST(sku AS VARCHAR) AS sku,
+           snapshot_date,
+           available_stock
+    FROM read_parquet({files}, hive_partitioning = true)
+"""
+
+_EMPTY_STOCK_HISTORY_RELATION = """
+    SELECT CAST(NULL AS VARCHAR)   AS sku,
+           CAST(NULL AS TIMESTAMP) AS snapshot_date,
+           CAST(NULL AS DOUBLE)    AS available_stock
+    WHERE FALSE
+"""
+
+_MONTHLY_AGGREGATIONS_QUERY = """
+    SELECT CAST(:entity_type AS VARCHAR) AS entity_type,
+           {entity_column}                AS entity_id,
+           strftime(sale_date, '%Y-%m')   AS year_month,
+           SUM(quantity)                  AS total_quantity,
+           SUM(total_amount)              AS total_revenue,
+           COUNT(*)                       AS transaction_count,
+           COUNT(DISTINCT order_id)       AS unique_orders,
+           AVG(unit_price)                AS avg_unit_price
+    FROM raw_sales_transactions
+    WHERE is_valid
+      AND {entity_column} IS NOT NULL
+    GROUP BY 2, 3
+    ORDER BY 2, 3
+"""
+
+
+def _to_duckdb(query: str, params: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    sql = _NAMED_PARAM.sub(r"$\1", query).replace("::numeric", "::double")
+    used = set(_DUCKDB_PARAM.findall(sql))
+    return sql, {name: value for name, value in params.items() if name in used}
+
+
+def _file_list(paths: list[Path]) -> str:
+    quoted = ", ".join("'" + path.as_posix().replace("'", "''") + "'" for path in paths)
+    return f"[{quoted}]"
+
+
+def _column(df: pd.DataFrame, col: str) -> pd.Series:
+    return df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+
+
+class DuckDBSource(DataSource):
+
+    def __init__(self, database_path: Path | None = None, paths_file: str | None = None) -> None:
+        self.database_path = database_path
+        self._files = FileSource(paths_file)
+        if database_path is not None:
+            database_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = duckdb.connect(str(database_path) if database_path else ":memory:")
+        self._synced_version: int | None = None
+        self._sync_lock = threading.Lock()
+        self._results: dict[tuple[str, str, str], pd.DataFrame] = {}
+
+    def _query(self, query: str, params: dict[str, Any] | None = None) -> pd.DataFrame:
+        self._sync()
+        sql, bound = _to_duckdb(query, params or {})
+        cursor = self._conn.cursor()
+        try:
+            return cursor.execute(sql, bound).df()
+        finally:
+            cursor.close()
+
+    def _sync(self) -> None:
+        version = self._files.loader.get_files_version()
+        if version == self._synced_version:
+            return
+
+        with self._sync_lock:
+            if version == self._synced_version:
+                return
+
+            cursor = self._conn.cursor()
+            try:
+                sales_files = self._files.sales_cache.refresh()
+                snapshot_files = self._files.stock_cache.sync()
+                source_key = self._source_key(sales_files, snapshot_files)
+                if not self._is_persisted(cursor, source_key):
+                    self._build(cursor, sales_files, snapshot_files)
+                    if self.database_path is not None:
+                        self._store_source_key(cursor, source_key)
+            finally:
+                cursor.close()
+
+            self._results.clear()
+            self._synced_version = version
+
+    def _source_key(self, sales_files: list[Path], snapshot_files: list[Path]) -> str:
+        stock_files = self._files.loader.find_stock_files()
+        forecast_file = self._files.loader.get_latest_forecast_file()
+        inputs = [
+            *sales_files,
+            *snapshot_files,
+            *[path for path, _ in stock_files[-1:]],
+            *([forecast_file[0]] if forecast_file is not None else []),
+        ]
+        digest = hashlib.sha256()
+        for path in inputs:
+            stat_result = path.stat()
+            digest.update(f"{path}|{stat_result.st_size}|{stat_result.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+
+    def _is_persisted(self, cursor: duckdb.DuckDBPyConnection, source_key: str) -> bool:
+        if self.database_path is None:
+            return False
+        row = cursor.execute("""
+            SELECT COUNT(*)
+            FROM information_schema.columns
+            WHERE table_name = 'duckdb_source_state'
+              AND column_name = 'source_key'
+        """).fetchone()
+        if not row or row[0] == 0:
+            return False
+        stored = cursor.execute("SELECT MAX(source_key) FROM duckdb_source_state").fetchone()
+        return stored is not None and stored[0] == source_key
+
+    @staticmethod
+    def _store_source_key(cursor: duckdb.DuckDBPyConnection, source_key: str) -> None:
+        cursor.execute("CREATE OR REPLACE TABLE duckdb_source_state (source_key VARCHAR)")
+        cursor.execute("INSERT INTO duckdb_source_state VALUES (?)", [source_key])
+
+    def _build(
+            self,
+            cursor: duckdb.DuckDBPyConnection,
+            sales_files: list[Path],
+            snapshot_files: list[Path],
+    ) -> None:
+        logger.info("Building DuckDB relations from the Parquet lake")
+
+        sales_relation = _SALES_RELATION.format(files=_file_list(sales_files))
+        self._publish(cursor, "raw_sales_transactions", sales_relation, "sale_date, sku")
+
+        stock_history_relation = (
+            _STOCK_HISTORY_RELATION.format(files=_file_list(snapshot_files))
+            if snapshot_files
+            else _EMPTY_STOCK_HISTORY_RELATION
+        )
+        self._publish(cursor, "stock_history", stock_history_relation, "snapshot_date, sku")
+
+        self._store_frame(cursor, "stock_snapshots", self._latest_stock_frame())
+        self._store_frame(cursor, "forecast_data", self._latest_forecast_frame())
+
+    def _publish(
+            self, cursor: duckdb.DuckDBPyConnection, name: str, relation: str, order_by: str
+    ) -> None:
+        if self.database_path is None:
+            cursor.execute(f"CREATE OR REPLACE VIEW {name} AS {relation}")
+        else:
+            cursor.execute(f"CREATE OR REPLACE TABLE {name} AS {relation} ORDER BY {order_by}")
+
+    @staticmethod
+    def _store_frame(cursor: duckdb.DuckDBPyConnection, name: str, frame: pd.DataFrame) -> None:
+        cursor.register("frame_to_store", frame)
+        try:
+            cursor.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM frame_to_store")
+        finally:
+            cursor.unregister("frame_to_store")
+
+    def _latest_stock_frame(self) -> pd.DataFrame:
+        stock_files = self._files.loader.find_stock_files()
+        if not stock_files:
+            df, snapshot_date = pd.DataFrame({"sku": pd.Series(dtype=str)}), pd.NaT
+        else:
+            stock_file, snapshot_date = stock_files[-1]
+            df = self._files.loader.load_stock_file(stock_file)
+
+        return pd.DataFrame({
+            "sku": df["sku"].astype(str),
+            "product_name": _column(df, "nazwa"),
+            "net_price": _column(df, "cena_netto").astype("float64"),
+            "gross_price": _column(df, "cena_brutto").astype("float64"),
+            "total_stock": _column(df, "stock").astype("float64"),
+            "available_stock": _column(df, "available_stock").astype("float64"),
+            "snapshot_date": pd.Series(pd.Timestamp(snapshot_date), index=df.index),
+            "is_active": True,
+        })
+
+    def _latest_forecast_frame(self) -> pd.DataFrame:
+        forecast_file = self._files.loader.get_latest_forecast_file()
+        if forecast_file is None:
+            df, generated_date = pd.DataFrame({"sku": pd.Series(dtype=str)}), pd.NaT
+        else:
+            df = self._files.loader.load_forecast_file(forecast_file[0])
+            generated_date = forecast_file[1]
+
+        generated = (
+            pd.to_datetime(df["generated_date"])
+            if "generated_date" in df.columns
+            else pd.Series(pd.Timestamp(generated_date), index=df.index)
+        )
+        return pd.DataFrame({
+            "forecast_date": pd.to_datetime(_column(df, "data")),
+            "sku": df["sku"].astype(str),
+            "model": _column(df, "model").astype(object),
+            "forecast_quantity": _column(df, "forecast").astype("float64"),
+            "generated_date": generated,
+        })
+
+    def load_sales_data(
+            self,
+            start_date: datetime | None = None,
+            end_date: datetime | None = None,
+            columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        query, params = build_sales_query(start_date, end_date, columns, DUCKDB_SALES_COLUMN_MAP)
+        df = SALES_SCHEMA.cast(self._query(query, params))
+        logger.info("Loaded %d sales rows from DuckDB", len(df))
+        return df
+
+    def load_stock_data(
+            self, snapshot_date: datetime | None = None, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        query = f"""
+            SELECT {select_list(STOCK_COLUMN_MAP, columns)}
+            FROM stock_snapshots
+            WHERE is_active
+            ORDER BY sku
+        """
+        return self._query(query)
+
+    def load_stock_history(
+        self,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        selected = STOCK_HISTORY_COLUMNS if columns is None else [
+            col for col in columns if col in STOCK_HISTORY_COLUMNS
+        ]
+        conditions = ["TRUE"]
+        params: dict[str, Any] = {}
+
+        if start_date is not None:
+            conditions.append("snapshot_date >= CAST(:start_date AS timestamp)")
+            params["start_date"] = pd.Timestamp(start_date).to_pydatetime()
+
+        if end_date is not None:
+            conditions.append("snapshot_date <= CAST(:end_date AS timestamp)")
+            params["end_date"] = pd.Timestamp(end_date).to_pydatetime()
+
+        query = f"""
+            SELECT {', '.join(selected)}
+            FROM stock_history
+            WHERE {' AND '.join(conditions)}
+            ORDER BY snapshot_date, sku
+        """
+        return STOCK_HISTORY_SCHEMA.cast(self._query(query, params))
+
+    def load_forecast_data(
+            self, generated_date: datetime | None = None, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        if generated_date is not None:
+            return self._files.load_forecast_data(generated_date, columns)
+
+        query = f"""
+            SELECT {select_list(FORECAST_COLUMN_MAP, columns)}
+            FROM forecast_data
+            ORDER BY forecast_date, sku
+        """
+        return self._query(query)
+
+    def _current_settings(self) -> tuple[dict, str]:
+        from utils.settings_manager import load_settings
+
+        settings = load_settings()
+        return settings, DatabaseSource._compute_settings_hash(settings)
+
+    def _cached_result(
+            self, key: tuple[str, str, str], query: str, params: dict[str, Any], force: bool
+    ) -> pd.DataFrame:
+        self._sync()
+        if force or key not in self._results:
+            self._results[key] = self._query(query, params)
+        return self._results[key].copy()
+
+    def get_sku_statistics(
+            self, entity_type: str = "sku", force_recompute: bool = False
+    ) -> pd.DataFrame:
+        settings, configuration_hash = self._current_settings()
+        query, params = sku_statistics_query(entity_type, settings, configuration_hash)
+        df = self._cached_result(
+            ("sku_statistics", entity_type, configuration_hash), query, params, force_recompute
+        )
+        logger.info("Computed %d %s statistics rows in DuckDB", len(df), entity_type)
+        return df
+
+    def get_order_priorities(
+            self, top_n: int | None = None, force_recompute: bool = False
+    ) -> pd.DataFrame:
+        settings, configuration_hash = self._current_settings()
+        query, params = order_priorities_query(settings, configuration_hash)
+        df = self._cached_result(
+            ("order_priorities", "sku", configuration_hash), query, params, force_recompute
+        )
+        logger.info("Computed %d order priority rows in DuckDB", len(df))
+        return df.head(top_n) if top_n is not None else df
+
+    def get_monthly_aggregations(
+            self, entity_type: str = "sku", force_recompute: bool = False
+    ) -> pd.DataFrame:
+        if entity_type not in ENTITY_COLUMNS:
+            raise ValueError(
+                f"Unknown entity type '{entity_type}', expected one of {list(ENTITY_COLUMNS)}"
+            )
+        query = _MONTHLY_AGGREGATIONS_QUERY.format(entity_column=ENTITY_COLUMNS[entity_type])
+        df = self._cached_result(
+            ("monthly_aggregations", entity_type, ""),
+            query,
+            {"entity_type": entity_type},
+            force_recompute,
+        )
+        return MONTHLY_AGGREGATE_SCHEMA.cast(df)
+
+    def load_model_metadata(self) -> pd.DataFrame | None:
+        return self._files.load_model_metadata()
+
+    def load_size_aliases(self) -> dict[str, str]:
+        return self._files.load_size_aliases()
+
+    def load_color_aliases(self) -> dict[str, str]:
+        return self._files.load_color_aliases()
+
+    def load_category_mappings(self) -> pd.DataFrame:
+        return self._files.load_category_mappings()
+
+    def is_available(self) -> bool:
+        try:
+            self._sync()
+            return True
+        except Exception as e:
+            logger.error("DuckDB data source unavailable: %s", e)
+            return False
+
+    def get_data_source_type(self) -> str:
+        return "duckdb"
+
+    def get_data_version(self, refresh: bool = False) -> str:
+        return f"duckdb_{self._files.loader.get_files_version(refresh)}"
+
+    def load_bom_data(self) -> pd.DataFrame | None:
+        return self._files.load_bom_data()
+
+    def load_material_catalog(self) -> pd.DataFrame | None:
+        return self._files.load_material_catalog()
+
+    def load_material_stock(self) -> pd.DataFrame | None:
+        return self._files.load_material_stock()
+
+    def load_outlet_models(self) -> set[str]:
+        return self._files.load_outlet_models()
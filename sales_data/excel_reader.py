@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import io
+import time
+from pathlib import Path
+from typing import Callable, TypeVar
+
+import pandas as pd
+
+from utils.logging_config import get_logger
+
+logger = get_logger("excel_reader")
+
+T = TypeVar("T")
+
+ENGINE_AUTO = "auto"
+ENGINE_CALAMINE = "calamine"
+ENGINE_OPENPYXL = "openpyxl"
+EXCEL_ENGINES = (ENGINE_AUTO, ENGINE_CALAMINE, ENGINE_OPENPYXL)
+
+CALAMINE_AVAILABLE = False
+ENGINE_ERRORS: tuple[type[Exception], ...] = (ImportError,)
+try:
+    import python_calamine
+
+    CALAMINE_AVAILABLE = True
+    ENGINE_ERRORS = (ImportError, python_calamine.CalamineError)
+except ImportError:
+    pass
+
+
+def get_configured_engine() -> str:
+    from utils.settings_manager import load_settings
+
+    engine = load_settings().get("excel_engine", ENGINE_AUTO)
+    if engine not in EXCEL_ENGINES:
+        logger.warning("Unknown excel_engine '%s' in settings, using '%s'", engine, ENGINE_AUTO)
+        return ENGINE_AUTO
+    return engine
+
+
+def resolve_engines(engine: str | None = None) -> list[str]:
+    requested = engine or get_configured_engine()
+    if requested == ENGINE_OPENPYXL:
+        return [ENGINE_OPENPYXL]
+    if CALAMINE_AVAILABLE:
+        return [ENGINE_CALAMINE, ENGINE_OPENPYXL]
+    if requested == ENGINE_CALAMINE:
+        logger.warning("python-calamine is not installed, reading Excel files with openpyxl")
+    return [ENGINE_OPENPYXL]
+
+
+def read_workbook(
+    source: Path | bytes,
+    reader: Callable[[pd.ExcelFile], T],
+    engine: str | None = None,
+    label: str | None = None,
+) -> T:
+    engines = resolve_engines(engine)
+    name = label or (source.name if isinstance(source, Path) else "workbook")
+
+    for attempt, engine_name in enumerate(engines, 1):
+        handle = io.BytesIO(source) if isinstance(source, bytes) else source
+        start = time.perf_counter()
+        try:
+            with pd.ExcelFile(handle, engine=engine_name) as excel_file:
+                result = reader(excel_file)
+        except ENGINE_ERRORS as e:
+            if attempt == len(engines):
+                raise
+            logger.warning(
+                "%s engine failed for %s (%s), retrying with %s",
+                engine_name, name, e, engines[attempt],
+            )
+            continue
+        logger.debug("Parsed %s with %s in %.3fs", name, engine_name, time.perf_counter() - start)
+        return result
+
+    raise ValueError(f"No Excel engine available for {name}")
+
+
+def read_sheet(
+    source: Path | bytes,
+    sheet_name: str | int = 0,
+    engine: str | None = None,
+    **kwargs,
+) -> pd.DataFrame:
+    return read_workbook(
+        source,
+        lambda excel_file: pd.DataFrame(pd.read_excel(excel_file, sheet_name=sheet_name, **kwargs)),
+        engine=engine,
+    )
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from utils.logging_config import get_logger
+
+logger = get_logger("file_manifest")
+
+MANIFEST_FILE = ".file_manifest.json"
+MANIFEST_FORMAT_VERSION = 1
+DEFAULT_POLL_INTERVAL = 10.0
+
+TRACKED_SUFFIXES = (".csv", ".xlsx", ".xls")
+
+
+class _RootIndex:
+    def __init__(
+            self,
+            dirs: dict[str, int] | None = None,
+            files: dict[str, tuple[int, int]] | None = None,
+    ) -> None:
+        self.dirs = dirs or {}
+        self.files = files or {}
+        self.checked_at = 0.0
+
+    def paths(self) -> list[Path]:
+        return [Path(path) for path in self.files]
+
+    def to_json(self) -> dict[str, Any]:
+        return {"dirs": self.dirs, "files": {path: list(stat) for path, stat in self.files.items()}}
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> _RootIndex:
+        return cls(
+            dirs={path: int(mtime) for path, mtime in data.get("dirs", {}).items()},
+            files={
+                path: (int(stat[0]), int(stat[1])) for path, stat in data.get("files", {}).items()
+            },
+        )
+
+
+def _mtime_ns(path: str | Path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _scan_root(root: Path) -> _RootIndex:
+    index = _RootIndex()
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        index.dirs[str(directory)] = _mtime_ns(directory)
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            logger.debug("Cannot scan %s: %s", directory, e)
+            continue
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                elif Path(entry.name).suffix.lower() in TRACKED_SUFFIXES:
+                    stat_result = entry.stat()
+                    index.files[entry.path] = (stat_result.st_size, stat_result.st_mtime_ns)
+            except OSError:
+                continue
+    index.files = dict(sorted(index.files.items()))
+    return index
+
+
+def _is_unchanged(index: _RootIndex) -> bool:
+    for directory, mtime_ns in index.dirs.items():
+        if _mtime_ns(directory) != mtime_ns:
+            return False
+    for path, known in index.files.items():
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return False
+        if (stat_result.st_size, stat_result.st_mtime_ns) != known:
+            return False
+    return True
+
+
+class FileManifest:
+    def __init__(
+            self, manifest_path: Path | None = None, poll_interval: float = DEFAULT_POLL_INTERVAL
+    ) -> None:
+        self.manifest_path = manifest_path
+        self.poll_interval = poll_interval
+        self._roots: dict[str, _RootIndex] = {}
+        self._persisted: dict[str, _RootIndex] = {}
+        self._version = 0
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self._load()
+
+    @property
+    def version(self) -> int:
+        if not self.watching:
+            self._poll(force=False)
+        return self._version
+
+    @property
+    def watching(self) -> bool:
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def list_files(self, directory: Path) -> list[Path]:
+        key = str(directory)
+        with self._lock:
+            index = self._roots.get(key)
+            if index is None:
+                self._register(key)
+            elif not self.watching and time.monotonic() - index.checked_at >= self.poll_interval:
+                if self._poll_root(key, index):
+                    self._version += 1
+                    self._save()
+            index = self._roots.get(key)
+            return index.paths() if index is not None else []
+
+    def watch(self, directories: Iterable[Path]) -> None:
+        with self._lock:
+            for directory in directories:
+                if str(directory) not in self._roots:
+                    self._register(str(directory))
+        self.start_watching()
+
+    def refresh(self) -> bool:
+        return self._poll(force=True)
+
+    def start_watching(self) -> None:
+        with self._lock:
+            if self.watching:
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(
+                target=self._watch_loop, name="file-manifest-watcher", daemon=True
+            )
+            self._watcher.start()
+            logger.info("File manifest watcher started (every %.0fs)", self.poll_interval)
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        watcher = self._watcher
+        if watcher is not None:
+            watcher.join(timeout=self.poll_interval)
+        self._watcher = None
+
+    def _watch_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._poll(force=True)
+            except Exception as e:
+                logger.warning("File manifest poll failed: %s", e)
+
+    def _poll(self, force: bool) -> bool:
+        changed = False
+        with self._lock:
+            now = time.monotonic()
+            for key, index in list(self._roots.items()):
+                if force or now - index.checked_at >= self.poll_interval:
+                    changed = self._poll_root(key, index) or changed
+            if changed:
+                self._version += 1
+                self._save()
+        return changed
+
+    def _register(self, key: str) -> None:
+        index = self._persisted.pop(key, None)
+        if index is not None and Path(key).is_dir():
+            self._roots[key] = index
+            if self._poll_root(key, index):
+                self._version += 1
+        else:
+            index = _scan_root(Path(key))
+            index.checked_at = time.monotonic()
+            self._roots[key] = index
+            self._version += 1
+            logger.info("File manifest: indexed %d file(s) under %s", len(index.files), key)
+        self._save()
+
+    def _poll_root(self, key: str, index: _RootIndex) -> bool:
+        checked_at = time.monotonic()
+        if not Path(key).is_dir():
+            del self._roots[key]
+            logger.info("File manifest: %s no longer exists, dropped it", key)
+            return bool(index.files)
+        if _is_unchanged(index):
+            index.checked_at = checked_at
+            return False
+
+        fresh = _scan_root(Path(key))
+        fresh.checked_at = checked_at
+        self._roots[key] = fresh
+        changed = fresh.files != index.files
+        if changed:
+            logger.info("File manifest: change detected under %s", key)
+        return changed
+
+    def _load(self) -> None:
+        if self.manifest_path is None or not self.manifest_path.exists():
+            return
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Could not read file manifest %s: %s", self.manifest_path, e)
+            return
+        if data.get("format") != MANIFEST_FORMAT_VERSION:
+            return
+        self._version = int(data.get("version", 0))
+        self._persisted = {
+            key: _RootIndex.from_json(root) for key, root in data.get("roots", {}).items()
+        }
+
+    def _save(self) -> None:
+        if self.manifest_path is None:
+            return
+        payload = {
+            "format": MANIFEST_FORMAT_VERSION,
+            "version": self._version,
+            "roots": {key: index.to_json() for key, index in self._roots.items()},
+        }
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.manifest_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning("Could not write file manifest %s: %s", self.manifest_path, e)
+
+
+_manifest: FileManifest | None = None
+_manifest_lock = threading.Lock()
+
+
+def get_file_manifest() -> FileManifest:
+    global _manifest
+
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = FileManifest(Path(__file__).parent.parent / "data" / MANIFEST_FILE)
+        return _manifest
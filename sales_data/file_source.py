@@ -8,9 +8,12 @@ import pandas as pd
 from utils.logging_config import get_logger
 
 from .analyzer import SalesAnalyzer
-from .data_source import DataSource
-from .dtype_optimizer import optimize_dtypes
+from .data_plane import freeze_frame, frozen_view
+from .data_source import DataSource, select_columns, slice_by_date
+from .dtype_schema import MONTHLY_AGGREGATE_SCHEMA
+from .incremental_aggregates import IncrementalAggregates
 from .loader import SalesDataLoader, load_size_aliases_from_excel
+from .sales_file_cache import SalesFileCache
 from .stock_history_cache import StockHistoryCache
 
 logger = get_logger("file_source")
@@ -21,44 +24,72 @@ class FileSource(DataSource):
     def __init__(self, paths_file: str | None = None) -> None:
         self.loader = SalesDataLoader(paths_file)
         self._sales_data: pd.DataFrame | None = None
+        self._sales_version: int | None = None
+        self._aggregates_version: int | None = None
         self._analyzer: SalesAnalyzer | None = None
-        cache_path = Path(__file__).parent.parent / "data" / ".stock_history_cache.parquet"
-        self._stock_cache = StockHistoryCache(cache_path, self.loader)
+        self._aggregates = IncrementalAggregates()
+        cache_root = self.loader.cache_root
+        self._stock_cache = StockHistoryCache(cache_root / ".stock_history", self.loader)
+        self._sales_cache = SalesFileCache(cache_root / ".sales_cache", self.loader)
+        self.loader.watch_directories()
+
+    @property
+    def sales_cache(self) -> SalesFileCache:
+        return self._sales_cache
+
+    @property
+    def stock_cache(self) -> StockHistoryCache:
+        return self._stock_cache
 
     def load_sales_data(
-            self, start_date: datetime | None = None, end_date: datetime | None = None
+            self,
+            start_date: datetime | None = None,
+            end_date: datetime | None = None,
+            columns: list[str] | None = None,
     ) -> pd.DataFrame:
-        if self._sales_data is None:
-            self._sales_data = self.loader.consolidate_all_files()
+        version = self.loader.get_files_version()
+        if self._sales_data is None or self._sales_version != version:
+            self._index_sales_data(self._sales_cache.consolidate())
+            self._sales_version = version
+            self._analyzer = None
 
         if self._sales_data is None:
             return pd.DataFrame()
 
-        df = self._sales_data
-
-        if start_date is not None:
-            df = df[df["data"] >= start_date]
-        if end_date is not None:
-            df = df[df["data"] <= end_date]
+        rows = slice_by_date(self._sales_data, start_date, end_date)
+        if columns is not None:
+            rows = select_columns(rows, columns)
+        return frozen_view(rows)
 
-        return pd.DataFrame(df).copy()
+    def _index_sales_data(self, df: pd.DataFrame) -> None:
+        df = df.sort_values("data", kind="stable", na_position="last").reset_index(drop=True)
+        self._sales_data = freeze_frame(df)
 
-    def load_stock_data(self, snapshot_date: datetime | None = None) -> pd.DataFrame:
+    def load_stock_data(
+            self, snapshot_date: datetime | None = None, columns: list[str] | None = None
+    ) -> pd.DataFrame:
         stock_file = self.loader.get_latest_stock_file()
         if stock_file is None:
             logger.warning("No stock file found")
             return pd.DataFrame()
 
-        return self.loader.load_stock_file(stock_file)
+        return self.loader.load_stock_file(stock_file, columns=columns)
 
     def load_stock_history(
-        self, start_date: datetime | None = None, end_date: datetime | None = None
+        self,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        columns: list[str] | None = None,
     ) -> pd.DataFrame:
-        return self._stock_cache.get_history(start_date=start_date, end_date=end_date)
+        return self._stock_cache.get_history(
+            start_date=start_date, end_date=end_date, columns=columns
+        )
 
-    def load_forecast_data(self, generated_date: datetime | None = None) -> pd.DataFrame:
+    def load_forecast_data(
+            self, generated_date: datetime | None = None, columns: list[str] | None = None
+    ) -> pd.DataFrame:
         if generated_date is not None:
-            return self._load_forecast_by_generated_date(generated_date)
+            return self._load_forecast_by_generated_date(generated_date, columns=columns)
 
         forecast_result = self.loader.get_latest_forecast_file()
         if forecast_result is None:
@@ -66,11 +97,11 @@ class FileSource(DataSource):
             return pd.DataFrame()
 
         forecast_file, _ = forecast_result
-        df = self.loader.load_forecast_file(forecast_file)
+        df = self.loader.load_forecast_file(forecast_file, columns=columns)
         return df
 
     def _load_forecast_by_generated_date(
-        self, target_date: datetime, tolerance_days: int = 7
+        self, target_date: datetime, tolerance_days: int = 7, columns: list[str] | None = None
     ) -> pd.DataFrame:
         forecast_files = self.loader.find_forecast_files()
         if not forecast_files:
@@ -91,20 +122,30 @@ class FileSource(DataSource):
         closest_file = min(matching_files, key=lambda x: abs((x[1] - target_date).days))
         logger.info("Loading forecast from %s (target: %s)", closest_file[1], target_date)
 
-        df = self.loader.load_forecast_file(closest_file[0])
-        df["generated_date"] = closest_file[1]
+        df = self.loader.load_forecast_file(closest_file[0], columns=columns)
+        if columns is None or "generated_date" in columns:
+            df["generated_date"] = closest_file[1]
         return df
 
     def get_sku_statistics(
             self, entity_type: str = "sku", force_recompute: bool = False
     ) -> pd.DataFrame:
-        if self._analyzer is None or force_recompute:
-            sales_data = self.load_sales_data()
-            self._analyzer = SalesAnalyzer(sales_data)
+        version = self.loader.get_files_version()
+        if force_recompute or not self._aggregates.fragments or self._aggregates_version != version:
+            self._sync_aggregates()
+            self._aggregates_version = version
 
-        if entity_type == "model":
-            return self._analyzer.aggregate_by_model()
-        return self._analyzer.aggregate_by_sku()
+        from utils.settings_manager import load_settings
+
+        cv_thresholds = load_settings().get("cv_thresholds", {})
+        return self._aggregates.statistics(
+            entity_type, cv_thresholds.get("basic", 0.6), cv_thresholds.get("seasonal", 1.0)
+        )
+
+    def _sync_aggregates(self) -> None:
+        if self._aggregates.sync(self._sales_cache.refresh()) and self._sales_data is not None:
+            self._sales_data = None
+            self._analyzer = None
 
     def get_order_priorities(
             self, top_n: int | None = None, force_recompute: bool = False
@@ -122,8 +163,7 @@ class FileSource(DataSource):
         settings = load_settings()
         forecast_time = settings.get("forecast_time", 5)
 
-        assert self._analyzer is not None
-        priority_df = self._analyzer.calculate_order_priority(
+        priority_df = SalesAnalyzer.calculate_order_priority(
             summary, forecast_df, forecast_time, settings
         )
 
@@ -135,8 +175,8 @@ class FileSource(DataSource):
     def get_monthly_aggregations(
             self, entity_type: str = "sku", force_recompute: bool = False
     ) -> pd.DataFrame:
+        sales_data = self.load_sales_data()
         if self._analyzer is None or force_recompute:
-            sales_data = self.load_sales_data()
             self._analyzer = SalesAnalyzer(sales_data)
 
         monthly_data = self._analyzer.data.copy()
@@ -160,7 +200,7 @@ class FileSource(DataSource):
         monthly_agg["entity_type"] = entity_type
         monthly_agg["year_month"] = monthly_agg["year_month"].astype(str)
 
-        return optimize_dtypes(monthly_agg)
+        return MONTHLY_AGGREGATE_SCHEMA.cast(monthly_agg)
 
     def load_model_metadata(self) -> pd.DataFrame | None:
         return self.loader.load_model_metadata()
@@ -189,6 +229,9 @@ class FileSource(DataSource):
     def get_data_source_type(self) -> str:
         return "file"
 
+    def get_data_version(self, refresh: bool = False) -> str:
+        return f"file_{self.loader.get_files_version(refresh)}"
+
     def load_bom_data(self) -> pd.DataFrame | None:
         return self.loader.load_bom_data()
 
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.logging_config import get_logger
+
+from .analysis import AVERAGE_SALES, SalesCube, classify_sku_type
+
+logger = get_logger("incremental_aggregates")
+
+ENTITY_TYPES = ("sku", "model")
+ENTITY_ID_COLUMNS = {"sku": "SKU", "model": "MODEL"}
+
+_FRAGMENT_COLUMNS = ["sku", "data", "ilosc"]
+_NO_SALE = np.iinfo(np.int64).max
+
+
+@dataclass
+class FragmentAggregate:
+    cells: dict[str, pd.DataFrame]
+    first_sales: dict[str, pd.Series]
+
+    @classmethod
+    def from_sales(cls, df: pd.DataFrame) -> FragmentAggregate:
+        cube = SalesCube(df)
+        return cls(
+            {entity_type: cube.cells(entity_type) for entity_type in ENTITY_TYPES},
+            {entity_type: cube.first_sales(entity_type) for entity_type in ENTITY_TYPES},
+        )
+
+
+class EntityStatistics:
+    def __init__(self) -> None:
+        self.labels = np.empty(0, dtype=object)
+        self._index: dict[str, int] = {}
+        self.first_month = 0
+        self.quantity = np.zeros((0, 0))
+        self.transactions = np.zeros((0, 0), dtype=np.int64)
+        self.months = np.zeros(0, dtype=np.int64)
+        self.total = np.zeros(0)
+        self.squares = np.zeros(0)
+        self.first_sale = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0)
+        self.sd = np.zeros(0)
+        self.cv = np.zeros(0)
+        self.types = np.empty(0, dtype=object)
+        self._classified_with: tuple[float, float, date] | None = None
+        self._unclassified: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _rows(self, entity_ids: np.ndarray) -> np.ndarray:
+        new_ids = [entity_id for entity_id in pd.unique(entity_ids) if entity_id not in self._index]
+        if new_ids:
+            self._grow_rows(new_ids)
+        return pd.Series(entity_ids, dtype=object).map(self._index).to_numpy(dtype=np.int64)
+
+    def _grow_rows(self, new_ids: list[str]) -> None:
+        start = len(self._index)
+        for offset, entity_id in enumerate(new_ids):
+            self._index[entity_id] = start + offset
+        size = len(self._index)
+        if size > len(self.labels):
+            capacity = max(size, 2 * len(self.labels))
+            self.labels = _resize(self.labels, capacity, None)
+            self.quantity = _resize(self.quantity, capacity, 0.0)
+            self.transactions = _resize(self.transactions, capacity, 0)
+            for name, fill in (
+                    ("months", 0), ("total", 0.0), ("squares", 0.0), ("first_sale", _NO_SALE),
+                    ("mean", np.nan), ("sd", np.nan), ("cv", 0.0), ("types", None),
+            ):
+                setattr(self, name, _resize(getattr(self, name), capacity, fill))
+        self.labels[start:size] = new_ids
+
+    def _columns(self, months: np.ndarray) -> np.ndarray:
+        if len(months) == 0:
+            return np.zeros(0, dtype=np.int64)
+        n_months = self.quantity.shape[1]
+        low = min(int(months.min()), self.first_month) if n_months else int(months.min())
+        high = max(int(months.max()) + 1, self.first_month + n_months)
+        if n_months == 0 or low < self.first_month or high > self.first_month + n_months:
+            shift = self.first_month - low if n_months else 0
+            quantity = np.zeros((len(self.quantity), high - low))
+            transactions = np.zeros((len(self.transactions), high - low), dtype=np.int64)
+            quantity[:, shift:shift + n_months] = self.quantity
+            transactions[:, shift:shift + n_months] = self.transactions
+            self.quantity, self.transactions, self.first_month = quantity, transactions, low
+        return months - self.first_month
+
+    def apply(self, delta: pd.DataFrame) -> np.ndarray:
+        if delta.empty:
+            return np.zeros(0, dtype=np.int64)
+        rows = self._rows(delta["entity_id"].to_numpy())
+        cols = self._columns(delta["month"].to_numpy(dtype=np.int64))
+
+        old_quantity = self.quantity[rows, cols]
+        old_active = self.transactions[rows, cols] > 0
+        new_quantity = old_quantity + delta["quantity"].to_numpy(dtype=np.float64)
+        new_transactions = self.transactions[rows, cols] + delta["transactions"].to_numpy()
+
+        self.quantity[rows, cols] = new_quantity
+        self.transactions[rows, cols] = new_transactions
+        np.add.at(self.total, rows, new_quantity - old_quantity)
+        np.add.at(self.squares, rows, new_quantity ** 2 - old_quantity ** 2)
+        np.add.at(self.months, rows, (new_transactions > 0).astype(np.int64) - old_active)
+        return np.unique(rows)
+
+    def update_first_sales(self, entity_ids: pd.Index, fragments: list[pd.Series]) -> np.ndarray:
+        known = [entity_id for entity_id in entity_ids if entity_id in self._index]
+        if not known:
+            return np.zeros(0, dtype=np.int64)
+        rows = pd.Series(known, dtype=object).map(self._index).to_numpy(dtype=np.int64)
+        first_sale = np.full(len(known), _NO_SALE, dtype=np.int64)
+        for series in fragments:
+            values = series.reindex(known).to_numpy(dtype="datetime64[ns]")
+            values = np.where(np.isnat(values), _NO_SALE, values.view(np.int64))
+            first_sale = np.minimum(first_sale, values)
+        changed = rows[self.first_sale[rows] != first_sale]
+        self.first_sale[rows] = first_sale
+        return changed
+
+    def recompute(self, rows: np.ndarray) -> None:
+        if len(rows) == 0:
+            return
+        months = self.months[rows]
+        total = self.total[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / months
+            variance = np.maximum(self.squares[rows] - total * mean, 0.0) / (months - 1)
+            sd = np.where(months > 1, np.sqrt(variance), np.nan)
+            cv = sd / mean
+        self.mean[rows] = mean
+        self.sd[rows] = sd
+        self.cv[rows] = np.nan_to_num(cv, nan=0.0, posinf=np.inf, neginf=-np.inf)
+        self._unclassified.update(rows.tolist())
+
+    def classify(self, cv_basic: float, cv_seasonal: float) -> None:
+        key = (cv_basic, cv_seasonal, date.today())
+        if key != self._classified_with:
+            rows = np.arange(len(self))
+        elif self._unclassified:
+            rows = np.fromiter(self._unclassified, np.int64, len(self._unclassified))
+        else:
+            return
+        classified = classify_sku_type(
+            pd.DataFrame({
+                "first_sale": self.first_sale[rows].view("datetime64[ns]"),
+                "CV": self.cv[rows],
+            }),
+            cv_basic,
+            cv_seasonal,
+        )
+        self.types[rows] = classified["TYPE"].to_numpy()
+        self._classified_with = key
+        self._unclassified.clear()
+
+    def frame(self, entity_type: str) -> pd.DataFrame:
+        id_col = ENTITY_ID_COLUMNS[entity_type]
+        size = len(self)
+        summary = pd.DataFrame({
+            id_col: self.labels[:size],
+            "MONTHS": self.months[:size],
+            "QUANTITY": np.rint(self.total[:size]).astype(np.int64),
+            AVERAGE_SALES: self.mean[:size],
+            "SD": self.sd[:size],
+            "CV": self.cv[:size],
+            "first_sale": self.first_sale[:size].view("datetime64[ns]"),
+        })
+        if self._classified_with is not None:
+            summary["TYPE"] = self.types[:size]
+        summary = summary[summary["MONTHS"] > 0]
+        return pd.DataFrame(summary.sort_values(id_col, ascending=False))
+
+
+def _resize(values: np.ndarray, capacity: int, fill: object) -> np.ndarray:
+    resized = np.full((capacity, *values.shape[1:]), fill, dtype=values.dtype)
+    resized[:len(values)] = values
+    return resized
+
+
+class IncrementalAggregates:
+    def __init__(self) -> None:
+        self._fragments: dict[str, FragmentAggregate] = {}
+        self._statistics = {entity_type: EntityStatistics() for entity_type in ENTITY_TYPES}
+
+    @property
+    def fragments(self) -> set[str]:
+        return set(self._fragments)
+
+    def sync(self, fragment_paths: list[Path]) -> bool:
+        paths = {path.name: path for path in fragment_paths}
+        removed = {name: self._fragments[name] for name in self._fragments if name not in paths}
+        added = {
+            name: FragmentAggregate.from_sales(pd.read_parquet(path, columns=_FRAGMENT_COLUMNS))
+            for name, path in paths.items()
+            if name not in self._fragments
+        }
+        if not removed and not added:
+            return False
+
+        started = time.perf_counter()
+        for name in removed:
+            del self._fragments[name]
+        self._fragments.update(added)
+
+        changed = {
+            entity_type: self._apply(entity_type, list(added.values()), list(removed.values()))
+            for entity_type in ENTITY_TYPES
+        }
+        logger.info(
+            "Incremental aggregates: %d fragment(s) added, %d removed, "
+            "%d SKU(s) and %d model(s) recomputed in %.1f ms",
+            len(added),
+            len(removed),
+            changed["sku"],
+            changed["model"],
+            (time.perf_counter() - started) * 1000,
+        )
+        return True
+
+    def _apply(
+            self,
+            entity_type: str,
+            added: list[FragmentAggregate],
+            removed: list[FragmentAggregate],
+    ) -> int:
+        statistics = self._statistics[entity_type]
+        cells = [fragment.cells[entity_type] for fragment in added]
+        cells += [
+            fragment.cells[entity_type].assign(
+                quantity=lambda df: -df["quantity"], transactions=lambda df: -df["transactions"]
+            )
+            for fragment in removed
+        ]
+        delta = pd.concat(cells, ignore_index=True).groupby(
+            ["entity_id", "month"], as_index=False, sort=False
+        ).sum()
+        delta = delta[(delta["quantity"] != 0) | (delta["transactions"] != 0)]
+        rows = statistics.apply(delta)
+
+        touched = pd.Index(
+            np.unique(np.concatenate([
+                fragment.first_sales[entity_type].index.to_numpy(dtype=object)
+                for fragment in added + removed
+            ]))
+        )
+        first_sales = [fragment.first_sales[entity_type] for fragment in self._fragments.values()]
+        rows = np.union1d(rows, statistics.update_first_sales(touched, first_sales))
+
+        statistics.recompute(rows)
+        return len(rows)
+
+    def statistics(
+            self,
+            entity_type: str = "sku",
+            cv_basic: float | None = None,
+            cv_seasonal: float | None = None,
+    ) -> pd.DataFrame:
+        statistics = self._statistics[entity_type]
+        if cv_basic is not None and cv_seasonal is not None:
+            statistics.classify(cv_basic, cv_seasonal)
+        return statistics.frame(entity_type)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-import io
 import re
 from datetime import datetime
 from pathlib import Path
+from typing import Callable
 
 import pandas as pd
 from pandas import DataFrame
@@ -11,10 +11,9 @@ from pandas import DataFrame
 from exceptions import OfflineFileError
 from utils.logging_config import get_logger
 from utils.parallel_loader import parallel_load
-from .dtype_optimizer import (
-    get_optimal_sales_dtypes,
-    optimize_dtypes,
-)
+from .dtype_schema import FORECAST_SCHEMA, SALES_SCHEMA, STOCK_SCHEMA
+from .excel_reader import read_sheet, read_workbook
+from .file_manifest import get_file_manifest
 from .validator import DataValidator
 
 logger = get_logger("loader")
@@ -28,10 +27,6 @@ CSV = ".csv"
 XLSX = ".xlsx"
 
 ANY_XLSX = "*.xlsx"
-ANY_XLSX_RECURSIVE = "**/*.xlsx"
-
-ANY_CSV = "*.csv"
-ANY_CSV_RECURSIVE = "**/*.csv"
 
 
 def _is_icloud_offloaded(file_path: Path) -> bool:
@@ -83,8 +78,9 @@ def load_size_aliases_from_excel(sizes_file_path: Path) -> dict[str, str]:
 
 
 class SalesDataLoader:
-    def __init__(self, paths_file: str | None = None) -> None:
+    def __init__(self, paths_file: str | None = None, excel_engine: str | None = None) -> None:
         self.validator = DataValidator()
+        self.excel_engine = excel_engine
 
         paths_file_path = self._get_paths_file_path(paths_file)
         default_data_dir = Path(__file__).parent.parent / "data"
@@ -94,6 +90,10 @@ class SalesDataLoader:
         else:
             self._set_default_paths(default_data_dir)
 
+    @property
+    def cache_root(self) -> Path:
+        return self.sales_dir
+
     @staticmethod
     def _get_paths_file_path(paths_file: str | None) -> Path:
         if paths_file is None:
@@ -197,17 +197,23 @@ class SalesDataLoader:
 
     @staticmethod
     def _get_unique_files_from_directory(directory: Path) -> list[Path]:
-        all_files = (
-                list(directory.glob(ANY_CSV)) + list(directory.glob(ANY_XLSX)) +
-                list(directory.glob(ANY_CSV_RECURSIVE)) + list(directory.glob(ANY_XLSX_RECURSIVE))
-        )
-        seen_paths: set[Path] = set()
-        unique_files = []
-        for file_path in all_files:
-            if file_path not in seen_paths:
-                seen_paths.add(file_path)
-                unique_files.append(file_path)
-        return unique_files
+        files = [
+            path
+            for path in get_file_manifest().list_files(directory)
+            if path.suffix in (CSV, XLSX)
+        ]
+        files.sort(key=lambda path: (path.parent != directory, path.suffix == XLSX))
+        return files
+
+    def watch_directories(self) -> None:
+        get_file_manifest().watch((self.sales_dir, self.stock_dir, self.forecast_dir))
+
+    @staticmethod
+    def get_files_version(refresh: bool = False) -> int:
+        manifest = get_file_manifest()
+        if refresh:
+            manifest.refresh()
+        return manifest.version
 
     def collect_files_from_directory(
             self, directory: Path
@@ -263,25 +269,27 @@ class SalesDataLoader:
     def _should_replace_forecast_file(new_file: Path, existing_file: Path) -> bool:
         return new_file.suffix == XLSX and existing_file.suffix == CSV
 
-    def _process_forecast_subdir(self, subdir: Path, seen_dates: dict[datetime, Path]) -> None:
+    @staticmethod
+    def _is_forecast_file(file_path: Path) -> bool:
+        return file_path.name.startswith("forecast_") and file_path.suffix in (CSV, XLSX)
+
+    def _process_forecast_subdir(
+            self, subdir: Path, forecast_files: list[Path], seen_dates: dict[datetime, Path]
+    ) -> None:
         try:
             folder_date = datetime.strptime(subdir.name, "%Y-%m-%d")
         except ValueError:
             return
 
-        forecast_files = list(subdir.glob("forecast_*.csv")) + list(subdir.glob("forecast_*.xlsx"))
-
         for file_path in forecast_files:
             if folder_date not in seen_dates or self._should_replace_forecast_file(
                     file_path, seen_dates[folder_date]
             ):
                 seen_dates[folder_date] = file_path
 
-    def _process_direct_forecast_files(self, seen_dates: dict[datetime, Path]) -> None:
-        direct_files = list(self.forecast_dir.glob("forecast_*.csv")) + list(
-            self.forecast_dir.glob("forecast_*.xlsx")
-        )
-
+    def _process_direct_forecast_files(
+            self, direct_files: list[Path], seen_dates: dict[datetime, Path]
+    ) -> None:
         for file_path in direct_files:
             parsed_date = self._parse_forecast_filename(file_path.name)
             if parsed_date and (parsed_date not in seen_dates or self._should_replace_forecast_file(
@@ -295,13 +303,21 @@ class SalesDataLoader:
         if not self.forecast_dir.exists():
             return []
 
-        subdirs = [d for d in self.forecast_dir.iterdir() if d.is_dir()]
+        direct_files: list[Path] = []
+        subdir_files: dict[Path, list[Path]] = {}
+        for file_path in get_file_manifest().list_files(self.forecast_dir):
+            if not self._is_forecast_file(file_path):
+                continue
+            if file_path.parent == self.forecast_dir:
+                direct_files.append(file_path)
+            elif file_path.parent.parent == self.forecast_dir:
+                subdir_files.setdefault(file_path.parent, []).append(file_path)
 
-        for subdir in subdirs:
-            self._process_forecast_subdir(subdir, seen_dates)
+        for subdir, forecast_files in subdir_files.items():
+            self._process_forecast_subdir(subdir, forecast_files, seen_dates)
 
         if not seen_dates:
-            self._process_direct_forecast_files(seen_dates)
+            self._process_direct_forecast_files(direct_files, seen_dates)
 
         files_info = [(path, date) for date, path in seen_dates.items()]
         files_info.sort(key=lambda x: x[1])
@@ -343,8 +359,8 @@ class SalesDataLoader:
                 return []
 
         files_info = []
-        for file_path in search_dir.iterdir():
-            if file_path.suffix.lower() in (".xlsx", ".xls"):
+        for file_path in get_file_manifest().list_files(search_dir):
+            if file_path.parent == search_dir and file_path.suffix.lower() in (".xlsx", ".xls"):
                 year = self._parse_outlet_filename(file_path.name)
                 if year is not None:
                     files_info.append((file_path, year))
@@ -362,34 +378,41 @@ class SalesDataLoader:
     def _read_file(
             file_path: Path,
             find_sheet_method=None,
-            usecols: list[str] | None = None,
+            usecols: list[str] | Callable[[str], bool] | None = None,
             dtype: dict | None = None,
+            engine: str | None = None,
     ) -> DataFrame:
         if file_path.suffix == CSV:
             return pd.DataFrame(pd.read_csv(file_path, usecols=usecols, dtype=dtype))  # type: ignore[arg-type]
         elif file_path.suffix == XLSX:
-            buffer = io.BytesIO(read_file_bytes(file_path))
-            with pd.ExcelFile(buffer) as excel_file:
+            def read_sheet_from(excel_file: pd.ExcelFile):
                 sheet_name = find_sheet_method(excel_file) if find_sheet_method else None
-                result = pd.read_excel(
+                return pd.read_excel(
                     excel_file,
                     sheet_name=sheet_name or "Sheet1",
                     usecols=usecols,
                     dtype=dtype,
                 )
+
+            result = read_workbook(
+                read_file_bytes(file_path), read_sheet_from, engine=engine, label=file_path.name
+            )
             if isinstance(result, dict):
                 raise ValueError(f"Unexpected dict result from read_excel for {file_path}")
             return pd.DataFrame(result)
         else:
             raise ValueError(f"Unsupported file format: {file_path.suffix}")
 
-    def _validate_and_clean_sales_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        is_valid, errors = self.validator.validate_sales_data(df)
+    def _validate_and_clean_sales_data(
+            self, df: pd.DataFrame, required: set[str] | None = None
+    ) -> pd.DataFrame:
+        is_valid, errors = self.validator.validate_sales_data(df, required)
         if not is_valid:
             logger.error("Sales data validation failed: %s", errors)
             raise ValueError(f"Invalid sales data: {errors}")
 
-        df["data"] = pd.to_datetime(df["data"])
+        if "data" in df.columns:
+            df["data"] = pd.to_datetime(df["data"])
         df = pd.DataFrame(df.dropna(how="all"))
         return df
 
@@ -401,53 +424,73 @@ class SalesDataLoader:
             df["source_file"] = file_path.name
         return df
 
-    def load_sales_file(self, file_path: Path) -> pd.DataFrame:
+    def load_sales_file(self, file_path: Path, columns: list[str] | None = None) -> pd.DataFrame:
         logger.info("Loading sales file: %s", file_path.name)
 
         sales_cols = ["order_id", "data", "sku", "ilosc", "cena", "razem"]
-        dtype = get_optimal_sales_dtypes()
-        dtype_without_date = {k: v for k, v in dtype.items() if k != "data"}
-
+        if columns is not None:
+            sales_cols = [col for col in sales_cols if col in columns]
         df = self._read_file(
             file_path,
             self.validator.find_sales_sheet,
             usecols=sales_cols,
-            dtype=dtype_without_date,
+            dtype=SALES_SCHEMA.read_dtypes(sales_cols),
+            engine=self.excel_engine,
         )
-        df = self._validate_and_clean_sales_data(df)
+        df = self._validate_and_clean_sales_data(df, set(sales_cols))
         df = self._add_sales_metadata(df, file_path)
-        df = optimize_dtypes(df)
+        if columns is not None:
+            df = pd.DataFrame(df[[col for col in df.columns if col in columns]])
+        df = SALES_SCHEMA.cast(df)
 
         logger.info("Loaded %d sales records from %s", len(df), file_path.name)
         return df
 
-    def _validate_and_filter_stock_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        is_valid, errors = self.validator.validate_stock_data(df)
+    def _validate_and_filter_stock_data(
+            self, df: pd.DataFrame, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        required = None
+        if columns is not None:
+            required = {
+                col for col in self.validator.STOCK_COLUMNS if col in columns or col == "aktywny"
+            }
+        is_valid, errors = self.validator.validate_stock_data(df, required)
         if not is_valid:
             logger.error("Stock data validation failed: %s", errors)
             raise ValueError(f"Invalid stock data: {errors}")
 
+        output_cols = ["sku", "nazwa", "cena_netto", "available_stock"]
+        if columns is not None:
+            output_cols = [col for col in output_cols if col in columns]
+
         df = pd.DataFrame(df[df["aktywny"] == 1])
-        return pd.DataFrame(df[["sku", "nazwa", "cena_netto", "available_stock"]].copy())
+        return pd.DataFrame(df[output_cols].copy())
 
-    def load_stock_file(self, file_path: Path) -> pd.DataFrame:
+    def load_stock_file(self, file_path: Path, columns: list[str] | None = None) -> pd.DataFrame:
         logger.info("Loading stock file: %s", file_path.name)
 
         stock_cols = list(self.validator.STOCK_COLUMNS)
-        df = self._read_file(file_path, self.validator.find_stock_sheet, usecols=stock_cols)
-        df = self._validate_and_filter_stock_data(df)
-        df = optimize_dtypes(df)
+        if columns is not None:
+            stock_cols = [col for col in stock_cols if col in columns or col == "aktywny"]
+        df = self._read_file(
+            file_path, self.validator.find_stock_sheet, usecols=stock_cols, engine=self.excel_engine
+        )
+        df = self._validate_and_filter_stock_data(df, columns)
+        df = STOCK_SCHEMA.cast(df)
 
         logger.info("Loaded %d active SKUs", len(df))
         return df
 
-    def _validate_and_prepare_forecast_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        is_valid, errors = self.validator.validate_forecast_data(df)
+    def _validate_and_prepare_forecast_data(
+            self, df: pd.DataFrame, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        required = None if columns is None else self.validator.FORECAST_COLUMNS & set(columns)
+        is_valid, errors = self.validator.validate_forecast_data(df, required)
         if not is_valid:
             logger.error("Forecast data validation failed: %s", errors)
             raise ValueError(f"Invalid forecast data: {errors}")
 
-        required_cols = ["data", "sku", "forecast"]
+        required_cols = [col for col in ["data", "sku", "forecast"] if col in df.columns]
         if "model" in df.columns:
             required_cols.append("model")
 
@@ -458,14 +501,17 @@ class SalesDataLoader:
 
         return df
 
-    def load_forecast_file(self, file_path: Path) -> pd.DataFrame:
+    def load_forecast_file(self, file_path: Path, columns: list[str] | None = None) -> pd.DataFrame:
         logger.info("Loading forecast file: %s", file_path.name)
 
-        df = self._read_file(file_path, self.validator.find_forecast_sheet)
-        df = self._validate_and_prepare_forecast_data(df)
-        df = optimize_dtypes(df)
+        usecols = None if columns is None else set(columns).__contains__
+        df = self._read_file(
+            file_path, self.validator.find_forecast_sheet, usecols=usecols, engine=self.excel_engine
+        )
+        df = self._validate_and_prepare_forecast_data(df, columns)
+        df = FORECAST_SCHEMA.cast(df)
 
-        logger.info("Loaded %d forecast records for %d SKUs", len(df), df['sku'].nunique())
+        logger.info("Loaded %d forecast records from %s", len(df), file_path.name)
         return df
 
     def _load_single_sales_file(self, file_info: tuple[Path, datetime, datetime]) -> pd.DataFrame:
@@ -485,7 +531,7 @@ class SalesDataLoader:
         )
 
         consolidated_df = pd.concat(all_dataframes, ignore_index=True)
-        consolidated_df = optimize_dtypes(consolidated_df, verbose=False)
+        consolidated_df = SALES_SCHEMA.cast(consolidated_df)
 
         logger.info(
             "Consolidation complete: %d rows, %d orders, %d SKUs",
@@ -515,13 +561,19 @@ class SalesDataLoader:
         if file_path.suffix == CSV:
             return pd.read_csv(file_path)
         elif file_path.suffix == XLSX:
-            buffer = io.BytesIO(read_file_bytes(file_path))
-            with pd.ExcelFile(buffer, engine="openpyxl") as excel_file:
-                sheet_name = self.validator.find_model_metadata_sheet(excel_file)
-                if sheet_name:
-                    return pd.read_excel(excel_file, sheet_name=sheet_name)
-                logger.warning("Could not find valid sheet with metadata columns")
-                return None
+            return read_workbook(
+                read_file_bytes(file_path),
+                self._read_model_metadata_sheet,
+                engine=self.excel_engine,
+                label=file_path.name,
+            )
+        return None
+
+    def _read_model_metadata_sheet(self, excel_file: pd.ExcelFile) -> pd.DataFrame | None:
+        sheet_name = self.validator.find_model_metadata_sheet(excel_file)
+        if sheet_name:
+            return pd.DataFrame(pd.read_excel(excel_file, sheet_name=sheet_name))
+        logger.warning("Could not find valid sheet with metadata columns")
         return None
 
     def _validate_and_prepare_metadata(self, df: pd.DataFrame) -> pd.DataFrame | None:
@@ -572,13 +624,16 @@ class SalesDataLoader:
             return None
 
     def _read_bom_sheet(self, file_path: Path) -> pd.DataFrame | None:
-        buffer = io.BytesIO(read_file_bytes(file_path))
-        with pd.ExcelFile(buffer, engine="openpyxl") as excel_file:
+        def read_bom(excel_file: pd.ExcelFile) -> pd.DataFrame | None:
             sheet_name = self.validator.find_bom_sheet(excel_file)
             if not sheet_name:
                 logger.warning("Could not find BOM sheet in %s", file_path)
                 return None
-            return pd.read_excel(excel_file, sheet_name=sheet_name)
+            return pd.DataFrame(pd.read_excel(excel_file, sheet_name=sheet_name))
+
+        return read_workbook(
+            read_file_bytes(file_path), read_bom, engine=self.excel_engine, label=file_path.name
+        )
 
     @staticmethod
     def _clean_bom_boolean(value) -> bool:
@@ -671,13 +726,16 @@ class SalesDataLoader:
             return None
 
     def _read_material_catalog_sheet(self, file_path: Path) -> pd.DataFrame | None:
-        buffer = io.BytesIO(read_file_bytes(file_path))
-        with pd.ExcelFile(buffer, engine="openpyxl") as excel_file:
+        def read_catalog(excel_file: pd.ExcelFile) -> pd.DataFrame | None:
             sheet_name = self.validator.find_material_catalog_sheet(excel_file)
             if not sheet_name:
                 logger.warning("Could not find material catalog sheet in %s", file_path)
                 return None
-            return pd.read_excel(excel_file, sheet_name=sheet_name)
+            return pd.DataFrame(pd.read_excel(excel_file, sheet_name=sheet_name))
+
+        return read_workbook(
+            read_file_bytes(file_path), read_catalog, engine=self.excel_engine, label=file_path.name
+        )
 
     def load_material_catalog(self) -> pd.DataFrame | None:
         file_path = self.find_model_metadata_file()
@@ -752,7 +810,7 @@ class SalesDataLoader:
             return {}
 
         try:
-            df = pd.read_excel(file_path, sheet_name='kolory', engine='openpyxl')
+            df = read_sheet(file_path, sheet_name="kolory", engine=self.excel_engine)
             df = pd.DataFrame(df[["NUMER", "KOLOR"]].copy())
             df = pd.DataFrame(df.dropna(subset=["NUMER", "KOLOR"]))
             df["NUMER"] = df["NUMER"].astype(str).str.replace('*', '', regex=False).str[:2].str.zfill(2).str.upper()
@@ -788,7 +846,7 @@ class SalesDataLoader:
             sheet_name = self.validator.find_category_sheet(Path(file_path))
             if sheet_name is None:
                 raise ValueError("No category sheet found")
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
+            df = read_sheet(Path(file_path), sheet_name=sheet_name, engine=self.excel_engine)
             df = pd.DataFrame(df[list(self.validator.CATEGORY_COLUMNS)])  # type: ignore[index]
             df = pd.DataFrame(df.dropna(subset=["Model"]))
             df["Model"] = pd.Series(df["Model"]).astype(str).str.strip().str.upper()
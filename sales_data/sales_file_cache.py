@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from utils.logging_config import get_logger
+from utils.parallel_loader import parallel_load
+
+from .cache_io import directory_lock, temp_path
+from .dtype_schema import SALES_SCHEMA
+from .loader import SalesDataLoader, read_file_bytes
+
+logger = get_logger("sales_file_cache")
+
+MANIFEST_FILE = "manifest.json"
+CACHE_FORMAT_VERSION = 2
+
+
+class SalesFileCache:
+    def __init__(self, cache_dir: Path, loader: SalesDataLoader) -> None:
+        self.cache_dir = cache_dir
+        self.loader = loader
+        self._manifest_path = cache_dir / MANIFEST_FILE
+
+    def consolidate(self) -> pd.DataFrame:
+        with directory_lock(self.cache_dir):
+            frames = [pd.read_parquet(fragment) for fragment in self.refresh()]
+
+        if not frames:
+            raise ValueError(f"No sales data could be loaded from {self.loader.sales_dir}")
+
+        consolidated_df = pd.concat(frames, ignore_index=True)
+        consolidated_df = SALES_SCHEMA.cast(consolidated_df)
+
+        logger.info(
+            "Consolidation complete: %d rows, %d orders, %d SKUs",
+            len(consolidated_df),
+            consolidated_df["order_id"].nunique(),
+            consolidated_df["sku"].nunique(),
+        )
+        return consolidated_df
+
+    def refresh(self) -> list[Path]:
+        with directory_lock(self.cache_dir):
+            return self._refresh()
+
+    def _refresh(self) -> list[Path]:
+        files_info = self.loader.find_data_files()
+
+        if not files_info:
+            raise ValueError(f"No data files found in {self.loader.sales_dir}")
+
+        manifest = self._read_manifest()
+        fresh_manifest: dict[str, dict[str, Any]] = {}
+        stale: list[tuple[Path, datetime, datetime]] = []
+
+        for file_info in files_info:
+            key = str(file_info[0])
+            entry = manifest.get(key)
+            if entry is not None and self._is_unchanged(file_info[0], entry):
+                fresh_manifest[key] = entry
+            else:
+                stale.append(file_info)
+
+        logger.info(
+            "Sales cache: %d of %d file(s) served from cache",
+            len(fresh_manifest),
+            len(files_info),
+        )
+
+        if stale:
+            logger.info("Sales cache: %d file(s) to parse", len(stale))
+            refreshed = parallel_load(
+                [(file_info, manifest.get(str(file_info[0]))) for file_info in stale],
+                self._refresh_fragment,
+                desc="Refreshing sales cache",
+            )
+            for key, entry in refreshed:
+                fresh_manifest[key] = entry
+
+        self._write_manifest(fresh_manifest)
+        self._remove_orphan_fragments(fresh_manifest)
+
+        return [
+            self.cache_dir / fresh_manifest[str(path)]["fragment"]
+            for path, _, _ in files_info
+            if str(path) in fresh_manifest
+        ]
+
+    def clear(self) -> None:
+        if not self.cache_dir.exists():
+            return
+        with directory_lock(self.cache_dir):
+            for fragment in self.cache_dir.glob("*.parquet"):
+                fragment.unlink(missing_ok=True)
+            self._manifest_path.unlink(missing_ok=True)
+        logger.info("Sales cache cleared: %s", self.cache_dir)
+
+    def _is_unchanged(self, file_path: Path, entry: dict[str, Any]) -> bool:
+        if not (self.cache_dir / entry["fragment"]).exists():
+            return False
+        try:
+            stat_result = file_path.stat()
+        except OSError:
+            return False
+        return entry["size"] == stat_result.st_size and entry["mtime_ns"] == stat_result.st_mtime_ns
+
+    def _refresh_fragment(
+        self, item: tuple[tuple[Path, datetime, datetime], dict[str, Any] | None]
+    ) -> tuple[str, dict[str, Any]]:
+        (file_path, _, _), previous = item
+        stat_result = file_path.stat()
+        content_hash = hashlib.sha256(read_file_bytes(file_path)).hexdigest()
+        fragment_name = f"{file_path.stem}_{content_hash[:16]}.parquet"
+
+        has_previous = previous is not None and (self.cache_dir / previous["fragment"]).exists()
+        if previous is None or previous["sha256"] != content_hash or not has_previous:
+            try:
+                df = self.loader.load_sales_file(file_path)
+            except Exception as e:
+                if previous is None or not has_previous:
+                    raise
+                logger.warning(
+                    "Sales cache: could not re-parse %s, keeping %s: %s",
+                    file_path.name,
+                    previous["fragment"],
+                    e,
+                )
+                return str(file_path), previous
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fragment_path = self.cache_dir / fragment_name
+            tmp_path = temp_path(fragment_path)
+            try:
+                df.to_parquet(tmp_path, compression="snappy", index=False)
+                os.replace(tmp_path, fragment_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+            logger.info("Sales cache: stored %s (%d rows)", fragment_name, len(df))
+        else:
+            fragment_name = previous["fragment"]
+            logger.info("Sales cache: %s touched but content unchanged", file_path.name)
+
+        return str(file_path), {
+            "size": stat_result.st_size,
+            "mtime_ns": stat_result.st_mtime_ns,
+            "sha256": content_hash,
+            "fragment": fragment_name,
+        }
+
+    def _read_manifest(self) -> dict[str, dict[str, Any]]:
+        if not self._manifest_path.exists():
+            return {}
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Could not read sales cache manifest %s: %s", self._manifest_path, e)
+            return {}
+        if manifest.get("version") != CACHE_FORMAT_VERSION:
+            logger.info("Sales cache format changed, rebuilding")
+            return {}
+        return manifest.get("files", {})
+
+    def _write_manifest(self, files: dict[str, dict[str, Any]]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = temp_path(self._manifest_path)
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_FORMAT_VERSION, "files": files}, f, indent=2)
+            os.replace(tmp_path, self._manifest_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _remove_orphan_fragments(self, files: dict[str, dict[str, Any]]) -> None:
+        referenced = {entry["fragment"] for entry in files.values()}
+        for fragment in self.cache_dir.glob("*.parquet"):
+            if fragment.name not in referenced:
+                fragment.unlink(missing_ok=True)
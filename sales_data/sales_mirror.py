@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from utils.logging_config import get_logger
+
+from .cache_io import temp_path
+from .data_plane import freeze_frame, frozen_view
+from .data_source import select_columns, slice_by_date
+from .dtype_schema import SALES_SCHEMA
+
+logger = get_logger("sales_mirror")
+
+MIRROR_FILE = "sales.parquet"
+STATE_FILE = "state.json"
+MIRROR_FORMAT_VERSION = 1
+WATERMARK_OVERLAP = timedelta(minutes=5)
+DEFAULT_SYNC_INTERVAL = 60.0
+DEFAULT_COUNT_INTERVAL = 3600.0
+
+ChangeFetcher = Callable[[datetime | None], pd.DataFrame]
+RowCounter = Callable[[], int]
+
+
+class SalesMirror:
+    def __init__(
+            self,
+            mirror_dir: Path,
+            source_key: str,
+            fetch_changes: ChangeFetcher,
+            count_rows: RowCounter,
+            sync_interval: float = DEFAULT_SYNC_INTERVAL,
+            count_interval: float = DEFAULT_COUNT_INTERVAL,
+    ) -> None:
+        self.mirror_dir = mirror_dir
+        self.source_key = source_key
+        self.sync_interval = sync_interval
+        self.count_interval = count_interval
+        self._fetch_changes = fetch_changes
+        self._count_rows = count_rows
+        self._frame: pd.DataFrame | None = None
+        self._watermark: datetime | None = None
+        self._synced_at = 0.0
+        self._counted_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def _mirror_path(self) -> Path:
+        return self.mirror_dir / MIRROR_FILE
+
+    @property
+    def _state_path(self) -> Path:
+        return self.mirror_dir / STATE_FILE
+
+    def load(
+            self,
+            start_date: datetime | None = None,
+            end_date: datetime | None = None,
+            columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        frame = self.sync()
+
+        rows = slice_by_date(frame, start_date, end_date).drop(columns=["id"])
+        if columns is not None:
+            rows = select_columns(rows, columns)
+        return frozen_view(rows)
+
+    def sync(self, force: bool = False) -> pd.DataFrame:
+        with self._lock:
+            if self._frame is None:
+                self._restore()
+
+            due = time.monotonic() - self._synced_at >= self.sync_interval
+            if self._frame is None or self._watermark is None:
+                self._full_sync()
+            elif force or due:
+                self._incremental_sync(force)
+
+            assert self._frame is not None
+            return self._frame
+
+    def version(self, refresh: bool = False) -> str:
+        frame = self.sync(force=refresh)
+        with self._lock:
+            watermark = self._watermark
+        return f"{watermark.isoformat() if watermark else 'none'}_{len(frame)}"
+
+    def resync(self) -> None:
+        with self._lock:
+            self._full_sync()
+
+    def _full_sync(self) -> None:
+        logger.info("Sales mirror: full download from database")
+        changes = self._fetch_changes(None)
+        frame = self._valid_rows(changes)
+        self._store(frame, self._max_updated_at(changes, None))
+        self._counted_at = time.monotonic()
+        logger.info("Sales mirror: stored %d rows", len(frame))
+
+    def _incremental_sync(self, verify_count: bool = False) -> None:
+        assert self._frame is not None and self._watermark is not None
+        changes = self._fetch_changes(self._watermark - WATERMARK_OVERLAP)
+        self._synced_at = time.monotonic()
+
+        if not changes.empty:
+            current = self._frame
+            kept = current[~current["id"].isin(changes["id"])]
+            valid = self._valid_rows(changes)
+            removed = len(current) - len(kept) - (len(changes) - len(valid))
+            merged = pd.concat([kept, valid], ignore_index=True)
+            self._store(merged, self._max_updated_at(changes, self._watermark))
+            logger.info(
+                "Sales mirror: applied %d changed row(s), %d tombstone(s), %d row(s) replaced",
+                len(valid),
+                len(changes) - len(valid),
+                max(removed, 0),
+            )
+
+        if not verify_count and time.monotonic() - self._counted_at < self.count_interval:
+            return
+        expected = self._count_rows()
+        self._counted_at = time.monotonic()
+        if expected != len(self._frame):
+            logger.warning(
+                "Sales mirror has %d rows but database has %d, resyncing",
+                len(self._frame),
+                expected,
+            )
+            self._full_sync()
+
+    @staticmethod
+    def _valid_rows(changes: pd.DataFrame) -> pd.DataFrame:
+        valid = changes[changes["is_valid"] == 1]
+        return pd.DataFrame(valid.drop(columns=["is_valid", "updated_at"]))
+
+    @staticmethod
+    def _max_updated_at(changes: pd.DataFrame, fallback: datetime | None) -> datetime | None:
+        if changes.empty:
+            return fallback
+        latest = pd.Timestamp(changes["updated_at"].max()).to_pydatetime()
+        return latest if fallback is None else max(latest, fallback)
+
+    def _store(self, frame: pd.DataFrame, watermark: datetime | None) -> None:
+        frame = frame.sort_values(["data", "sku"], kind="stable", na_position="last")
+        frame = frame.reset_index(drop=True)
+        frame = SALES_SCHEMA.cast(frame)
+
+        self.mirror_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = temp_path(self._mirror_path)
+        try:
+            frame.to_parquet(tmp_path, compression="snappy", index=False)
+            os.replace(tmp_path, self._mirror_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._write_state(watermark, len(frame))
+
+        self._frame = freeze_frame(frame)
+        self._watermark = watermark
+        self._synced_at = time.monotonic()
+
+    def _restore(self) -> None:
+        state = self._read_state()
+        if state is None or not self._mirror_path.exists():
+            return
+        try:
+            frame = pd.read_parquet(self._mirror_path)
+        except Exception as e:
+            logger.warning("Could not read sales mirror %s: %s", self._mirror_path, e)
+            return
+        if len(frame) != state.get("rows"):
+            logger.warning("Sales mirror row count does not match its state file, ignoring it")
+            return
+
+        watermark = state.get("watermark")
+        self._frame = freeze_frame(SALES_SCHEMA.cast(frame))
+        self._watermark = datetime.fromisoformat(watermark) if watermark else None
+        logger.info("Sales mirror: restored %d rows (watermark %s)", len(frame), watermark)
+
+    def _read_state(self) -> dict[str, Any] | None:
+        if not self._state_path.exists():
+            return None
+        try:
+            with open(self._state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Could not read sales mirror state %s: %s", self._state_path, e)
+            return None
+        if state.get("version") != MIRROR_FORMAT_VERSION or state.get("source") != self.source_key:
+            logger.info("Sales mirror belongs to another database or format, rebuilding")
+            return None
+        return state
+
+    def _write_state(self, watermark: datetime | None, rows: int) -> None:
+        tmp_path = temp_path(self._state_path)
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "version": MIRROR_FORMAT_VERSION,
+                        "source": self.source_key,
+                        "watermark": watermark.isoformat() if watermark else None,
+                        "rows": rows,
+                    },
+                    f,
+                    indent=2,
+                )
+            os.replace(tmp_path, self._state_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+
+_mirrors: dict[tuple[Path, str], SalesMirror] = {}
+_mirrors_lock = threading.Lock()
+
+
+def get_sales_mirror(
+        mirror_dir: Path,
+        source_key: str,
+        fetch_changes: ChangeFetcher,
+        count_rows: RowCounter,
+) -> SalesMirror:
+    key = (mirror_dir.resolve(), source_key)
+    with _mirrors_lock:
+        mirror = _mirrors.get(key)
+        if mirror is None:
+            mirror = SalesMirror(mirror_dir, source_key, fetch_changes, count_rows)
+            _mirrors[key] = mirror
+        return mirror
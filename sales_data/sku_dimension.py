@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.logging_config import get_logger
+
+logger = get_logger("sku_dimension")
+
+SKU_ATTRIBUTES = ("model", "color", "size", "model_color", "age_group")
+
+CHILDREN_PREFIXES = ("ch", "ni", "dz")
+ADULT_PREFIXES = ("do", "ju")
+
+AGE_GROUP_CHILDREN = "children"
+AGE_GROUP_ADULT = "adult"
+
+
+def _age_groups(skus: pd.Series) -> pd.Series:
+    prefix = skus.str[:2].str.lower()
+    age_group = pd.Series(np.nan, index=skus.index, dtype=object)
+    age_group[prefix.isin(CHILDREN_PREFIXES)] = AGE_GROUP_CHILDREN
+    age_group[prefix.isin(ADULT_PREFIXES)] = AGE_GROUP_ADULT
+    return age_group
+
+
+def _parse_attributes(skus: pd.Index) -> dict[str, pd.Series]:
+    sku_str = pd.Series(skus, dtype=object)
+    return {
+        "model": sku_str.str[:5],
+        "color": sku_str.str[5:7],
+        "size": sku_str.str[7:9],
+        "model_color": sku_str.str[:7],
+        "age_group": _age_groups(sku_str),
+    }
+
+
+class SkuDimension:
+    def __init__(self, skus: pd.Index) -> None:
+        self.skus = pd.Index(skus.astype(str).unique(), dtype=object)
+        self.codes: dict[str, np.ndarray] = {}
+        self.levels: dict[str, pd.Index] = {}
+        for attribute, values in _parse_attributes(self.skus).items():
+            codes, levels = pd.factorize(values, sort=True)
+            self.codes[attribute] = codes.astype(np.int32)
+            self.levels[attribute] = pd.Index(levels, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def lookup(self, skus: pd.Index) -> np.ndarray:
+        return self.skus.get_indexer(skus.astype(str))
+
+    def extend(self, skus: pd.Index) -> SkuDimension:
+        new_skus = pd.Index(skus.astype(str).unique(), dtype=object)
+        new_skus = new_skus[self.skus.get_indexer(new_skus) < 0]
+        if new_skus.empty:
+            return self
+
+        dimension = SkuDimension.__new__(SkuDimension)
+        dimension.skus = self.skus.append(new_skus)
+        dimension.codes = {}
+        dimension.levels = {}
+        for attribute, values in _parse_attributes(new_skus).items():
+            old_levels = self.levels[attribute]
+            levels = old_levels.union(pd.Index(values.dropna().unique(), dtype=object))
+            remap = np.append(levels.get_indexer(old_levels), -1).astype(np.int32)
+            dimension.codes[attribute] = np.concatenate([
+                remap[self.codes[attribute]],
+                levels.get_indexer(values).astype(np.int32),
+            ])
+            dimension.levels[attribute] = levels
+        return dimension
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame({"sku": self.skus})
+        for attribute in SKU_ATTRIBUTES:
+            frame[f"{attribute}_code"] = self.codes[attribute]
+        return frame
+
+
+_dimension: SkuDimension | None = None
+_dimension_lock = threading.Lock()
+
+
+def get_sku_dimension(skus: pd.Index) -> SkuDimension:
+    global _dimension
+
+    with _dimension_lock:
+        dimension = _dimension
+        if dimension is None:
+            dimension = SkuDimension(skus)
+        elif (dimension.lookup(skus) < 0).any():
+            dimension = dimension.extend(skus)
+        else:
+            return dimension
+        _dimension = dimension
+        logger.debug("SKU dimension extended to %d SKUs", len(dimension))
+        return dimension
+
+
+def reset_sku_dimension() -> None:
+    global _dimension
+
+    with _dimension_lock:
+        _dimension = None
+
+
+def _row_positions(sku: pd.Series) -> tuple[SkuDimension, np.ndarray]:
+    if isinstance(sku.dtype, pd.CategoricalDtype):
+        row_codes = sku.cat.codes.to_numpy()
+        uniques = pd.Index(sku.cat.categories)
+    else:
+        row_codes, uniques = pd.factorize(sku)
+        uniques = pd.Index(uniques)
+
+    dimension = get_sku_dimension(uniques)
+    positions = dimension.lookup(uniques)
+    return dimension, np.where(row_codes >= 0, positions[row_codes], -1)
+
+
+def sku_attribute_codes(sku: pd.Series, attribute: str) -> np.ndarray:
+    dimension, positions = _row_positions(sku)
+    attribute_codes = dimension.codes[attribute]
+    return np.where(positions >= 0, attribute_codes[positions], -1).astype(np.int32)
+
+
+def sku_attribute(sku: pd.Series, attribute: str) -> pd.Series:
+    dimension, positions = _row_positions(sku)
+    attribute_codes = np.where(positions >= 0, dimension.codes[attribute][positions], -1)
+    values = pd.Categorical.from_codes(attribute_codes, categories=dimension.levels[attribute])
+    return pd.Series(values, index=sku.index, name=attribute)
+
+
+def sku_labels(sku: pd.Series, attribute: str) -> pd.Series:
+    return sku_attribute(sku, attribute).astype(object)
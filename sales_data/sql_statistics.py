@@ -0,0 +1,622 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from utils.logging_config import get_logger
+
+from .analysis.inventory_metrics import calculate_forecast_date_range
+from .analysis.order_priority import extract_priority_config
+
+logger = get_logger("sql_statistics")
+
+ENTITY_COLUMNS = {"sku": "sku", "model": "model"}
+
+DEFAULT_CACHE_SLOTS = 4
+SLOT_TOUCH_INTERVAL = timedelta(minutes=10)
+ORDER_PRIORITIES_CACHE = "order_priorities"
+
+SKU_STATISTICS_COLUMNS = """entity_id                as "SKU",
+                   months_with_sales        as "MONTHS",
+                   total_quantity           as "QUANTITY",
+                   average_monthly_sales    as "AVERAGE SALES",
+                   standard_deviation       as "SD",
+                   coefficient_of_variation as "CV",
+                   product_type             as "TYPE",
+                   safety_stock             as "SS",
+                   reorder_point            as "ROP",
+                   first_sale_date,
+                   last_2y_avg_monthly      as "LAST_2_YEARS_AVG",
+                   is_seasonal,
+                   seasonal_ss_in,
+                   seasonal_ss_out,
+                   seasonal_rop_in,
+                   seasonal_rop_out,
+                   computed_at,
+                   configuration_hash"""
+
+ORDER_PRIORITY_COLUMNS = """sku               as "SKU",
+                   model             as "MODEL",
+                   color             as "COLOR",
+                   size              as "SIZE",
+                   priority_score    as "PRIORITY_SCORE",
+                   stockout_risk     as "STOCKOUT_RISK",
+                   revenue_impact    as "REVENUE_IMPACT",
+                   revenue_at_risk   as "REVENUE_AT_RISK",
+                   current_stock     as "STOCK",
+                   reorder_point     as "ROP",
+                   deficit           as "DEFICIT",
+                   forecast_leadtime as "FORECAST_LEADTIME",
+                   coverage_gap      as "COVERAGE_GAP",
+                   product_type      as "TYPE",
+                   type_multiplier   as "TYPE_MULTIPLIER",
+                   is_urgent         as "URGENT",
+                   computed_at,
+                   configuration_hash"""
+
+_STATISTICS_CTES = """
+    config AS (
+        SELECT CAST(:lead_time AS float8)      AS lead_time,
+               CAST(:cv_basic AS float8)       AS cv_basic,
+               CAST(:cv_seasonal AS float8)    AS cv_seasonal,
+               CAST(:z_basic AS float8)        AS z_basic,
+               CAST(:z_regular AS float8)      AS z_regular,
+               CAST(:z_seasonal_in AS float8)  AS z_seasonal_in,
+               CAST(:z_seasonal_out AS float8) AS z_seasonal_out,
+               CAST(:z_new AS float8)          AS z_new
+    ),
+    monthly AS (
+        SELECT {entity_column}                                                AS entity_id,
+               DATE_TRUNC('month', sale_date)                                 AS month_start,
+               SUM(quantity)::float8                                          AS quantity,
+               SUM(quantity) FILTER (WHERE sale_date >= :recent_since)::float8 AS recent_quantity,
+               COUNT(*) FILTER (WHERE sale_date >= :recent_since)             AS recent_rows,
+               MIN(sale_date)                                                 AS first_sale,
+               MAX(sale_date)                                                 AS last_sale
+        FROM raw_sales_transactions
+        WHERE is_valid = TRUE
+          AND {entity_column} IS NOT NULL
+        GROUP BY 1, 2
+    ),
+    summary AS (
+        SELECT entity_id,
+               COUNT(*)                                           AS months_with_sales,
+               SUM(quantity)                                      AS total_quantity,
+               AVG(quantity)                                      AS average_sales,
+               STDDEV_SAMP(quantity)                              AS standard_deviation,
+               MIN(first_sale)                                    AS first_sale,
+               AVG(recent_quantity) FILTER (WHERE recent_rows > 0) AS last_2y_avg
+        FROM monthly
+        GROUP BY entity_id
+    ),
+    seasonal_months AS (
+        SELECT entity_id,
+               EXTRACT(MONTH FROM month_start) AS month_number,
+               AVG(recent_quantity)            AS avg_sales
+        FROM monthly
+        WHERE recent_rows > 0
+        GROUP BY 1, 2
+    ),
+    seasonal_indices AS (
+        SELECT entity_id,
+               month_number,
+               avg_sales / NULLIF(AVG(avg_sales) OVER (PARTITION BY entity_id), 0) AS seasonal_index
+        FROM seasonal_months
+    ),
+    classified AS (
+        SELECT s.*,
+               CASE
+                   WHEN s.average_sales <> 0
+                       THEN COALESCE(s.standard_deviation / s.average_sales, 0)
+                   WHEN s.standard_deviation > 0 THEN 'Infinity'::float8
+                   ELSE 0
+               END                                     AS cv,
+               COALESCE(si.seasonal_index > 1.2, FALSE) AS is_in_season
+        FROM summary s
+                 LEFT JOIN seasonal_indices si
+                           ON si.entity_id = s.entity_id AND si.month_number = :current_month
+    ),
+    typed AS (
+        SELECT c.*,
+               cfg.*,
+               CASE
+                   WHEN c.first_sale > :new_since THEN 'new'
+                   WHEN c.cv > cfg.cv_seasonal THEN 'seasonal'
+                   WHEN c.cv < cfg.cv_basic THEN 'basic'
+                   ELSE 'regular'
+               END AS product_type
+        FROM classified c
+                 CROSS JOIN config cfg
+    ),
+    z_scored AS (
+        SELECT t.*,
+               CASE t.product_type
+                   WHEN 'basic' THEN t.z_basic
+                   WHEN 'regular' THEN t.z_regular
+                   WHEN 'new' THEN t.z_new
+                   WHEN 'seasonal' THEN CASE
+                                            WHEN t.is_in_season THEN t.z_seasonal_in
+                                            ELSE t.z_seasonal_out
+                                        END
+               END                                                           AS z_score,
+               t.standard_deviation * SQRT(t.lead_time)                      AS lead_time_sd,
+               t.average_sales * t.lead_time                                 AS lead_time_demand
+        FROM typed t
+    ),
+    stats AS (
+        SELECT z.*,
+               ROUND((z.z_score * z.lead_time_sd)::numeric, 2) AS safety_stock,
+               ROUND((z.lead_time_demand + z.z_score * z.lead_time_sd)::numeric, 2)
+                   AS reorder_point,
+               CASE
+                   WHEN z.product_type = 'seasonal'
+                       THEN ROUND((z.z_seasonal_in * z.lead_time_sd)::numeric, 2)
+               END AS ss_in,
+               CASE
+                   WHEN z.product_type = 'seasonal'
+                       THEN ROUND((z.z_seasonal_out * z.lead_time_sd)::numeric, 2)
+               END AS ss_out,
+               CASE
+                   WHEN z.product_type = 'seasonal'
+                       THEN ROUND(
+                           (z.lead_time_demand + z.z_seasonal_in * z.lead_time_sd)::numeric, 2
+                       )
+               END AS rop_in,
+               CASE
+                   WHEN z.product_type = 'seasonal'
+                       THEN ROUND(
+                           (z.lead_time_demand + z.z_seasonal_out * z.lead_time_sd)::numeric, 2
+                       )
+               END AS rop_out
+        FROM z_scored z
+    )"""
+
+_STATISTICS_ROWS_CTE = """
+    statistics_rows AS (
+        SELECT s.entity_id,
+               s.months_with_sales,
+               ROUND(s.total_quantity::numeric, 2)                  AS total_quantity,
+               ROUND(s.average_sales::numeric, 2)                   AS average_monthly_sales,
+               ROUND(COALESCE(s.standard_deviation, 0)::numeric, 2) AS standard_deviation,
+               ROUND(LEAST(s.cv, 9999.9999)::numeric, 4)            AS coefficient_of_variation,
+               s.first_sale::date                                   AS first_sale_date,
+               s.product_type,
+               s.safety_stock,
+               s.reorder_point,
+               s.z_score                                            AS z_score_used,
+               s.lead_time                                          AS lead_time_months,
+               s.product_type = 'seasonal'                          AS is_seasonal,
+               s.ss_in                                              AS seasonal_ss_in,
+               s.ss_out                                             AS seasonal_ss_out,
+               s.rop_in                                             AS seasonal_rop_in,
+               s.rop_out                                            AS seasonal_rop_out,
+               ROUND(s.last_2y_avg::numeric, 2)                     AS last_2y_avg_monthly,
+               CURRENT_TIMESTAMP                                    AS computed_at,
+               (SELECT MAX(last_sale)::date FROM monthly)           AS based_on_data_until,
+               CAST(:configuration_hash AS varchar)                 AS configuration_hash
+        FROM stats s
+    )"""
+
+_SLOT_CTES = """
+    slot AS (
+        INSERT INTO cache_configuration_slots (cache_name, configuration_hash)
+        VALUES (:cache_name, :configuration_hash)
+        ON CONFLICT (cache_name, configuration_hash)
+            DO UPDATE SET created_at   = CURRENT_TIMESTAMP,
+                          last_used_at = CURRENT_TIMESTAMP
+    ),
+    evicted_slots AS (
+        DELETE FROM cache_configuration_slots
+        WHERE cache_name = :cache_name
+          AND configuration_hash IN (
+              SELECT configuration_hash
+              FROM cache_configuration_slots
+              WHERE cache_name = :cache_name
+                AND configuration_hash <> :configuration_hash
+              ORDER BY last_used_at DESC
+              OFFSET :retained_slots
+          )
+        RETURNING configuration_hash
+    )"""
+
+_TOUCH_SLOT_CTE = """
+    touched AS (
+        UPDATE cache_configuration_slots
+        SET last_used_at = CURRENT_TIMESTAMP,
+            hit_count    = hit_count + 1
+        WHERE cache_name = :cache_name
+          AND configuration_hash = :configuration_hash
+          AND last_used_at < CURRENT_TIMESTAMP - :touch_interval
+    )"""
+
+_CACHED_SKU_STATISTICS_QUERY = """
+WITH {touch_slot}
+SELECT {columns}
+FROM mv_valid_sku_stats
+WHERE entity_type = :entity_type
+  AND configuration_hash = :configuration_hash
+ORDER BY total_quantity DESC
+"""
+
+_SKU_STATISTICS_QUERY = """
+WITH {statistics_ctes},{rows_cte}
+SELECT {columns}
+FROM statistics_rows
+ORDER BY total_quantity DESC
+"""
+
+_ORDER_PRIORITY_QUERY = """
+WITH {statistics_ctes},{priority_ctes}
+SELECT {columns}
+FROM priority_rows
+ORDER BY priority_score DESC
+"""
+
+_CACHED_ORDER_PRIORITIES_QUERY = """
+WITH {touch_slot}
+SELECT {columns}
+FROM mv_valid_order_priorities
+WHERE configuration_hash = :configuration_hash
+ORDER BY priority_score DESC
+"""
+
+_SKU_STATISTICS_STATEMENT = """
+WITH {statistics_ctes},{rows_cte},{slot_ctes},
+    version AS (
+        SELECT COALESCE(MAX(cache_version), 0) + 1 AS cache_version
+        FROM cache_sku_statistics
+        WHERE entity_type = :entity_type
+          AND configuration_hash = :configuration_hash
+    ),
+    retired AS (
+        DELETE FROM cache_sku_statistics
+        WHERE entity_type = :entity_type
+          AND (configuration_hash = :configuration_hash
+            OR configuration_hash IN (SELECT configuration_hash FROM evicted_slots))
+    ),
+    stored AS (
+        INSERT INTO cache_sku_statistics (entity_type, entity_id, months_with_sales, total_quantity,
+                                          average_monthly_sales, standard_deviation,
+                                          coefficient_of_variation, first_sale_date, product_type,
+                                          safety_stock, reorder_point, z_score_used,
+                                          lead_time_months, is_seasonal, seasonal_ss_in,
+                                          seasonal_ss_out, seasonal_rop_in, seasonal_rop_out,
+                                          last_2y_avg_monthly, cache_version, computed_at,
+                                          based_on_data_until, configuration_hash, is_valid)
+        SELECT :entity_type,
+               r.entity_id,
+               r.months_with_sales,
+               r.total_quantity,
+               r.average_monthly_sales,
+               r.standard_deviation,
+               r.coefficient_of_variation,
+               r.first_sale_date,
+               r.product_type,
+               r.safety_stock,
+               r.reorder_point,
+               r.z_score_used,
+               r.lead_time_months,
+               r.is_seasonal,
+               r.seasonal_ss_in,
+               r.seasonal_ss_out,
+               r.seasonal_rop_in,
+               r.seasonal_rop_out,
+               r.last_2y_avg_monthly,
+               v.cache_version,
+               r.computed_at,
+               r.based_on_data_until,
+               r.configuration_hash,
+               TRUE
+        FROM statistics_rows r
+                 CROSS JOIN version v
+        RETURNING *
+    )
+SELECT {columns}
+FROM stored
+ORDER BY total_quantity DESC
+"""
+
+_PRIORITY_CTES = """
+    stock AS (
+        SELECT sku,
+               available_stock::float8 AS stock,
+               net_price::float8       AS price
+        FROM stock_snapshots
+        WHERE snapshot_date = (SELECT MAX(snapshot_date) FROM stock_snapshots)
+          AND is_active = TRUE
+    ),
+    forecast_run AS (
+        SELECT MAX(generated_date) AS generated_date
+        FROM forecast_data
+    ),
+    forecast AS (
+        SELECT f.sku,
+               SUM(f.forecast_quantity)::float8 AS forecast_leadtime
+        FROM forecast_data f
+                 JOIN forecast_run r ON f.generated_date = r.generated_date
+        WHERE f.forecast_date >= :forecast_start
+          AND f.forecast_date < :forecast_end
+        GROUP BY f.sku
+    ),
+    inputs AS (
+        SELECT s.entity_id                          AS sku,
+               s.product_type,
+               COALESCE(s.reorder_point::float8, 0) AS rop,
+               COALESCE(st.stock, 0)                AS stock,
+               COALESCE(st.price, 0)                AS price,
+               COALESCE(f.forecast_leadtime, 0)     AS forecast_leadtime
+        FROM stats s
+                 LEFT JOIN stock st ON st.sku = s.entity_id
+                 LEFT JOIN forecast f ON f.sku = s.entity_id
+    ),
+    risk AS (
+        SELECT i.*,
+               CASE
+                   WHEN i.stock <= 0 AND i.forecast_leadtime > 0
+                       THEN CAST(:zero_stock_penalty AS float8)
+                   WHEN i.stock > 0 AND i.stock < i.rop
+                       THEN (i.rop - i.stock) / i.rop * CAST(:below_rop_max AS float8)
+                   ELSE 0
+               END                             AS stockout_risk,
+               i.forecast_leadtime * i.price   AS revenue_at_risk,
+               CASE i.product_type
+                   WHEN 'new' THEN CAST(:multiplier_new AS float8)
+                   WHEN 'seasonal' THEN CAST(:multiplier_seasonal AS float8)
+                   WHEN 'regular' THEN CAST(:multiplier_regular AS float8)
+                   WHEN 'basic' THEN CAST(:multiplier_basic AS float8)
+                   ELSE 1.0
+               END                             AS type_multiplier,
+               MAX(i.forecast_leadtime * i.price) OVER () AS max_revenue_at_risk
+        FROM inputs i
+    ),
+    scored AS (
+        SELECT r.*,
+               CASE
+                   WHEN r.max_revenue_at_risk > 0
+                       THEN r.revenue_at_risk / r.max_revenue_at_risk * 100
+                   ELSE 0
+               END AS revenue_impact
+        FROM risk r
+    ),
+    priority_rows AS (
+        SELECT s.sku,
+               LEFT(s.sku, 5)                                          AS model,
+               SUBSTRING(s.sku FROM 6 FOR 2)                           AS color,
+               SUBSTRING(s.sku FROM 8 FOR 2)                           AS size,
+               ROUND(((s.stockout_risk * CAST(:weight_stockout AS float8)
+                   + s.revenue_impact * CAST(:weight_revenue AS float8)
+                   + LEAST(s.forecast_leadtime, CAST(:demand_cap AS float8))
+                         * CAST(:weight_demand AS float8))
+                   * s.type_multiplier)::numeric, 4)                   AS priority_score,
+               ROUND(s.stockout_risk::numeric, 2)                      AS stockout_risk,
+               ROUND(s.revenue_impact::numeric, 2)                     AS revenue_impact,
+               ROUND(s.revenue_at_risk::numeric, 2)                    AS revenue_at_risk,
+               ROUND(s.stock::numeric, 2)                              AS current_stock,
+               ROUND(s.rop::numeric, 2)                                AS reorder_point,
+               ROUND(GREATEST(s.rop - s.stock, 0)::numeric, 2)         AS deficit,
+               ROUND(s.forecast_leadtime::numeric, 2)                  AS forecast_leadtime,
+               ROUND(GREATEST(s.forecast_leadtime - s.stock, 0)::numeric, 2)
+                   AS coverage_gap,
+               s.product_type,
+               ROUND(s.type_multiplier::numeric, 2)                    AS type_multiplier,
+               s.stock = 0 AND s.forecast_leadtime > 0                 AS is_urgent,
+               CURRENT_TIMESTAMP                                       AS computed_at,
+               r.generated_date                                        AS forecast_generated_date,
+               COALESCE((SELECT MAX(snapshot_date) FROM stock_snapshots), CURRENT_DATE)
+                   AS stock_snapshot_date,
+               CAST(:configuration_hash AS varchar)                    AS configuration_hash
+        FROM scored s
+                 CROSS JOIN forecast_run r
+        WHERE r.generated_date IS NOT NULL
+    )"""
+
+_ORDER_PRIORITY_STATEMENT = """
+WITH {statistics_ctes},{priority_ctes},{slot_ctes},
+    version AS (
+        SELECT COALESCE(MAX(cache_version), 0) + 1 AS cache_version
+        FROM cache_order_priorities
+        WHERE configuration_hash = :configuration_hash
+    ),
+    retired AS (
+        DELETE FROM cache_order_priorities
+        WHERE configuration_hash = :configuration_hash
+           OR configuration_hash IN (SELECT configuration_hash FROM evicted_slots)
+    ),
+    stored AS (
+        INSERT INTO cache_order_priorities (sku, model, color, size, priority_score, stockout_risk,
+                                            revenue_impact, revenue_at_risk, current_stock,
+                                            reorder_point, deficit, forecast_leadtime, coverage_gap,
+                                            product_type, type_multiplier, is_urgent,
+                                            cache_version, computed_at, forecast_generated_date,
+                                            stock_snapshot_date, configuration_hash, is_valid)
+        SELECT p.sku,
+               p.model,
+               p.color,
+               p.size,
+               p.priority_score,
+               p.stockout_risk,
+               p.revenue_impact,
+               p.revenue_at_risk,
+               p.current_stock,
+               p.reorder_point,
+               p.deficit,
+               p.forecast_leadtime,
+               p.coverage_gap,
+               p.product_type,
+               p.type_multiplier,
+               p.is_urgent,
+               v.cache_version,
+               p.computed_at,
+               p.forecast_generated_date,
+               p.stock_snapshot_date,
+               p.configuration_hash,
+               TRUE
+        FROM priority_rows p
+                 CROSS JOIN version v
+        RETURNING *
+    )
+SELECT {columns}
+FROM stored
+ORDER BY priority_score DESC
+"""
+
+
+def _statistics_params(settings: dict, entity_type: str, configuration_hash: str) -> dict[str, Any]:
+    today = datetime.today().replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "entity_type": entity_type,
+        "configuration_hash": configuration_hash,
+        "lead_time": settings["lead_time"],
+        "cv_basic": settings["cv_thresholds"]["basic"],
+        "cv_seasonal": settings["cv_thresholds"]["seasonal"],
+        "z_basic": settings["z_scores"]["basic"],
+        "z_regular": settings["z_scores"]["regular"],
+        "z_seasonal_in": settings["z_scores"]["seasonal_in"],
+        "z_seasonal_out": settings["z_scores"]["seasonal_out"],
+        "z_new": settings["z_scores"]["new"],
+        "new_since": today - timedelta(days=365),
+        "recent_since": today - timedelta(days=730),
+        "current_month": today.month,
+    }
+
+
+def _priority_params(settings: dict, configuration_hash: str) -> dict[str, Any]:
+    config = extract_priority_config(settings)
+    multipliers = config["type_multipliers"]
+    forecast_start, forecast_end = calculate_forecast_date_range(settings.get("forecast_time", 5))
+    return {
+        **_statistics_params(settings, "sku", configuration_hash),
+        "forecast_start": forecast_start.to_pydatetime(),
+        "forecast_end": forecast_end.to_pydatetime(),
+        "zero_stock_penalty": config["zero_stock_penalty"],
+        "below_rop_max": config["below_rop_max"],
+        "weight_stockout": config["weight_stockout"],
+        "weight_revenue": config["weight_revenue"],
+        "weight_demand": config["weight_demand"],
+        "demand_cap": config["demand_cap"],
+        "multiplier_new": multipliers["new"],
+        "multiplier_seasonal": multipliers["seasonal"],
+        "multiplier_regular": multipliers["regular"],
+        "multiplier_basic": multipliers["basic"],
+    }
+
+
+def _statistics_ctes(entity_type: str) -> str:
+    if entity_type not in ENTITY_COLUMNS:
+        raise ValueError(
+            f"Unknown entity type '{entity_type}', expected one of {list(ENTITY_COLUMNS)}"
+        )
+    return _STATISTICS_CTES.format(entity_column=ENTITY_COLUMNS[entity_type])
+
+
+def sku_statistics_cache_name(entity_type: str) -> str:
+    return f"sku_statistics:{entity_type}"
+
+
+def _slot_params(cache_name: str, configuration_hash: str, max_slots: int) -> dict[str, Any]:
+    return {
+        "cache_name": cache_name,
+        "configuration_hash": configuration_hash,
+        "retained_slots": max(max_slots - 1, 0),
+    }
+
+
+def load_cached_sku_statistics(
+        conn: Connection, entity_type: str, configuration_hash: str
+) -> pd.DataFrame:
+    query = _CACHED_SKU_STATISTICS_QUERY.format(
+        touch_slot=_TOUCH_SLOT_CTE, columns=SKU_STATISTICS_COLUMNS
+    )
+    params = {
+        "cache_name": sku_statistics_cache_name(entity_type),
+        "configuration_hash": configuration_hash,
+        "entity_type": entity_type,
+        "touch_interval": SLOT_TOUCH_INTERVAL,
+    }
+    return pd.read_sql_query(text(query), conn, params=params)
+
+
+def load_cached_order_priorities(
+        conn: Connection, configuration_hash: str, top_n: int | None = None
+) -> pd.DataFrame:
+    query = _CACHED_ORDER_PRIORITIES_QUERY.format(
+        touch_slot=_TOUCH_SLOT_CTE, columns=ORDER_PRIORITY_COLUMNS
+    )
+    params: dict[str, Any] = {
+        "cache_name": ORDER_PRIORITIES_CACHE,
+        "configuration_hash": configuration_hash,
+        "touch_interval": SLOT_TOUCH_INTERVAL,
+    }
+    if top_n is not None:
+        query += " LIMIT :top_n"
+        params["top_n"] = top_n
+    return pd.read_sql_query(text(query), conn, params=params)
+
+
+def sku_statistics_query(
+        entity_type: str, settings: dict, configuration_hash: str
+) -> tuple[str, dict[str, Any]]:
+    query = _SKU_STATISTICS_QUERY.format(
+        statistics_ctes=_statistics_ctes(entity_type),
+        rows_cte=_STATISTICS_ROWS_CTE,
+        columns=SKU_STATISTICS_COLUMNS,
+    )
+    return query, _statistics_params(settings, entity_type, configuration_hash)
+
+
+def order_priorities_query(settings: dict, configuration_hash: str) -> tuple[str, dict[str, Any]]:
+    query = _ORDER_PRIORITY_QUERY.format(
+        statistics_ctes=_statistics_ctes("sku"),
+        priority_ctes=_PRIORITY_CTES,
+        columns=ORDER_PRIORITY_COLUMNS,
+    )
+    return query, _priority_params(settings, configuration_hash)
+
+
+def recompute_sku_statistics(
+        conn: Connection,
+        entity_type: str,
+        settings: dict,
+        configuration_hash: str,
+        max_slots: int = DEFAULT_CACHE_SLOTS,
+) -> pd.DataFrame:
+    statement = _SKU_STATISTICS_STATEMENT.format(
+        statistics_ctes=_statistics_ctes(entity_type),
+        rows_cte=_STATISTICS_ROWS_CTE,
+        slot_ctes=_SLOT_CTES,
+        columns=SKU_STATISTICS_COLUMNS,
+    )
+    params = {
+        **_statistics_params(settings, entity_type, configuration_hash),
+        **_slot_params(sku_statistics_cache_name(entity_type), configuration_hash, max_slots),
+    }
+    df = pd.read_sql_query(text(statement), conn, params=params)
+    conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_valid_sku_stats"))
+    logger.info("Recomputed %d %s statistics rows in database", len(df), entity_type)
+    return df
+
+
+def recompute_order_priorities(
+        conn: Connection,
+        settings: dict,
+        configuration_hash: str,
+        max_slots: int = DEFAULT_CACHE_SLOTS,
+) -> pd.DataFrame:
+    statement = _ORDER_PRIORITY_STATEMENT.format(
+        statistics_ctes=_statistics_ctes("sku"),
+        priority_ctes=_PRIORITY_CTES,
+        slot_ctes=_SLOT_CTES,
+        columns=ORDER_PRIORITY_COLUMNS,
+    )
+    params = {
+        **_priority_params(settings, configuration_hash),
+        **_slot_params(ORDER_PRIORITIES_CACHE, configuration_hash, max_slots),
+    }
+    df = pd.read_sql_query(text(statement), conn, params=params)
+    conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_valid_order_priorities"))
+    logger.info("Recomputed %d order priority rows in database", len(df))
+    return df
@@ -4,53 +4,116 @@ from datetime import date, datetime
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 from utils.logging_config import get_logger
 from utils.parallel_loader import parallel_load
 
-from .dtype_optimizer import optimize_dtypes
+from .cache_io import directory_lock, temp_path
+from .dtype_schema import STOCK_HISTORY_SCHEMA
 from .loader import SalesDataLoader
 
 logger = get_logger("stock_history_cache")
 
 _CACHE_COLUMNS = ["sku", "snapshot_date", "available_stock"]
 
+LEGACY_CACHE_FILE = ".stock_history_cache.parquet"
+LEGACY_CACHE_DIR = Path(__file__).parent.parent / "data"
+
+_SNAPSHOT_SCHEMA = pa.schema(
+    [
+        ("sku", pa.string()),
+        ("snapshot_date", pa.timestamp("ns")),
+        ("available_stock", pa.float64()),
+    ]
+)
+_PARTITION_SCHEMA = pa.schema([("year", pa.int16()), ("month", pa.int8())])
+_PARTITIONING = ds.partitioning(_PARTITION_SCHEMA, flavor="hive")
+_DATASET_SCHEMA = pa.unify_schemas([_SNAPSHOT_SCHEMA, _PARTITION_SCHEMA])
+
 
 class StockHistoryCache:
-    def __init__(self, cache_path: Path, loader: SalesDataLoader) -> None:
-        self.cache_path = cache_path
+    def __init__(self, cache_dir: Path, loader: SalesDataLoader) -> None:
+        self.cache_dir = cache_dir
         self.loader = loader
 
     def get_history(
         self,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        skus: list[str] | None = None,
+        columns: list[str] | None = None,
     ) -> pd.DataFrame:
-        self._sync()
+        self.sync()
 
-        if not self.cache_path.exists():
-            return pd.DataFrame(columns=pd.Index(_CACHE_COLUMNS))
+        selected = _CACHE_COLUMNS if columns is None else [
+            col for col in columns if col in _CACHE_COLUMNS
+        ]
+        if not self._snapshot_files():
+            return pd.DataFrame(columns=pd.Index(selected))
+
+        dataset = ds.dataset(
+            self.cache_dir, format="parquet", schema=_DATASET_SCHEMA, partitioning=_PARTITIONING
+        )
+        table = dataset.to_table(
+            columns=selected, filter=self._build_filter(start_date, end_date, skus)
+        )
 
-        df = pd.read_parquet(self.cache_path)
+        df = table.to_pandas()
+        if df.empty:
+            return df
+        if "snapshot_date" in df.columns:
+            df = df.sort_values("snapshot_date", kind="stable").reset_index(drop=True)
+        return STOCK_HISTORY_SCHEMA.cast(df)
+
+    @staticmethod
+    def _build_filter(
+        start_date: datetime | None, end_date: datetime | None, skus: list[str] | None
+    ) -> ds.Expression | None:
+        conditions: list[ds.Expression] = []
+        year = ds.field("year")
+        month = ds.field("month")
 
         if start_date is not None:
-            df = pd.DataFrame(df[df["snapshot_date"] >= start_date])
+            start = pd.Timestamp(start_date)
+            conditions.append(
+                (year > start.year) | ((year == start.year) & (month >= start.month))
+            )
+            conditions.append(
+                ds.field("snapshot_date") >= pa.scalar(start, type=pa.timestamp("ns"))
+            )
         if end_date is not None:
-            df = pd.DataFrame(df[df["snapshot_date"] <= end_date])
+            end = pd.Timestamp(end_date)
+            conditions.append((year < end.year) | ((year == end.year) & (month <= end.month)))
+            conditions.append(ds.field("snapshot_date") <= pa.scalar(end, type=pa.timestamp("ns")))
+        if skus is not None:
+            conditions.append(ds.field("sku").isin([str(sku) for sku in skus]))
 
-        df = df.reset_index(drop=True)
-        return optimize_dtypes(df)
+        if not conditions:
+            return None
+        expression = conditions[0]
+        for condition in conditions[1:]:
+            expression = expression & condition
+        return expression
+
+    def sync(self) -> list[Path]:
+        with directory_lock(self.cache_dir):
+            return self._sync()
+
+    def _sync(self) -> list[Path]:
+        self._migrate_legacy_cache()
 
-    def _sync(self) -> None:
         stock_files = self.loader.find_stock_files()
         if not stock_files:
-            return
+            return self._snapshot_files()
 
         cached_dates = self._read_cached_dates()
         missing = [(path, d) for path, d in stock_files if d.date() not in cached_dates]
 
         if not missing:
-            return
+            return self._snapshot_files()
 
         logger.info("Stock history cache: %d new snapshot(s) to load", len(missing))
 
@@ -58,33 +121,72 @@ class StockHistoryCache:
             missing, self._load_snapshot, desc="Building stock history cache"
         )
         if not new_frames:
-            return
+            return self._snapshot_files()
 
-        new_df = pd.concat(new_frames, ignore_index=True)
-
-        if self.cache_path.exists():
-            existing = pd.read_parquet(self.cache_path)
-            combined_raw = pd.concat([existing, new_df], ignore_index=True)
-            combined = pd.DataFrame(
-                combined_raw.drop_duplicates(subset=["sku", "snapshot_date"], keep="last")
-            )
-        else:
-            combined = new_df
+        rows = 0
+        for frame in new_frames:
+            rows += self._write_snapshot(frame)
 
-        combined = combined.sort_values("snapshot_date").reset_index(drop=True)
-        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-        combined.to_parquet(self.cache_path, compression="snappy", index=False)
         logger.info(
-            "Stock history cache updated: %d rows across %d snapshot(s)",
-            len(combined),
-            combined["snapshot_date"].nunique(),
+            "Stock history cache updated: %d rows across %d new snapshot(s)", rows, len(new_frames)
         )
+        return self._snapshot_files()
+
+    def _snapshot_path(self, snapshot_date: pd.Timestamp) -> Path:
+        return (
+            self.cache_dir
+            / f"year={snapshot_date.year}"
+            / f"month={snapshot_date.month:02d}"
+            / f"{snapshot_date:%Y%m%d}.parquet"
+        )
+
+    def _snapshot_files(self) -> list[Path]:
+        if not self.cache_dir.exists():
+            return []
+        return sorted(self.cache_dir.glob("year=*/month=*/*.parquet"))
+
+    def _write_snapshot(self, df: pd.DataFrame) -> int:
+        snapshot_date = pd.Timestamp(df["snapshot_date"].iloc[0])
+        frame = pd.DataFrame(
+            {
+                "sku": df["sku"].astype(str),
+                "snapshot_date": pd.to_datetime(df["snapshot_date"]).astype("datetime64[ns]"),
+                "available_stock": pd.to_numeric(df["available_stock"]).astype("float64"),
+            }
+        ).drop_duplicates(subset=["sku"], keep="last")
+
+        target = self._snapshot_path(snapshot_date)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(frame, schema=_SNAPSHOT_SCHEMA, preserve_index=False)
+        tmp_path = temp_path(target)
+        try:
+            pq.write_table(table, tmp_path, compression="snappy")
+            tmp_path.replace(target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return len(frame)
 
     def _read_cached_dates(self) -> set[date]:
-        if not self.cache_path.exists():
-            return set()
-        df = pd.read_parquet(self.cache_path, columns=["snapshot_date"])
-        return set(pd.to_datetime(df["snapshot_date"]).dt.date.unique())
+        cached: set[date] = set()
+        for snapshot_file in self._snapshot_files():
+            try:
+                cached.add(datetime.strptime(snapshot_file.stem, "%Y%m%d").date())
+            except ValueError:
+                continue
+        return cached
+
+    def _migrate_legacy_cache(self) -> None:
+        for legacy_dir in dict.fromkeys((LEGACY_CACHE_DIR, self.cache_dir.parent)):
+            legacy_path = legacy_dir / LEGACY_CACHE_FILE
+            if not legacy_path.exists():
+                continue
+
+            logger.info("Migrating %s into partitioned stock history cache", legacy_path)
+            legacy = pd.read_parquet(legacy_path)
+            legacy["snapshot_date"] = pd.to_datetime(legacy["snapshot_date"])
+            for _, snapshot in legacy.groupby("snapshot_date", observed=True):
+                self._write_snapshot(pd.DataFrame(snapshot))
+            legacy_path.unlink()
 
     def _load_snapshot(self, file_info: tuple[Path, datetime]) -> pd.DataFrame | None:
         file_path, snapshot_date = file_info
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import pandas as pd
+
+from utils.logging_config import get_logger
+
+from .analysis import calculate_safety_stock_and_rop, classify_sku_type
+from .analyzer import SalesAnalyzer
+from .data_plane import DatasetGetter
+
+logger = get_logger("summary_pipeline")
+
+StageFunction = Callable[..., "pd.DataFrame | None"]
+
+ENTITY_ID_COLUMNS = {"sku": "SKU", "model": "MODEL"}
+
+CV_SETTINGS = ("cv_thresholds.basic", "cv_thresholds.seasonal")
+Z_SCORE_SETTINGS = (
+    "z_scores.basic",
+    "z_scores.regular",
+    "z_scores.seasonal_in",
+    "z_scores.seasonal_out",
+    "z_scores.new",
+)
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    name: str
+    compute: StageFunction
+    inputs: tuple[str, ...] = ()
+    settings: tuple[str, ...] = ()
+    by_entity: bool = True
+
+
+def _setting(settings: dict, path: str) -> Any:
+    value: Any = settings
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _aggregate(pipeline: SummaryPipeline, entity_type: str, _settings: dict) -> pd.DataFrame:
+    if entity_type == "model":
+        return pipeline.analyzer.aggregate_by_model()
+    return pipeline.analyzer.aggregate_by_sku()
+
+
+def _classify(
+        _pipeline: SummaryPipeline, _entity_type: str, settings: dict, summary: pd.DataFrame
+) -> pd.DataFrame:
+    return classify_sku_type(
+        summary,
+        cv_basic=settings["cv_thresholds"]["basic"],
+        cv_seasonal=settings["cv_thresholds"]["seasonal"],
+    )
+
+
+def _seasonal(pipeline: SummaryPipeline, _entity_type: str, _settings: dict) -> pd.DataFrame:
+    return pipeline.analyzer.determine_seasonal_months()
+
+
+def _safety_stock(
+        _pipeline: SummaryPipeline,
+        _entity_type: str,
+        settings: dict,
+        summary: pd.DataFrame,
+        seasonal_data: pd.DataFrame,
+) -> pd.DataFrame:
+    return calculate_safety_stock_and_rop(
+        summary,
+        seasonal_data,
+        z_basic=settings["z_scores"]["basic"],
+        z_regular=settings["z_scores"]["regular"],
+        z_seasonal_in=settings["z_scores"]["seasonal_in"],
+        z_seasonal_out=settings["z_scores"]["seasonal_out"],
+        z_new=settings["z_scores"]["new"],
+        lead_time_months=settings["lead_time"],
+    )
+
+
+def _last_two_years(pipeline: SummaryPipeline, entity_type: str, _settings: dict) -> pd.DataFrame:
+    return pipeline.analyzer.calculate_last_two_years_avg_sales(by_model=entity_type == "model")
+
+
+def _summary(
+        _pipeline: SummaryPipeline,
+        entity_type: str,
+        _settings: dict,
+        summary: pd.DataFrame,
+        last_two_years_avg: pd.DataFrame,
+) -> pd.DataFrame:
+    summary = summary.merge(last_two_years_avg, on=ENTITY_ID_COLUMNS[entity_type], how="left")
+    summary["LAST_2_YEARS_AVG"] = summary["LAST_2_YEARS_AVG"].fillna(0)
+    return summary
+
+
+DEFAULT_STAGES = (
+    PipelineStage("aggregate", _aggregate),
+    PipelineStage("classified", _classify, ("aggregate",), CV_SETTINGS),
+    PipelineStage("seasonal", _seasonal, by_entity=False),
+    PipelineStage(
+        "safety_stock", _safety_stock, ("classified", "seasonal"), (*Z_SCORE_SETTINGS, "lead_time")
+    ),
+    PipelineStage("last_two_years", _last_two_years),
+    PipelineStage("summary", _summary, ("safety_stock", "last_two_years")),
+)
+
+
+class SummaryPipeline:
+    def __init__(
+            self,
+            analyzer: SalesAnalyzer,
+            datasets: DatasetGetter | None = None,
+            max_entries: int = 4,
+    ) -> None:
+        self.analyzer = analyzer
+        self._datasets = datasets
+        self._max_entries = max_entries
+        self._stages: dict[str, PipelineStage] = {}
+        self._cache: dict[str, OrderedDict[tuple, pd.DataFrame | None]] = {}
+        self._lock = threading.RLock()
+        for stage in DEFAULT_STAGES:
+            self.register(stage)
+
+    def register(self, stage: PipelineStage) -> None:
+        with self._lock:
+            self._stages[stage.name] = stage
+            self._cache.pop(stage.name, None)
+
+    def dataset(self, name: str) -> pd.DataFrame | None:
+        if self._datasets is None:
+            return None
+        return self._datasets(name)
+
+    def run(self, name: str, settings: dict, entity_type: str = "sku") -> pd.DataFrame | None:
+        with self._lock:
+            frame = self._evaluate(name, settings, entity_type)
+        return None if frame is None else frame.copy()
+
+    def cached_entries(self) -> dict[str, int]:
+        with self._lock:
+            return {name: len(entries) for name, entries in self._cache.items()}
+
+    def _key(self, name: str, settings: dict, entity_type: str) -> tuple:
+        stage = self._stages.get(name)
+        if stage is None:
+            raise KeyError(f"Unknown pipeline stage: {name}")
+        return (
+            name,
+            entity_type if stage.by_entity else None,
+            tuple(
+                json.dumps(_setting(settings, path), sort_keys=True, default=str)
+                for path in stage.settings
+            ),
+            tuple(self._key(dependency, settings, entity_type) for dependency in stage.inputs),
+        )
+
+    def _evaluate(self, name: str, settings: dict, entity_type: str) -> pd.DataFrame | None:
+        key = self._key(name, settings, entity_type)
+        entries = self._cache.setdefault(name, OrderedDict())
+        if key in entries:
+            entries.move_to_end(key)
+            return entries[key]
+
+        stage = self._stages[name]
+        inputs = [self._evaluate(dependency, settings, entity_type) for dependency in stage.inputs]
+        started = time.perf_counter()
+        frame = stage.compute(self, entity_type, settings, *inputs)
+        entries[key] = frame
+        while len(entries) > self._max_entries:
+            entries.popitem(last=False)
+        logger.info(
+            "Summary pipeline computed %s (%s) in %.1f ms",
+            name,
+            entity_type if stage.by_entity else "all",
+            (time.perf_counter() - started) * 1000,
+        )
+        return frame
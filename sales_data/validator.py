@@ -42,10 +42,13 @@ class DataValidator:
     MATERIAL_CATALOG_COLUMNS = {"OPIS Z KARTY PRODUKTU", "RODZAJ MATERIAŁU", "DOSTAWCA"}
 
     @staticmethod
-    def validate_sales_data(df: pd.DataFrame) -> tuple[bool, list[str]]:
+    def validate_sales_data(
+            df: pd.DataFrame, required: set[str] | None = None
+    ) -> tuple[bool, list[str]]:
         errors = []
 
-        missing_columns = DataValidator.SALES_COLUMNS - set(df.columns)
+        required_columns = DataValidator.SALES_COLUMNS if required is None else required
+        missing_columns = required_columns - set(df.columns)
         if missing_columns:
             errors.append(f"Missing required columns: {', '.join(missing_columns)}")
 
@@ -65,10 +68,13 @@ class DataValidator:
         return is_valid, errors
 
     @staticmethod
-    def validate_stock_data(df: pd.DataFrame) -> tuple[bool, list[str]]:
+    def validate_stock_data(
+            df: pd.DataFrame, required: set[str] | None = None
+    ) -> tuple[bool, list[str]]:
         errors = []
 
-        missing_columns = DataValidator.STOCK_COLUMNS - set(df.columns)
+        required_columns = DataValidator.STOCK_COLUMNS if required is None else required
+        missing_columns = required_columns - set(df.columns)
         if missing_columns:
             errors.append(f"Missing required columns: {', '.join(missing_columns)}")
 
@@ -90,10 +96,13 @@ class DataValidator:
         return is_valid, errors
 
     @staticmethod
-    def validate_forecast_data(df: pd.DataFrame) -> tuple[bool, list[str]]:
+    def validate_forecast_data(
+            df: pd.DataFrame, required: set[str] | None = None
+    ) -> tuple[bool, list[str]]:
         errors = []
 
-        missing_columns = DataValidator.FORECAST_COLUMNS - set(df.columns)
+        required_columns = DataValidator.FORECAST_COLUMNS if required is None else required
+        missing_columns = required_columns - set(df.columns)
         if missing_columns:
             errors.append(f"Missing required columns: {', '.join(missing_columns)}")
 
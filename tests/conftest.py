@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_data import file_manifest, stock_history_cache
+from sales_data.file_manifest import FileManifest
+
+
+@pytest.fixture(autouse=True)
+def isolated_file_manifest(tmp_path, monkeypatch):
+    manifest = FileManifest(tmp_path / file_manifest.MANIFEST_FILE, poll_interval=3600.0)
+    monkeypatch.setattr(file_manifest, "_manifest", manifest)
+    yield manifest
+    manifest.stop_watching()
+
+
+@pytest.fixture(autouse=True)
+def isolated_legacy_cache(tmp_path, monkeypatch):
+    legacy_dir = tmp_path / "legacy"
+    legacy_dir.mkdir()
+    monkeypatch.setattr(stock_history_cache, "LEGACY_CACHE_DIR", legacy_dir)
+    return legacy_dir
+
+
+def sales_frame(start: str, periods: int, skus: list[str], seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=periods, freq="D")
+    rows = len(dates) * len(skus)
+    quantity = rng.integers(1, 10, rows)
+    price = np.full(rows, 10.0)
+    return pd.DataFrame({
+        "order_id": [f"o{seed}_{i}" for i in range(rows)],
+        "data": np.repeat(dates, len(skus)),
+        "sku": skus * len(dates),
+        "ilosc": quantity,
+        "cena": price,
+        "razem": quantity * price,
+    })
+
+
+def write_sales_file(directory: Path, year: int, skus: list[str], seed: int = 0) -> Path:
+    path = directory / f"{year}0101-{year}1231.csv"
+    sales_frame(f"{year}-01-01", 365, skus, seed).to_csv(path, index=False)
+    return path
+
+
+def write_stock_file(directory: Path, snapshot: str, skus: list[str]) -> Path:
+    path = directory / f"{snapshot.replace('-', '')}.csv"
+    pd.DataFrame({
+        "sku": skus,
+        "nazwa": "item",
+        "cena_netto": 10.0,
+        "cena_brutto": 12.0,
+        "stock": 20,
+        "available_stock": range(len(skus)),
+        "aktywny": 1,
+    }).to_csv(path, index=False)
+    return path
+
+
+def touch(path: Path) -> None:
+    stat_result = path.stat()
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+
+
+SKUS = ["ch0010101", "ch0010102", "ch0020201"]
+
+
+@pytest.fixture
+def data_tree(tmp_path):
+    sales_dir = tmp_path / "sales"
+    stock_dir = tmp_path / "stock"
+    forecast_dir = tmp_path / "forecast"
+    for directory in (sales_dir, stock_dir, forecast_dir):
+        directory.mkdir()
+    write_sales_file(sales_dir, 2024, SKUS, seed=1)
+    write_stock_file(stock_dir, "2025-01-01", SKUS)
+    paths_file = tmp_path / "paths.txt"
+    paths_file.write_text(f"{sales_dir}\n{stock_dir}\n{forecast_dir}\n", encoding="utf-8")
+    return paths_file
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from sales_data.data_plane import SharedDataPlane
+from ui.shared import data_loaders
+
+
+class RefreshingSource:
+    def __init__(self) -> None:
+        self.refreshes = 0
+
+    def get_data_version(self, refresh: bool = False) -> str:
+        self.refreshes += int(refresh)
+        return "v1"
+
+
+class CacheRecorder:
+    def __init__(self) -> None:
+        self.cleared = 0
+
+    def clear(self) -> None:
+        self.cleared += 1
+
+
+@pytest.fixture
+def plane(monkeypatch):
+    source = RefreshingSource()
+    data_plane = SharedDataPlane(lambda: source)
+    data_plane.register("sales", lambda _source, _get: pd.DataFrame({"sku": ["a"]}))
+    monkeypatch.setattr(data_loaders, "get_data_plane", lambda: data_plane)
+    return data_plane
+
+
+def test_refresh_shared_data_clears_derived_caches(plane, monkeypatch):
+    caches = {
+        name: CacheRecorder()
+        for name in ("_build_summary_pipeline", "_build_sales_analyzer", "_build_stock_projection")
+    }
+    for name, recorder in caches.items():
+        monkeypatch.setattr(data_loaders, name, recorder)
+    lease = plane.acquire()
+    lease.get("sales")
+
+    data_loaders.refresh_shared_data()
+
+    assert plane.source.refreshes == 1
+    assert all(recorder.cleared == 1 for recorder in caches.values())
+    assert not lease.active
+    assert plane.current_version is None
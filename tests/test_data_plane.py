@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import gc
+
+import pandas as pd
+import pytest
+
+from sales_data.data_plane import SharedDataPlane
+
+
+class VersionedSource:
+    def __init__(self) -> None:
+        self.version = "v1"
+        self.loads = 0
+
+    def get_data_version(self, refresh: bool = False) -> str:
+        return self.version
+
+
+@pytest.fixture
+def source():
+    return VersionedSource()
+
+
+@pytest.fixture
+def plane(source):
+    data_plane = SharedDataPlane(lambda: source)
+
+    def load_sales(data_source, _get_dataset):
+        data_source.loads += 1
+        return pd.DataFrame({"sku": ["a", "b"], "ilosc": [1, 2], "version": data_source.version})
+
+    data_plane.register("sales", load_sales)
+    data_plane.register(
+        "totals", lambda _source, get_dataset: get_dataset("sales").groupby("sku").sum()
+    )
+    return data_plane
+
+
+def test_leases_share_one_load_per_generation(plane, source):
+    first, second = plane.acquire(), plane.acquire()
+
+    first.get("sales")
+    second.get("totals")
+
+    assert source.loads == 1
+    assert plane.stats()[0]["refs"] == 2
+
+
+def test_views_are_read_only(plane):
+    sales = plane.acquire().get("sales")
+
+    with pytest.raises(ValueError):
+        sales["ilosc"].to_numpy()[0] = 10
+
+
+def test_new_version_retires_previous_generation(plane, source):
+    old = plane.acquire()
+    assert old.get("sales")["version"].iloc[0] == "v1"
+
+    source.version = "v2"
+    new = plane.acquire()
+
+    assert not old.active and new.active
+    assert old.get("sales")["version"].iloc[0] == "v1"
+    assert new.get("sales")["version"].iloc[0] == "v2"
+    assert [entry["version"] for entry in plane.stats()] == ["v1", "v2"]
+
+    old.release()
+    assert [entry["version"] for entry in plane.stats()] == ["v2"]
+    with pytest.raises(RuntimeError):
+        old.get("sales")
+
+
+def test_dropped_lease_releases_retired_generation(plane, source):
+    lease = plane.acquire()
+    lease.get("sales")
+    plane.invalidate()
+
+    del lease
+    gc.collect()
+
+    assert plane.stats() == []
+
+
+def test_invalidate_reloads_same_version(plane, source):
+    plane.acquire().get("sales")
+
+    plane.invalidate()
+    plane.acquire().get("sales")
+
+    assert source.loads == 2
+    assert plane.current_version == "v1"
+
+
+def test_unknown_dataset_raises(plane):
+    with pytest.raises(KeyError):
+        plane.acquire().get("missing")
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from sales_data.data_source import slice_by_date
+
+
+@pytest.fixture
+def sorted_sales():
+    dates = pd.to_datetime(
+        ["2024-01-01", "2024-01-15", "2024-01-15", "2024-02-01", "2024-03-10", None, None]
+    )
+    return pd.DataFrame({"data": dates, "ilosc": range(len(dates))})
+
+
+@pytest.mark.parametrize(
+    ("start", "end"),
+    [
+        (datetime(2024, 1, 15), datetime(2024, 2, 1)),
+        (datetime(2024, 1, 2), None),
+        (None, datetime(2024, 1, 15)),
+        (datetime(2025, 1, 1), None),
+        (datetime(2024, 3, 1), datetime(2024, 1, 1)),
+    ],
+)
+def test_slice_by_date_matches_mask(sorted_sales, start, end):
+    mask = sorted_sales["data"].notna()
+    if start is not None:
+        mask &= sorted_sales["data"] >= start
+    if end is not None:
+        mask &= sorted_sales["data"] <= end
+
+    pd.testing.assert_frame_equal(slice_by_date(sorted_sales, start, end), sorted_sales[mask])
+
+
+def test_slice_by_date_without_bounds_keeps_undated_rows(sorted_sales):
+    assert slice_by_date(sorted_sales) is sorted_sales
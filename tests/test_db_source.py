@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from sales_data import db_source
+from sales_data.db_source import DatabaseSource
+
+
+@pytest.fixture
+def database(tmp_path):
+    source = DatabaseSource(f"sqlite:///{tmp_path / 'sales.db'}")
+    with source.engine.begin() as conn:
+        conn.execute(text("CREATE TABLE file_imports (id INTEGER)"))
+        conn.execute(text("CREATE TABLE raw_sales_transactions (updated_at TIMESTAMP)"))
+        conn.execute(text("INSERT INTO raw_sales_transactions VALUES ('2026-01-01 10:00:00')"))
+    return source
+
+
+def _execute(source: DatabaseSource, statement: str) -> None:
+    with source.engine.begin() as conn:
+        conn.execute(text(statement))
+
+
+def test_data_version_changes_with_sales_updates(database):
+    version = database.get_data_version()
+    assert version.startswith("database_")
+
+    _execute(database, "INSERT INTO raw_sales_transactions VALUES ('2026-01-02 10:00:00')")
+
+    assert database.get_data_version() == version
+    assert database.get_data_version(refresh=True) != version
+
+
+def test_data_version_changes_with_new_import_after_interval(database):
+    version = database.get_data_version()
+
+    _execute(database, "INSERT INTO file_imports VALUES (1)")
+    database._data_version_at -= db_source.DATA_VERSION_INTERVAL
+
+    assert database.get_data_version() != version
+
+
+def test_data_version_falls_back_when_database_is_unreachable(tmp_path):
+    source = DatabaseSource(f"sqlite:///{tmp_path / 'missing' / 'sales.db'}")
+
+    assert source.get_data_version() == f"database_{date.today().isoformat()}"
+    assert not source.is_available()
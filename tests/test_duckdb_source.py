@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from conftest import SKUS, write_sales_file
+
+from sales_data.duckdb_source import DuckDBSource
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls: list[int] = []
+    build = DuckDBSource._build
+
+    def counting_build(self, cursor, sales_files, snapshot_files):
+        calls.append(len(sales_files))
+        build(self, cursor, sales_files, snapshot_files)
+
+    monkeypatch.setattr(DuckDBSource, "_build", counting_build)
+    return calls
+
+
+def test_duckdb_sales_match_file_source(data_tree):
+    source = DuckDBSource(paths_file=str(data_tree))
+    columns = ["sku", "data", "ilosc"]
+
+    duckdb_sales = source.load_sales_data(datetime(2024, 2, 1), datetime(2024, 2, 29), columns)
+    file_sales = source._files.load_sales_data(datetime(2024, 2, 1), datetime(2024, 2, 29), columns)
+
+    assert len(duckdb_sales) == len(file_sales) == 29 * len(SKUS)
+    assert duckdb_sales["ilosc"].sum() == file_sales["ilosc"].sum()
+
+
+def test_persisted_database_is_reused_until_files_change(
+        tmp_path, data_tree, builds, isolated_file_manifest
+):
+    database_path = tmp_path / "duckdb" / "sales.duckdb"
+    first = DuckDBSource(database_path, str(data_tree))
+    rows = len(first.load_sales_data())
+    first._conn.close()
+
+    second = DuckDBSource(database_path, str(data_tree))
+    assert len(second.load_sales_data()) == rows
+    assert builds == [1]
+
+    write_sales_file(second._files.loader.sales_dir, 2025, SKUS, seed=2)
+    isolated_file_manifest.refresh()
+
+    assert len(second.load_sales_data()) == 2 * rows
+    assert builds == [1, 2]
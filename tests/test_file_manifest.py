@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from conftest import touch
+
+from sales_data.file_manifest import MANIFEST_FILE, FileManifest
+
+
+def test_manifest_tracks_added_changed_and_removed_files(tmp_path):
+    root = tmp_path / "files"
+    (root / "nested").mkdir(parents=True)
+    first = root / "a.csv"
+    first.write_text("x\n", encoding="utf-8")
+    (root / "notes.txt").write_text("ignored\n", encoding="utf-8")
+    manifest = FileManifest(poll_interval=3600.0)
+
+    assert manifest.list_files(root) == [first]
+    version = manifest.version
+    assert not manifest.refresh()
+
+    second = root / "nested" / "b.xlsx"
+    second.write_bytes(b"")
+    assert manifest.refresh()
+    assert sorted(manifest.list_files(root)) == [first, second]
+
+    touch(first)
+    assert manifest.refresh()
+
+    second.unlink()
+    assert manifest.refresh()
+    assert manifest.list_files(root) == [first]
+    assert manifest.version == version + 3
+
+
+def test_manifest_polls_after_interval(tmp_path):
+    root = tmp_path / "files"
+    root.mkdir()
+    manifest = FileManifest(poll_interval=0.0)
+    assert manifest.list_files(root) == []
+
+    (root / "a.csv").write_text("x\n", encoding="utf-8")
+
+    assert manifest.list_files(root) == [root / "a.csv"]
+
+
+def test_persisted_manifest_detects_changes_made_while_stopped(tmp_path):
+    root = tmp_path / "files"
+    root.mkdir()
+    (root / "a.csv").write_text("x\n", encoding="utf-8")
+    manifest_path = tmp_path / MANIFEST_FILE
+    first = FileManifest(manifest_path, poll_interval=3600.0)
+    first.list_files(root)
+    version = first.version
+
+    reloaded = FileManifest(manifest_path, poll_interval=3600.0)
+    reloaded.list_files(root)
+    assert reloaded.version == version
+
+    (root / "b.csv").write_text("y\n", encoding="utf-8")
+    restarted = FileManifest(manifest_path, poll_interval=3600.0)
+
+    assert len(restarted.list_files(root)) == 2
+    assert restarted.version == version + 1
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from conftest import SKUS, write_sales_file
+
+from sales_data.file_source import FileSource
+
+
+def test_load_sales_data_picks_up_new_sales_file(data_tree):
+    source = FileSource(str(data_tree))
+    version = source.get_data_version()
+    assert len(source.load_sales_data()) == 365 * len(SKUS)
+
+    write_sales_file(source.loader.sales_dir, 2025, SKUS, seed=2)
+
+    assert source.get_data_version(refresh=True) != version
+    assert len(source.load_sales_data()) == 2 * 365 * len(SKUS)
+    assert len(source.load_sales_data()) == len(FileSource(str(data_tree)).load_sales_data())
+
+
+def test_sku_statistics_follow_new_sales_file(data_tree):
+    source = FileSource(str(data_tree))
+    before = source.get_sku_statistics()["QUANTITY"].sum()
+
+    added = write_sales_file(source.loader.sales_dir, 2025, SKUS, seed=2)
+    source.get_data_version(refresh=True)
+
+    after = source.get_sku_statistics()["QUANTITY"].sum()
+    assert after == before + source.loader.load_sales_file(added)["ilosc"].sum()
+
+
+def test_load_sales_data_slices_date_range(data_tree):
+    source = FileSource(str(data_tree))
+    start, end = datetime(2024, 3, 1), datetime(2024, 3, 31)
+
+    rows = source.load_sales_data(start, end, columns=["data", "sku"])
+
+    everything = source.load_sales_data()
+    expected = everything[(everything["data"] >= start) & (everything["data"] <= end)]
+    assert list(rows.columns) == ["data", "sku"]
+    assert len(rows) == len(expected) == 31 * len(SKUS)
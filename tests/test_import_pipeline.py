@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from utils.import_pipeline import PipelineStage, run_pipeline
+from utils.import_utils import build_sales_frame, parse_sku_columns
+
+
+def test_pipeline_runs_every_item_through_all_stages():
+    results, stats = run_pipeline(
+        range(20),
+        [
+            PipelineStage("double", lambda item: item * 2, workers=3),
+            PipelineStage("shift", lambda item: item + 1, workers=2),
+        ],
+    )
+
+    assert sorted(results) == [item * 2 + 1 for item in range(20)]
+    assert [(entry.name, entry.processed, entry.emitted) for entry in stats] == [
+        ("double", 20, 20), ("shift", 20, 20)
+    ]
+
+
+def test_pipeline_skips_filtered_and_failed_items():
+    def check(item):
+        if item == 3:
+            raise ValueError("broken file")
+        return item if item % 2 == 0 else None
+
+    results, stats = run_pipeline(range(8), [PipelineStage("check", check, workers=2)])
+
+    assert sorted(results) == [0, 2, 4, 6]
+    assert (stats[0].processed, stats[0].emitted, stats[0].failed) == (8, 4, 1)
+
+
+def test_batched_stage_receives_lists_up_to_batch_size():
+    batches: list[int] = []
+
+    def load(items):
+        batches.append(len(items))
+        return [sum(items)]
+
+    results, stats = run_pipeline(
+        range(10),
+        [PipelineStage("parse", lambda item: item), PipelineStage("load", load, batch_size=4)],
+        queue_size=8,
+    )
+
+    assert sum(results) == sum(range(10))
+    assert sum(batches) == 10
+    assert all(size <= 4 for size in batches)
+    assert stats[1].processed == 10
+
+
+def test_pipeline_without_stages_is_rejected():
+    with pytest.raises(ValueError):
+        run_pipeline([1], [])
+
+
+def test_parse_sku_columns_splits_model_color_and_size():
+    parts = parse_sku_columns(pd.Series(["ch0010203", "ch0010203", "ab123", "x"]))
+
+    expected = pd.DataFrame({
+        "model": ["ch001", "ch001", "ab123", None],
+        "color": ["02", "02", None, None],
+        "size": ["03", "03", None, None],
+    })
+    pd.testing.assert_frame_equal(parts, expected)
+
+
+def test_build_sales_frame_maps_loader_columns():
+    sales = pd.DataFrame({
+        "order_id": ["o1", "o2"],
+        "data": pd.to_datetime(["2025-01-31", "2025-02-01"]),
+        "sku": ["ch0010203", "ch0020101"],
+        "ilosc": [1, 2],
+        "cena": [10.0, 5.0],
+        "razem": [10.0, 10.0],
+    })
+
+    frame = build_sales_frame(
+        sales,
+        Path("20250101-20251231.xlsx"),
+        datetime(2025, 1, 1),
+        datetime(2025, 12, 31),
+        "batch",
+    )
+
+    assert list(frame["year_month"]) == ["2025-01", "2025-02"]
+    assert list(frame["model"]) == ["ch001", "ch002"]
+    assert frame["source_file"].iloc[0] == "20250101-20251231.xlsx"
+    assert frame["file_end_date"].iloc[0] == datetime(2025, 12, 31).date()
+    assert list(frame["quantity"]) == [1, 2]
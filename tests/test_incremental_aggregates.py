@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+from conftest import sales_frame
+
+from sales_data.analyzer import SalesAnalyzer
+from sales_data.incremental_aggregates import IncrementalAggregates
+
+COMPARED_COLUMNS = ["MONTHS", "QUANTITY", "SD", "CV"]
+
+
+@pytest.fixture
+def fragments(tmp_path):
+    frames = {
+        "2023.parquet": sales_frame("2023-03-01", 300, ["ch0010101", "ch0010102"], seed=1),
+        "2024.parquet": sales_frame("2024-01-01", 366, ["ch0010101", "ch0020201"], seed=2),
+        "2025.parquet": sales_frame("2025-01-01", 120, ["ch0020201", "ch0030301"], seed=3),
+    }
+    paths = {}
+    for name, frame in frames.items():
+        paths[name] = tmp_path / name
+        frame.to_parquet(paths[name], index=False)
+    return paths, frames
+
+
+def _statistics(aggregates: IncrementalAggregates, entity_type: str) -> pd.DataFrame:
+    return aggregates.statistics(entity_type).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("entity_type", ["sku", "model"])
+def test_incremental_updates_match_full_rebuild(fragments, entity_type):
+    paths, _ = fragments
+    incremental = IncrementalAggregates()
+    assert incremental.sync([paths["2023.parquet"], paths["2024.parquet"]])
+    assert not incremental.sync([paths["2023.parquet"], paths["2024.parquet"]])
+    assert incremental.sync([paths["2024.parquet"], paths["2025.parquet"]])
+
+    rebuilt = IncrementalAggregates()
+    rebuilt.sync([paths["2024.parquet"], paths["2025.parquet"]])
+
+    pd.testing.assert_frame_equal(
+        _statistics(incremental, entity_type), _statistics(rebuilt, entity_type)
+    )
+
+
+@pytest.mark.parametrize("entity_type", ["sku", "model"])
+def test_statistics_match_sales_analyzer(fragments, entity_type):
+    paths, frames = fragments
+    aggregates = IncrementalAggregates()
+    aggregates.sync(list(paths.values()))
+
+    analyzer = SalesAnalyzer(pd.concat(frames.values(), ignore_index=True))
+    expected = (
+        analyzer.aggregate_by_model() if entity_type == "model" else analyzer.aggregate_by_sku()
+    )
+    id_col = "MODEL" if entity_type == "model" else "SKU"
+
+    actual = _statistics(aggregates, entity_type).set_index(id_col).sort_index()
+    expected = expected.set_index(id_col).sort_index()
+    pd.testing.assert_frame_equal(
+        actual[COMPARED_COLUMNS], expected[COMPARED_COLUMNS], check_dtype=False
+    )
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_data.analysis import PriorityEngine, apply_priority_scoring
+from sales_data.analysis.inventory_metrics import calculate_forecast_date_range
+from sales_data.analysis.order_priority import aggregate_order_by_model_color
+from utils.settings_manager import load_settings
+
+LEAD_TIME = 3
+
+
+@pytest.fixture
+def summary():
+    return pd.DataFrame({
+        "SKU": ["ch0010101", "ch0010102", "ch0010201", "ch0020101", "ch0020102", "ch0030101"],
+        "STOCK": [0, 4, 20, 1, 0, 50],
+        "ROP": [10.0, 8.0, 5.0, 6.0, 3.0, 10.0],
+        "SS": [2.0, 2.0, 1.0, 1.0, 1.0, 2.0],
+        "TYPE": ["regular", "seasonal", "basic", "new", "regular", "basic"],
+        "PRICE": [10.0, 20.0, 15.0, 30.0, 5.0, 8.0],
+    })
+
+
+@pytest.fixture
+def forecast(summary):
+    start, _ = calculate_forecast_date_range(LEAD_TIME)
+    months = pd.date_range(start, periods=LEAD_TIME + 2, freq="MS")
+    skus = summary["SKU"].iloc[:-1]
+    return pd.DataFrame({
+        "sku": np.repeat(skus.to_numpy(), len(months)),
+        "data": np.tile(months, len(skus)),
+        "forecast": np.arange(len(skus) * len(months), dtype=float),
+    })
+
+
+@pytest.fixture
+def settings():
+    return copy.deepcopy(load_settings())
+
+
+def _scored_directly(summary, forecast, settings):
+    start, end = calculate_forecast_date_range(LEAD_TIME)
+    window = forecast[(forecast["data"] >= start) & (forecast["data"] < end)]
+    leadtime = window.groupby("sku")["forecast"].sum().rename("FORECAST_LEADTIME")
+    merged = summary.merge(leadtime, left_on="SKU", right_index=True, how="left")
+    merged["FORECAST_LEADTIME"] = merged["FORECAST_LEADTIME"].fillna(0)
+    return apply_priority_scoring(merged, settings)
+
+
+def test_priority_scores_match_direct_scoring(summary, forecast, settings):
+    engine = PriorityEngine(summary, forecast, LEAD_TIME)
+
+    priority = engine.priority(settings).set_index("SKU").sort_index()
+    expected = _scored_directly(summary, forecast, settings).set_index("SKU").sort_index()
+
+    columns = ["FORECAST_LEADTIME", "STOCKOUT_RISK", "REVENUE_IMPACT", "PRIORITY_SCORE"]
+    pd.testing.assert_frame_equal(priority[columns], expected[columns], check_dtype=False)
+    assert list(engine.priority(settings)["PRIORITY_SCORE"]) == sorted(
+        expected["PRIORITY_SCORE"], reverse=True
+    )
+
+
+def test_rescoring_with_new_settings_matches_fresh_engine(summary, forecast, settings):
+    engine = PriorityEngine(summary, forecast, LEAD_TIME)
+    engine.recommendations(settings)
+
+    changed = copy.deepcopy(settings)
+    changed.setdefault("order_recommendations", {})["demand_cap"] = 5
+    changed["order_recommendations"].setdefault("priority_weights", {})["stockout_risk"] = 0.9
+
+    rescored = engine.recommendations(changed)
+    fresh = PriorityEngine(summary, forecast, LEAD_TIME).recommendations(changed)
+
+    pd.testing.assert_frame_equal(rescored["priority_skus"], fresh["priority_skus"])
+    assert rescored["top_recommendations"] == fresh["top_recommendations"]
+
+
+def test_model_color_summary_matches_aggregation(summary, forecast, settings):
+    recommendations = PriorityEngine(summary, forecast, LEAD_TIME).recommendations(settings)
+
+    expected = aggregate_order_by_model_color(recommendations["priority_skus"])
+    actual = recommendations["model_color_summary"]
+
+    key = ["MODEL", "COLOR"]
+    pd.testing.assert_frame_equal(
+        actual.sort_values(key).reset_index(drop=True)[expected.columns],
+        expected.sort_values(key).reset_index(drop=True),
+        check_dtype=False,
+    )
+    top = recommendations["top_recommendations"][0]
+    assert top["size_quantities"]
+
+
+def test_restrict_limits_recommendations_to_kept_models(summary, forecast, settings):
+    engine = PriorityEngine(summary, forecast, LEAD_TIME)
+    engine.restrict((engine.frame["MODEL"] == "ch001").to_numpy())
+
+    recommendations = engine.recommendations(settings)
+
+    assert set(recommendations["priority_skus"]["MODEL"]) == {"ch001"}
+    assert {item["model"] for item in recommendations["top_recommendations"]} == {"ch001"}
+
+    engine.restrict(None)
+    assert len(engine.recommendations(settings)["priority_skus"]) == len(summary)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sales_data.analysis.projection import (
+    StockProjection,
+    calculate_model_stock_projection,
+    calculate_stock_projection,
+)
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def forecast():
+    months = pd.date_range("2025-01-01", periods=6, freq="MS")
+    skus = ["ch0010101", "ch0010102", "ch0020101"]
+    return pd.DataFrame({
+        "sku": np.repeat(skus, len(months)),
+        "data": np.tile(months, len(skus)),
+        "forecast": np.tile([5.0, 5.0, 10.0, 10.0, 0.0, 20.0], len(skus)),
+    })
+
+
+@pytest.mark.parametrize("sku", ["ch0010101", "ch0020101", "ch0099999"])
+def test_projection_matches_single_entity_calculation(forecast, sku):
+    projection = StockProjection(forecast, START)
+
+    pd.testing.assert_frame_equal(
+        projection.projection(sku, 30, 10, 2, projection_months=4),
+        calculate_stock_projection(sku, 30, 10, 2, forecast, START, 4),
+        check_dtype=False,
+    )
+
+
+def test_model_projection_matches_model_calculation(forecast):
+    projection = StockProjection(forecast, START)
+
+    pd.testing.assert_frame_equal(
+        projection.projection("ch001", 40, 15, 3, entity_type="model"),
+        calculate_model_stock_projection("ch001", 40, 15, 3, forecast, START),
+        check_dtype=False,
+    )
+
+
+def test_stockout_summary_reports_months_and_dates(forecast):
+    summary = pd.DataFrame({
+        "SKU": ["ch0010101", "ch0010102", "ch0020101"],
+        "STOCK": [12.0, 100.0, 0.0],
+        "ROP": [8.0, 10.0, 5.0],
+    })
+
+    ranking = StockProjection(forecast, START).stockout_summary(summary).set_index("SKU")
+
+    assert ranking.loc["ch0010101", "MONTHS_TO_ROP"] == 1
+    assert ranking.loc["ch0010101", "ZERO_DATE"] == pd.Timestamp("2025-03-01")
+    assert np.isnan(ranking.loc["ch0010102", "MONTHS_TO_ROP"])
+    assert ranking.loc["ch0020101", "MONTHS_TO_ZERO"] == 0
+    assert list(ranking.index) == ["ch0020101", "ch0010101", "ch0010102"]
+
+
+def test_stockout_summary_leaves_entities_without_forecast_unknown(forecast):
+    summary = pd.DataFrame({
+        "SKU": ["ch0010101", "ch0099999"],
+        "STOCK": [12.0, 0.0],
+        "ROP": [8.0, 5.0],
+    })
+
+    ranking = StockProjection(forecast, START).stockout_summary(summary).set_index("SKU")
+
+    assert ranking.loc["ch0099999", ["MONTHS_TO_ROP", "MONTHS_TO_ZERO"]].isna().all()
+    assert ranking.loc["ch0099999", ["ROP_DATE", "ZERO_DATE"]].isna().all()
+    assert ranking.loc["ch0010101", "MONTHS_TO_ROP"] == 1
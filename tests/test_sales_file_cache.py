@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+import threading
+
+import pytest
+from conftest import SKUS, touch, write_sales_file
+
+from sales_data.loader import SalesDataLoader
+from sales_data.sales_file_cache import SalesFileCache
+
+
+@pytest.fixture
+def loader(data_tree):
+    return SalesDataLoader(str(data_tree))
+
+
+def _cache(loader: SalesDataLoader) -> SalesFileCache:
+    return SalesFileCache(loader.sales_dir / ".sales_cache", loader)
+
+
+def test_touched_file_reuses_fragment(loader, isolated_file_manifest):
+    cache = _cache(loader)
+    fragments = cache.refresh()
+
+    touch(loader.find_data_files()[0][0])
+    isolated_file_manifest.refresh()
+
+    assert cache.refresh() == fragments
+
+
+def test_failed_reparse_keeps_previous_fragment(loader, isolated_file_manifest):
+    cache = _cache(loader)
+    fragments = cache.refresh()
+    rows = len(cache.consolidate())
+
+    source_file = loader.find_data_files()[0][0]
+    source_file.write_text("not,a,sales\nfile,at,all\n", encoding="utf-8")
+    isolated_file_manifest.refresh()
+
+    assert _cache(loader).refresh() == fragments
+    assert all(fragment.exists() for fragment in fragments)
+    assert len(cache.consolidate()) == rows
+
+
+def test_concurrent_consolidation_shares_cache_directory(loader, isolated_file_manifest):
+    write_sales_file(loader.sales_dir, 2025, SKUS, seed=2)
+    isolated_file_manifest.refresh()
+    caches = [_cache(loader) for _ in range(4)]
+    errors: list[Exception] = []
+
+    def consolidate(cache: SalesFileCache) -> None:
+        try:
+            for _ in range(3):
+                cache.consolidate()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=consolidate, args=(cache,)) for cache in caches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(caches[0].consolidate()) == 2 * 365 * len(SKUS)
+    assert not [name for name in os.listdir(caches[0].cache_dir) if name.endswith(".tmp")]
+
+
+def test_removed_file_drops_its_fragment(loader, isolated_file_manifest):
+    added = write_sales_file(loader.sales_dir, 2025, SKUS, seed=2)
+    isolated_file_manifest.refresh()
+    cache = _cache(loader)
+    assert len(cache.refresh()) == 2
+
+    added.unlink()
+    isolated_file_manifest.refresh()
+
+    assert len(cache.refresh()) == 1
+    assert len(list(cache.cache_dir.glob("*.parquet"))) == 1
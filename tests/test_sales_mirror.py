@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from sales_data.sales_mirror import SalesMirror, get_sales_mirror
+
+
+class FakeSalesTable:
+    def __init__(self) -> None:
+        self.rows = pd.DataFrame({
+            "id": [1, 2, 3],
+            "updated_at": pd.to_datetime(["2026-01-01 10:00"] * 3),
+            "is_valid": [1, 1, 1],
+            "order_id": ["a", "b", "c"],
+            "data": pd.to_datetime(["2026-01-01", "2026-01-02", "2026-01-03"]),
+            "sku": ["ch0010101", "ch0010102", "ch0020201"],
+            "ilosc": [1, 2, 3],
+            "cena": [10.0, 10.0, 10.0],
+            "razem": [10.0, 20.0, 30.0],
+            "source_file": ["import"] * 3,
+        })
+        self.clock = datetime(2026, 1, 1, 10)
+        self.fetches: list[datetime | None] = []
+        self.counts = 0
+
+    def fetch(self, since: datetime | None) -> pd.DataFrame:
+        self.fetches.append(since)
+        if since is None:
+            return self.rows[self.rows["is_valid"] == 1].copy()
+        return self.rows[self.rows["updated_at"] > since].copy()
+
+    def count(self) -> int:
+        self.counts += 1
+        return int((self.rows["is_valid"] == 1).sum())
+
+    def update(self, row_id: int, **values) -> None:
+        self.clock += timedelta(hours=1)
+        mask = self.rows["id"] == row_id
+        for column, value in values.items():
+            self.rows.loc[mask, column] = value
+        self.rows.loc[mask, "updated_at"] = self.clock
+
+
+@pytest.fixture
+def table():
+    return FakeSalesTable()
+
+
+@pytest.fixture
+def mirror(tmp_path, table):
+    return SalesMirror(tmp_path, "db", table.fetch, table.count, sync_interval=0)
+
+
+def test_incremental_sync_applies_changes_and_tombstones(mirror, table):
+    assert len(mirror.load()) == 3
+
+    table.update(2, ilosc=20)
+    table.update(3, is_valid=0)
+    rows = mirror.load()
+
+    assert list(rows["sku"]) == ["ch0010101", "ch0010102"]
+    assert list(rows["ilosc"]) == [1, 20]
+    assert table.fetches[0] is None
+    assert all(since is not None for since in table.fetches[1:])
+
+
+def test_row_count_is_verified_only_after_interval(mirror, table):
+    mirror.load()
+    for _ in range(3):
+        mirror.load()
+    assert table.counts == 0
+
+    table.rows = table.rows[table.rows["id"] != 1]
+    mirror._counted_at -= mirror.count_interval
+    rows = mirror.load()
+
+    assert table.counts == 1
+    assert table.fetches.count(None) == 2
+    assert len(rows) == 2
+
+
+def test_forced_sync_verifies_row_count(mirror, table):
+    mirror.load()
+
+    mirror.sync(force=True)
+
+    assert table.counts == 1
+
+
+def test_version_changes_with_watermark(mirror, table):
+    version = mirror.version()
+    assert mirror.version() == version
+
+    table.update(1, ilosc=5)
+
+    assert mirror.version(refresh=True) != version
+
+
+def test_load_slices_dates_and_columns(mirror):
+    rows = mirror.load(datetime(2026, 1, 2), datetime(2026, 1, 2), columns=["sku", "ilosc"])
+
+    assert rows.to_dict("records") == [{"sku": "ch0010102", "ilosc": 2}]
+
+
+def test_mirror_is_restored_from_disk(tmp_path, mirror, table):
+    mirror.load()
+    table.update(1, ilosc=7)
+    mirror.load()
+
+    restored = SalesMirror(tmp_path, "db", table.fetch, table.count, sync_interval=3600)
+    rows = restored.load()
+
+    assert table.fetches.count(None) == 1
+    assert list(rows["ilosc"]) == [7, 2, 3]
+
+
+def test_mirror_of_another_database_is_rebuilt(tmp_path, mirror, table):
+    mirror.load()
+
+    SalesMirror(tmp_path, "other", table.fetch, table.count).load()
+
+    assert table.fetches.count(None) == 2
+
+
+def test_get_sales_mirror_shares_instances_per_directory_and_source(tmp_path, table):
+    mirror = get_sales_mirror(tmp_path, "db", table.fetch, table.count)
+
+    assert get_sales_mirror(tmp_path / ".", "db", table.fetch, table.count) is mirror
+    assert get_sales_mirror(tmp_path, "other", table.fetch, table.count) is not mirror
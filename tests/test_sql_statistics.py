@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import copy
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from sales_data import sql_statistics
+from utils.settings_manager import load_settings
+
+
+class RecordingConnection:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+
+
+@pytest.fixture
+def settings():
+    return copy.deepcopy(load_settings())
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    recorded: list[tuple[str, dict]] = []
+
+    def read_sql_query(statement, _conn, params):
+        recorded.append((str(statement), params))
+        return pd.DataFrame()
+
+    monkeypatch.setattr(sql_statistics.pd, "read_sql_query", read_sql_query)
+    return recorded
+
+
+def _unbound(query: str, params: dict) -> set[str]:
+    return set(text(query)._bindparams) - set(params)
+
+
+@pytest.mark.parametrize("entity_type", ["sku", "model"])
+def test_statistics_query_binds_every_parameter(settings, entity_type):
+    query, params = sql_statistics.sku_statistics_query(entity_type, settings, "hash")
+
+    assert not _unbound(query, params)
+    assert params["entity_type"] == entity_type
+    assert params["z_basic"] == settings["z_scores"]["basic"]
+
+
+def test_order_priorities_query_binds_every_parameter(settings):
+    settings.setdefault("order_recommendations", {})["demand_cap"] = 7
+
+    query, params = sql_statistics.order_priorities_query(settings, "hash")
+
+    assert not _unbound(query, params)
+    assert params["demand_cap"] == 7
+    assert params["forecast_start"] < params["forecast_end"]
+
+
+def test_unknown_entity_type_is_rejected(settings):
+    with pytest.raises(ValueError):
+        sql_statistics.sku_statistics_query("color", settings, "hash")
+
+
+@pytest.mark.parametrize("entity_type", ["sku", "model"])
+def test_recompute_statistics_stores_slot_and_refreshes_view(settings, queries, entity_type):
+    conn = RecordingConnection()
+
+    sql_statistics.recompute_sku_statistics(conn, entity_type, settings, "hash", max_slots=3)
+
+    statement, params = queries[0]
+    assert not _unbound(statement, params)
+    assert params["cache_name"] == f"sku_statistics:{entity_type}"
+    assert params["retained_slots"] == 2
+    assert conn.statements == ["REFRESH MATERIALIZED VIEW CONCURRENTLY mv_valid_sku_stats"]
+
+
+def test_recompute_order_priorities_binds_every_parameter(settings, queries):
+    conn = RecordingConnection()
+
+    sql_statistics.recompute_order_priorities(conn, settings, "hash", max_slots=1)
+
+    statement, params = queries[0]
+    assert not _unbound(statement, params)
+    assert params["retained_slots"] == 0
+    assert conn.statements == ["REFRESH MATERIALIZED VIEW CONCURRENTLY mv_valid_order_priorities"]
+
+
+def test_cached_loaders_bind_every_parameter(queries):
+    sql_statistics.load_cached_sku_statistics(RecordingConnection(), "model", "hash")
+    sql_statistics.load_cached_order_priorities(RecordingConnection(), "hash", top_n=5)
+
+    for statement, params in queries:
+        assert not _unbound(statement, params)
+    assert queries[1][0].rstrip().endswith("LIMIT :top_n")
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from conftest import SKUS, write_stock_file
+
+from sales_data.loader import SalesDataLoader
+from sales_data.stock_history_cache import LEGACY_CACHE_FILE, StockHistoryCache
+
+
+@pytest.fixture
+def loader(data_tree):
+    return SalesDataLoader(str(data_tree))
+
+
+def _cache(loader: SalesDataLoader) -> StockHistoryCache:
+    return StockHistoryCache(loader.cache_root / ".stock_history", loader)
+
+
+def _write_legacy_cache(directory) -> None:
+    pd.DataFrame({
+        "sku": ["ch0010101", "ch0010102"],
+        "snapshot_date": pd.to_datetime(["2024-06-01"] * 2),
+        "available_stock": [1.0, 2.0],
+    }).to_parquet(directory / LEGACY_CACHE_FILE)
+
+
+def test_legacy_cache_in_data_directory_is_migrated(loader, isolated_legacy_cache):
+    _write_legacy_cache(isolated_legacy_cache)
+
+    history = _cache(loader).get_history()
+
+    assert sorted(history["snapshot_date"].dt.strftime("%Y-%m-%d").unique()) == [
+        "2024-06-01", "2025-01-01"
+    ]
+    assert not (isolated_legacy_cache / LEGACY_CACHE_FILE).exists()
+
+
+def test_legacy_cache_next_to_cache_directory_is_migrated(loader):
+    _write_legacy_cache(loader.cache_root)
+
+    history = _cache(loader).get_history(end_date=datetime(2024, 12, 31))
+
+    assert list(history["available_stock"]) == [1.0, 2.0]
+    assert not (loader.cache_root / LEGACY_CACHE_FILE).exists()
+
+
+def test_new_snapshot_is_added_and_filtered(loader, isolated_file_manifest):
+    cache = _cache(loader)
+    assert len(cache.sync()) == 1
+
+    write_stock_file(loader.stock_dir, "2025-02-01", SKUS)
+    isolated_file_manifest.refresh()
+
+    assert len(cache.sync()) == 2
+    history = cache.get_history(start_date=datetime(2025, 2, 1), skus=[SKUS[1]])
+    assert history[["sku", "available_stock"]].to_dict("records") == [
+        {"sku": SKUS[1], "available_stock": 1.0}
+    ]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import copy
+
+import pandas as pd
+import pytest
+from conftest import sales_frame
+
+from sales_data.analyzer import SalesAnalyzer
+from sales_data.summary_pipeline import PipelineStage, SummaryPipeline
+from utils.settings_manager import load_settings
+
+
+@pytest.fixture
+def analyzer():
+    sales = pd.concat(
+        [
+            sales_frame("2023-01-01", 700, ["ch0010101", "ch0010102"], seed=1),
+            sales_frame("2024-06-01", 200, ["ch0020201"], seed=2),
+        ],
+        ignore_index=True,
+    )
+    return SalesAnalyzer(sales)
+
+
+@pytest.fixture
+def settings():
+    return copy.deepcopy(load_settings())
+
+
+def _direct_summary(analyzer: SalesAnalyzer, settings: dict, by_model: bool) -> pd.DataFrame:
+    summary = analyzer.aggregate_by_model() if by_model else analyzer.aggregate_by_sku()
+    summary = analyzer.classify_sku_type(
+        summary, settings["cv_thresholds"]["basic"], settings["cv_thresholds"]["seasonal"]
+    )
+    z_scores = settings["z_scores"]
+    summary = analyzer.calculate_safety_stock_and_rop(
+        summary,
+        analyzer.determine_seasonal_months(),
+        z_scores["basic"],
+        z_scores["regular"],
+        z_scores["seasonal_in"],
+        z_scores["seasonal_out"],
+        z_scores["new"],
+        settings["lead_time"],
+    )
+    last_two_years = analyzer.calculate_last_two_years_avg_sales(by_model=by_model)
+    summary = summary.merge(last_two_years, on="MODEL" if by_model else "SKU", how="left")
+    summary["LAST_2_YEARS_AVG"] = summary["LAST_2_YEARS_AVG"].fillna(0)
+    return summary
+
+
+@pytest.mark.parametrize("entity_type", ["sku", "model"])
+def test_summary_matches_direct_computation(analyzer, settings, entity_type):
+    pipeline = SummaryPipeline(analyzer)
+
+    pd.testing.assert_frame_equal(
+        pipeline.run("summary", settings, entity_type),
+        _direct_summary(analyzer, settings, entity_type == "model"),
+    )
+
+
+def test_setting_change_recomputes_only_dependent_stages(analyzer, settings):
+    pipeline = SummaryPipeline(analyzer)
+    pipeline.run("summary", settings)
+
+    changed = copy.deepcopy(settings)
+    changed["z_scores"]["basic"] += 0.5
+    summary = pipeline.run("summary", changed)
+
+    pd.testing.assert_frame_equal(summary, _direct_summary(analyzer, changed, False))
+    entries = pipeline.cached_entries()
+    assert entries["aggregate"] == 1
+    assert entries["classified"] == 1
+    assert entries["safety_stock"] == 2
+
+
+def test_cached_results_are_not_shared_with_callers(analyzer, settings):
+    pipeline = SummaryPipeline(analyzer)
+    summary = pipeline.run("summary", settings)
+
+    summary["SS"] = 0
+
+    assert (pipeline.run("summary", settings)["SS"] != 0).any()
+
+
+def test_custom_stage_reads_datasets_and_evicts_old_entries(analyzer, settings):
+    calls: list[int] = []
+
+    def stock_stage(pipeline, _entity_type, stage_settings, summary):
+        calls.append(stage_settings["lead_time"])
+        stock = pipeline.dataset("stock")
+        return summary.merge(stock, on="SKU", how="left")
+
+    stock = pd.DataFrame({"SKU": ["ch0010101"], "STOCK": [5]})
+    pipeline = SummaryPipeline(analyzer, {"stock": stock}.get, max_entries=2)
+    pipeline.register(PipelineStage("stock", stock_stage, ("aggregate",), ("lead_time",)))
+
+    for lead_time in (1, 2, 3, 1):
+        result = pipeline.run("stock", {**settings, "lead_time": lead_time})
+
+    assert calls == [1, 2, 3, 1]
+    assert pipeline.cached_entries()["stock"] == 2
+    assert result.set_index("SKU").loc["ch0010101", "STOCK"] == 5
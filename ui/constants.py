@@ -6,6 +6,7 @@ from typing import Final
 class SessionKeys:
     SETTINGS: Final[str] = "settings"
     DATA_SOURCE: Final[str] = "data_source"
+    DATA_LEASE: Final[str] = "data_lease"
     PATTERN_SETS: Final[str] = "pattern_sets"
     ACTIVE_SET_ID: Final[str] = "active_set_id"
     SHOW_ADD_PATTERN_SET: Final[str] = "show_add_pattern_set"
@@ -14,6 +15,8 @@ class SessionKeys:
     NUM_SIZES: Final[str] = "num_sizes"
     RECOMMENDATIONS_DATA: Final[str] = "recommendations_data"
     RECOMMENDATIONS_TOP_N: Final[str] = "recommendations_top_n"
+    PRIORITY_ENGINE: Final[str] = "priority_engine"
+    PRIORITY_ENGINE_PARAMS: Final[str] = "priority_engine_params"
     SELECTED_ORDER_ITEMS: Final[str] = "selected_order_items"
     SZWALNIA_INCLUDE_FILTER: Final[str] = "szwalnia_include_filter"
     SZWALNIA_EXCLUDE_FILTER: Final[str] = "szwalnia_exclude_filter"
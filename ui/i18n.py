@@ -116,6 +116,7 @@ class Keys:
     TITLE_TASK_PLANNER: Final[str] = "title_task_planner"
     TITLE_SALES_DATA_ANALYSIS: Final[str] = "title_sales_data_analysis"
     TITLE_STOCK_PROJECTION: Final[str] = "title_stock_projection"
+    TITLE_STOCKOUT_RANKING: Final[str] = "title_stockout_ranking"
     TITLE_YEARLY_SALES_TREND: Final[str] = "title_yearly_sales_trend"
     TITLE_STOCK_STATUS: Final[str] = "title_stock_status"
     TITLE_ORDER_QUANTITIES: Final[str] = "title_order_quantities"
@@ -1087,6 +1088,7 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         Keys.TITLE_TASK_PLANNER: "📝 Task Planner",
         Keys.TITLE_SALES_DATA_ANALYSIS: "Sales Data Analysis",
         Keys.TITLE_STOCK_PROJECTION: "📈 Stock Projection Analysis",
+        Keys.TITLE_STOCKOUT_RANKING: "⏳ Earliest projected stockouts",
         Keys.TITLE_YEARLY_SALES_TREND: "📊 Yearly Sales Trend",
         Keys.TITLE_STOCK_STATUS: "Stock Status",
         Keys.TITLE_ORDER_QUANTITIES: "Order Quantities",
@@ -2050,6 +2052,7 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         Keys.TITLE_TASK_PLANNER: "📝 Planer Zadań",
         Keys.TITLE_SALES_DATA_ANALYSIS: "Analiza Danych Sprzedaży",
         Keys.TITLE_STOCK_PROJECTION: "📈 Analiza Projekcji Stanu",
+        Keys.TITLE_STOCKOUT_RANKING: "⏳ Najwcześniejsze prognozowane braki",
         Keys.TITLE_YEARLY_SALES_TREND: "📊 Roczny Trend Sprzedaży",
         Keys.TITLE_STOCK_STATUS: "Stan Magazynu",
         Keys.TITLE_ORDER_QUANTITIES: "Ilości Zamówienia",
@@ -15,6 +15,7 @@ __all__ = [
     "load_unique_categories",
     "load_unique_facilities",
     "load_unique_materials",
+    "refresh_shared_data",
     "create_download_button",
     "display_error",
     "display_info",
@@ -54,6 +55,7 @@ from ui.shared.data_loaders import (
     load_unique_categories,
     load_unique_facilities,
     load_unique_materials,
+    refresh_shared_data,
 )
 from ui.shared.display_helpers import (
     create_download_button,
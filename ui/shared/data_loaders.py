@@ -1,16 +1,31 @@
 from __future__ import annotations
 
-from datetime import date
-from typing import Any
+from collections.abc import Collection
+from datetime import date, datetime, time
+from typing import TYPE_CHECKING, Any
 
 import pandas as pd
 import streamlit as st
 
-from ui.constants import Config
+from sales_data import SalesAnalyzer
+from sales_data.analysis import (
+    SalesCube,
+    StockProjection,
+    apply_priority_scoring,
+    calculate_forecast_date_range,
+)
+from sales_data.data_plane import DataLease, DatasetGetter, SharedDataPlane
+from sales_data.data_source import select_columns, slice_by_date
+from sales_data.summary_pipeline import PipelineStage, SummaryPipeline
+from ui.constants import Config, SessionKeys
 from ui.i18n import t, Keys
 from ui.shared.session_manager import get_data_source
+from ui.shared.sku_utils import filter_excluded_skus
 from utils.logging_config import get_logger
 
+if TYPE_CHECKING:
+    from sales_data.data_source import DataSource
+
 logger = get_logger("data_loaders")
 
 
@@ -65,9 +80,7 @@ def load_all_data_with_progress(
     return results
 
 
-@st.cache_data(ttl=Config.CACHE_TTL)
-def load_active_skus() -> set[str] | None:
-    stock_df, _ = load_stock()
+def _active_skus_from(stock_df: pd.DataFrame | None) -> set[str] | None:
     if stock_df is None or stock_df.empty:
         return None
     sku_col = "sku" if "sku" in stock_df.columns else "SKU"
@@ -76,15 +89,15 @@ def load_active_skus() -> set[str] | None:
     return set(stock_df[sku_col].unique())
 
 
-@st.cache_data(ttl=Config.CACHE_TTL)
-def load_data() -> pd.DataFrame:
+def _load_sales_dataset(data_source: DataSource, get_dataset: DatasetGetter) -> pd.DataFrame:
     logger.info("Loading sales data")
-    data_source = get_data_source()
     df = data_source.load_sales_data()
     logger.info("Sales data loaded: %d rows", len(df) if df is not None else 0)
     if df is None or df.empty:
         return pd.DataFrame()
-    active_skus = load_active_skus()
+    if df["data"].hasnans or not df["data"].is_monotonic_increasing:
+        df = df.sort_values("data", kind="stable", na_position="last", ignore_index=True)
+    active_skus = _active_skus_from(get_dataset("stock"))
     if active_skus is not None:
         before = len(df)
         df = pd.DataFrame(df[df["sku"].isin(active_skus)])
@@ -92,36 +105,162 @@ def load_data() -> pd.DataFrame:
     return df
 
 
-def _get_stock_cache_key() -> str:
-    data_source = get_data_source()
-    if data_source.get_data_source_type() == "file":
-        from sales_data.loader import SalesDataLoader
-        loader = SalesDataLoader()
-        latest_file = loader.get_latest_stock_file()
-        if latest_file:
-            return f"file_{latest_file.name}_{latest_file.stat().st_mtime}"
-    return f"db_{date.today().isoformat()}"
-
-
-@st.cache_data(ttl=Config.CACHE_TTL)
-def _load_stock_cached(_cache_key: str) -> tuple[pd.DataFrame | None, str | None]:
-    logger.info("Loading stock data (cache_key=%s)", _cache_key)
-    data_source = get_data_source()
+def _load_stock_dataset(
+        data_source: DataSource, _get_dataset: DatasetGetter
+) -> pd.DataFrame | None:
+    logger.info("Loading stock data")
     stock_dataframe = data_source.load_stock_data()
     if stock_dataframe is not None and not stock_dataframe.empty:
-        source = "database" if data_source.get_data_source_type() == "database" else "file"
-        logger.info("Stock data loaded: %d rows from %s", len(stock_dataframe), source)
-        return stock_dataframe, source
+        logger.info(
+            "Stock data loaded: %d rows from %s",
+            len(stock_dataframe),
+            data_source.get_data_source_type(),
+        )
+        return stock_dataframe
     logger.warning("No stock data available")
-    return None, None
+    return None
 
 
-def load_stock() -> tuple[pd.DataFrame | None, str | None]:
-    cache_key = _get_stock_cache_key()
-    return _load_stock_cached(cache_key)
+def _load_forecast_dataset(
+        data_source: DataSource, _get_dataset: DatasetGetter
+) -> pd.DataFrame | None:
+    logger.info("Loading forecast data")
+    forecast_dataframe = data_source.load_forecast_data()
+    if forecast_dataframe is None or forecast_dataframe.empty:
+        logger.warning("No forecast data available")
+        return None
+    return forecast_dataframe
+
+
+def _load_stock_history_dataset(
+        data_source: DataSource, _get_dataset: DatasetGetter
+) -> pd.DataFrame | None:
+    df = data_source.load_stock_history()
+    return df if df is not None and not df.empty else None
+
+
+@st.cache_resource
+def get_data_plane() -> SharedDataPlane:
+    from sales_data.data_source_factory import DataSourceFactory
+
+    plane = SharedDataPlane(DataSourceFactory.create_data_source)
+    plane.register("sales", _load_sales_dataset)
+    plane.register("stock", _load_stock_dataset)
+    plane.register("forecast", _load_forecast_dataset)
+    plane.register("stock_history", _load_stock_history_dataset)
+    return plane
+
+
+def _get_data_version() -> str:
+    return get_data_plane().source.get_data_version()
+
+
+def get_data_version() -> str:
+    return _get_data_version()
+
+
+def _get_data_lease() -> DataLease:
+    lease: DataLease | None = st.session_state.get(SessionKeys.DATA_LEASE)
+    version = _get_data_version()
+    if lease is not None and lease.active and lease.version == version:
+        return lease
+
+    new_lease = get_data_plane().acquire(version)
+    st.session_state[SessionKeys.DATA_LEASE] = new_lease
+    if lease is not None:
+        lease.release()
+    return new_lease
+
+
+def _shared_source_type() -> str:
+    return get_data_plane().source.get_data_source_type()
+
+
+def refresh_shared_data() -> None:
+    plane = get_data_plane()
+    plane.source.get_data_version(refresh=True)
+    _build_summary_pipeline.clear()
+    _build_sales_analyzer.clear()
+    _build_stock_projection.clear()
+    plane.invalidate()
+
+
+def load_active_skus() -> set[str] | None:
+    return _active_skus_from(_get_data_lease().get("stock"))
+
+
+def load_data() -> pd.DataFrame:
+    df = _get_data_lease().get("sales")
+    return df if df is not None else pd.DataFrame()
+
 
+def load_sales_range(
+        start_date: datetime, end_date: datetime, columns: list[str] | None = None
+) -> pd.DataFrame:
+    df = load_data()
+    if df.empty:
+        return df
+    return select_columns(slice_by_date(df, start_date, end_date), columns)
+
+
+@st.cache_resource(max_entries=4)
+def _build_sales_analyzer(
+        data_version: str, excluded_skus: tuple[str, ...], reference_date: date
+) -> SalesAnalyzer:
+    df = filter_excluded_skus(load_data(), set(excluded_skus), sku_column="sku")
+    cube = SalesCube(df, datetime.combine(reference_date, time.min))
+    analyzer = SalesAnalyzer(df, copy=False, cube=cube)
+    logger.info(
+        "Sales cube built for version %s: %d SKUs x %d months",
+        data_version,
+        len(cube),
+        len(cube.months),
+    )
+    return analyzer
+
+
+def load_sales_analyzer(excluded_skus: Collection[str] = ()) -> SalesAnalyzer:
+    return _build_sales_analyzer(_get_data_version(), tuple(sorted(excluded_skus)), date.today())
+
+
+def _stock_stage(
+        pipeline: SummaryPipeline, _entity_type: str, _settings: dict, summary: pd.DataFrame
+) -> pd.DataFrame:
+    return merge_stock_into_summary(summary.copy(deep=False), pipeline.dataset("stock"))
+
+
+def _priority_stage(
+        pipeline: SummaryPipeline, _entity_type: str, settings: dict, summary: pd.DataFrame
+) -> pd.DataFrame:
+    summary = merge_forecast_into_summary(
+        summary.copy(deep=False), pipeline.dataset("forecast"), settings["lead_time"]
+    )
+    return apply_priority_scoring(summary, settings)
 
-load_stock.clear = _load_stock_cached.clear  # type: ignore[attr-defined]
+
+@st.cache_resource(max_entries=4)
+def _build_summary_pipeline(
+        data_version: str, excluded_skus: tuple[str, ...], reference_date: date
+) -> SummaryPipeline:
+    analyzer = _build_sales_analyzer(data_version, excluded_skus, reference_date)
+    lease = get_data_plane().acquire(data_version)
+    pipeline = SummaryPipeline(analyzer, lease.get)
+    pipeline.register(PipelineStage("stock", _stock_stage, ("summary",)))
+    pipeline.register(PipelineStage(
+        "priority", _priority_stage, ("stock",), ("lead_time", "order_recommendations")
+    ))
+    return pipeline
+
+
+def load_summary_pipeline(excluded_skus: Collection[str] = ()) -> SummaryPipeline:
+    return _build_summary_pipeline(_get_data_version(), tuple(sorted(excluded_skus)), date.today())
+
+
+def load_stock() -> tuple[pd.DataFrame | None, str | None]:
+    stock_dataframe = _get_data_lease().get("stock")
+    if stock_dataframe is None:
+        return None, None
+    return stock_dataframe, _shared_source_type()
 
 
 def _parse_forecast_date(forecast_df: pd.DataFrame) -> pd.Timestamp | None:
@@ -143,21 +282,32 @@ def _parse_forecast_date(forecast_df: pd.DataFrame) -> pd.Timestamp | None:
         return None
 
 
-@st.cache_data(ttl=Config.CACHE_TTL)
 def load_forecast() -> tuple[pd.DataFrame | None, pd.Timestamp | None, str | None]:
-    logger.info("Loading forecast data")
-    data_source = get_data_source()
-    forecast_dataframe = data_source.load_forecast_data()
-
-    if forecast_dataframe is None or forecast_dataframe.empty:
-        logger.warning("No forecast data available")
+    forecast_dataframe = _get_data_lease().get("forecast")
+    if forecast_dataframe is None:
         return None, None, None
+    return forecast_dataframe, _parse_forecast_date(forecast_dataframe), _shared_source_type()
+
+
+@st.cache_resource(max_entries=2)
+def _build_stock_projection(
+        data_version: str, forecast_date: pd.Timestamp | None
+) -> StockProjection | None:
+    forecast_df, _, _ = load_forecast()
+    if forecast_df is None:
+        return None
+    projection = StockProjection(forecast_df, forecast_date)
+    logger.info(
+        "Stock projection built for version %s: %d SKUs x %d forecast months",
+        data_version,
+        len(projection.skus),
+        len(projection.dates),
+    )
+    return projection
 
-    loaded_forecast_date = _parse_forecast_date(forecast_dataframe)
-    source = "database" if data_source.get_data_source_type() == "database" else "file"
-    logger.info("Forecast data loaded: %d rows from %s, generated_date=%s",
-                len(forecast_dataframe), source, loaded_forecast_date)
-    return forecast_dataframe, loaded_forecast_date, source
+
+def load_stock_projection(forecast_date: pd.Timestamp | None) -> StockProjection | None:
+    return _build_stock_projection(_get_data_version(), forecast_date)
 
 
 @st.cache_data(ttl=Config.CACHE_TTL)
@@ -267,11 +417,8 @@ def load_yearly_forecast(include_color: bool = False) -> pd.DataFrame | None:
     return aggregate_forecast_yearly(forecast_df, include_color=include_color)
 
 
-@st.cache_data(ttl=Config.CACHE_TTL)
 def load_stock_history() -> pd.DataFrame | None:
-    data_source = get_data_source()
-    df = data_source.load_stock_history()
-    return df if df is not None and not df.empty else None
+    return _get_data_lease().get("stock_history")
 
 
 def _add_default_stock_columns(df: pd.DataFrame, stock_column: str) -> pd.DataFrame:
@@ -320,3 +467,23 @@ def merge_stock_into_summary(
         sku_summary["PRICE"] = sku_summary["PRICE"].astype(float).fillna(0)
 
     return sku_summary
+
+
+def merge_forecast_into_summary(
+        sku_summary: pd.DataFrame, forecast_df: pd.DataFrame | None, lead_time: float
+) -> pd.DataFrame:
+    if forecast_df is None or forecast_df.empty:
+        sku_summary["FORECAST_LEADTIME"] = 0
+        return sku_summary
+
+    forecast_start, forecast_end = calculate_forecast_date_range(lead_time)
+    forecast_window = forecast_df[
+        (forecast_df["data"] >= forecast_start) & (forecast_df["data"] < forecast_end)
+        ]
+    forecast_agg = pd.DataFrame(
+        forecast_window.groupby("sku", as_index=False, observed=True)["forecast"].sum()
+    )
+    forecast_agg = forecast_agg.rename(columns={"sku": "SKU", "forecast": "FORECAST_LEADTIME"})
+    sku_summary = sku_summary.merge(forecast_agg, on="SKU", how="left")
+    sku_summary["FORECAST_LEADTIME"] = sku_summary["FORECAST_LEADTIME"].fillna(0)
+    return sku_summary
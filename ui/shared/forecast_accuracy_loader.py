@@ -7,20 +7,18 @@ import pandas as pd
 import streamlit as st
 
 from ui.constants import Config
-from ui.shared.data_loaders import load_active_skus
+from ui.shared.data_loaders import load_sales_range
 from ui.shared.session_manager import get_data_source
-from ui.shared.sku_utils import filter_by_active_skus
+
+ACCURACY_SALES_COLUMNS = ["data", "sku", "ilosc"]
+ACCURACY_STOCK_COLUMNS = ["sku", "snapshot_date", "available_stock"]
 
 
-@st.cache_data(ttl=Config.CACHE_TTL)
 def load_sales_for_accuracy(
     start_date: datetime, end_date: datetime
 ) -> pd.DataFrame | None:
-    data_source = get_data_source()
-    sales_df = data_source.load_sales_data(start_date=start_date, end_date=end_date)
-    if sales_df is None or sales_df.empty:
-        return None
-    return filter_by_active_skus(sales_df, load_active_skus())
+    sales_df = load_sales_range(start_date, end_date, columns=ACCURACY_SALES_COLUMNS)
+    return sales_df if not sales_df.empty else None
 
 
 def _extract_generated_date(forecast_df: pd.DataFrame) -> datetime | None:
@@ -61,7 +59,9 @@ def load_stock_history_for_accuracy(
     start_date: datetime, end_date: datetime
 ) -> pd.DataFrame | None:
     data_source = get_data_source()
-    stock_df = data_source.load_stock_history(start_date=start_date, end_date=end_date)
+    stock_df = data_source.load_stock_history(
+        start_date=start_date, end_date=end_date, columns=ACCURACY_STOCK_COLUMNS
+    )
     return stock_df if stock_df is not None and not stock_df.empty else None
 
 
@@ -11,8 +11,13 @@ if TYPE_CHECKING:
     from utils.pattern_optimizer import PatternSet
 
 
+def _shared_data_source() -> DataSource:
+    from ui.shared.data_loaders import get_data_plane
+
+    return get_data_plane().source
+
+
 def initialize_session_state() -> None:
-    from sales_data.data_source_factory import DataSourceFactory
     from utils.pattern_optimizer import load_pattern_sets
     from utils.settings_manager import load_settings
     from utils.sku_exclude_manager import load_excluded_skus
@@ -20,7 +25,7 @@ def initialize_session_state() -> None:
 
     defaults: dict[str, Any] = {
         SessionKeys.SETTINGS: load_settings,
-        SessionKeys.DATA_SOURCE: DataSourceFactory.create_data_source,
+        SessionKeys.DATA_SOURCE: _shared_data_source,
         SessionKeys.PATTERN_SETS: load_pattern_sets,
         SessionKeys.ACTIVE_SET_ID: None,
         SessionKeys.SHOW_ADD_PATTERN_SET: False,
@@ -29,6 +34,8 @@ def initialize_session_state() -> None:
         SessionKeys.NUM_SIZES: Config.DEFAULT_NUM_SIZES,
         SessionKeys.RECOMMENDATIONS_DATA: None,
         SessionKeys.RECOMMENDATIONS_TOP_N: Config.DEFAULT_TOP_N,
+        SessionKeys.PRIORITY_ENGINE: None,
+        SessionKeys.PRIORITY_ENGINE_PARAMS: None,
         SessionKeys.SELECTED_ORDER_ITEMS: [],
         SessionKeys.SZWALNIA_INCLUDE_FILTER: [],
         SessionKeys.SZWALNIA_EXCLUDE_FILTER: [],
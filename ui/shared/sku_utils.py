@@ -4,8 +4,7 @@ from collections.abc import Collection
 
 import pandas as pd
 
-CHILDREN_PREFIXES = ("ch", "ni", "dz")
-ADULT_PREFIXES = ("do", "ju")
+from sales_data.sku_dimension import ADULT_PREFIXES, CHILDREN_PREFIXES, sku_attribute, sku_labels
 
 
 def get_sku_age_category(sku: str) -> str | None:
@@ -18,15 +17,15 @@ def get_sku_age_category(sku: str) -> str | None:
 
 
 def extract_model(sku_series: pd.Series) -> pd.Series:
-    return sku_series.astype(str).str[:5]
+    return sku_labels(sku_series, "model")
 
 
 def extract_color(sku_series: pd.Series) -> pd.Series:
-    return sku_series.astype(str).str[5:7]
+    return sku_labels(sku_series, "color")
 
 
 def extract_size(sku_series: pd.Series) -> pd.Series:
-    return sku_series.astype(str).str[7:9]
+    return sku_labels(sku_series, "size")
 
 
 def parse_sku(sku: str) -> dict[str, str]:
@@ -77,7 +76,7 @@ def filter_excluded_models(
     if col is None:
         return df
     excluded_models = list({sku[:5] for sku in excluded_skus})
-    return pd.DataFrame(df[~df[col].astype(str).str[:5].isin(excluded_models)])
+    return pd.DataFrame(df[~sku_attribute(pd.Series(df[col]), "model").isin(excluded_models)])
 
 
 def filter_excluded_model_colors(
@@ -91,7 +90,7 @@ def filter_excluded_model_colors(
     if col is None:
         return df
     excluded_mc = list({sku[:7] for sku in excluded_skus})
-    return pd.DataFrame(df[~df[col].astype(str).str[:7].isin(excluded_mc)])
+    return pd.DataFrame(df[~sku_attribute(pd.Series(df[col]), "model_color").isin(excluded_mc)])
 
 
 def filter_by_active_skus(
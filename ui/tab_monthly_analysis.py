@@ -17,7 +17,7 @@ from ui.shared.data_loaders import (
     load_outlet_models,
 )
 from ui.shared.session_manager import get_excluded_skus, get_session_value, set_session_value
-from ui.shared.sku_utils import filter_excluded_skus
+from ui.shared.sku_utils import extract_model, filter_excluded_skus
 from utils.logging_config import get_logger
 
 logger = get_logger("tab_monthly_analysis")
@@ -26,7 +26,7 @@ logger = get_logger("tab_monthly_analysis")
 def _get_new_models(sales_df: pd.DataFrame) -> set[str]:
     df = sales_df.copy()
     df["data"] = pd.to_datetime(df["data"])
-    df["model"] = df["sku"].astype(str).str[:5]
+    df["model"] = extract_model(df["sku"])
 
     one_year_ago = datetime.today() - timedelta(days=365)
     first_sales = df.groupby("model", observed=True)["data"].min().reset_index()
@@ -8,7 +8,6 @@ import pandas as pd
 import streamlit as st
 
 from sales_data import SalesAnalyzer
-from sales_data.analysis import apply_priority_scoring
 from ui.constants import ColumnNames, Config, Icons, MimeTypes, SessionKeys
 from ui.i18n import Keys, t
 from ui.shared.data_loaders import (
@@ -16,7 +15,7 @@ from ui.shared.data_loaders import (
     load_model_metadata,
     load_size_aliases,
     load_size_aliases_reverse,
-    merge_stock_into_summary,
+    load_summary_pipeline,
 )
 from ui.shared.session_manager import get_data_source, get_excluded_skus, get_session_value, get_settings, set_session_value
 from ui.shared.sku_utils import ADULT_PREFIXES, extract_color, extract_model, extract_size, filter_excluded_skus, get_size_sort_key
@@ -74,7 +73,7 @@ def _process_manual_order(manual_model: str, context: dict) -> None:
     analyzer = context["analyzer"]
     settings = get_settings()
 
-    model_skus = df[df["sku"].astype(str).str[:5] == model_code]
+    model_skus = df[extract_model(df["sku"]) == model_code]
 
     if model_skus.empty:
         logger.warning("No SKUs found for model '%s'", model_code)
@@ -82,7 +81,7 @@ def _process_manual_order(manual_model: str, context: dict) -> None:
         return
 
     with st.spinner(t(Keys.LOADING_DATA_FOR_MODEL).format(model=model_code)):  # type: ignore[attr-defined]
-        sku_summary = _get_or_build_sku_summary(analyzer, context, settings)
+        sku_summary = _get_or_build_sku_summary(analyzer, settings)
         model_data = pd.DataFrame(sku_summary[sku_summary["MODEL"] == model_code]).copy()
 
         if model_data.empty:
@@ -98,53 +97,17 @@ def _process_manual_order(manual_model: str, context: dict) -> None:
         st.rerun()
 
 
-def _prepare_sku_summary(analyzer: SalesAnalyzer, context: dict, settings: dict) -> pd.DataFrame:
-    seasonal_data = context["seasonal_data"]
-    stock_df = context.get("stock_df")
-    forecast_df = context.get("forecast_df")
+def _prepare_sku_summary(analyzer: SalesAnalyzer, settings: dict) -> pd.DataFrame:
+    sku_summary = load_summary_pipeline(get_excluded_skus()).run("priority", settings)
 
-    if stock_df is None or (hasattr(stock_df, 'empty') and stock_df.empty):
-        stock_df = _load_stock_data()
+    period_sales = analyzer.calculate_sku_period_sales(settings["lead_time"])
+    sku_summary = sku_summary.merge(period_sales, on="SKU", how="left")
+    sku_summary["PERIOD_SALES"] = sku_summary["PERIOD_SALES"].fillna(0).astype(int)
 
-    if forecast_df is None or (hasattr(forecast_df, 'empty') and forecast_df.empty):
-        forecast_df = _load_forecast_data()
-
-    sku_summary = analyzer.aggregate_by_sku()
-
-    sku_summary = analyzer.classify_sku_type(
-        sku_summary,
-        cv_basic=settings["cv_thresholds"]["basic"],
-        cv_seasonal=settings["cv_thresholds"]["seasonal"],
-    )
-
-    sku_summary = analyzer.calculate_safety_stock_and_rop(
-        sku_summary,
-        seasonal_data,
-        z_basic=settings["z_scores"]["basic"],
-        z_regular=settings["z_scores"]["regular"],
-        z_seasonal_in=settings["z_scores"]["seasonal_in"],
-        z_seasonal_out=settings["z_scores"]["seasonal_out"],
-        z_new=settings["z_scores"]["new"],
-        lead_time_months=settings["lead_time"],
-    )
-
-    sku_summary = merge_stock_into_summary(sku_summary, stock_df, ColumnNames.STOCK)
-    sku_summary = _merge_forecast_data(sku_summary, forecast_df, settings["lead_time"])
-    sku_summary = apply_priority_scoring(sku_summary, settings)
-
-    monthly_agg = _load_monthly_aggregations_cached()
-    if monthly_agg is not None and not monthly_agg.empty:
-        period_sales = SalesAnalyzer.calculate_period_sales(monthly_agg, settings["lead_time"])
-        sku_summary = sku_summary.merge(period_sales, on="SKU", how="left")
-        sku_summary["PERIOD_SALES"] = sku_summary["PERIOD_SALES"].fillna(0).astype(int)
-
-        seasonal_sales = SalesAnalyzer.calculate_period_sales(monthly_agg, settings["lead_time"], force_seasonal=True)
-        seasonal_sales.columns = pd.Index(["SKU", "PERIOD_SALES_SEASONAL"])
-        sku_summary = sku_summary.merge(seasonal_sales, on="SKU", how="left")
-        sku_summary["PERIOD_SALES_SEASONAL"] = sku_summary["PERIOD_SALES_SEASONAL"].fillna(0).astype(int)
-    else:
-        sku_summary["PERIOD_SALES"] = 0
-        sku_summary["PERIOD_SALES_SEASONAL"] = 0
+    seasonal_sales = analyzer.calculate_sku_period_sales(settings["lead_time"], force_seasonal=True)
+    seasonal_sales.columns = pd.Index(["SKU", "PERIOD_SALES_SEASONAL"])
+    sku_summary = sku_summary.merge(seasonal_sales, on="SKU", how="left")
+    sku_summary["PERIOD_SALES_SEASONAL"] = sku_summary["PERIOD_SALES_SEASONAL"].fillna(0).astype(int)
 
     sku_summary = _apply_forecast_fallback_for_new_adults(sku_summary)
 
@@ -157,7 +120,7 @@ def _settings_hash(settings: dict) -> str:
 
 
 def _get_or_build_sku_summary(
-        analyzer: SalesAnalyzer, context: dict, settings: dict,
+        analyzer: SalesAnalyzer, settings: dict,
 ) -> pd.DataFrame:
     current_hash = _settings_hash(settings)
     cached_hash = st.session_state.get(SessionKeys.ORDER_SKU_SUMMARY_HASH)
@@ -168,7 +131,7 @@ def _get_or_build_sku_summary(
         return cached_summary
 
     logger.info("Building SKU summary for order creation (settings changed or first run)")
-    sku_summary = _prepare_sku_summary(analyzer, context, settings)
+    sku_summary = _prepare_sku_summary(analyzer, settings)
     sku_summary = _add_sku_components(sku_summary)
 
     st.session_state[SessionKeys.ORDER_SKU_SUMMARY_CACHE] = sku_summary
@@ -198,50 +161,6 @@ def _apply_forecast_fallback_for_new_adults(sku_summary: pd.DataFrame) -> pd.Dat
     return sku_summary
 
 
-def _merge_forecast_data(
-        sku_summary: pd.DataFrame, forecast_df: pd.DataFrame | None, lead_time: float
-) -> pd.DataFrame:
-    if forecast_df is None or forecast_df.empty:
-        sku_summary["FORECAST_LEADTIME"] = 0
-        return sku_summary
-
-    return _add_forecast_data(sku_summary, forecast_df, lead_time)
-
-
-@st.cache_data(ttl=Config.CACHE_TTL)
-def _load_cached_data(data_type: str) -> pd.DataFrame | None:
-    try:
-        data_source = get_data_source()
-        if data_type == "stock":
-            return data_source.load_stock_data()
-        return data_source.load_forecast_data()
-    except Exception as e:
-        logger.warning("Could not load %s data: %s", data_type, e)
-        return None
-
-
-def _load_stock_data() -> pd.DataFrame | None:
-    df = _load_cached_data("stock")
-    return filter_excluded_skus(df, get_excluded_skus()) if df is not None else None
-
-
-def _load_forecast_data() -> pd.DataFrame | None:
-    df = _load_cached_data("forecast")
-    return filter_excluded_skus(df, get_excluded_skus(), sku_column="sku") if df is not None else None
-
-
-def _add_forecast_data(sku_summary: pd.DataFrame, forecast_df: pd.DataFrame, lead_time: float) -> pd.DataFrame:
-    forecast_start, forecast_end = SalesAnalyzer.calculate_forecast_date_range(lead_time)
-    forecast_window = forecast_df[
-        (forecast_df["data"] >= forecast_start) & (forecast_df["data"] < forecast_end)
-        ]
-    forecast_agg = pd.DataFrame(forecast_window.groupby("sku", as_index=False, observed=True)["forecast"].sum())
-    forecast_agg = forecast_agg.rename(columns={"sku": "SKU", "forecast": "FORECAST_LEADTIME"})
-    sku_summary = sku_summary.merge(forecast_agg, on="SKU", how="left")
-    sku_summary["FORECAST_LEADTIME"] = sku_summary["FORECAST_LEADTIME"].fillna(0)
-    return sku_summary
-
-
 def _add_sku_components(sku_summary: pd.DataFrame) -> pd.DataFrame:
     sku_col = pd.Series(sku_summary["SKU"])
     sku_summary["MODEL"] = extract_model(sku_col)
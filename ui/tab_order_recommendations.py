@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 from sales_data import SalesAnalyzer
+from sales_data.analysis import PriorityEngine, extract_priority_config
 from ui.constants import ColumnNames, Config, Icons, MimeTypes, SessionKeys
 from ui.i18n import t, Keys
-from ui.shared.data_loaders import load_color_aliases, load_model_metadata, merge_stock_into_summary
+from ui.shared.data_loaders import load_color_aliases, load_model_metadata, load_summary_pipeline, \
+    merge_stock_into_summary
 from ui.shared.navigation import switch_to_tab
 from ui.shared.session_manager import get_data_source, get_excluded_skus, get_session_value, get_settings, set_session_value
 from ui.shared.sku_utils import filter_excluded_skus
@@ -68,7 +71,6 @@ def _initialize_tab_session_state() -> None:
         st.session_state["forecast_source"] = "External"
 
 
-@st.fragment
 def _render_parameters_expander() -> None:
     settings = get_settings()
 
@@ -291,6 +293,7 @@ def _render_controls_row() -> None:
         if st.button(t(Keys.BTN_CLEAR), type="secondary"):
             logger.info("Clear recommendations button clicked")
             st.session_state[SessionKeys.RECOMMENDATIONS_DATA] = None
+            st.session_state[SessionKeys.PRIORITY_ENGINE] = None
             st.rerun()
 
 
@@ -307,6 +310,8 @@ def _render_results(context: dict) -> None:
     if st.session_state.get("_generate_recommendations"):
         st.session_state["_generate_recommendations"] = False
         _generate_recommendations(context)
+    else:
+        _rescore_recommendations()
 
     recommendations = get_session_value(SessionKeys.RECOMMENDATIONS_DATA)
     if recommendations is None:
@@ -333,8 +338,6 @@ def _render_results(context: dict) -> None:
 
 def _generate_recommendations(context: dict) -> None:
     logger.info("Starting recommendation generation")
-    analyzer: SalesAnalyzer = context["analyzer"]
-    seasonal_data: pd.DataFrame = context["seasonal_data"]
     stock_df = context.get("stock_df")
     forecast_df = context.get("forecast_df")
     settings = get_settings()
@@ -344,7 +347,7 @@ def _generate_recommendations(context: dict) -> None:
 
     with st.spinner(t(Keys.CALCULATING_PRIORITIES)):  # type: ignore[attr-defined]
         try:
-            sku_summary = _build_sku_summary(analyzer, seasonal_data, stock_df, settings)
+            sku_summary = _build_sku_summary(stock_df, settings)
 
             if use_ml:
                 logger.info("Loading ML forecast data")
@@ -359,20 +362,10 @@ def _generate_recommendations(context: dict) -> None:
                 st.error(t(Keys.LOAD_STOCK_AND_FORECAST))
                 return
 
-            forecast_time = settings["lead_time"]
-            recommendations = SalesAnalyzer.generate_order_recommendations(
-                summary_df=sku_summary,
-                forecast_df=forecast_df,
-                forecast_time_months=forecast_time,
-                top_n=st.session_state[SessionKeys.RECOMMENDATIONS_TOP_N],
-                settings=settings,
-            )
-            logger.info("Recommendations generated: %d priority SKUs, %d model-color combinations",
-                        len(recommendations['priority_skus']), len(recommendations['model_color_summary']))
-
-            recommendations = _filter_active_orders(recommendations)
-            recommendations = _apply_facility_filters(recommendations)
-            recommendations = _apply_material_filters(recommendations)
+            engine = PriorityEngine(sku_summary, forecast_df, settings["lead_time"])
+            engine.restrict(_model_filter_mask(pd.Series(engine.frame["MODEL"])))
+            st.session_state[SessionKeys.PRIORITY_ENGINE] = engine
+            recommendations = _score_recommendations(engine, settings)
 
             set_session_value(SessionKeys.RECOMMENDATIONS_DATA, recommendations)
             source_label = "ML" if use_ml else "External"
@@ -386,30 +379,11 @@ def _generate_recommendations(context: dict) -> None:
             st.error(t(Keys.ERR_GENERATING_RECOMMENDATIONS).format(error=e))
 
 
-def _build_sku_summary(analyzer: SalesAnalyzer, seasonal_data: pd.DataFrame, stock_df: pd.DataFrame | None,
-                       settings: dict) -> pd.DataFrame:
-    sku_summary = analyzer.aggregate_by_sku()
-    sku_summary = analyzer.classify_sku_type(
-        sku_summary,
-        cv_basic=settings["cv_thresholds"]["basic"],
-        cv_seasonal=settings["cv_thresholds"]["seasonal"],
-    )
-    sku_summary = analyzer.calculate_safety_stock_and_rop(
-        sku_summary,
-        seasonal_data,
-        z_basic=settings["z_scores"]["basic"],
-        z_regular=settings["z_scores"]["regular"],
-        z_seasonal_in=settings["z_scores"]["seasonal_in"],
-        z_seasonal_out=settings["z_scores"]["seasonal_out"],
-        z_new=settings["z_scores"]["new"],
-        lead_time_months=settings["lead_time"],
-    )
-
-    sku_last_two_years = analyzer.calculate_last_two_years_avg_sales(by_model=False)
-    sku_summary = sku_summary.merge(sku_last_two_years, on="SKU", how="left")
-    sku_summary["LAST_2_YEARS_AVG"] = sku_summary["LAST_2_YEARS_AVG"].fillna(0)
-
-    return merge_stock_into_summary(sku_summary, stock_df, ColumnNames.STOCK)
+def _build_sku_summary(stock_df: pd.DataFrame | None, settings: dict) -> pd.DataFrame:
+    pipeline = load_summary_pipeline(get_excluded_skus())
+    if stock_df is None:
+        return merge_stock_into_summary(pipeline.run("summary", settings), None, ColumnNames.STOCK)
+    return pipeline.run("stock", settings)
 
 
 def _period_to_timestamp(p: object) -> pd.Timestamp:
@@ -482,99 +456,75 @@ def _load_ml_forecast(settings: dict) -> pd.DataFrame | None:
         return None
 
 
-def _filter_active_orders(recommendations: dict) -> dict:
-    from utils.order_manager import get_active_orders
-
-    active_orders = get_active_orders()
-    active_models = {order["model"] for order in active_orders}
+def _priority_params(settings: dict) -> tuple[dict, int]:
+    return extract_priority_config(settings), st.session_state[SessionKeys.RECOMMENDATIONS_TOP_N]
 
-    if not active_models:
-        return recommendations
 
-    priority_skus = recommendations["priority_skus"].copy()
-    priority_skus = priority_skus[~priority_skus["MODEL"].isin(active_models)]
-
-    model_color_summary = SalesAnalyzer.aggregate_order_by_model_color(priority_skus)
-
-    recommendations["priority_skus"] = priority_skus
-    recommendations["model_color_summary"] = model_color_summary
-
-    st.info(f"ℹ️ Filtered out {len(active_models)} model(s) with active orders: {', '.join(sorted(active_models))}")
+def _score_recommendations(engine: PriorityEngine, settings: dict) -> dict:
+    params = _priority_params(settings)
+    recommendations = engine.recommendations(settings, top_n=params[1])
+    st.session_state[SessionKeys.PRIORITY_ENGINE_PARAMS] = params
     return recommendations
 
 
-def _apply_facility_filters(recommendations: dict) -> dict:
-    include_filter = st.session_state[SessionKeys.SZWALNIA_INCLUDE_FILTER]
-    exclude_filter = st.session_state[SessionKeys.SZWALNIA_EXCLUDE_FILTER]
-
-    if not include_filter and not exclude_filter:
-        return recommendations
-
-    model_metadata_df = load_model_metadata()
-    if model_metadata_df is None or ColumnNames.SZWALNIA_G not in model_metadata_df.columns:
-        return recommendations
-
-    priority_skus = recommendations["priority_skus"].copy()
-    priority_skus = priority_skus.merge(
-        model_metadata_df[["Model", ColumnNames.SZWALNIA_G]],
-        left_on="MODEL",
-        right_on="Model",
-        how="left",
-    )
+def _rescore_recommendations() -> None:
+    engine: PriorityEngine | None = st.session_state.get(SessionKeys.PRIORITY_ENGINE)
+    if engine is None or get_session_value(SessionKeys.RECOMMENDATIONS_DATA) is None:
+        return
 
-    priority_skus[ColumnNames.SZWALNIA_G] = priority_skus[ColumnNames.SZWALNIA_G].str.strip()
+    settings = get_settings()
+    if _priority_params(settings) == st.session_state.get(SessionKeys.PRIORITY_ENGINE_PARAMS):
+        return
 
-    if include_filter:
-        priority_skus = priority_skus[priority_skus[ColumnNames.SZWALNIA_G].isin(include_filter)]
+    logger.info("Priority parameters changed, rescoring cached priority inputs")
+    set_session_value(SessionKeys.RECOMMENDATIONS_DATA, _score_recommendations(engine, settings))
 
-    if exclude_filter:
-        priority_skus = priority_skus[~priority_skus[ColumnNames.SZWALNIA_G].isin(exclude_filter)]
 
-    priority_skus = priority_skus.drop(columns=["Model", ColumnNames.SZWALNIA_G])
-
-    model_color_summary = SalesAnalyzer.aggregate_order_by_model_color(priority_skus)
+def _model_filter_mask(models: pd.Series) -> np.ndarray:
+    keep = ~models.isin(_active_order_models())
+    keep &= _metadata_filter_mask(
+        models,
+        ColumnNames.SZWALNIA_G,
+        st.session_state[SessionKeys.SZWALNIA_INCLUDE_FILTER],
+        st.session_state[SessionKeys.SZWALNIA_EXCLUDE_FILTER],
+    )
+    keep &= _metadata_filter_mask(
+        models,
+        ColumnNames.MATERIAL,
+        st.session_state[SessionKeys.MATERIAL_INCLUDE_FILTER],
+        st.session_state[SessionKeys.MATERIAL_EXCLUDE_FILTER],
+    )
+    return keep.to_numpy()
 
-    recommendations["priority_skus"] = priority_skus
-    recommendations["model_color_summary"] = model_color_summary
 
-    return recommendations
+def _active_order_models() -> set[str]:
+    from utils.order_manager import get_active_orders
 
+    active_models = {order["model"] for order in get_active_orders()}
+    if active_models:
+        st.info(f"ℹ️ Filtered out {len(active_models)} model(s) with active orders: {', '.join(sorted(active_models))}")
+    return active_models
 
-def _apply_material_filters(recommendations: dict) -> dict:
-    include_filter = st.session_state[SessionKeys.MATERIAL_INCLUDE_FILTER]
-    exclude_filter = st.session_state[SessionKeys.MATERIAL_EXCLUDE_FILTER]
 
+def _metadata_filter_mask(
+        models: pd.Series, column: str, include_filter: list[str], exclude_filter: list[str]
+) -> pd.Series:
+    keep = pd.Series(True, index=models.index)
     if not include_filter and not exclude_filter:
-        return recommendations
+        return keep
 
     model_metadata_df = load_model_metadata()
-    if model_metadata_df is None or ColumnNames.MATERIAL not in model_metadata_df.columns:
-        return recommendations
-
-    priority_skus = recommendations["priority_skus"].copy()
-    priority_skus = priority_skus.merge(
-        model_metadata_df[["Model", ColumnNames.MATERIAL]],
-        left_on="MODEL",
-        right_on="Model",
-        how="left",
-    )
+    if model_metadata_df is None or column not in model_metadata_df.columns:
+        return keep
 
-    priority_skus[ColumnNames.MATERIAL] = priority_skus[ColumnNames.MATERIAL].str.strip()
+    metadata = model_metadata_df.drop_duplicates(subset=["Model"]).set_index("Model")[column]
+    values = models.map(metadata.str.strip())
 
     if include_filter:
-        priority_skus = priority_skus[priority_skus[ColumnNames.MATERIAL].isin(include_filter)]
-
+        keep &= values.isin(include_filter)
     if exclude_filter:
-        priority_skus = priority_skus[~priority_skus[ColumnNames.MATERIAL].isin(exclude_filter)]
-
-    priority_skus = priority_skus.drop(columns=["Model", ColumnNames.MATERIAL])
-
-    model_color_summary = SalesAnalyzer.aggregate_order_by_model_color(priority_skus)
-
-    recommendations["priority_skus"] = priority_skus
-    recommendations["model_color_summary"] = model_color_summary
-
-    return recommendations
+        keep &= ~values.isin(exclude_filter)
+    return keep
 
 
 def _build_order_item(
@@ -8,6 +8,7 @@ from ui.i18n import Keys, t
 from ui.shared.data_loaders import load_size_aliases, load_size_aliases_reverse
 from ui.shared.display_helpers import display_optimization_metrics
 from ui.shared.session_manager import get_data_source, get_settings
+from ui.shared.sku_utils import extract_model, extract_size
 from ui.shared.styles import PATTERN_SECTION_STYLE
 from utils.logging_config import get_logger
 from utils.pattern_optimizer import (
@@ -186,8 +187,8 @@ def _calculate_model_size_sales_history(
     if sku_col is None:
         return {}
 
-    df["_model"] = df[sku_col].astype(str).str[:5]
-    df["_size"] = df[sku_col].astype(str).str[7:9]
+    df["_model"] = extract_model(df[sku_col])
+    df["_size"] = extract_size(df[sku_col])
 
     filtered = df[df["_model"] == model]
     if filtered.empty:
@@ -6,10 +6,12 @@ import plotly.graph_objects as go
 import streamlit as st
 
 from sales_data import SalesAnalyzer
+from sales_data.analysis import StockProjection
 from ui.constants import ColumnNames, Config, Icons, MimeTypes
 from ui.i18n import t, Keys
-from ui.shared.data_loaders import load_data, load_forecast, load_model_metadata, load_stock, load_stock_history, \
-    load_yearly_sales, load_yearly_forecast
+from ui.shared.data_loaders import load_forecast, load_model_metadata, load_sales_analyzer, \
+    load_stock, load_stock_history, load_stock_projection, load_summary_pipeline, load_yearly_sales, \
+    load_yearly_forecast
 from ui.shared.session_manager import get_excluded_skus, get_settings
 from ui.shared.sku_utils import extract_model, filter_excluded_skus
 from ui.shared.styles import SIDEBAR_STYLE
@@ -39,13 +41,13 @@ def _render_content(context: dict) -> None:
     use_stock = context.get("use_stock", True)
     use_forecast = context.get("use_forecast", True)
 
-    df = filter_excluded_skus(load_data(), get_excluded_skus(), sku_column="sku")
+    analyzer = load_sales_analyzer(get_excluded_skus())
+    df = analyzer.data
     logger.info("Sales data loaded: %d rows, group_by_model=%s", len(df), group_by_model)
-    analyzer = SalesAnalyzer(df)
 
     summary, id_column = _build_summary(group_by_model, settings)
     summary = _merge_model_metadata(summary, id_column)
-    seasonal_data = analyzer.determine_seasonal_months()
+    seasonal_data = load_summary_pipeline(get_excluded_skus()).run("seasonal", settings)
 
     stock_df, stock_df_sku_level, stock_loaded = _process_stock_data(
         summary, group_by_model, use_stock
@@ -82,68 +84,11 @@ def _render_content(context: dict) -> None:
     context["forecast_date"] = forecast_date
 
 
-@st.cache_data(ttl=Config.CACHE_TTL)
-def _build_summary_cached(
-    _sales_data_hash: str,
-    group_by_model: bool,
-    cv_basic: float,
-    cv_seasonal: float,
-    z_basic: float,
-    z_regular: float,
-    z_seasonal_in: float,
-    z_seasonal_out: float,
-    z_new: float,
-    lead_time: float,
-    excluded_skus: tuple[str, ...],
-) -> tuple[pd.DataFrame, str]:
-    df = filter_excluded_skus(load_data(), set(excluded_skus), sku_column="sku")
-    analyzer = SalesAnalyzer(df)
-
-    if group_by_model:
-        summary = analyzer.aggregate_by_model()
-        id_column = "MODEL"
-    else:
-        summary = analyzer.aggregate_by_sku()
-        id_column = "SKU"
-
-    summary = analyzer.classify_sku_type(summary, cv_basic=cv_basic, cv_seasonal=cv_seasonal)
-
-    seasonal_data = analyzer.determine_seasonal_months()
-    summary = analyzer.calculate_safety_stock_and_rop(
-        summary, seasonal_data,
-        z_basic=z_basic, z_regular=z_regular,
-        z_seasonal_in=z_seasonal_in, z_seasonal_out=z_seasonal_out,
-        z_new=z_new, lead_time_months=lead_time,
-    )
-
-    last_two_years_avg = analyzer.calculate_last_two_years_avg_sales(by_model=group_by_model)
-    summary = summary.merge(last_two_years_avg, on=id_column, how="left")
-    summary["LAST_2_YEARS_AVG"] = summary["LAST_2_YEARS_AVG"].fillna(0)
-
-    return summary, id_column
-
-
 def _build_summary(group_by_model: bool, settings: dict) -> tuple[pd.DataFrame, str]:
-    import hashlib
-    sales_data = load_data()
-    hash_values = pd.util.hash_pandas_object(sales_data).to_numpy()
-    data_hash = hashlib.md5(hash_values.tobytes()).hexdigest()
-
-    excluded = tuple(sorted(get_excluded_skus()))
-
-    return _build_summary_cached(
-        _sales_data_hash=data_hash,
-        group_by_model=group_by_model,
-        cv_basic=settings["cv_thresholds"]["basic"],
-        cv_seasonal=settings["cv_thresholds"]["seasonal"],
-        z_basic=settings["z_scores"]["basic"],
-        z_regular=settings["z_scores"]["regular"],
-        z_seasonal_in=settings["z_scores"]["seasonal_in"],
-        z_seasonal_out=settings["z_scores"]["seasonal_out"],
-        z_new=settings["z_scores"]["new"],
-        lead_time=settings["lead_time"],
-        excluded_skus=excluded,
-    )
+    pipeline = load_summary_pipeline(get_excluded_skus())
+    entity_type = "model" if group_by_model else "sku"
+    summary = pipeline.run("summary", settings, entity_type)
+    return summary, "MODEL" if group_by_model else "SKU"
 
 
 def _merge_model_metadata(summary: pd.DataFrame, id_column: str) -> pd.DataFrame:
@@ -166,7 +111,7 @@ def _merge_model_metadata(summary: pd.DataFrame, id_column: str) -> pd.DataFrame
         if "Model" in summary.columns:
             summary = summary.drop(columns=["Model"])
     else:
-        summary["_MODEL"] = pd.Series(summary["SKU"]).astype(str).str[:5]
+        summary["_MODEL"] = extract_model(pd.Series(summary["SKU"]))
         summary = summary.merge(metadata_subset, left_on="_MODEL", right_on="Model", how="left")
         summary = summary.drop(columns=["_MODEL"])
         if "Model" in summary.columns:
@@ -644,6 +589,14 @@ def _render_stock_projection(
 
     st.caption(t(Keys.ITEMS_AVAILABLE).format(count=len(available_ids), entity_type=entity_type))
 
+    projection = load_stock_projection(forecast_date)
+    if projection is None:
+        return
+
+    _render_stockout_ranking(
+        projection, summary, available_ids, id_column, group_by_model, projection_months
+    )
+
     if not selected_id:
         return
 
@@ -652,13 +605,36 @@ def _render_stock_projection(
         return
 
     _render_projection_chart(
-        summary, forecast_df, forecast_date, selected_id, id_column, group_by_model, projection_months
+        projection, summary, forecast_date, selected_id, id_column, group_by_model, projection_months
     )
 
 
+def _render_stockout_ranking(
+        projection: StockProjection,
+        summary: pd.DataFrame,
+        available_ids: list[str],
+        id_column: str,
+        group_by_model: bool,
+        projection_months: int,
+) -> None:
+    valid_summary = summary[summary[id_column].isin(available_ids)]
+    ranking = projection.stockout_summary(
+        valid_summary, "model" if group_by_model else "sku", projection_months
+    )
+    ranking = ranking[ranking["ROP_DATE"].notna()]
+    if ranking.empty:
+        return
+
+    with st.expander(f"{t(Keys.TITLE_STOCKOUT_RANKING)} ({len(ranking)})"):
+        ranking = ranking.merge(
+            valid_summary[[id_column, ColumnNames.STOCK, "ROP"]], on=id_column, how="left"
+        )
+        st.dataframe(ranking, hide_index=True, width="stretch")
+
+
 def _render_projection_chart(
+        projection: StockProjection,
         summary: pd.DataFrame,
-        forecast_df: pd.DataFrame,
         forecast_date: pd.Timestamp,
         selected_id: str,
         id_column: str,
@@ -671,26 +647,14 @@ def _render_projection_chart(
     safety_stock = entity_data["SS"]
     avg_sales = entity_data[ColumnNames.AVERAGE_SALES]
 
-    if group_by_model:
-        projection_df = SalesAnalyzer.calculate_model_stock_projection(
-            model=selected_id,
-            current_stock=current_stock,
-            rop=rop,
-            safety_stock=safety_stock,
-            forecast_df=forecast_df,
-            start_date=forecast_date,
-            projection_months=projection_months,
-        )
-    else:
-        projection_df = SalesAnalyzer.calculate_stock_projection(
-            sku=selected_id,
-            current_stock=current_stock,
-            rop=rop,
-            safety_stock=safety_stock,
-            forecast_df=forecast_df,
-            start_date=forecast_date,
-            projection_months=projection_months,
-        )
+    projection_df = projection.projection(
+        selected_id,
+        current_stock=current_stock,
+        rop=rop,
+        safety_stock=safety_stock,
+        entity_type="model" if group_by_model else "sku",
+        projection_months=projection_months,
+    )
 
     if projection_df.empty:
         entity_name = t(Keys.GROUP_MODEL) if group_by_model else "SKU"
@@ -8,7 +8,7 @@ import streamlit as st
 from sales_data import SalesAnalyzer
 from ui.constants import ColumnNames, Config, Icons, MimeTypes
 from ui.i18n import t, Keys
-from ui.shared.data_loaders import load_data, load_stock
+from ui.shared.data_loaders import load_data, load_stock, refresh_shared_data
 from ui.shared.display_helpers import display_star_product
 from ui.shared.session_manager import get_excluded_skus, get_settings
 from ui.shared.sku_utils import extract_color, extract_model, filter_excluded_model_colors, filter_excluded_models, filter_excluded_skus
@@ -30,8 +30,7 @@ def _render_content(context: dict) -> None:
     st.title(t(Keys.TITLE_WEEKLY_ANALYSIS))
 
     if st.button(t(Keys.BTN_REFRESH), type="primary"):
-        load_data.clear()  # type: ignore[union-attr]
-        load_stock.clear()  # type: ignore[union-attr]
+        refresh_shared_data()
         st.rerun()
 
     excluded = get_excluded_skus()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sales_data.copy_export import EXPORT_COPY, EXPORT_MODES, EXPORT_READ_SQL
+from sales_data.db_source import DatabaseSource
+
+
+def _first_value(values: pd.Series) -> object:
+    present = values.dropna()
+    return present.iloc[0] if not present.empty else None
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    normalized = df.reset_index(drop=True).copy()
+    for col in normalized.columns:
+        values = normalized[col]
+        if values.dtype == object and isinstance(_first_value(values), date):
+            normalized[col] = pd.to_datetime(values).astype("datetime64[ns]")
+        elif values.dtype == object:
+            numeric = pd.to_numeric(values, errors="coerce")
+            if values.notna().any() and numeric.notna().sum() == values.notna().sum():
+                normalized[col] = numeric.astype("float64")
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            normalized[col] = values.astype("datetime64[ns]")
+    return normalized
+
+
+def _frames_match(reference: pd.DataFrame, candidate: pd.DataFrame) -> bool:
+    try:
+        pd.testing.assert_frame_equal(
+            _normalize(reference), _normalize(candidate), check_dtype=False, check_exact=False
+        )
+        return True
+    except AssertionError as e:
+        print(f"    MISMATCH: {str(e)[:200]}")
+        return False
+
+
+def _run_case(
+        title: str,
+        sources: dict[str, DatabaseSource],
+        load: Callable[[DatabaseSource], pd.DataFrame],
+        repeats: int,
+) -> None:
+    print(f"\n{title}")
+    frames: dict[str, pd.DataFrame] = {}
+    baseline: float | None = None
+    for mode, source in sources.items():
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            frames[mode] = load(source)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        baseline = baseline or best
+        memory = frames[mode].memory_usage(deep=True).sum() / 1e6
+        print(
+            f"  {mode:8s} best {best:8.2f}s  rows {len(frames[mode]):>10,}  "
+            f"memory {memory:8.1f}MB  speedup {baseline / best:5.2f}x"
+        )
+
+    if len(frames) == len(EXPORT_MODES):
+        matches = _frames_match(frames[EXPORT_READ_SQL], frames[EXPORT_COPY])
+        print(f"  results {'match' if matches else 'DIFFER'}")
+
+
+def main() -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Benchmark COPY export against read_sql_query")
+    parser.add_argument(
+        "--connection-string",
+        default=os.environ.get("DATABASE_URL"),
+        help="PostgreSQL URL (defaults to DATABASE_URL)",
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per mode (best is reported)")
+    args = parser.parse_args()
+
+    if not args.connection_string:
+        print("No connection string: pass --connection-string or set DATABASE_URL")
+        return 1
+
+    sources = {
+        mode: DatabaseSource(args.connection_string, pool_size=2, export_mode=mode)
+        for mode in (EXPORT_READ_SQL, EXPORT_COPY)
+    }
+    if not all(source.is_available() for source in sources.values()):
+        print("Database is not reachable")
+        return 1
+
+    print("=" * 60)
+    print("Database Export Benchmark")
+    print("=" * 60)
+
+    cases: list[tuple[str, Callable[[DatabaseSource], pd.DataFrame]]] = [
+        ("Sales (raw_sales_transactions)", lambda source: source.load_sales_data()),
+        ("Stock history (stock_snapshots)", lambda source: source.load_stock_history()),
+        ("Forecast (forecast_data)", lambda source: source.load_forecast_data()),
+    ]
+    for title, load in cases:
+        _run_case(title, sources, load, args.repeats)
+
+    for source in sources.values():
+        source.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
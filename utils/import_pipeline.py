@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_QUEUE_SIZE = 2
+
+_DONE = object()
+
+
+@dataclass
+class PipelineStage:
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    batch_size: int | None = None
+
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int
+    processed: int = 0
+    emitted: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        capacity = self.elapsed * self.workers
+        return min(self.busy_seconds / capacity, 1.0) if capacity > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.name:<8} {self.processed:>5} in {self.emitted:>5} out {self.failed:>3} failed"
+            f"  {self.throughput:8.2f} items/s  {self.utilization:4.0%} busy"
+            f"  ({self.workers} worker(s), {self.elapsed:.1f}s)"
+        )
+
+
+class _StageRunner:
+    def __init__(
+            self,
+            stage: PipelineStage,
+            inbox: queue.Queue,
+            outbox: queue.Queue,
+            downstream_workers: int,
+    ) -> None:
+        self.stage = stage
+        self.inbox = inbox
+        self.outbox = outbox
+        self.downstream_workers = downstream_workers
+        self.stats = StageStats(stage.name, max(stage.workers, 1))
+        self._running = self.stats.workers
+        self._lock = threading.Lock()
+
+    def start(self) -> list[threading.Thread]:
+        threads = [
+            threading.Thread(target=self._work, name=f"{self.stage.name}-{i}", daemon=True)
+            for i in range(self.stats.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _work(self) -> None:
+        try:
+            done = False
+            while not done:
+                items, done = self._next_items()
+                if items:
+                    self._process(items)
+        finally:
+            with self._lock:
+                self._running -= 1
+                last_worker = self._running == 0
+            if last_worker:
+                for _ in range(self.downstream_workers):
+                    self.outbox.put(_DONE)
+
+    def _next_items(self) -> tuple[list[Any], bool]:
+        item = self.inbox.get()
+        if item is _DONE:
+            return [], True
+
+        items = [item]
+        while self.stage.batch_size is not None and len(items) < self.stage.batch_size:
+            try:
+                item = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _process(self, items: list[Any]) -> None:
+        started = time.perf_counter()
+        try:
+            if self.stage.batch_size is None:
+                outputs: Iterable[Any] = [self.stage.func(items[0])]
+            else:
+                outputs = list(self.stage.func(items))
+            failed = 0
+        except Exception as e:
+            subject = items[0] if self.stage.batch_size is None else f"{len(items)} item(s)"
+            logger.warning("Pipeline stage %s failed for %s: %s", self.stage.name, subject, e)
+            outputs, failed = [], len(items)
+        finished = time.perf_counter()
+
+        emitted = [output for output in outputs if output is not None]
+        with self._lock:
+            if self.stats.started_at is None:
+                self.stats.started_at = started
+            self.stats.finished_at = finished
+            self.stats.processed += len(items)
+            self.stats.failed += failed
+            self.stats.emitted += len(emitted)
+            self.stats.busy_seconds += finished - started
+
+        for output in emitted:
+            self.outbox.put(output)
+
+
+def run_pipeline(
+        items: Iterable[Any],
+        stages: list[PipelineStage],
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> tuple[list[Any], list[StageStats]]:
+    if not stages:
+        raise ValueError("Pipeline needs at least one stage")
+
+    queues: list[queue.Queue] = [
+        queue.Queue(maxsize=max(queue_size, stage.batch_size or 0)) for stage in stages
+    ]
+    sink: queue.Queue = queue.Queue()
+    queues.append(sink)
+
+    runners = [
+        _StageRunner(
+            stage,
+            queues[i],
+            queues[i + 1],
+            max(stages[i + 1].workers, 1) if i + 1 < len(stages) else 1,
+        )
+        for i, stage in enumerate(stages)
+    ]
+    threads = [thread for runner in runners for thread in runner.start()]
+
+    for item in items:
+        queues[0].put(item)
+    for _ in range(runners[0].stats.workers):
+        queues[0].put(_DONE)
+
+    results = []
+    while (result := sink.get()) is not _DONE:
+        results.append(result)
+
+    for thread in threads:
+        thread.join()
+
+    stats = [runner.stats for runner in runners]
+    for stage_stats in stats:
+        logger.info("Pipeline %s", stage_stats.summary())
+    return results, stats
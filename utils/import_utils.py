@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import hashlib
+import io
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from pandas.api.extensions import take
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
@@ -13,6 +18,8 @@ from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+HASH_CHUNK_SIZE = 1024 * 1024
+
 
 def log_info(message: str) -> None:
     logger.info(message)
@@ -30,7 +37,7 @@ def log_header(title: str) -> None:
 def compute_file_hash(file_path: Path) -> str:
     sha256_hash = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        for byte_block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
@@ -52,101 +59,176 @@ def is_file_imported(engine: Engine, file_hash: str, file_type: str) -> bool:
         return bool(row[0] > 0)
 
 
-def insert_sales_batch(engine: Engine, batch_data: list[dict[str, Any]]) -> int:
+def find_imported_hashes(engine: Engine, file_hashes: list[str], file_type: str) -> set[str]:
+    if not file_hashes:
+        return set()
+
+    query = text(
+        """
+        SELECT DISTINCT file_hash
+        FROM file_imports
+        WHERE file_hash = ANY (:file_hashes) AND file_type = :file_type
+    """
+    )
+
+    with engine.connect() as conn:
+        params = {"file_hashes": file_hashes, "file_type": file_type}
+        result = conn.execute(query, params)  # type: ignore[call-overload]
+        return {row[0] for row in result}
+
+
+def hash_sales_file(
+    file_info: tuple[Path, datetime, datetime]
+) -> tuple[Path, datetime, datetime, str]:
+    file_path, start_date, end_date = file_info
+    return file_path, start_date, end_date, compute_file_hash(file_path)
+
+
+def filter_new_files(engine: Engine, file_infos: list[tuple], file_type: str) -> list[tuple]:
+    imported = find_imported_hashes(engine, [info[-1] for info in file_infos], file_type)
+    return [info for info in file_infos if info[-1] not in imported]
+
+
+SALES_CONFLICT = "ON CONFLICT (order_id, sku, sale_date, source_file) DO NOTHING"
+FORECAST_CONFLICT = "ON CONFLICT (sku, forecast_date, generated_date) DO NOTHING"
+STOCK_CONFLICT = """
+    ON CONFLICT (sku, snapshot_date) DO UPDATE
+        SET product_name     = EXCLUDED.product_name,
+            net_price        = EXCLUDED.net_price,
+            available_stock  = EXCLUDED.available_stock,
+            model            = EXCLUDED.model,
+            source_file      = EXCLUDED.source_file,
+            import_batch_id  = EXCLUDED.import_batch_id,
+            import_timestamp = CURRENT_TIMESTAMP
+"""
+
+
+def copy_merge(engine: Engine, table: str, frame: pd.DataFrame, conflict_clause: str) -> int:
+    if frame.empty:
+        return 0
+
+    columns = ", ".join(frame.columns)
+    staging_table = f"staging_{table}"
+    buffer = io.BytesIO()
+    pacsv.write_csv(
+        pa.Table.from_pandas(frame, preserve_index=False),
+        buffer,
+        write_options=pacsv.WriteOptions(include_header=False),
+    )
+    buffer.seek(0)
+
     with engine.begin() as conn:
         conn.execute(  # type: ignore[call-overload]
             text(
-                """
-            INSERT INTO raw_sales_transactions (
-                order_id, sale_date, sku, quantity, unit_price, total_amount,
-                model, color, size, year_month,
-                source_file, file_start_date, file_end_date,
-                import_batch_id, data_source
+                f"""
+                CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+                SELECT {columns} FROM {table} WITH NO DATA
+            """
             )
-            VALUES (
-                :order_id, :sale_date, :sku, :quantity, :unit_price, :total_amount,
-                :model, :color, :size, :year_month,
-                :source_file, :file_start_date, :file_end_date,
-                :import_batch_id, :data_source
+        )
+        with conn.connection.dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {staging_table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        result = conn.execute(  # type: ignore[call-overload]
+            text(
+                f"""
+                INSERT INTO {table} ({columns})
+                SELECT {columns} FROM {staging_table}
+                {conflict_clause}
+            """
             )
-            ON CONFLICT (order_id, sku, sale_date, source_file) DO NOTHING
-        """
-            ),
-            batch_data,
         )
-    return len(batch_data)
+        return max(result.rowcount, 0)
+
+
+def parse_sku_columns(skus: pd.Series) -> pd.DataFrame:
+    codes, uniques = pd.factorize(skus)
+    unique_skus = pd.Series(np.asarray(uniques, dtype=object)).astype(str)
+    lengths = unique_skus.str.len()
+    parts = {
+        "model": unique_skus.str[:5].where(lengths >= 5),
+        "color": unique_skus.str[5:7].where(lengths >= 7),
+        "size": unique_skus.str[7:9].where(lengths >= 9),
+    }
+    return pd.DataFrame(
+        {name: take(values.to_numpy(dtype=object), codes, allow_fill=True)
+         for name, values in parts.items()},
+        index=skus.index,
+    )
 
 
-def parse_sku_components(sku: str) -> tuple[str | None, str | None, str | None]:
-    model = sku[:5] if len(sku) >= 5 else None
-    color = sku[5:7] if len(sku) >= 7 else None
-    size = sku[7:9] if len(sku) >= 9 else None
-    return model, color, size
+def _column_or_default(df: pd.DataFrame, column: str, default: Any) -> Any:
+    return df[column] if column in df.columns else default
 
 
-def build_sales_record(
-    row: Any,
+def build_sales_frame(
+    df: pd.DataFrame,
     file_path: Path,
     start_date: datetime,
     end_date: datetime,
     batch_id: str,
     data_source: str = "current",
-) -> dict[str, Any]:
-    sku = row["sku"]
-    sale_date = row["data"]
-    model, color, size = parse_sku_components(sku)
-
-    return {
-        "order_id": row["order_id"],
-        "sale_date": sale_date,
-        "sku": sku,
-        "quantity": row["ilosc"],
-        "unit_price": row["cena"],
-        "total_amount": row["razem"],
-        "model": model,
-        "color": color,
-        "size": size,
-        "year_month": sale_date.strftime("%Y-%m") if sale_date else None,
-        "source_file": file_path.name,
-        "file_start_date": start_date,
-        "file_end_date": end_date,
-        "import_batch_id": batch_id,
-        "data_source": data_source,
-    }
-
+) -> pd.DataFrame:
+    sale_date = pd.to_datetime(df["data"]).astype("datetime64[us]")
+    sku_parts = parse_sku_columns(df["sku"])
+
+    return pd.DataFrame(
+        {
+            "order_id": df["order_id"],
+            "sale_date": sale_date,
+            "sku": df["sku"],
+            "quantity": df["ilosc"],
+            "unit_price": df["cena"],
+            "total_amount": df["razem"],
+            "model": sku_parts["model"],
+            "color": sku_parts["color"],
+            "size": sku_parts["size"],
+            "year_month": sale_date.to_numpy().astype("datetime64[M]").astype(str),
+            "source_file": file_path.name,
+            "file_start_date": pd.Timestamp(start_date).date(),
+            "file_end_date": pd.Timestamp(end_date).date(),
+            "import_batch_id": batch_id,
+            "data_source": data_source,
+        },
+        index=df.index,
+    )
 
-def build_forecast_record(
-    row: Any, generation_date: datetime, file_path: Path, batch_id: str
-) -> dict[str, Any]:
-    sku = row["sku"]
-    forecast_date = row["data"]
-    model, _, _ = parse_sku_components(sku)
-
-    return {
-        "forecast_date": forecast_date,
-        "sku": sku,
-        "forecast_quantity": row["forecast"],
-        "model": model,
-        "generated_date": generation_date,
-        "source_file": file_path.name,
-        "import_batch_id": batch_id,
-    }
 
+def build_forecast_frame(
+    df: pd.DataFrame, generation_date: datetime, file_path: Path, batch_id: str
+) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "forecast_date": pd.to_datetime(df["data"]).dt.date,
+            "sku": df["sku"],
+            "forecast_quantity": df["forecast"],
+            "model": parse_sku_columns(df["sku"])["model"],
+            "generated_date": pd.Timestamp(generation_date).date(),
+            "source_file": file_path.name,
+            "import_batch_id": batch_id,
+        },
+        index=df.index,
+    )
 
-def build_stock_record(row: Any, snapshot_date: datetime, file_path: Path, batch_id: str) -> dict[str, Any]:
-    sku = row["sku"]
-    model, _, _ = parse_sku_components(sku)
 
-    return {
-        "snapshot_date": snapshot_date,
-        "sku": sku,
-        "product_name": row["nazwa"] if "nazwa" in row.index else "",
-        "net_price": row["cena_netto"] if "cena_netto" in row.index else 0,
-        "available_stock": row["available_stock"] if "available_stock" in row.index else 0,
-        "model": model,
-        "source_file": file_path.name,
-        "import_batch_id": batch_id,
-    }
+def build_stock_frame(
+    df: pd.DataFrame, snapshot_date: datetime, file_path: Path, batch_id: str
+) -> pd.DataFrame:
+    frame = pd.DataFrame(
+        {
+            "snapshot_date": pd.Timestamp(snapshot_date).date(),
+            "sku": df["sku"],
+            "product_name": _column_or_default(df, "nazwa", ""),
+            "net_price": _column_or_default(df, "cena_netto", 0),
+            "available_stock": _column_or_default(df, "available_stock", 0),
+            "model": parse_sku_columns(df["sku"])["model"],
+            "source_file": file_path.name,
+            "import_batch_id": batch_id,
+        },
+        index=df.index,
+    )
+    return frame.drop_duplicates(["sku", "snapshot_date"], keep="last")
 
 
 def log_file_import(
@@ -194,7 +276,7 @@ def log_file_import(
         )
 
 
-def process_sales_file_in_batches(
+def import_sales_frame(
     df: pd.DataFrame,
     engine: Engine,
     file_path: Path,
@@ -202,21 +284,6 @@ def process_sales_file_in_batches(
     end_date: datetime,
     batch_id: str,
     data_source: str = "current",
-    batch_size: int = 1000,
 ) -> int:
-    records_imported = 0
-    batch_data: list[dict[str, Any]] = []
-
-    for _, row in df.iterrows():
-        batch_data.append(
-            build_sales_record(row, file_path, start_date, end_date, batch_id, data_source)
-        )
-
-        if len(batch_data) >= batch_size:
-            records_imported += insert_sales_batch(engine, batch_data)
-            batch_data = []
-
-    if batch_data:
-        records_imported += insert_sales_batch(engine, batch_data)
-
-    return records_imported
+    frame = build_sales_frame(df, file_path, start_date, end_date, batch_id, data_source)
+    return copy_merge(engine, "raw_sales_transactions", frame, SALES_CONFLICT)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sales_data.excel_reader import CALAMINE_AVAILABLE, ENGINE_CALAMINE, ENGINE_OPENPYXL
+from sales_data.loader import XLSX, SalesDataLoader
+from sales_data.stock_history_cache import StockHistoryCache
+from utils.parallel_loader import PARALLEL_LOAD_MODES, parallel_load
+
+
+def _time_load(
+    items: list[Any], load_func: Callable[[Any], Any], mode: str, workers: int, desc: str
+) -> tuple[float, int]:
+    start = time.perf_counter()
+    frames = parallel_load(items, load_func, max_workers=workers, desc=desc, mode=mode)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(len(frame) for frame in frames)
+
+
+def _run_case(
+    title: str, items: list[Any], load_func: Callable[[Any], Any], workers: int, repeats: int
+) -> None:
+    print(f"\n{title}: {len(items)} file(s), {workers} worker(s)")
+    if not items:
+        print("  [SKIP] No files found")
+        return
+
+    baseline: float | None = None
+    for mode in PARALLEL_LOAD_MODES:
+        timings = []
+        rows = 0
+        for _ in range(repeats):
+            elapsed, rows = _time_load(items, load_func, mode, workers, title)
+            timings.append(elapsed)
+        best = min(timings)
+        baseline = baseline or best
+        print(f"  {mode:8s} best {best:8.2f}s  rows {rows:>10,}  speedup {baseline / best:5.2f}x")
+
+
+def _time_parse(load_func: Callable[[Path], Any], file_path: Path) -> float | None:
+    start = time.perf_counter()
+    try:
+        load_func(file_path)
+    except Exception as e:
+        print(f"    ERROR {file_path.name}: {str(e)[:60]}")
+        return None
+    return time.perf_counter() - start
+
+
+def _print_parse_report(title: str, files: list[Path], loaders: dict[str, Callable[[Path], Any]]) -> None:
+    print(f"\n{title}: {len(files)} xlsx file(s)")
+    if not files:
+        print("  [SKIP] No files found")
+        return
+
+    print(f"  {'file':40s} " + " ".join(f"{engine:>10s}" for engine in loaders) + "   gain")
+    totals = dict.fromkeys(loaders, 0.0)
+    for file_path in files:
+        timings = {engine: _time_parse(load, file_path) for engine, load in loaders.items()}
+        cells = " ".join(
+            f"{timing:9.2f}s" if timing is not None else f"{'-':>10s}" for timing in timings.values()
+        )
+        baseline = timings.get(ENGINE_OPENPYXL)
+        fast = timings.get(ENGINE_CALAMINE)
+        gain = f"{baseline / fast:5.1f}x" if baseline and fast else "    -"
+        print(f"  {file_path.name[:40]:40s} {cells}  {gain}")
+        for engine, timing in timings.items():
+            totals[engine] += timing or 0.0
+
+    print(f"  {'TOTAL':40s} " + " ".join(f"{total:9.2f}s" for total in totals.values()))
+
+
+def _run_parse_report(paths_file: str | None) -> None:
+    if not CALAMINE_AVAILABLE:
+        print("\npython-calamine is not installed, parse-time report needs both engines")
+        return
+
+    loaders = {
+        engine: SalesDataLoader(paths_file, excel_engine=engine)
+        for engine in (ENGINE_OPENPYXL, ENGINE_CALAMINE)
+    }
+    reference = loaders[ENGINE_OPENPYXL]
+
+    _print_parse_report(
+        "Sales files (parse time per engine)",
+        [path for path, _, _ in reference.find_data_files() if path.suffix == XLSX],
+        {engine: loader.load_sales_file for engine, loader in loaders.items()},
+    )
+    _print_parse_report(
+        "Stock snapshots (parse time per engine)",
+        [path for path, _ in reference.find_stock_files() if path.suffix == XLSX],
+        {engine: loader.load_stock_file for engine, loader in loaders.items()},
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark sales and stock file loading")
+    parser.add_argument("--workers", type=int, default=4, help="Worker count for both modes")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per mode (best is reported)")
+    parser.add_argument("--paths-file", default=None, help="Alternative paths_to_files.txt")
+    parser.add_argument(
+        "--parse-report", action="store_true", help="Per-file parse times for openpyxl vs calamine"
+    )
+    args = parser.parse_args()
+
+    loader = SalesDataLoader(args.paths_file)
+    stock_cache = StockHistoryCache(Path("unused"), loader)
+
+    print("=" * 60)
+    print("Loader Benchmark")
+    print("=" * 60)
+
+    if args.parse_report:
+        _run_parse_report(args.paths_file)
+        return 0
+
+    _run_case(
+        "Sales files",
+        loader.find_data_files(),
+        loader._load_single_sales_file,
+        args.workers,
+        args.repeats,
+    )
+    _run_case(
+        "Stock snapshots",
+        loader.find_stock_files(),
+        stock_cache._load_snapshot,
+        args.workers,
+        args.repeats,
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
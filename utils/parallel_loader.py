@@ -1,5 +1,11 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, TypeVar
+import os
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+import pandas as pd
+import pyarrow as pa
 
 from utils.logging_config import get_logger
 
@@ -10,12 +16,137 @@ R = TypeVar("R")
 
 PARALLEL_LOAD_WORKERS = 4
 
+MODE_THREAD = "thread"
+MODE_PROCESS = "process"
+PARALLEL_LOAD_MODES = (MODE_THREAD, MODE_PROCESS)
+
+
+class _ArrowFrame:
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: bytes) -> None:
+        self.payload = payload
+
+
+def _frame_to_ipc(df: pd.DataFrame) -> _ArrowFrame:
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return _ArrowFrame(sink.getvalue().to_pybytes())
+
+
+def _frame_from_ipc(frame: _ArrowFrame) -> pd.DataFrame:
+    with pa.ipc.open_stream(pa.py_buffer(frame.payload)) as reader:
+        return reader.read_all().to_pandas()
+
+
+def _encode_result(result: Any) -> Any:
+    if isinstance(result, pd.DataFrame):
+        return _frame_to_ipc(result)
+    if isinstance(result, tuple):
+        return tuple(_encode_result(part) for part in result)
+    return result
+
+
+def _decode_result(result: Any) -> Any:
+    if isinstance(result, _ArrowFrame):
+        return _frame_from_ipc(result)
+    if isinstance(result, tuple):
+        return tuple(_decode_result(part) for part in result)
+    return result
+
+
+def _run_in_worker(load_func: Callable[[Any], Any], item: Any) -> Any:
+    return _encode_result(load_func(item))
+
+
+def _resolve_config(mode: str | None, max_workers: int | None) -> tuple[str, int]:
+    if mode is not None and max_workers is not None:
+        return mode, max_workers
+
+    from utils.settings_manager import load_settings
+
+    config = load_settings().get("parallel_loading", {})
+    resolved_mode = mode or config.get("mode", MODE_THREAD)
+    resolved_workers = max_workers or config.get("max_workers") or PARALLEL_LOAD_WORKERS
+
+    if resolved_mode not in PARALLEL_LOAD_MODES:
+        logger.warning("Unknown parallel loading mode '%s', using threads", resolved_mode)
+        resolved_mode = MODE_THREAD
+
+    return resolved_mode, int(resolved_workers)
+
+
+def _is_picklable(obj: Any) -> bool:
+    try:
+        pickle.dumps(obj)
+        return True
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+
+
+def _load_fallback(load_func: Callable[[T], R | None], item: T, desc: str) -> R | None:
+    try:
+        return load_func(item)
+    except Exception as e:
+        logger.warning("%s failed for %s: %s", desc, item, e)
+        return None
+
+
+def _collect_thread_results(
+    executor: Executor, items: list[T], load_func: Callable[[T], R | None], desc: str
+) -> list[R]:
+    results: list[R] = []
+    futures = {executor.submit(load_func, item): item for item in items}
+    for future in as_completed(futures):
+        item = futures[future]
+        try:
+            result = future.result()
+            if result is not None:
+                results.append(result)
+        except Exception as e:
+            logger.warning("%s failed for %s: %s", desc, item, e)
+    return results
+
+
+def _collect_process_results(
+    executor: Executor, items: list[T], load_func: Callable[[T], R | None], desc: str
+) -> list[R]:
+    results: list[R] = []
+    futures = {executor.submit(_run_in_worker, load_func, item): item for item in items}
+    for future in as_completed(futures):
+        item = futures[future]
+        try:
+            result = _decode_result(future.result())
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            logger.warning("%s failed in worker process for %s (%s), retrying in-process", desc, item, e)
+            result = _load_fallback(load_func, item, desc)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def _process_load(
+    items: list[T], load_func: Callable[[T], R | None], max_workers: int, desc: str
+) -> list[R]:
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return _collect_process_results(executor, items, load_func, desc)
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning("%s: process pool unavailable (%s), falling back to threads", desc, e)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return _collect_thread_results(executor, items, load_func, desc)
+
 
 def parallel_load(
     items: list[T],
     load_func: Callable[[T], R | None],
-    max_workers: int = PARALLEL_LOAD_WORKERS,
+    max_workers: int | None = None,
     desc: str = "Loading",
+    mode: str | None = None,
 ) -> list[R]:
     if not items:
         return []
@@ -24,15 +155,14 @@ def parallel_load(
         result = load_func(items[0])
         return [result] if result is not None else []
 
-    results: list[R] = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(load_func, item): item for item in items}
-        for future in as_completed(futures):
-            item = futures[future]
-            try:
-                result = future.result()
-                if result is not None:
-                    results.append(result)
-            except Exception as e:
-                logger.warning("%s failed for %s: %s", desc, item, e)
-    return results
+    resolved_mode, workers = _resolve_config(mode, max_workers)
+
+    if resolved_mode == MODE_PROCESS:
+        if _is_picklable(load_func):
+            process_workers = min(workers, len(items), os.cpu_count() or 1)
+            logger.debug("%s: %d item(s) on %d worker process(es)", desc, len(items), process_workers)
+            return _process_load(items, load_func, process_workers, desc)
+        logger.debug("%s: load function cannot be sent to worker processes, using threads", desc)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return _collect_thread_results(executor, items, load_func, desc)
@@ -65,6 +65,8 @@ DEFAULT_SETTINGS = {
         "confidence_level": 0.95,
     },
     "facility_capacity": {},
+    "parallel_loading": {"mode": "thread", "max_workers": 4},
+    "excel_engine": "auto",
 }
 
 